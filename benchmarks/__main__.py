@@ -0,0 +1,87 @@
+import sys
+import argparse
+from benchmarks.generators import GENERATORS
+from benchmarks.io_benchmarks import run_io_benchmarks, DEFAULT_SIZES, DEFAULT_REPEATS
+from benchmarks.import_benchmarks import run_import_benchmarks
+from benchmarks.codec_benchmarks import run_codec_benchmarks
+from benchmarks.results import (write_results, load_results, compare_results, print_results, print_comparisons,
+                                DEFAULT_TOLERANCE)
+
+
+SUITES = ['io', 'codecs', 'imports']
+
+
+def main(argv: list = None) -> int:
+    """
+    Runs the benchmark suites, writes the results as JSON and compares them to a baseline.
+    Usage: python -m benchmarks --sizes 1e3,1e6 --output results.json --baseline baseline.json
+    :param argv: optional list of arguments, sys.argv[1:] if None
+    :return: int, 1 if a metric regressed beyond the tolerance else 0
+    """
+    args = build_parser().parse_args(argv)
+    results = []
+    if 'io' in args.suites:
+        results.extend(run_io_benchmarks(
+            series_names=args.series,
+            sizes=args.sizes,
+            repeats=args.repeats,
+            measure_memory=not args.no_memory,
+            directory=args.directory
+        ))
+    if 'codecs' in args.suites:
+        results.extend(run_codec_benchmarks(sizes=args.sizes, repeats=args.repeats))
+    if 'imports' in args.suites:
+        results.extend(run_import_benchmarks(repeats=args.repeats))
+
+    print_results(results)
+    if args.output is not None:
+        write_results(args.output, results)
+    if args.baseline is None:
+        return 0
+
+    comparisons = compare_results(results, load_results(args.baseline), args.tolerance)
+    print('')
+    print_comparisons(comparisons)
+    return 1 if any([c.regressed for c in comparisons]) else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='TimeBox benchmarks')
+    parser.add_argument('--suites', type=_comma_separated(SUITES), default=SUITES,
+                        help='comma separated suites to run (default: {})'.format(','.join(SUITES)))
+    parser.add_argument('--series', type=_comma_separated(sorted(GENERATORS)), default=None,
+                        help='comma separated synthetic series (default: all of {})'.format(','.join(sorted(GENERATORS))))
+    parser.add_argument('--sizes', type=_sizes, default=DEFAULT_SIZES,
+                        help='comma separated numbers of points, like 1e3,1e8 (default: {})'.format(
+                            ','.join([str(s) for s in DEFAULT_SIZES])))
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help='timed calls per case')
+    parser.add_argument('--no-memory', action='store_true', help='do not measure peak memory')
+    parser.add_argument('--directory', default=None, help='directory the files are written to '
+                                                          '(default: the system temporary directory)')
+    parser.add_argument('--output', default=None, help='path of the JSON results file')
+    parser.add_argument('--baseline', default=None, help='path of a JSON results file to compare to')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='relative increase of a metric reported as a regression (default: {})'.format(
+                            DEFAULT_TOLERANCE))
+    return parser
+
+
+def _comma_separated(choices: list):
+    def parse(value: str) -> list:
+        values = [v for v in value.split(',') if v != '']
+        for v in values:
+            if v not in choices:
+                raise argparse.ArgumentTypeError('{} is not one of {}'.format(v, ', '.join(choices)))
+        return values
+    return parse
+
+
+def _sizes(value: str) -> list:
+    try:
+        return [int(float(v)) for v in value.split(',') if v != '']
+    except ValueError:
+        raise argparse.ArgumentTypeError('{} is not a comma separated list of numbers'.format(value))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import numpy as np
+from timebox.utils.numpy_utils import compress_array, decompress_array, compress_float_array, \
+    round_array_returning_integers, integer_compression_dtype
+from timebox.utils.datetime_utils import compress_time_delta_array
+from timebox.utils.buffer_pool import BufferPool
+from benchmarks.generators import DEFAULT_SEED
+from benchmarks.timing import time_repeats, summarize_seconds
+from benchmarks.results import BenchmarkResult
+
+
+SUITE = 'codecs'
+DEFAULT_CODEC_SIZES = [1000, 100000, 1000000]
+DEFAULT_CODEC_REPEATS = 7
+DTYPES = ['int32', 'int64', 'float32', 'float64']
+FLOAT_DTYPES = ['float32', 'float64']
+NUM_DECIMALS = 2  # decimals kept by round_array_returning_integers
+
+
+def random_walk(dtype: np.dtype, num_points: int, random_state: np.random.RandomState) -> np.ndarray:
+    """
+    Small steps from a start value, floats are cents. Compresses well in 'e' mode
+    """
+    steps = random_state.randint(-3, 4, num_points)
+    if dtype.kind == 'f':
+        return (np.round((100000 + np.cumsum(steps)) / 100., 2)).astype(dtype)
+    return (100000 + np.cumsum(steps)).astype(dtype)
+
+
+def uniform(dtype: np.dtype, num_points: int, random_state: np.random.RandomState) -> np.ndarray:
+    """
+    Values spread over a quarter of the integer range or +/- 1e6, which barely compresses
+    """
+    if dtype.kind == 'f':
+        return random_state.uniform(-1e6, 1e6, num_points).astype(dtype)
+    return random_state.randint(0, 2 ** (8 * dtype.itemsize - 2), num_points, dtype=np.int64).astype(dtype)
+
+
+def low_cardinality(dtype: np.dtype, num_points: int, random_state: np.random.RandomState) -> np.ndarray:
+    """
+    Four values that fit in float16, like states or flags. Compresses well in 'm' mode
+    """
+    return random_state.choice(np.array([0., 1., 2.5, 4.], dtype=dtype), num_points)
+
+
+def nan_heavy(dtype: np.dtype, num_points: int, random_state: np.random.RandomState) -> np.ndarray:
+    """
+    A float random walk where 90% of the values are NaN, floats only
+    """
+    values = random_walk(dtype, num_points, random_state)
+    values[random_state.uniform(0., 1., num_points) < 0.9] = np.nan
+    return values
+
+
+DISTRIBUTIONS = {
+    'random_walk': random_walk,
+    'uniform': uniform,
+    'low_cardinality': low_cardinality,
+    'nan_heavy': nan_heavy
+}
+INTEGER_DISTRIBUTIONS = ['random_walk', 'uniform', 'low_cardinality']
+
+# timedelta64[ns] differentials: whole seconds, whole milliseconds and irregular nanoseconds
+TIME_DELTA_STEPS = {
+    'seconds': 10 ** 9,
+    'milliseconds': 10 ** 6,
+    'nanoseconds': 1
+}
+
+
+def values(distribution: str, dtype: str, num_points: int, seed: int = DEFAULT_SEED) -> np.ndarray:
+    """
+    Generates deterministic values of a distribution
+    :param distribution: key of DISTRIBUTIONS
+    :param dtype: numpy dtype name
+    :param num_points: number of values
+    :param seed: random seed
+    :return: numpy array
+    """
+    return DISTRIBUTIONS[distribution](np.dtype(dtype), num_points, np.random.RandomState(seed))
+
+
+def time_deltas(steps: str, num_points: int, seed: int = DEFAULT_SEED) -> np.ndarray:
+    """
+    Generates deterministic positive timedelta64[ns] differentials, multiples of a step
+    :param steps: key of TIME_DELTA_STEPS
+    :param num_points: number of differentials
+    :param seed: random seed
+    :return: numpy array of timedelta64[ns]
+    """
+    random_state = np.random.RandomState(seed)
+    return (random_state.randint(1, 1000, num_points) * TIME_DELTA_STEPS[steps]).astype('timedelta64[ns]')
+
+
+def run_codec_benchmarks(sizes: list = None, repeats: int = DEFAULT_CODEC_REPEATS) -> list:
+    """
+    Times the encoding primitives on each dtype and distribution they apply to. Cases are named like
+    'compress_array/e/int64/random_walk/1000000'. Throughput is the uncompressed bytes per second,
+    the input of encoders and the output of decompress_array, and the compression ratio is the
+    uncompressed over the encoded bytes
+    :param sizes: optional list of numbers of values, DEFAULT_CODEC_SIZES if None
+    :param repeats: number of timed calls of each case
+    :return: list of BenchmarkResult
+    """
+    sizes = DEFAULT_CODEC_SIZES if sizes is None else sizes
+    results = []
+    for size in sizes:
+        for dtype in DTYPES:
+            distributions = DISTRIBUTIONS if dtype in FLOAT_DTYPES else INTEGER_DISTRIBUTIONS
+            for distribution in sorted(distributions):
+                arr = values(distribution, dtype, size)
+                variant = '{}/{}/{}'.format(dtype, distribution, size)
+                if distribution != 'nan_heavy':
+                    for mode in ['e', 'm']:
+                        results.extend(_benchmark_compress_array(arr, mode, variant, repeats))
+                if dtype in FLOAT_DTYPES:
+                    results.append(_benchmark_compress_float_array(arr, variant, repeats))
+                    if distribution != 'nan_heavy':
+                        results.append(_benchmark_round_array(arr, variant, repeats))
+        for steps in sorted(TIME_DELTA_STEPS):
+            results.append(_benchmark_compress_time_delta_array(time_deltas(steps, size), '{}/{}'.format(
+                steps, size), repeats))
+    return results
+
+
+def _result(function: str, variant: str, samples: list, uncompressed_bytes: int, encoded_bytes: int):
+    """
+    :param function: name of the timed function, and its mode if any
+    :param variant: dtype, distribution and size of the case
+    :param samples: list of seconds per call
+    :param uncompressed_bytes: number of bytes before encoding
+    :param encoded_bytes: number of bytes after encoding
+    :return: BenchmarkResult
+    """
+    seconds = summarize_seconds(samples)
+    per_second = uncompressed_bytes / max(seconds['p50'], 1e-12)
+    return BenchmarkResult(SUITE, '{}/{}'.format(function, variant), seconds, {
+        'uncompressed_bytes': uncompressed_bytes,
+        'encoded_bytes': encoded_bytes,
+        'compression_ratio': uncompressed_bytes / max(encoded_bytes, 1),
+        'mb_per_second': per_second / 1e6,
+        'gb_per_second': per_second / 1e9
+    })
+
+
+def _benchmark_compress_array(arr: np.ndarray, mode: str, variant: str, repeats: int) -> list:
+    """
+    Times compress_array with a re-used BufferPool, like TimeBox.write, and decompress_array into a
+    pre-allocated array, like TimeBox.read_into
+    """
+    buffer_pool = BufferPool()
+    samples = time_repeats(lambda: compress_array(arr, mode, buffer_pool), repeats)
+    compressed = compress_array(arr, mode, buffer_pool)
+    if isinstance(compressed, np.ndarray):
+        # left uncompressed, there is nothing to decompress
+        return [_result('compress_array/{}'.format(mode), variant, samples, arr.nbytes, compressed.nbytes)]
+
+    encoded = compressed.numpy_array.copy()
+    out = np.empty(arr.size, dtype=arr.dtype)
+    decompress_samples = time_repeats(
+        lambda: decompress_array(encoded, mode, compressed.reference_value, out=out), repeats
+    )
+    return [
+        _result('compress_array/{}'.format(mode), variant, samples, arr.nbytes, encoded.nbytes),
+        _result('decompress_array/{}'.format(mode), variant, decompress_samples, arr.nbytes, encoded.nbytes)
+    ]
+
+
+def _benchmark_compress_float_array(arr: np.ndarray, variant: str, repeats: int) -> BenchmarkResult:
+    samples = time_repeats(lambda: compress_float_array(arr), repeats)
+    return _result('compress_float_array', variant, samples, arr.nbytes, compress_float_array(arr).nbytes)
+
+
+def _benchmark_round_array(arr: np.ndarray, variant: str, repeats: int) -> BenchmarkResult:
+    buffer_pool = BufferPool()
+    samples = time_repeats(lambda: round_array_returning_integers(arr, NUM_DECIMALS, buffer_pool), repeats)
+    rounded = round_array_returning_integers(arr, NUM_DECIMALS, buffer_pool)
+    return _result('round_array_returning_integers', variant, samples, arr.nbytes, rounded.nbytes)
+
+
+def _benchmark_compress_time_delta_array(arr: np.ndarray, variant: str, repeats: int) -> BenchmarkResult:
+    """
+    The encoded size is that of the unsigned integers TimeBox stores the differentials as
+    """
+    samples = time_repeats(lambda: compress_time_delta_array(arr), repeats)
+    compressed = compress_time_delta_array(arr)[0]
+    encoded_bytes = compressed.size * np.dtype(integer_compression_dtype(0, int(np.amax(compressed)))).itemsize
+    return _result('compress_time_delta_array', variant, samples, arr.nbytes, encoded_bytes)
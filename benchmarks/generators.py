@@ -0,0 +1,132 @@
+import numpy as np
+from collections import namedtuple
+from timebox.writer import CodecOptions
+
+
+DEFAULT_SEED = 20180101
+START_SECONDS = 1514764800  # 2018-01-01T00:00:00 UTC
+
+# timestamps are int64 counts of unit since epoch, codec_options is like {tag: CodecOptions}
+SyntheticSeries = namedtuple('SyntheticSeries', ['name', 'timestamps', 'unit', 'data', 'codec_options'])
+
+PRICE_CODEC = CodecOptions(use_compression=True, compression_mode='e', num_decimals_to_store=2)
+COUNT_CODEC = CodecOptions(use_compression=True, compression_mode='m', num_decimals_to_store=None)
+RAW_CODEC = CodecOptions(use_compression=False, compression_mode='m', num_decimals_to_store=None)
+
+
+def random_walk_ticks(num_points: int, seed: int = DEFAULT_SEED) -> SyntheticSeries:
+    """
+    Trade ticks: irregular millisecond timestamps, a price moving by one cent at a time and integer sizes
+    :param num_points: number of points
+    :param seed: random seed
+    :return: SyntheticSeries
+    """
+    rs = np.random.RandomState(seed)
+    gaps = np.maximum(1, rs.exponential(250., num_points)).astype(np.int64)
+    timestamps = START_SECONDS * 1000 + np.cumsum(gaps) - gaps[0]
+    steps = rs.choice(np.array([-1, 0, 1], dtype=np.int64), num_points, p=[0.3, 0.4, 0.3])
+    price = np.round((10000 + np.cumsum(steps)) / 100., 2)
+    size = rs.geometric(0.05, num_points).astype(np.int64)
+    return SyntheticSeries(
+        name='random_walk_ticks',
+        timestamps=timestamps,
+        unit='ms',
+        data={'price': price, 'size': size},
+        codec_options={'price': PRICE_CODEC, 'size': COUNT_CODEC}
+    )
+
+
+def regular_bars(num_points: int, seed: int = DEFAULT_SEED) -> SyntheticSeries:
+    """
+    One-minute OHLCV bars: regular timestamps, prices rounded to cents and integer volumes
+    :param num_points: number of points
+    :param seed: random seed
+    :return: SyntheticSeries
+    """
+    rs = np.random.RandomState(seed)
+    timestamps = START_SECONDS + np.arange(0, num_points, dtype=np.int64) * 60
+    close = 100. * np.exp(np.cumsum(rs.normal(0., 0.001, num_points)))
+    open_ = np.concatenate([close[:1], close[:-1]])
+    high = np.maximum(open_, close) + np.abs(rs.normal(0., 0.05, num_points))
+    low = np.minimum(open_, close) - np.abs(rs.normal(0., 0.05, num_points))
+    volume = rs.poisson(1000, num_points).astype(np.int64)
+    data = {
+        'open': np.round(open_, 2),
+        'high': np.round(high, 2),
+        'low': np.round(low, 2),
+        'close': np.round(close, 2),
+        'volume': volume
+    }
+    codec_options = dict([(t, PRICE_CODEC) for t in ['open', 'high', 'low', 'close']])
+    codec_options['volume'] = COUNT_CODEC
+    return SyntheticSeries(name='regular_bars', timestamps=timestamps, unit='s', data=data,
+                           codec_options=codec_options)
+
+
+def low_cardinality_flags(num_points: int, seed: int = DEFAULT_SEED) -> SyntheticSeries:
+    """
+    Status flags sampled every second: a state out of four values held for long runs and a rare alarm
+    :param num_points: number of points
+    :param seed: random seed
+    :return: SyntheticSeries
+    """
+    rs = np.random.RandomState(seed)
+    timestamps = START_SECONDS + np.arange(0, num_points, dtype=np.int64)
+    run_lengths = rs.geometric(0.01, num_points // 50 + 1)
+    states = rs.randint(0, 4, run_lengths.size).astype(np.uint8)
+    state = np.repeat(states, run_lengths)
+    while state.size < num_points:
+        state = np.concatenate([state, state])
+    alarm = (rs.random_sample(num_points) < 0.001).astype(np.uint8)
+    return SyntheticSeries(
+        name='low_cardinality_flags',
+        timestamps=timestamps,
+        unit='s',
+        data={'state': state[:num_points], 'alarm': alarm},
+        codec_options={'state': COUNT_CODEC, 'alarm': COUNT_CODEC}
+    )
+
+
+def nan_heavy_sensors(num_points: int, seed: int = DEFAULT_SEED) -> SyntheticSeries:
+    """
+    Sensor readings every 100 milliseconds with jitter, most of them missing (NaN)
+    :param num_points: number of points
+    :param seed: random seed
+    :return: SyntheticSeries
+    """
+    rs = np.random.RandomState(seed)
+    jitter = rs.randint(0, 50, num_points)
+    jitter[:1] = 0  # file start dates are stored in whole seconds
+    timestamps = START_SECONDS * 1000 + np.arange(0, num_points, dtype=np.int64) * 100 + jitter
+    temperature = 20. + np.cumsum(rs.normal(0., 0.01, num_points))
+    temperature[rs.random_sample(num_points) < 0.9] = np.nan
+    pressure = (1000. + rs.normal(0., 5., num_points)).astype(np.float32)
+    pressure[rs.random_sample(num_points) < 0.7] = np.nan
+    return SyntheticSeries(
+        name='nan_heavy_sensors',
+        timestamps=timestamps,
+        unit='ms',
+        data={'temperature': temperature, 'pressure': pressure},
+        codec_options={'temperature': RAW_CODEC, 'pressure': RAW_CODEC}
+    )
+
+
+GENERATORS = {
+    'random_walk_ticks': random_walk_ticks,
+    'regular_bars': regular_bars,
+    'low_cardinality_flags': low_cardinality_flags,
+    'nan_heavy_sensors': nan_heavy_sensors
+}
+
+
+def generate(name: str, num_points: int, seed: int = DEFAULT_SEED) -> SyntheticSeries:
+    """
+    Generates a synthetic series, the same name, number of points and seed always give the same series
+    :param name: one of GENERATORS
+    :param num_points: number of points
+    :param seed: random seed
+    :return: SyntheticSeries
+    """
+    if name not in GENERATORS:
+        raise ValueError('Unknown series {}, expected one of {}'.format(name, sorted(GENERATORS)))
+    return GENERATORS[name](int(num_points), seed)
@@ -0,0 +1,32 @@
+import sys
+import subprocess
+import numpy as np
+from benchmarks.timing import time_repeats, summarize_seconds
+from benchmarks.results import BenchmarkResult
+
+
+SUITE = 'imports'
+DEFAULT_MODULES = ['timebox.timebox', 'pandas']
+
+
+def run_import_benchmarks(modules: list = None, repeats: int = 5) -> list:
+    """
+    Times importing modules in a fresh interpreter, less the median start-up time of the interpreter
+    :param modules: optional list of module names, DEFAULT_MODULES if None
+    :param repeats: number of interpreters started per module
+    :return: list of BenchmarkResult
+    """
+    modules = DEFAULT_MODULES if modules is None else modules
+    start_up = float(np.median(time_repeats(lambda: _run_python('pass'), repeats)))
+    results = []
+    for m in modules:
+        samples = time_repeats(lambda: _run_python('import {}'.format(m)), repeats)
+        results.append(BenchmarkResult(SUITE, 'import {}'.format(m),
+                                       summarize_seconds([max(0., s - start_up) for s in samples]),
+                                       {'interpreter_start_seconds': start_up}))
+    return results
+
+
+def _run_python(code: str):
+    subprocess.check_call([sys.executable, '-c', code])
+    return
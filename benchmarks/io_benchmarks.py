@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import importlib.util
+from timebox.timebox import TimeBox
+from timebox.writer import apply_codec_options
+from benchmarks.generators import GENERATORS, generate
+from benchmarks.timing import time_repeats, summarize_seconds, peak_memory_bytes
+from benchmarks.results import BenchmarkResult
+
+
+SUITE = 'io'
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]  # 1e7 and 1e8 take minutes and gigabytes, pass them explicitly
+DEFAULT_REPEATS = 5
+
+
+def run_io_benchmarks(series_names: list = None, sizes: list = None, repeats: int = DEFAULT_REPEATS,
+                      measure_memory: bool = True, directory: str = None) -> list:
+    """
+    Times writing and reading each synthetic series at each size. Throughput is the uncompressed size
+    of the dates and tag data, 8 bytes per date plus the tag arrays, per second
+    :param series_names: optional list of generators.GENERATORS names, all of them if None
+    :param sizes: optional list of numbers of points, DEFAULT_SIZES if None
+    :param repeats: number of timed calls of each operation
+    :param measure_memory: if True, each operation is run once more under tracemalloc for its peak memory
+    :param directory: optional directory the files are written to, a temporary directory if None
+    :return: list of BenchmarkResult
+    """
+    series_names = sorted(GENERATORS) if series_names is None else series_names
+    sizes = DEFAULT_SIZES if sizes is None else sizes
+    temporary_directory = tempfile.mkdtemp(prefix='timebox-benchmarks-', dir=directory)
+    results = []
+    try:
+        for name in series_names:
+            for size in sizes:
+                file_path = os.path.join(temporary_directory, '{}_{}.npb'.format(name, size))
+                results.extend(_benchmark_series(generate(name, size), file_path, repeats, measure_memory))
+                os.remove(file_path)
+    finally:
+        shutil.rmtree(temporary_directory, ignore_errors=True)
+    return results
+
+
+def _benchmark_series(series, file_path: str, repeats: int, measure_memory: bool) -> list:
+    """
+    Times the operations on one series
+    :param series: generators.SyntheticSeries
+    :param file_path: path of the file written
+    :param repeats: number of timed calls of each operation
+    :param measure_memory: if True, measures the peak memory of each operation
+    :return: list of BenchmarkResult
+    """
+    tb = TimeBox.from_arrays(series.timestamps, series.data, unit=series.unit)
+    for t in tb._tags:
+        apply_codec_options([tb._tags[t]], series.codec_options[t])
+    tb.file_path = file_path
+    num_points = series.timestamps.size
+    raw_bytes = series.timestamps.nbytes + sum([a.nbytes for a in series.data.values()])
+
+    operations = [
+        ('write', tb.write),
+        ('read', lambda: TimeBox(file_path).read()),
+        ('read_lazy', lambda: TimeBox(file_path).read(lazy=True)),
+    ]
+    if importlib.util.find_spec('pandas') is not None:
+        operations.append(('to_pandas', lambda: TimeBox(file_path).to_pandas()))
+
+    results = []
+    for operation, func in operations:
+        seconds = summarize_seconds(time_repeats(func, repeats))
+        metrics = {
+            'num_points': num_points,
+            'raw_bytes': raw_bytes,
+            'file_bytes': os.path.getsize(file_path),
+            'mb_per_second': raw_bytes / 1e6 / max(seconds['p50'], 1e-12),
+            'points_per_second': num_points / max(seconds['p50'], 1e-12)
+        }
+        if measure_memory:
+            metrics['peak_memory_bytes'] = peak_memory_bytes(func)
+        results.append(BenchmarkResult(SUITE, '{}/{}/{}'.format(series.name, num_points, operation), seconds,
+                                       metrics))
+    return results
@@ -0,0 +1,150 @@
+import sys
+import json
+import platform
+import datetime
+import numpy as np
+from collections import namedtuple
+
+
+RESULTS_FORMAT_VERSION = 1
+DEFAULT_TOLERANCE = 0.1
+
+# seconds is a summary from timing.summarize_seconds, metrics a dictionary of numbers
+BenchmarkResult = namedtuple('BenchmarkResult', ['suite', 'case', 'seconds', 'metrics'])
+# change is current / baseline - 1, regressed is True if it is larger than the tolerance
+Comparison = namedtuple('Comparison', ['suite', 'case', 'metric', 'baseline', 'current', 'change', 'regressed'])
+
+# metrics compared with a baseline, for all of them lower is better
+COMPARED_METRICS = ['seconds.p50', 'file_bytes', 'encoded_bytes', 'peak_memory_bytes']
+
+
+def environment() -> dict:
+    """
+    Describes the machine and library versions the results were measured with
+    :return: dictionary
+    """
+    return {
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'measured_at': datetime.datetime.utcnow().replace(microsecond=0).isoformat() + 'Z'
+    }
+
+
+def results_to_json(results: list) -> dict:
+    """
+    :param results: list of BenchmarkResult
+    :return: JSON-serializable dictionary
+    """
+    return {
+        'format_version': RESULTS_FORMAT_VERSION,
+        'environment': environment(),
+        'results': [r._asdict() for r in results]
+    }
+
+
+def write_results(path: str, results: list):
+    """
+    Writes results to a JSON file
+    :param path: file path
+    :param results: list of BenchmarkResult
+    :return: void
+    """
+    with open(path, 'w') as f:
+        json.dump(results_to_json(results), f, indent=1, sort_keys=True)
+    return
+
+
+def load_results(path: str) -> list:
+    """
+    Loads results written by write_results
+    :param path: file path
+    :return: list of BenchmarkResult
+    """
+    with open(path, 'r') as f:
+        contents = json.load(f)
+    return [BenchmarkResult(**r) for r in contents['results']]
+
+
+def metric_value(result: BenchmarkResult, metric: str):
+    """
+    Gets a metric of a result, 'seconds.<statistic>' for timings
+    :param result: BenchmarkResult
+    :param metric: metric name
+    :return: number or None if the result does not have it
+    """
+    if metric.startswith('seconds.'):
+        return result.seconds.get(metric[len('seconds.'):])
+    return result.metrics.get(metric)
+
+
+def compare_results(results: list, baseline: list, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """
+    Compares results to a baseline, case by case. Cases missing from either side are ignored
+    :param results: list of BenchmarkResult
+    :param baseline: list of BenchmarkResult
+    :param tolerance: allowed relative increase, 0.1 flags metrics more than 10% above the baseline
+    :return: list of Comparison
+    """
+    baseline_by_case = dict([((b.suite, b.case), b) for b in baseline])
+    comparisons = []
+    for r in results:
+        b = baseline_by_case.get((r.suite, r.case))
+        if b is None:
+            continue
+        for metric in COMPARED_METRICS:
+            current = metric_value(r, metric)
+            previous = metric_value(b, metric)
+            if current is None or previous is None or previous <= 0:
+                continue
+            change = current / previous - 1.
+            comparisons.append(Comparison(r.suite, r.case, metric, previous, current, change, change > tolerance))
+    return comparisons
+
+
+def print_results(results: list, stream=None):
+    """
+    Prints one line per result with its median time and throughput
+    :param results: list of BenchmarkResult
+    :param stream: optional file-like object, sys.stdout if None
+    :return: void
+    """
+    stream = sys.stdout if stream is None else stream
+    line = '{:>8}|{:>44}|{:>10}|{:>10}|{:>10}|{:>12}|{:>10}'
+    print(line.format('Suite', 'Case', 'p50 ms', 'p90 ms', 'MB/s', 'FileBytes', 'PeakMB'), file=stream)
+    for r in results:
+        peak = r.metrics.get('peak_memory_bytes')
+        print(line.format(
+            r.suite,
+            r.case,
+            round(r.seconds['p50'] * 1000., 3),
+            round(r.seconds['p90'] * 1000., 3),
+            '' if r.metrics.get('mb_per_second') is None else round(r.metrics['mb_per_second'], 1),
+            r.metrics.get('file_bytes', ''),
+            '' if peak is None else round(peak / 1e6, 1)
+        ), file=stream)
+    return
+
+
+def print_comparisons(comparisons: list, stream=None):
+    """
+    Prints the comparisons to a baseline, regressions are marked
+    :param comparisons: list of Comparison
+    :param stream: optional file-like object, sys.stdout if None
+    :return: void
+    """
+    stream = sys.stdout if stream is None else stream
+    line = '{:>8}|{:>44}|{:>18}|{:>14}|{:>14}|{:>9}|{}'
+    print(line.format('Suite', 'Case', 'Metric', 'Baseline', 'Current', 'Change', ''), file=stream)
+    for c in comparisons:
+        print(line.format(
+            c.suite,
+            c.case,
+            c.metric,
+            '{:.6g}'.format(c.baseline),
+            '{:.6g}'.format(c.current),
+            '{:+.1%}'.format(c.change),
+            'REGRESSION' if c.regressed else ''
+        ), file=stream)
+    return
@@ -0,0 +1,124 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from benchmarks.generators import GENERATORS, generate
+from benchmarks.io_benchmarks import run_io_benchmarks
+from benchmarks.codec_benchmarks import run_codec_benchmarks, values, DISTRIBUTIONS
+from benchmarks.results import BenchmarkResult, write_results, load_results, compare_results, print_comparisons
+from benchmarks.timing import summarize_seconds
+from timebox.timebox import TimeBox
+from timebox.writer import apply_codec_options
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_generators_are_deterministic(self):
+        for name in GENERATORS:
+            first = generate(name, 5000)
+            second = generate(name, 5000)
+            self.assertEqual(5000, first.timestamps.size)
+            self.assertTrue(np.all(np.diff(first.timestamps) >= 0))
+            self.assertTrue(np.array_equal(first.timestamps, second.timestamps))
+            self.assertEqual(sorted(first.data), sorted(first.codec_options))
+            for t in first.data:
+                self.assertEqual(5000, first.data[t].size)
+                self.assertTrue(np.array_equal(first.data[t], second.data[t], equal_nan=True))
+            other_seed = generate(name, 5000, seed=1)
+            self.assertFalse(all([np.array_equal(first.data[t], other_seed.data[t], equal_nan=True)
+                                  for t in first.data]))
+
+        sensors = generate('nan_heavy_sensors', 10000)
+        self.assertGreater(np.isnan(sensors.data['temperature']).mean(), 0.85)
+        self.assertEqual(4, np.unique(generate('low_cardinality_flags', 10000).data['state']).size)
+        with self.assertRaises(ValueError):
+            generate('unknown', 10)
+        return
+
+    def test_series_round_trip(self):
+        directory = tempfile.mkdtemp()
+        try:
+            for name in GENERATORS:
+                series = generate(name, 2000)
+                tb = TimeBox.from_arrays(series.timestamps, series.data, unit=series.unit)
+                for t in tb._tags:
+                    apply_codec_options([tb._tags[t]], series.codec_options[t])
+                tb.file_path = os.path.join(directory, '{}.npb'.format(name))
+                tb.write()
+                arrays = TimeBox(tb.file_path).to_arrays(series.unit)
+                self.assertTrue(np.array_equal(series.timestamps, arrays.timestamps))
+                for t in series.data:
+                    self.assertTrue(np.array_equal(series.data[t], arrays.data[t], equal_nan=True))
+        finally:
+            shutil.rmtree(directory)
+        return
+
+    def test_run_io_benchmarks(self):
+        results = run_io_benchmarks(series_names=['regular_bars'], sizes=[100, 1000], repeats=3)
+        cases = [r.case for r in results]
+        self.assertIn('regular_bars/100/write', cases)
+        self.assertIn('regular_bars/1000/read', cases)
+        self.assertIn('regular_bars/1000/read_lazy', cases)
+        for r in results:
+            self.assertEqual('io', r.suite)
+            self.assertEqual(3, r.seconds['repeats'])
+            self.assertLessEqual(r.seconds['min'], r.seconds['p50'])
+            self.assertLessEqual(r.seconds['p90'], r.seconds['max'])
+            self.assertGreater(r.metrics['file_bytes'], 0)
+            self.assertGreater(r.metrics['mb_per_second'], 0)
+            self.assertGreater(r.metrics['peak_memory_bytes'], 0)
+        return
+
+    def test_run_codec_benchmarks(self):
+        results = run_codec_benchmarks(sizes=[1000], repeats=2)
+        by_case = dict([(r.case, r) for r in results])
+        self.assertEqual(len(results), len(by_case))
+        for case in ['compress_array/e/int64/random_walk/1000', 'decompress_array/m/float32/uniform/1000',
+                     'compress_float_array/float64/nan_heavy/1000',
+                     'round_array_returning_integers/float32/low_cardinality/1000',
+                     'compress_time_delta_array/seconds/1000']:
+            self.assertIn(case, by_case)
+        self.assertNotIn('compress_array/e/float64/nan_heavy/1000', by_case)
+        for r in results:
+            self.assertEqual('codecs', r.suite)
+            self.assertGreater(r.metrics['gb_per_second'], 0)
+            self.assertEqual(r.metrics['uncompressed_bytes'] / r.metrics['encoded_bytes'],
+                             r.metrics['compression_ratio'])
+
+        # int64 random walk steps fit in one byte, seconds in 1000 ns steps in two bytes
+        self.assertEqual(999, by_case['compress_array/e/int64/random_walk/1000'].metrics['encoded_bytes'])
+        self.assertEqual(8000, by_case['compress_time_delta_array/seconds/1000'].metrics['uncompressed_bytes'])
+        self.assertEqual(2000, by_case['compress_time_delta_array/seconds/1000'].metrics['encoded_bytes'])
+        for name in DISTRIBUTIONS:
+            self.assertTrue(np.array_equal(values(name, 'float64', 100), values(name, 'float64', 100),
+                                           equal_nan=True))
+        return
+
+    def test_json_and_baseline_comparison(self):
+        baseline = [BenchmarkResult('io', 'a', summarize_seconds([1., 1., 1.]), {'file_bytes': 100}),
+                    BenchmarkResult('io', 'b', summarize_seconds([1., 2., 3.]), {'file_bytes': 100})]
+        directory = tempfile.mkdtemp()
+        try:
+            file_path = os.path.join(directory, 'baseline.json')
+            write_results(file_path, baseline)
+            self.assertEqual(baseline, load_results(file_path))
+        finally:
+            shutil.rmtree(directory)
+
+        results = [BenchmarkResult('io', 'a', summarize_seconds([1.5]), {'file_bytes': 100}),
+                   BenchmarkResult('io', 'b', summarize_seconds([2.1]), {'file_bytes': 90}),
+                   BenchmarkResult('io', 'c', summarize_seconds([9.]), {'file_bytes': 100})]
+        comparisons = compare_results(results, baseline, tolerance=0.1)
+        regressed = [(c.case, c.metric) for c in comparisons if c.regressed]
+        self.assertEqual([('a', 'seconds.p50')], regressed)
+        self.assertEqual(4, len(comparisons))
+
+        stream = io.StringIO()
+        print_comparisons(comparisons, stream)
+        self.assertEqual(1, stream.getvalue().count('REGRESSION'))
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import gc
+import time
+import tracemalloc
+import numpy as np
+
+
+PERCENTILES = [50, 90, 99]
+
+
+def time_repeats(func, repeats: int, setup=None) -> list:
+    """
+    Times repeated calls of a function, garbage is collected before each call
+    :param func: function without arguments
+    :param repeats: number of calls
+    :param setup: optional function without arguments called, untimed, before each call
+    :return: list of seconds per call
+    """
+    samples = []
+    for _ in range(0, repeats):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize_seconds(samples: list) -> dict:
+    """
+    Summarizes timing samples
+    :param samples: list of seconds
+    :return: dictionary like {'repeats', 'min', 'mean', 'p50', 'p90', 'p99', 'max'}
+    """
+    samples = np.array(samples, dtype=np.float64)
+    summary = {'repeats': int(samples.size), 'min': float(samples.min()), 'mean': float(samples.mean())}
+    for p in PERCENTILES:
+        summary['p{}'.format(p)] = float(np.percentile(samples, p))
+    summary['max'] = float(samples.max())
+    return summary
+
+
+def peak_memory_bytes(func, setup=None) -> int:
+    """
+    Measures the peak memory allocated by one call of a function with tracemalloc. numpy reports its
+    array allocations to tracemalloc, so the peak includes array buffers. The call is not timed,
+    tracemalloc slows down code making many small allocations
+    :param func: function without arguments
+    :param setup: optional function without arguments called, untraced, before the call
+    :return: int, peak number of bytes allocated during the call
+    """
+    if setup is not None:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak
@@ -7,16 +7,37 @@ echo ""
 coverage erase
 
 
+coverage run -a --omit "venv/*" -m timebox.tests.test_import
 coverage run -a --omit "venv/*" -m timebox.tests.test_tag_string_name
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_aggregate
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_arrays
+coverage run -a --omit "venv/*" -m timebox.tests.test_convert
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_cache
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_csv
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_expression
 coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_data_io
 coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_dates
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_describe
 coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_file_info
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_info
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_instrumentation
 coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_io
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_join
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_lazy
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_lookup
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_memory
 coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_pandas
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_read_into
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_read_many
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_resample
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_store
 coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_tag
 coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_tag_compression
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_where
+coverage run -a --omit "venv/*" -m timebox.tests.test_timebox_writer
 
 coverage run -a --omit "venv/*" -m timebox.utils.tests.test_binary
+coverage run -a --omit "venv/*" -m timebox.utils.tests.test_buffer_pool
 coverage run -a --omit "venv/*" -m timebox.utils.tests.test_datetime_utils
 coverage run -a --omit "venv/*" -m timebox.utils.tests.test_numpy_compression
 coverage run -a --omit "venv/*" -m timebox.utils.tests.test_numpy_decompression
@@ -25,6 +46,8 @@ coverage run -a --omit "venv/*" -m timebox.utils.tests.test_numpy_utils
 coverage run -a --omit "venv/*" -m timebox.utils.tests.test_pandas_utils
 coverage run -a --omit "venv/*" -m timebox.utils.tests.test_validation
 
+coverage run -a --omit "venv/*" -m benchmarks.tests.test_benchmarks
+
 report_coverage=false
 include_missing=false
 for i in "$@"
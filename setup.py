@@ -12,7 +12,12 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type='text/markdown',
     url='https://github.com/briankopp/timebox',
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=['benchmarks', 'benchmarks.*']),
+    entry_points={
+        'console_scripts': [
+            'timebox=timebox.cli:main'
+        ]
+    },
     install_requires=[
         'numpy',
         'pandas',
@@ -0,0 +1,93 @@
+import numpy as np
+from timebox.range_reader import RangeReader
+from timebox.block_statistics import compute_block_statistics, combine_statistics
+from timebox.exceptions import AggregationFunctionError
+
+
+AGGREGATION_FUNCTIONS = ['min', 'max', 'sum', 'count', 'mean', 'first', 'last']
+
+
+def aggregate_file(file_path: str, tags: list, start=None, end=None, funcs: list = None) -> dict:
+    """
+    Aggregates tags over the points dated from start to end, both included. The blocks of
+    points that are entirely in the range are answered from the block statistics in the
+    footer, only the partial blocks at the edges of the range are decoded. Tags of files
+    written without block statistics are decoded over the whole range. NaN values are left
+    out, like in pandas: count is the number of values that are not NaN, first and last are
+    the first and last values that are not NaN
+    :param file_path: path of the TimeBox file
+    :param tags: list of tag identifiers
+    :param start: optional first date, like numpy.datetime64('2018-01-01') or '2018-01-01T00:00'
+    :param end: optional last date
+    :param funcs: optional list of AGGREGATION_FUNCTIONS, all of them if None
+    :return: dictionary like {tag_identifier: {func: value}}. min, max, first, last and mean are None
+    if the range holds no value
+    """
+    funcs = AGGREGATION_FUNCTIONS if funcs is None else funcs
+    for f in funcs:
+        if f not in AGGREGATION_FUNCTIONS:
+            raise AggregationFunctionError('Aggregation function {} is not one of {}'.format(
+                f, ', '.join(AGGREGATION_FUNCTIONS)))
+
+    with RangeReader(file_path) as reader:
+        first, stop = reader.index_range(start, end)
+        result = dict()
+        for t in tags:
+            combined = combine_statistics(range_statistics(reader, t, first, stop))
+            result[t] = dict([(f, _aggregation_value(combined, f)) for f in funcs])
+    return result
+
+
+def range_statistics(reader: RangeReader, identifier, first: int, stop: int) -> np.ndarray:
+    """
+    Gets the statistics of the consecutive pieces of a range of points: the decoded partial
+    block at each edge and the stored statistics of the whole blocks in between
+    :param reader: RangeReader of the file
+    :param identifier: tag identifier
+    :param first: index of the first point
+    :param stop: index after the last point
+    :return: numpy array of block_statistics.block_statistics_dtype, in date order
+    """
+    tag = reader.tag(identifier)
+    stored = reader.block_statistics(identifier)
+    if stored is None:
+        return _decoded_statistics(reader, identifier, first, stop)
+
+    block_num_points, statistics = stored
+    first_block = -(-first // block_num_points)
+    stop_block = stop // block_num_points if stop < reader.num_points else statistics.size
+    if first_block >= stop_block:
+        return _decoded_statistics(reader, identifier, first, stop)
+    pieces = [
+        _decoded_statistics(reader, identifier, first, first_block * block_num_points),
+        statistics[first_block:stop_block],
+        _decoded_statistics(reader, identifier, min(stop_block * block_num_points, stop), stop)
+    ]
+    return np.concatenate([p.astype(statistics.dtype, copy=False) for p in pieces])
+
+
+def _decoded_statistics(reader: RangeReader, identifier, first: int, stop: int) -> np.ndarray:
+    """
+    Decodes a range of points and summarizes it as a single block
+    :return: numpy array of block_statistics.block_statistics_dtype with one element, none if the range is empty
+    """
+    data = reader.read_tag(identifier, first, stop)
+    return compute_block_statistics(data, max(data.size, 1))
+
+
+def _aggregation_value(combined: np.void, func: str):
+    """
+    :param combined: combined statistics, see block_statistics.combine_statistics
+    :param func: one of AGGREGATION_FUNCTIONS
+    :return: numpy scalar, or None if the range holds no value and func is not count or sum
+    """
+    count = int(combined['count'])
+    if func == 'count':
+        return count
+    if func == 'sum':
+        return combined['sum']
+    if count == 0:
+        return None
+    if func == 'mean':
+        return combined['sum'] / count
+    return combined[func]
@@ -0,0 +1,138 @@
+import numpy as np
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from timebox.timebox import TimeBox
+from timebox.range_reader import RangeReader
+from timebox.exceptions import DataDoesNotMatchTagDefinitionError
+
+
+# slice [first, last) of a file open in a RangeReader, written at position of the result
+FileSlice = namedtuple('FileSlice', ['reader', 'first', 'last', 'position'])
+
+
+def read_many(paths: list, tags: list = None, start=None, end=None, workers: int = None) -> TimeBox:
+    """
+    Reads the points between start and end, inclusive, from many TimeBox files into one TimeBox.
+    Files are read on a thread pool and each file's slice is decoded straight into one
+    preallocated result, so no intermediate concatenation is done. Only the points of each file
+    within the range are decoded, see RangeReader.read_tag. Files are ordered by start date,
+    points of files whose dates overlap are not merged or re-sorted
+    :param paths: list of file paths
+    :param tags: optional list of tag identifiers to read, all tags of the first file if None
+    :param start: optional start date, anything np.datetime64 accepts
+    :param end: optional end date, anything np.datetime64 accepts
+    :param workers: maximum number of threads, ThreadPoolExecutor's default if None
+    :return: TimeBox with the dates and tag data, not associated with a file
+    """
+    start = None if start is None else np.datetime64(start)
+    end = None if end is None else np.datetime64(end)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        infos = list(executor.map(TimeBox.info, paths))
+        overlapping = sorted(
+            [(info.start_date, i) for i, info in enumerate(infos)
+             if info.num_points > 0
+             and (start is None or info.end_date >= start)
+             and (end is None or info.start_date <= end)],
+            key=lambda x: x[0]
+        )
+        selected_paths = [paths[i] for _, i in overlapping]
+        opening = [executor.submit(_open_slice, p, start, end) for p in selected_paths]
+        wait(opening)
+        opened = [f.result() for f in opening if f.exception() is None]
+        try:
+            # raises the first failure to open a file, the files that did open are closed below
+            for f in opening:
+                f.result()
+            slices = _layout_slices(opened)
+            result = _allocate_result(slices, tags)
+            futures = [executor.submit(_copy_slice, s, result) for s in slices]
+            for f in futures:
+                f.result()
+        finally:
+            for reader, _, _ in opened:
+                reader.close()
+    return result
+
+
+def _open_slice(path: str, start, end) -> tuple:
+    """
+    Opens a file and finds the points between start and end, inclusive, decoding at most a
+    block of dates at each end, see RangeReader.index_range
+    :param path: file path
+    :param start: np.datetime64 or None
+    :param end: np.datetime64 or None
+    :return: tuple like (RangeReader, first index, last index)
+    """
+    reader = RangeReader(path)
+    try:
+        first, last = reader.index_range(start, end)
+    except Exception:
+        reader.close()
+        raise
+    return reader, first, last
+
+
+def _layout_slices(opened: list) -> list:
+    """
+    Assigns each non-empty slice its position in the result, in order
+    :param opened: list like [(RangeReader, first index, last index)]
+    :return: list of FileSlice
+    """
+    slices = []
+    position = 0
+    for reader, first, last in opened:
+        if last > first:
+            slices.append(FileSlice(reader=reader, first=first, last=last, position=position))
+            position += last - first
+    return slices
+
+
+def _allocate_result(slices: list, tags: list = None) -> TimeBox:
+    """
+    Allocates the dates and tag arrays of the result
+    :param slices: list of FileSlice
+    :param tags: optional list of tag identifiers, all tags of the first file if None
+    :return: TimeBox with uninitialized dates and tag data
+    """
+    result = TimeBox()
+    if len(slices) == 0:
+        return result
+    first_reader = slices[0].reader
+    tags = first_reader.tags if tags is None else tags
+    num_points = sum([s.last - s.first for s in slices])
+    for s in slices:
+        for t in tags:
+            if t not in s.reader.tags:
+                raise DataDoesNotMatchTagDefinitionError('Tag {} was not found in {}'.format(t, s.reader.file_path))
+            if s.reader.tag(t).dtype != first_reader.tag(t).dtype:
+                raise DataDoesNotMatchTagDefinitionError('Tag {} of {} does not have dtype '
+                                                         '{}'.format(t, s.reader.file_path, first_reader.tag(t).dtype))
+
+    result._tag_names_are_strings = first_reader._tb._tag_names_are_strings
+    result._dates = np.empty(num_points, dtype=np.result_type(*[np.dtype('datetime64[{}]'.format(s.reader.dates_units))
+                                                                for s in slices]))
+    for t in tags:
+        result._tags[t] = first_reader.tag(t).definition_copy()
+        result._tags[t].data = np.empty(num_points, dtype=result._tags[t].dtype)
+    result._num_points = num_points
+    first_date = first_reader.read_dates(slices[0].first, slices[0].first + 1)[0]
+    result._start_date = np.datetime64(int(first_date), first_reader.dates_units).astype('datetime64[s]')
+    return result
+
+
+def _copy_slice(file_slice: FileSlice, result: TimeBox):
+    """
+    Decodes the dates and tag data of one file slice into the result. Only the points of the
+    slice are decoded, tags stored in 'e' mode from the checkpoint of its first block, and the
+    tag data is decoded straight into the result when the slice starts at a checkpoint
+    :param file_slice: FileSlice
+    :param result: TimeBox from _allocate_result
+    :return: void
+    """
+    reader, first, last, position = file_slice
+    count = last - first
+    dates = np.asarray(reader.read_dates(first, last)).view('datetime64[{}]'.format(reader.dates_units))
+    result._dates[position:position+count] = dates
+    for t in result._tags:
+        reader.read_tag(t, first, last, result._tags[t].data[position:position+count])
+    return
@@ -0,0 +1,220 @@
+import struct
+import numpy as np
+from timebox.constants import TimeBoxFooterSectionTypes, FILE_FOOTER_SECTION_TAG_INDEX
+from timebox.footer import FooterSection
+from timebox.exceptions import FooterFormatError
+
+
+BLOCK_NUM_POINTS = 4096  # points summarized by each block of the footer statistics
+STATISTICS_CHUNK_NUM_BLOCKS = 256  # blocks summarized at a time, bounds the scratch space
+BLOCK_HEADER_STRUCT = struct.Struct('<I')  # points per block, leads the block sections
+
+
+def block_statistics_dtype(dtype, floating_point_rounded: bool = False) -> np.dtype:
+    """
+    Gets the dtype of the per-block statistics of a tag. min, max, first and last are in the
+    tag's dtype, or float64 for rounded tags, sum is in the widest type of the same kind, and
+    count is the number of values that are not NaN
+    :param dtype: numpy dtype of the tag
+    :param floating_point_rounded: True if the tag is rounded, its statistics are of the rounded values
+    :return: numpy structured dtype
+    """
+    dtype = np.dtype(np.float64 if floating_point_rounded else dtype).newbyteorder('<')
+    sum_dtype = {'f': '<f8', 'i': '<i8', 'u': '<u8'}[dtype.kind]
+    return np.dtype([('min', dtype), ('max', dtype), ('first', dtype), ('last', dtype), ('sum', sum_dtype),
+                     ('count', '<u8')])
+
+
+def compute_block_statistics(values: np.ndarray, block_num_points: int = BLOCK_NUM_POINTS,
+                             num_decimals: int = None) -> np.ndarray:
+    """
+    Summarizes consecutive blocks of values. NaN values are left out of every statistic, so
+    blocks without any other value have a count of 0 and NaN min, max, first and last
+    :param values: 1-d numpy array of int, uint or float values
+    :param block_num_points: number of values per block, the last block may hold fewer
+    :param num_decimals: if not None, values are the integers of a tag rounded to num_decimals
+    decimals, and the statistics are of the decoded floats
+    :return: numpy array of block_statistics_dtype, one element per block
+    """
+    statistics = np.empty((values.size + block_num_points - 1) // block_num_points,
+                          dtype=block_statistics_dtype(values.dtype, num_decimals is not None))
+    chunk_num_points = block_num_points * STATISTICS_CHUNK_NUM_BLOCKS
+    for start in range(0, values.size, chunk_num_points):
+        chunk = values[start:start + chunk_num_points]
+        summarize_segments(chunk, np.arange(0, chunk.size, block_num_points),
+                           statistics[start // block_num_points:(start + chunk_num_points) // block_num_points])
+    if num_decimals is not None:
+        for name in ['min', 'max', 'first', 'last', 'sum']:
+            np.divide(statistics[name], pow(10, num_decimals), out=statistics[name])
+    return statistics
+
+
+def summarize_segments(values: np.ndarray, starts: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Summarizes consecutive segments of values, each statistic is computed with one reduceat
+    :param values: 1-d numpy array of int, uint or float values
+    :param starts: sorted int array of the index of the first value of each segment, starting with 0.
+    each segment ends where the next one starts
+    :param out: optional structured array of block_statistics_dtype to fill, one element per segment
+    :return: numpy array of block_statistics_dtype, out if given
+    """
+    out = np.empty(starts.size, dtype=block_statistics_dtype(values.dtype)) if out is None else out
+    if starts.size == 0:
+        return out
+    ends = np.append(starts[1:], values.size)
+    if values.dtype.kind != 'f':
+        out['count'] = ends - starts
+        out['min'] = np.minimum.reduceat(values, starts)
+        out['max'] = np.maximum.reduceat(values, starts)
+        out['first'] = values[starts]
+        out['last'] = values[ends - 1]
+        out['sum'] = np.add.reduceat(values, starts, dtype=np.uint64 if values.dtype.kind == 'u' else np.int64)
+        return out
+
+    valid = ~np.isnan(values)
+    out['count'] = np.add.reduceat(valid, starts, dtype=np.uint64)
+    out['min'] = np.fmin.reduceat(values, starts)
+    out['max'] = np.fmax.reduceat(values, starts)
+    out['sum'] = np.add.reduceat(np.where(valid, values, 0.), starts, dtype=np.float64)
+    positions = np.where(valid, np.arange(values.size), values.size)
+    first = np.minimum.reduceat(positions, starts)
+    np.copyto(positions, -1, where=~valid)
+    last = np.maximum.reduceat(positions, starts)
+    empty = out['count'] == 0
+    out['first'] = values[np.where(empty, starts, first)]
+    out['last'] = values[np.where(empty, starts, last)]
+    out['first'][empty] = np.nan
+    out['last'][empty] = np.nan
+    return out
+
+
+def combine_segments(statistics: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Combines consecutive segments of statistics, like combine_statistics on each segment
+    :param statistics: array of block_statistics_dtype in date order
+    :param starts: sorted int array of the index of the first element of each segment, starting with 0.
+    each segment ends where the next one starts
+    :return: numpy array of block_statistics_dtype, one element per segment
+    """
+    out = np.empty(starts.size, dtype=statistics.dtype)
+    if starts.size == 0:
+        return out
+    out['count'] = np.add.reduceat(statistics['count'], starts, dtype=np.uint64)
+    out['sum'] = np.add.reduceat(statistics['sum'], starts, dtype=statistics.dtype['sum'])
+    if statistics.dtype['min'].kind == 'f':
+        # statistics without values hold NaN, which fmin and fmax leave out
+        out['min'] = np.fmin.reduceat(statistics['min'], starts)
+        out['max'] = np.fmax.reduceat(statistics['max'], starts)
+    else:
+        out['min'] = np.minimum.reduceat(statistics['min'], starts)
+        out['max'] = np.maximum.reduceat(statistics['max'], starts)
+    valid = statistics['count'] > 0
+    positions = np.where(valid, np.arange(statistics.size), statistics.size)
+    first = np.minimum.reduceat(positions, starts)
+    np.copyto(positions, -1, where=~valid)
+    last = np.maximum.reduceat(positions, starts)
+    empty = out['count'] == 0
+    out['first'] = statistics['first'][np.where(empty, starts, first)]
+    out['last'] = statistics['last'][np.where(empty, starts, last)]
+    return out
+
+
+def combine_statistics(statistics: np.ndarray) -> np.void:
+    """
+    Combines the statistics of consecutive ranges into the statistics of the whole range
+    :param statistics: array of block_statistics_dtype in date order
+    :return: one element of block_statistics_dtype
+    """
+    combined = np.zeros(1, dtype=statistics.dtype)[0]
+    not_empty = statistics[statistics['count'] > 0]
+    combined['count'] = np.sum(statistics['count'], dtype=np.uint64)
+    combined['sum'] = np.sum(statistics['sum'], dtype=statistics.dtype['sum'])
+    if not_empty.size == 0:
+        if statistics.dtype['min'].kind == 'f':
+            for name in ['min', 'max', 'first', 'last']:
+                combined[name] = np.nan
+        return combined
+    combined['min'] = np.amin(not_empty['min'])
+    combined['max'] = np.amax(not_empty['max'])
+    combined['first'] = not_empty['first'][0]
+    combined['last'] = not_empty['last'][-1]
+    return combined
+
+
+def block_date_offsets(date_differentials: np.ndarray, block_num_points: int = BLOCK_NUM_POINTS) -> np.ndarray:
+    """
+    Gets the date of the first point of each block from the date differentials
+    :param date_differentials: unsigned integer array of the stored date differentials
+    :param block_num_points: number of points per block
+    :return: int64 array, date units from the start date to the first date of each block
+    """
+    num_blocks = (date_differentials.size + block_num_points) // block_num_points
+    offsets = np.zeros(num_blocks, dtype=np.int64)
+    if num_blocks > 1:
+        block_sums = np.add.reduceat(date_differentials[:(num_blocks - 1) * block_num_points],
+                                     np.arange(0, (num_blocks - 1) * block_num_points, block_num_points),
+                                     dtype=np.uint64)
+        np.cumsum(block_sums, dtype=np.int64, out=offsets[1:])
+    return offsets
+
+
+def block_dates_section(date_offsets: np.ndarray, block_num_points: int = BLOCK_NUM_POINTS) -> FooterSection:
+    """
+    Builds the footer section holding the date of the first point of each block
+    :param date_offsets: int64 array, date units from the start date to the first date of each block
+    :param block_num_points: number of points per block
+    :return: FooterSection
+    """
+    return FooterSection(
+        TimeBoxFooterSectionTypes.BLOCK_DATES,
+        FILE_FOOTER_SECTION_TAG_INDEX,
+        BLOCK_HEADER_STRUCT.pack(block_num_points) + date_offsets.astype('<i8', copy=False).tobytes()
+    )
+
+
+def block_statistics_section(tag_index: int, statistics: np.ndarray,
+                             block_num_points: int = BLOCK_NUM_POINTS) -> FooterSection:
+    """
+    Builds the footer section holding a tag's block statistics
+    :param tag_index: position of the tag in the sorted tag identifiers
+    :param statistics: array of block_statistics_dtype
+    :param block_num_points: number of points per block
+    :return: FooterSection
+    """
+    return FooterSection(
+        TimeBoxFooterSectionTypes.BLOCK_STATISTICS,
+        tag_index,
+        BLOCK_HEADER_STRUCT.pack(block_num_points) + statistics.tobytes()
+    )
+
+
+def checkpoints_section(tag_index: int, values: np.ndarray, block_num_points: int = BLOCK_NUM_POINTS) -> FooterSection:
+    """
+    Builds the footer section holding the absolute value of the first point of each block of a tag
+    stored in 'e' mode, from which a block can be decoded without the points before it
+    :param tag_index: position of the tag in the sorted tag identifiers
+    :param values: numpy array of the tag's dtype, the values 'e' mode accumulates to at each block
+    :param block_num_points: number of points per block
+    :return: FooterSection
+    """
+    return FooterSection(
+        TimeBoxFooterSectionTypes.CHECKPOINTS,
+        tag_index,
+        BLOCK_HEADER_STRUCT.pack(block_num_points) + values.astype(values.dtype.newbyteorder('<'), copy=False).tobytes()
+    )
+
+
+def block_section_array(section: FooterSection, dtype, num_points: int) -> tuple:
+    """
+    Parses a block dates, block statistics or checkpoints footer section
+    :param section: FooterSection
+    :param dtype: numpy dtype of the elements, '<i8' for block dates
+    :param num_points: number of points in the file
+    :return: tuple like (points per block, numpy array with one element per block)
+    """
+    block_num_points = BLOCK_HEADER_STRUCT.unpack_from(section.payload)[0]
+    array = np.frombuffer(section.payload, dtype=dtype, offset=BLOCK_HEADER_STRUCT.size)
+    if block_num_points == 0 or array.size != (num_points + block_num_points - 1) // block_num_points:
+        raise FooterFormatError('Block section of type {} does not match {} points in blocks of '
+                                '{}'.format(section.section_type, num_points, block_num_points))
+    return block_num_points, array
@@ -0,0 +1,137 @@
+import os
+import numpy as np
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'evictions', 'num_entries', 'num_bytes', 'max_bytes'])
+DATES_CACHE_TAG = ('dates',)  # tuple so it cannot collide with str or int tag identifiers
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+_cache = None
+
+
+class DecodedArrayCache:
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        Least-recently-used cache of decoded numpy arrays with a byte budget.
+        Arrays are marked read-only when they are put in the cache, so callers
+        sharing a cached array cannot corrupt it.
+        :param max_bytes: maximum number of array bytes held by the cache
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._num_bytes = 0
+        self._entries = OrderedDict()  # like { key : numpy array }, least recently used first
+        self._lock = Lock()
+        return
+
+    def get(self, key) -> np.ndarray:
+        """
+        Gets the cached array for key and marks it as most recently used
+        :param key: cache key, see file_identity
+        :return: read-only numpy array, or None if key is not cached
+        """
+        with self._lock:
+            arr = self._entries.get(key)
+            if arr is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return arr
+
+    def put(self, key, arr: np.ndarray):
+        """
+        Marks arr read-only and stores it under key, evicting least recently used
+        entries until the cache fits in max_bytes. arrays larger than max_bytes are not stored
+        and stay writeable
+        :param key: cache key, see file_identity
+        :param arr: numpy array
+        :return: void
+        """
+        if arr.nbytes > self.max_bytes:
+            return
+        arr.flags.writeable = False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._num_bytes -= previous.nbytes
+            self._entries[key] = arr
+            self._num_bytes += arr.nbytes
+            while self._num_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._num_bytes -= evicted.nbytes
+                self.evictions += 1
+        return
+
+    def clear(self):
+        """
+        Removes all entries and resets the counters
+        :return: void
+        """
+        with self._lock:
+            self._entries.clear()
+            self._num_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+        return
+
+    def stats(self) -> CacheStats:
+        """
+        Gets the hit/miss counters and current size of the cache
+        :return: CacheStats named-tuple
+        """
+        with self._lock:
+            return CacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                num_entries=len(self._entries),
+                num_bytes=self._num_bytes,
+                max_bytes=self.max_bytes
+            )
+
+
+def enable_cache(max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> DecodedArrayCache:
+    """
+    Turns on the process-wide cache of decoded arrays used by TimeBox.read().
+    Replaces any cache that was already enabled
+    :param max_bytes: maximum number of array bytes held by the cache
+    :return: the DecodedArrayCache
+    """
+    global _cache
+    _cache = DecodedArrayCache(max_bytes)
+    return _cache
+
+
+def disable_cache():
+    """
+    Turns off the process-wide cache and drops its entries
+    :return: void
+    """
+    global _cache
+    _cache = None
+    return
+
+
+def get_cache() -> DecodedArrayCache:
+    """
+    Gets the process-wide cache
+    :return: DecodedArrayCache, or None if caching is not enabled
+    """
+    return _cache
+
+
+def file_identity(file_path: str, file_handle) -> tuple:
+    """
+    Identifies the version of a file, so cache entries go stale when the file is re-written
+    :param file_path: path the file was opened with
+    :param file_handle: open file handle of the file
+    :return: tuple like (absolute path, inode, mtime in ns, size in bytes)
+    """
+    stat = os.fstat(file_handle.fileno())
+    return os.path.abspath(file_path), stat.st_ino, stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,127 @@
+import sys
+import json
+import argparse
+from timebox.convert import convert_directory, CodecOptions, DEFAULT_CHUNK_SIZE, ConversionReport
+from timebox.describe import describe_file, print_description
+
+
+def main(argv: list = None) -> int:
+    """
+    Entry point of the timebox console script
+    :param argv: optional list of arguments, sys.argv[1:] if None
+    :return: int, process exit code
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    return args.run(args)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the argument parser with one sub-parser per command
+    :return: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog='timebox', description='TimeBox file utilities')
+    commands = parser.add_subparsers(dest='command')
+
+    convert = commands.add_parser('convert', help='convert a directory of CSV files into TimeBox files')
+    convert.add_argument('source_dir', help='directory walked for CSV files')
+    convert.add_argument('destination_dir', help='directory the TimeBox files are written to, '
+                                                 'mirroring the layout of source_dir')
+    convert.add_argument('--pattern', default='*.csv', help='file name pattern of the CSV files (default: *.csv)')
+    convert.add_argument('--workers', type=int, default=None, help='number of worker processes '
+                                                                   '(default: number of CPUs)')
+    convert.add_argument('--overwrite', action='store_true', help='convert files even if the TimeBox file '
+                                                                  'is newer than the CSV')
+    convert.add_argument('--index-col', default='0', help='name or position of the date-time column (default: 0)')
+    convert.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='number of CSV rows parsed '
+                                                                                    'at a time')
+    convert.add_argument('--compress', action='store_true', help='compress every tag')
+    convert.add_argument('--compression-mode', choices=['m', 'e'], default='m',
+                         help='m stores the difference from the minimum, e the difference between points')
+    convert.add_argument('--decimals', type=int, default=None, help='round float tags to this many decimals '
+                                                                    'and store them as integers')
+    convert.add_argument('--report', default=None, help='optional path of a JSON file with the per-file results')
+    convert.set_defaults(run=run_convert)
+
+    inspect = commands.add_parser('inspect', help='show how each tag of a TimeBox file is stored, how fast it '
+                                                  'decodes and its size under the other codecs')
+    inspect.add_argument('file', help='TimeBox file')
+    inspect.add_argument('--no-alternatives', action='store_true', help='do not estimate the size under the '
+                                                                        'other codecs')
+    inspect.set_defaults(run=run_inspect)
+    return parser
+
+
+def run_convert(args) -> int:
+    """
+    Runs the convert command and prints the throughput report
+    :param args: parsed arguments
+    :return: int, 1 if any file failed else 0
+    """
+    index_col = int(args.index_col) if args.index_col.isdigit() else args.index_col
+    report = convert_directory(
+        args.source_dir,
+        args.destination_dir,
+        pattern=args.pattern,
+        workers=args.workers,
+        overwrite=args.overwrite,
+        index_col=index_col,
+        chunk_size=args.chunk_size,
+        codec_options=CodecOptions(
+            use_compression=args.compress,
+            compression_mode=args.compression_mode,
+            num_decimals_to_store=args.decimals
+        )
+    )
+    print_conversion_report(report)
+    if args.report is not None:
+        with open(args.report, 'w') as f:
+            json.dump([r._asdict() for r in report.results], f, indent=1)
+    return 1 if report.num_failed > 0 else 0
+
+
+def run_inspect(args) -> int:
+    """
+    Runs the inspect command
+    :param args: parsed arguments
+    :return: int, 0
+    """
+    print_description(describe_file(args.file, estimate_alternatives=not args.no_alternatives))
+    return 0
+
+
+def print_conversion_report(report: ConversionReport, stream=None):
+    """
+    Prints the totals and throughput of a conversion, and the errors of the files that failed
+    :param report: ConversionReport
+    :param stream: optional file-like object, sys.stdout if None
+    :return: void
+    """
+    stream = sys.stdout if stream is None else stream
+    seconds = max(report.seconds, 1e-9)
+    for r in report.results:
+        if r.status == 'failed':
+            print('failed: {} ({})'.format(r.source, r.error), file=stream)
+    print('{:>12}|{:>12}|{:>12}|{:>14}|{:>10}|{:>10}|{:>10}|{:>10}|{:>8}'.format(
+        'Converted', 'Skipped', 'Failed', 'Rows', 'SourceMB', 'OutputMB', 'Seconds', 'Rows/s', 'MB/s'
+    ), file=stream)
+    print('{:>12}|{:>12}|{:>12}|{:>14}|{:>10}|{:>10}|{:>10}|{:>10}|{:>8}'.format(
+        report.num_converted,
+        report.num_skipped,
+        report.num_failed,
+        report.num_rows,
+        round(report.source_bytes / 1e6, 1),
+        round(report.destination_bytes / 1e6, 1),
+        round(report.seconds, 2),
+        int(report.num_rows / seconds),
+        round(report.source_bytes / 1e6 / seconds, 1)
+    ), file=stream)
+    return
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,6 +12,21 @@ class TimeBoxTagOptionPositions(Enum):
     FLOATING_POINT_ROUNDED = 2
 
 
+class TimeBoxFooterSectionTypes(Enum):
+    END_DATE = 0
+    BLOCK_DATES = 1
+    BLOCK_STATISTICS = 2
+    ROLLUP = 3
+    LAST_VALUE = 4
+    CHECKPOINTS = 5
+    VIRTUAL_TAG = 6
+    START_DATE_REMAINDER = 7
+
+
+# tag index used by footer sections that describe the whole file rather than a tag
+FILE_FOOTER_SECTION_TAG_INDEX = 0xFFFF
+
+
 def get_date_utils_constant_from_stored_units_int(value: int) -> int:
     """
     Gets the constant in datetime_utils.py that maps to the value stored
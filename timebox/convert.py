@@ -0,0 +1,142 @@
+import os
+import time
+import fnmatch
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from timebox.timebox import TimeBox
+from timebox.writer import CodecOptions, DEFAULT_CODEC_OPTIONS
+from timebox.csv_reader import DEFAULT_CSV_CHUNK_SIZE
+
+
+DEFAULT_CHUNK_SIZE = DEFAULT_CSV_CHUNK_SIZE  # rows per CSV chunk
+TIMEBOX_FILE_EXTENSION = '.npb'
+
+# status is one of 'converted', 'skipped', 'failed'
+ConversionResult = namedtuple('ConversionResult', ['source', 'destination', 'status', 'num_rows', 'source_bytes',
+                                                   'destination_bytes', 'seconds', 'error'])
+ConversionReport = namedtuple('ConversionReport', ['num_converted', 'num_skipped', 'num_failed', 'num_rows',
+                                                   'source_bytes', 'destination_bytes', 'seconds', 'results'])
+
+
+def convert_csv_file(source: str, destination: str, index_col=0, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     codec_options: CodecOptions = DEFAULT_CODEC_OPTIONS) -> ConversionResult:
+    """
+    Converts a CSV file with a date-time index column into a TimeBox file with TimeBox.from_csv,
+    parsing chunk_size rows at a time
+    :param source: CSV file path
+    :param destination: TimeBox file path, directories are created if needed
+    :param index_col: name or position of the date-time column
+    :param chunk_size: number of rows parsed at a time
+    :param codec_options: CodecOptions applied to every tag
+    :return: ConversionResult
+    """
+    start_time = time.time()
+    os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+    tb = TimeBox.from_csv(source, destination, index_col=index_col, chunk_size=chunk_size,
+                          codec_options=codec_options)
+    return ConversionResult(
+        source=source,
+        destination=destination,
+        status='converted',
+        num_rows=TimeBox.info(tb.file_path).num_points,
+        source_bytes=os.path.getsize(source),
+        destination_bytes=os.path.getsize(destination),
+        seconds=time.time() - start_time,
+        error=None
+    )
+
+
+def find_source_files(source_dir: str, pattern: str = '*.csv') -> list:
+    """
+    Walks a directory for files matching a pattern
+    :param source_dir: directory to walk
+    :param pattern: fnmatch pattern of file names
+    :return: sorted list of paths relative to source_dir
+    """
+    found = []
+    for directory, _, file_names in os.walk(source_dir):
+        for file_name in fnmatch.filter(file_names, pattern):
+            found.append(os.path.relpath(os.path.join(directory, file_name), source_dir))
+    return sorted(found)
+
+
+def destination_path(destination_dir: str, relative_source: str) -> str:
+    """
+    Gets the TimeBox file path mirroring a source file below destination_dir
+    :param destination_dir: output directory
+    :param relative_source: source path relative to the source directory
+    :return: file path
+    """
+    return os.path.join(destination_dir, os.path.splitext(relative_source)[0] + TIMEBOX_FILE_EXTENSION)
+
+
+def is_up_to_date(source: str, destination: str) -> bool:
+    """
+    Checks whether a destination file was written after its source was last modified. Files are
+    written to a temporary file and renamed, so an existing destination is always complete
+    :param source: source file path
+    :param destination: TimeBox file path
+    :return: bool
+    """
+    return os.path.exists(destination) and os.path.getmtime(destination) >= os.path.getmtime(source)
+
+
+def convert_directory(source_dir: str, destination_dir: str, pattern: str = '*.csv', workers: int = None,
+                      overwrite: bool = False, index_col=0, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      codec_options: CodecOptions = DEFAULT_CODEC_OPTIONS) -> ConversionReport:
+    """
+    Converts every CSV below source_dir into a TimeBox file at the same relative path below
+    destination_dir, on a pool of worker processes. Conversion is resumable: files whose
+    destination is newer than the source are skipped unless overwrite is set. A file that
+    fails is reported and does not stop the others
+    :param source_dir: directory to walk
+    :param destination_dir: output directory
+    :param pattern: fnmatch pattern of source file names
+    :param workers: number of worker processes, ProcessPoolExecutor's default if None
+    :param overwrite: if True, converts files even when they are up to date
+    :param index_col: name or position of the date-time column
+    :param chunk_size: number of rows parsed at a time
+    :param codec_options: CodecOptions applied to every tag
+    :return: ConversionReport
+    """
+    start_time = time.time()
+    results = []
+    tasks = []
+    for relative_source in find_source_files(source_dir, pattern):
+        source = os.path.join(source_dir, relative_source)
+        destination = destination_path(destination_dir, relative_source)
+        if not overwrite and is_up_to_date(source, destination):
+            results.append(ConversionResult(source, destination, 'skipped', 0, 0, 0, 0., None))
+        else:
+            tasks.append((source, destination, index_col, chunk_size, codec_options))
+
+    if len(tasks) > 0:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results.extend(executor.map(_convert_task, tasks, chunksize=max(1, min(64, len(tasks) // 64))))
+
+    converted = [r for r in results if r.status == 'converted']
+    return ConversionReport(
+        num_converted=len(converted),
+        num_skipped=len([r for r in results if r.status == 'skipped']),
+        num_failed=len([r for r in results if r.status == 'failed']),
+        num_rows=sum([r.num_rows for r in converted]),
+        source_bytes=sum([r.source_bytes for r in converted]),
+        destination_bytes=sum([r.destination_bytes for r in converted]),
+        seconds=time.time() - start_time,
+        results=results
+    )
+
+
+def _convert_task(task: tuple) -> ConversionResult:
+    """
+    Worker process entry point, converts one file and reports failures as a result
+    :param task: tuple like (source, destination, index_col, chunk_size, codec_options)
+    :return: ConversionResult
+    """
+    source, destination = task[0], task[1]
+    start_time = time.time()
+    try:
+        return convert_csv_file(*task)
+    except Exception as e:
+        return ConversionResult(source, destination, 'failed', 0, 0, 0, time.time() - start_time,
+                                '{}: {}'.format(type(e).__name__, e))
@@ -0,0 +1,148 @@
+import warnings
+import itertools
+import numpy as np
+from timebox.exceptions import DataDoesNotMatchTagDefinitionError, DateDataError
+
+
+DEFAULT_CSV_CHUNK_SIZE = 1000000  # rows parsed at a time
+
+
+class CsvChunkReader:
+    def __init__(self, csv_path: str, index_col=0, dtypes: dict = None, delimiter: str = ',',
+                 chunk_size: int = DEFAULT_CSV_CHUNK_SIZE, date_units: str = 'ns', epoch_units: str = None):
+        """
+        Reads a CSV file with a header row in chunks of typed numpy columns, without pandas.
+        Timestamps are parsed straight into int64 counts of date_units since epoch, either from
+        ISO 8601 strings or, if epoch_units is set, from integer epoch values. Column dtypes are
+        taken from dtypes, else inferred from the first chunk as int64 or float64.
+        Empty fields of float columns are read as NaN
+        :param csv_path: path of the CSV file
+        :param index_col: name or position of the timestamp column
+        :param dtypes: optional dictionary like {column name: numpy dtype}
+        :param delimiter: field delimiter
+        :param chunk_size: number of rows parsed at a time
+        :param date_units: numpy datetime64 units of the parsed timestamps
+        :param epoch_units: optional numpy datetime64 units of an integer epoch timestamp column
+        """
+        self.csv_path = csv_path
+        self.delimiter = delimiter
+        self.chunk_size = chunk_size
+        self.date_units = date_units
+        self.epoch_units = epoch_units
+        self._handle = open(csv_path, 'r', newline='')
+        header = self._handle.readline().rstrip('\r\n').split(delimiter)
+        self._index_position = index_col if isinstance(index_col, int) else header.index(index_col)
+        self.columns = [c for i, c in enumerate(header) if i != self._index_position]
+        self._pending_lines = self._read_lines()
+        self.dtypes = self._infer_dtypes(dict() if dtypes is None else dtypes)
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def __iter__(self):
+        """
+        Iterates over the chunks of the file
+        :return: iterator of tuples like (int64 numpy array of dates, {column name: numpy array})
+        """
+        while len(self._pending_lines) > 0:
+            lines = self._pending_lines
+            self._pending_lines = self._read_lines()
+            yield self._parse_lines(lines)
+        return
+
+    def close(self):
+        self._handle.close()
+        return
+
+    def _read_lines(self) -> list:
+        return list(itertools.islice(self._handle, self.chunk_size))
+
+    def _infer_dtypes(self, dtypes: dict) -> dict:
+        """
+        Gets the dtype of each column, inferring the missing ones from the first chunk
+        :param dtypes: dictionary like {column name: numpy dtype} of the known dtypes
+        :return: dictionary like {column name: numpy dtype}, in column order
+        """
+        inferred = dict()
+        for i, c in enumerate(self.columns):
+            if c in dtypes:
+                inferred[c] = np.dtype(dtypes[c])
+                continue
+            strings = np.loadtxt(self._pending_lines, delimiter=self.delimiter, dtype='U64',
+                                 usecols=[self._column_position(i)], ndmin=1)
+            for candidate in [np.dtype(np.int64), np.dtype(np.float64)]:
+                try:
+                    self._to_numbers(strings, candidate)
+                    inferred[c] = candidate
+                    break
+                except ValueError:
+                    continue
+            if c not in inferred:
+                raise DataDoesNotMatchTagDefinitionError('Column {} of {} is not numeric'.format(c, self.csv_path))
+        return inferred
+
+    def _column_position(self, column_index: int) -> int:
+        return column_index if column_index < self._index_position else column_index + 1
+
+    def _split_lines(self, lines: list) -> list:
+        """
+        Splits lines into fields, returning one tuple of strings per column of the file
+        """
+        rows = [line.rstrip('\r\n').split(self.delimiter) for line in lines if line.strip()]
+        return list(zip(*rows)) if len(rows) > 0 else [tuple() for _ in range(0, len(self.columns) + 1)]
+
+    def _parse_lines(self, lines: list) -> tuple:
+        """
+        Parses a chunk of lines into typed columns
+        :param lines: list of strings
+        :return: tuple like (int64 numpy array of dates, {column name: numpy array})
+        """
+        usecols = [self._column_position(i) for i in range(0, len(self.columns))]
+        try:
+            with warnings.catch_warnings():
+                # loadtxt only warns when it truncates a float into an integer column
+                warnings.simplefilter('error', DeprecationWarning)
+                parsed = np.loadtxt(
+                    lines,
+                    delimiter=self.delimiter,
+                    dtype=np.dtype([('date', 'U64')] + [('c{}'.format(i), self.dtypes[c])
+                                                        for i, c in enumerate(self.columns)]),
+                    usecols=[self._index_position] + usecols,
+                    ndmin=1
+                )
+            date_strings = parsed['date']
+            data = dict([(c, np.ascontiguousarray(parsed['c{}'.format(i)])) for i, c in enumerate(self.columns)])
+        except (ValueError, DeprecationWarning):
+            # slower path handling empty fields, raises if a value does not fit the column dtype
+            strings = self._split_lines(lines)
+            date_strings = np.array(strings[self._index_position])
+            data = dict([(c, self._to_numbers(strings[usecols[i]], self.dtypes[c]))
+                         for i, c in enumerate(self.columns)])
+        return self._parse_dates(date_strings), data
+
+    def _parse_dates(self, date_strings: np.ndarray) -> np.ndarray:
+        """
+        Parses timestamps into int64 counts of date_units since epoch
+        """
+        try:
+            if self.epoch_units is not None:
+                dates = date_strings.astype(np.int64).astype('datetime64[{}]'.format(self.epoch_units))
+            else:
+                dates = date_strings.astype('datetime64[{}]'.format(self.date_units))
+        except ValueError as e:
+            raise DateDataError('Could not parse timestamps of {}: {}'.format(self.csv_path, e))
+        return dates.astype('datetime64[{}]'.format(self.date_units)).view(np.int64)
+
+    @classmethod
+    def _to_numbers(cls, strings: tuple, dtype: np.dtype) -> np.ndarray:
+        """
+        Converts strings to numbers, empty strings of float columns become NaN
+        """
+        if dtype.kind == 'f':
+            return np.array([s if s != '' else 'nan' for s in strings]).astype(dtype)
+        return np.array(strings).astype(dtype)
@@ -0,0 +1,192 @@
+import sys
+import numpy as np
+from collections import namedtuple
+from timebox.timebox import TimeBox
+from timebox.timebox_tag import TimeBoxTag
+from timebox.utils.buffer_pool import BufferPool
+from timebox.instrumentation import StageCollector, READ_TAG, DECODE_TAG
+
+
+MAX_LOSSLESS_DECIMALS = 6  # most decimals tried when looking for a lossless rounding of a float tag
+MAX_EXACT_FLOAT_INTEGER = 2 ** 53
+
+# codec is a name like 'raw', 'm', 'round2+e', alternatives is like {codec name: number of bytes}
+TagDescription = namedtuple('TagDescription', ['identifier', 'dtype', 'codec', 'compression_mode', 'compressed_dtype',
+                                               'compression_reference_value', 'num_decimals_to_store', 'num_bytes',
+                                               'bytes_per_point', 'read_seconds', 'decode_seconds',
+                                               'decode_mb_per_second', 'alternatives'])
+TimeBoxDescription = namedtuple('TimeBoxDescription', ['info', 'dates_num_bytes', 'tags'])
+
+
+def describe_file(file_path: str, estimate_alternatives: bool = True) -> TimeBoxDescription:
+    """
+    Describes how each tag of a file is stored: the encoded size from the header, the time
+    to read and decode it, and, optionally, the size it would take under the other codecs.
+    Alternatives that round a float tag are only estimated with the fewest decimals that
+    keep every value, so each alternative is lossless
+    :param file_path: path of the TimeBox file
+    :param estimate_alternatives: if True, each tag is re-encoded under each alternative codec
+    :return: TimeBoxDescription
+    """
+    info = TimeBox.info(file_path)
+    tb = TimeBox(file_path)
+    tb.read(lazy=True)
+    dates_num_bytes = max(info.num_points - 1, 0) * tb._bytes_per_date_differential \
+        if info.date_differentials_stored else 0
+    buffer_pool = BufferPool()
+    tags = []
+    for t in sorted(tb._tags):
+        tag = tb._tags[t]
+        tag_info = info.tags[t]
+        data = np.empty(info.num_points, dtype=tag.dtype)
+        with StageCollector() as collector:
+            tag.decode_into(data)
+        events = [e for e in collector.events if e.tag == t and e.file_path == file_path]
+        read_seconds = sum([e.seconds for e in events if e.stage == READ_TAG])
+        decode_seconds = sum([e.seconds for e in events if e.stage == DECODE_TAG])
+        tags.append(TagDescription(
+            identifier=t,
+            dtype=tag_info.dtype,
+            codec=codec_name(tag_info.use_compression, tag_info.compression_mode, tag_info.num_decimals_to_store
+                             if tag_info.floating_point_rounded else None),
+            compression_mode=tag_info.compression_mode,
+            compressed_dtype=tag_info.compressed_dtype,
+            compression_reference_value=tag_info.compression_reference_value,
+            num_decimals_to_store=tag_info.num_decimals_to_store if tag_info.floating_point_rounded else None,
+            num_bytes=tag_info.num_bytes,
+            bytes_per_point=tag_info.num_bytes / max(info.num_points, 1),
+            read_seconds=read_seconds,
+            decode_seconds=decode_seconds,
+            decode_mb_per_second=data.nbytes / 1e6 / max(read_seconds + decode_seconds, 1e-9),
+            alternatives=_estimate_alternatives(tag, data, buffer_pool) if estimate_alternatives else dict()
+        ))
+    return TimeBoxDescription(info=info, dates_num_bytes=dates_num_bytes, tags=tags)
+
+
+def codec_name(use_compression: bool, compression_mode: str = None, num_decimals_to_store: int = None) -> str:
+    """
+    Names a codec, like 'raw', 'e' or 'round2+m'
+    :param use_compression: whether the data is compressed
+    :param compression_mode: 'm' or 'e' if compressed
+    :param num_decimals_to_store: decimals a float tag is rounded to, None if not rounded
+    :return: str
+    """
+    parts = [] if num_decimals_to_store is None else ['round{}'.format(num_decimals_to_store)]
+    if use_compression:
+        parts.append('m' if compression_mode is None else compression_mode)
+    return '+'.join(parts) if len(parts) > 0 else 'raw'
+
+
+def lossless_num_decimals(tag: TimeBoxTag, data: np.ndarray, buffer_pool: BufferPool = None):
+    """
+    Finds the fewest decimals a float tag can be rounded to without changing any value
+    :param tag: TimeBoxTag
+    :param data: decoded data of the tag
+    :param buffer_pool: optional BufferPool for the scratch arrays
+    :return: int, or None if the tag is not a float or no rounding up to MAX_LOSSLESS_DECIMALS is lossless
+    """
+    if tag.type_char != 'f' or data.size == 0 or not np.all(np.isfinite(data)):
+        return None
+    max_abs = float(np.amax(np.abs(data)))
+    for num_decimals in range(0, MAX_LOSSLESS_DECIMALS + 1):
+        if max_abs * pow(10, num_decimals) >= MAX_EXACT_FLOAT_INTEGER:
+            return None
+        candidate = _candidate_tag(tag, False, None, num_decimals)
+        candidate.data = data
+        candidate.encode_data(buffer_pool)
+        if np.array_equal(candidate._decode_encoded_array(candidate._encoded_data), data):
+            return num_decimals
+    return None
+
+
+def _estimate_alternatives(tag: TimeBoxTag, data: np.ndarray, buffer_pool: BufferPool) -> dict:
+    """
+    Encodes the data under each lossless alternative codec
+    :param tag: TimeBoxTag
+    :param data: decoded data of the tag
+    :param buffer_pool: BufferPool for the encoded arrays
+    :return: dictionary like {codec name: number of bytes}
+    """
+    if data.size == 0:
+        return dict()
+    decimals = [None]
+    if tag.floating_point_rounded:
+        decimals.append(tag.num_decimals_to_store)
+    lossless = lossless_num_decimals(tag, data, buffer_pool)
+    if lossless is not None and lossless not in decimals:
+        decimals.append(lossless)
+
+    alternatives = dict()
+    for num_decimals in decimals:
+        for use_compression, compression_mode in [(False, None), (True, 'm'), (True, 'e')]:
+            candidate = _candidate_tag(tag, use_compression, compression_mode, num_decimals)
+            candidate.data = data
+            candidate.encode_data(buffer_pool)
+            # tiny dtypes are left uncompressed, so their compressed alternatives are the same as raw
+            alternatives[codec_name(use_compression, compression_mode, num_decimals)] = candidate._encoded_data.nbytes
+    return alternatives
+
+
+def _candidate_tag(tag: TimeBoxTag, use_compression: bool, compression_mode: str, num_decimals: int) -> TimeBoxTag:
+    candidate = TimeBoxTag(tag.identifier, tag.bytes_per_value, tag.type_char)
+    candidate.use_compression = use_compression
+    candidate._compression_mode = compression_mode
+    if num_decimals is not None:
+        candidate.floating_point_rounded = True
+        candidate.num_decimals_to_store = num_decimals
+    return candidate
+
+
+def print_description(description: TimeBoxDescription, stream=None):
+    """
+    Prints the file summary, one line per tag, and the size of each tag under the alternative codecs
+    :param description: TimeBoxDescription
+    :param stream: optional file-like object, sys.stdout if None
+    :return: void
+    """
+    stream = sys.stdout if stream is None else stream
+    info = description.info
+    print('File: {}'.format(info.file_path), file=stream)
+    print('Size: {} bytes, {} points, {} tags'.format(info.file_size, info.num_points, len(info.tags)), file=stream)
+    print('Dates: {} to {}, stored in {}, {} bytes ({} per point)'.format(
+        info.start_date, info.end_date,
+        info.date_units if info.date_differentials_stored else 'uniform {} s steps'.format(
+            info.seconds_between_points),
+        description.dates_num_bytes,
+        round(description.dates_num_bytes / max(info.num_points, 1), 3)
+    ), file=stream)
+    print('', file=stream)
+
+    line = '{:>16}|{:>8}|{:>10}|{:>8}|{:>20}|{:>12}|{:>8}|{:>10}|{:>10}|{:>10}'
+    print(line.format('Tag', 'Dtype', 'Codec', 'Stored', 'Reference', 'Bytes', 'B/pt', 'Read ms', 'Decode ms',
+                      'MB/s'), file=stream)
+    for t in description.tags:
+        print(line.format(
+            str(t.identifier),
+            str(t.dtype),
+            t.codec,
+            str(t.compressed_dtype),
+            '' if t.compression_reference_value is None else str(t.compression_reference_value),
+            t.num_bytes,
+            round(t.bytes_per_point, 3),
+            round(t.read_seconds * 1000., 3),
+            round(t.decode_seconds * 1000., 3),
+            round(t.decode_mb_per_second, 1)
+        ), file=stream)
+
+    tags_with_alternatives = [t for t in description.tags if len(t.alternatives) > 0]
+    if len(tags_with_alternatives) == 0:
+        return
+    print('', file=stream)
+    line = '{:>16}|{:>10}|{:>12}|{:>8}|{:>10}'
+    print(line.format('Tag', 'Codec', 'Bytes', 'B/pt', 'vs stored'), file=stream)
+    for t in tags_with_alternatives:
+        for codec, num_bytes in sorted(t.alternatives.items(), key=lambda x: x[1]):
+            print(line.format(
+                str(t.identifier),
+                codec,
+                num_bytes,
+                round(num_bytes / max(description.info.num_points, 1), 3),
+                '{:+.1%}'.format(num_bytes / t.num_bytes - 1.) if t.num_bytes > 0 else ''
+            ), file=stream)
+    return
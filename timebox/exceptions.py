@@ -20,3 +20,39 @@ class DateDataError(ValueError):
 
 class CouldNotCalculateNumBytesError(ValueError):
     pass
+
+
+class FooterFormatError(ValueError):
+    pass
+
+
+class StoreError(ValueError):
+    pass
+
+
+class DatesNotInOrderError(DateDataError):
+    pass
+
+
+class MemoryBudgetExceededError(MemoryError):
+    pass
+
+
+class AggregationFunctionError(ValueError):
+    pass
+
+
+class ResampleFunctionError(ValueError):
+    pass
+
+
+class JoinError(ValueError):
+    pass
+
+
+class PredicateError(ValueError):
+    pass
+
+
+class ExpressionError(ValueError):
+    pass
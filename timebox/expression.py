@@ -0,0 +1,219 @@
+import re
+import numpy as np
+from collections import namedtuple
+from timebox.timebox import TimeBoxArrays
+from timebox.range_reader import RangeReader, DEFAULT_CHUNK_NUM_POINTS, tag_identifier, missing_tag_message
+from timebox.exceptions import ExpressionError
+
+
+TagReference = namedtuple('TagReference', ['tag'])
+Constant = namedtuple('Constant', ['value'])
+# op is '+', '-', '*' or '/'
+Arithmetic = namedtuple('Arithmetic', ['op', 'left', 'right'])
+Negation = namedtuple('Negation', ['operand'])
+
+ARITHMETIC_OPERATORS = {
+    '+': np.add,
+    '-': np.subtract,
+    '*': np.multiply,
+    '/': np.true_divide
+}
+NAME_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*$')
+TOKEN_PATTERN = re.compile(r'\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(?P<op>[-+*/])'
+                           r'|(?P<paren>[()])|(?P<name>[A-Za-z_][A-Za-z0-9_]*)|(?P<quoted>"[^"]*"|\'[^\']*\'))')
+
+
+def parse_expression(expression: str):
+    """
+    Parses an arithmetic expression like "(bid + ask) / 2" of tags and numbers, with +, -, *, /,
+    unary - and parentheses. Tags may be quoted, like "7" for the integer tag identifier 7
+    :param expression: string
+    :return: TagReference, Constant, Arithmetic or Negation
+    """
+    tokens = _tokenize(expression)
+    node, position = _parse_sum(tokens, 0, expression)
+    if position != len(tokens):
+        raise ExpressionError('Unexpected {} in expression {}'.format(tokens[position][1], expression))
+    return node
+
+
+def eval_file(file_path: str, expression: str, start=None, end=None,
+              chunk_num_points: int = DEFAULT_CHUNK_NUM_POINTS) -> TimeBoxArrays:
+    """
+    Evaluates an expression of tags at every point of a date range. The tags are decoded chunk by
+    chunk and each operation writes into the output or into scratch buffers allocated once for the
+    whole range, so no full-size temporary is made whatever the length of the expression. Values
+    are float64, integer division by zero gives inf or NaN
+    :param file_path: path of the TimeBox file
+    :param expression: string, see parse_expression. names may also be the virtual tags of the file,
+    see TimeBox.write
+    :param start: optional first date, like numpy.datetime64('2018-01-01') or '2018-01-01T00:00'
+    :param end: optional last date
+    :param chunk_num_points: number of points decoded at a time
+    :return: TimeBoxArrays named tuple like (int64 dates since epoch, unit, {expression: float64 numpy array})
+    """
+    node = parse_expression(expression)
+    with RangeReader(file_path) as reader:
+        node = resolve_virtual_tags(node, reader.virtual_tags, reader.tags)
+        first, stop = reader.index_range(start, end)
+        timestamps = np.empty(stop - first, dtype=np.int64)
+        values = np.empty(stop - first, dtype=np.float64)
+        scratch = [np.empty(min(chunk_num_points, stop - first), dtype=np.float64)
+                   for _ in range(_num_scratch_buffers(node))]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for chunk in reader.iter_chunks(expression_tags(node), first, stop, chunk_num_points):
+                position = chunk.start_index - first
+                timestamps[position:position + chunk.dates.size] = chunk.dates
+                _evaluate(node, chunk.data, values[position:position + chunk.dates.size], scratch, 0)
+        return TimeBoxArrays(timestamps=timestamps, unit=reader.dates_units, data={expression: values})
+
+
+def resolve_virtual_tags(node, virtual_tags: dict, tags: list, resolving: tuple = ()):
+    """
+    Replaces the virtual tags of an expression with their expressions
+    :param node: parsed expression
+    :param virtual_tags: dictionary like {name: expression}
+    :param tags: list of the tag identifiers of the file
+    :param resolving: names of the virtual tags being replaced, which cannot refer to themselves
+    :return: parsed expression referring only to tag identifiers, see tag_identifier
+    """
+    if isinstance(node, Constant):
+        return node
+    if isinstance(node, Negation):
+        return Negation(resolve_virtual_tags(node.operand, virtual_tags, tags, resolving))
+    if isinstance(node, Arithmetic):
+        return Arithmetic(node.op, resolve_virtual_tags(node.left, virtual_tags, tags, resolving),
+                          resolve_virtual_tags(node.right, virtual_tags, tags, resolving))
+    identifier = tag_identifier(node.tag, tags)
+    if identifier is not None:
+        return TagReference(identifier)
+    if node.tag not in virtual_tags:
+        raise ExpressionError(missing_tag_message(node.tag, tags))
+    if node.tag in resolving:
+        raise ExpressionError('Virtual tag {} refers to itself'.format(node.tag))
+    return resolve_virtual_tags(parse_expression(virtual_tags[node.tag]), virtual_tags, tags,
+                                resolving + (node.tag,))
+
+
+def validate_virtual_tags(virtual_tags: dict, tags: list):
+    """
+    Checks that virtual tags can be computed from the tags of a file
+    :param virtual_tags: dictionary like {name: expression}
+    :param tags: list of the tag identifiers of the file
+    :return: void
+    """
+    for name in virtual_tags:
+        if not isinstance(name, str) or NAME_PATTERN.match(name) is None:
+            raise ExpressionError('Virtual tag name {} is not a name like mid or bid_ask'.format(name))
+        if name in tags:
+            raise ExpressionError('Virtual tag {} is already a tag'.format(name))
+        resolve_virtual_tags(TagReference(name), virtual_tags, tags)
+    return
+
+
+def expression_tags(node) -> list:
+    """
+    :return: sorted list of the tag identifiers in a parsed expression
+    """
+    if isinstance(node, Constant):
+        return []
+    if isinstance(node, Negation):
+        return expression_tags(node.operand)
+    if isinstance(node, Arithmetic):
+        return sorted(set(expression_tags(node.left)) | set(expression_tags(node.right)), key=str)
+    return [node.tag]
+
+
+def _evaluate(node, data: dict, out: np.ndarray, scratch: list, depth: int):
+    """
+    Evaluates a parsed expression into out. The left operand of an operation is evaluated into out and
+    the right one, unless it is a tag or a number, into the scratch buffer of its depth
+    :param node: parsed expression
+    :param data: dictionary like {tag_identifier: numpy array}
+    :param out: float64 numpy array to fill
+    :param scratch: list of float64 numpy arrays at least as long as out, see _num_scratch_buffers
+    :param depth: index of the first scratch buffer free to use
+    :return: void
+    """
+    if isinstance(node, Constant):
+        out.fill(node.value)
+    elif isinstance(node, TagReference):
+        np.copyto(out, data[node.tag], casting='unsafe')
+    elif isinstance(node, Negation):
+        _evaluate(node.operand, data, out, scratch, depth)
+        np.negative(out, out=out)
+    else:
+        _evaluate(node.left, data, out, scratch, depth)
+        if isinstance(node.right, Constant):
+            right = node.right.value
+        elif isinstance(node.right, TagReference):
+            right = data[node.right.tag]
+        else:
+            right = scratch[depth][:out.size]
+            _evaluate(node.right, data, right, scratch, depth + 1)
+        ARITHMETIC_OPERATORS[node.op](out, right, out=out)
+    return
+
+
+def _num_scratch_buffers(node) -> int:
+    """
+    :return: number of scratch buffers _evaluate needs for a parsed expression
+    """
+    if isinstance(node, Negation):
+        return _num_scratch_buffers(node.operand)
+    if isinstance(node, Arithmetic):
+        right = 0 if isinstance(node.right, (Constant, TagReference)) else 1 + _num_scratch_buffers(node.right)
+        return max(_num_scratch_buffers(node.left), right)
+    return 0
+
+
+def _tokenize(expression: str) -> list:
+    """
+    :return: list of tuples like (kind, text), kind is 'number', 'op', 'paren', 'name' or 'quoted'. the
+    quotes of quoted names are removed
+    """
+    tokens = []
+    position = 0
+    while position < len(expression.rstrip()):
+        match = TOKEN_PATTERN.match(expression, position)
+        if match is None or match.end() == position:
+            raise ExpressionError('Could not parse expression {} at character {}'.format(expression, position))
+        text = match.group(match.lastgroup)
+        tokens.append((match.lastgroup, text[1:-1] if match.lastgroup == 'quoted' else text))
+        position = match.end()
+    return tokens
+
+
+def _parse_sum(tokens: list, position: int, expression: str) -> tuple:
+    node, position = _parse_product(tokens, position, expression)
+    while position < len(tokens) and tokens[position] in [('op', '+'), ('op', '-')]:
+        right, next_position = _parse_product(tokens, position + 1, expression)
+        node, position = Arithmetic(tokens[position][1], node, right), next_position
+    return node, position
+
+
+def _parse_product(tokens: list, position: int, expression: str) -> tuple:
+    node, position = _parse_factor(tokens, position, expression)
+    while position < len(tokens) and tokens[position] in [('op', '*'), ('op', '/')]:
+        right, next_position = _parse_factor(tokens, position + 1, expression)
+        node, position = Arithmetic(tokens[position][1], node, right), next_position
+    return node, position
+
+
+def _parse_factor(tokens: list, position: int, expression: str) -> tuple:
+    if position >= len(tokens):
+        raise ExpressionError('Expression {} ends early'.format(expression))
+    kind, text = tokens[position]
+    if (kind, text) == ('op', '-'):
+        operand, position = _parse_factor(tokens, position + 1, expression)
+        return Negation(operand), position
+    if (kind, text) == ('paren', '('):
+        node, position = _parse_sum(tokens, position + 1, expression)
+        if position >= len(tokens) or tokens[position] != ('paren', ')'):
+            raise ExpressionError('Missing ) in expression {}'.format(expression))
+        return node, position + 1
+    if kind == 'number':
+        return Constant(float(text)), position + 1
+    if kind in ['name', 'quoted']:
+        return TagReference(text), position + 1
+    raise ExpressionError('Unexpected {} in expression {}'.format(text, expression))
@@ -0,0 +1,50 @@
+import os
+import numpy as np
+from weakref import finalize
+from timebox.exceptions import DataShapeError
+
+
+class FileSnapshot:
+    def __init__(self, file_handle):
+        """
+        Holds a duplicate file descriptor of an open TimeBox file. TimeBox.write() replaces
+        files rather than re-writing them in place, so the descriptor keeps pointing at the
+        version of the file that was read, and can be read from after the read lock is released.
+        The descriptor is closed when the snapshot is garbage collected.
+        :param file_handle: open file handle, typically holding a shared lock
+        """
+        self.file_path = file_handle.name
+        self._fd = os.dup(file_handle.fileno())
+        self._finalizer = finalize(self, os.close, self._fd)
+        return
+
+    def read_array(self, offset: int, dtype, count: int) -> np.ndarray:
+        """
+        Reads count items of dtype starting at byte offset, without moving any file position
+        :param offset: byte offset from the start of the file
+        :param dtype: numpy dtype of the items
+        :param count: number of items to read
+        :return: numpy array
+        """
+        return self.read_into(offset, np.empty(count, dtype=dtype))
+
+    def read_into(self, offset: int, out: np.ndarray) -> np.ndarray:
+        """
+        Fills a contiguous array with the bytes starting at byte offset, without moving any file position
+        :param offset: byte offset from the start of the file
+        :param out: C-contiguous numpy array to read into
+        :return: out
+        """
+        num_bytes_read = os.preadv(self._fd, [out.view(np.uint8)], offset) if out.nbytes > 0 else 0
+        if num_bytes_read != out.nbytes:
+            raise DataShapeError('Could not read {} bytes at offset {}, only {} bytes '
+                                 'found'.format(out.nbytes, offset, num_bytes_read))
+        return out
+
+    def close(self):
+        """
+        Closes the duplicate file descriptor
+        :return: void
+        """
+        self._finalizer()
+        return
@@ -0,0 +1,143 @@
+import struct
+import numpy as np
+from collections import namedtuple
+from timebox.constants import TimeBoxFooterSectionTypes, FILE_FOOTER_SECTION_TAG_INDEX
+from timebox.exceptions import FooterFormatError
+
+
+# the footer is written after the tag data, so readers that only know the
+# header layout are unaffected by it. layout:
+#   section * N: section header (type, tag index, payload length) followed by the payload
+#   trailer: total length of the sections and the footer magic
+FooterSection = namedtuple('FooterSection', ['section_type', 'tag_index', 'payload'])
+FOOTER_MAGIC = b'TBFOOTR1'
+SECTION_HEADER_STRUCT = struct.Struct('<BHQ')  # section type, tag index, payload length
+TRAILER_STRUCT = struct.Struct('<Q8s')  # sections length, magic
+END_DATE_STRUCT = struct.Struct('<Q')  # date units between the start date and the end date
+# date units between the whole second stored in the file info and the first date
+START_DATE_REMAINDER_STRUCT = struct.Struct('<Q')
+VIRTUAL_TAG_NAME_STRUCT = struct.Struct('<H')  # length of the name of a virtual tag in bytes
+
+
+def footer_to_bytes(sections: list) -> bytes:
+    """
+    Serializes footer sections followed by the footer trailer
+    :param sections: list of FooterSection
+    :return: bytes of the footer
+    """
+    section_bytes = b''.join([
+        SECTION_HEADER_STRUCT.pack(s.section_type.value, s.tag_index, len(s.payload)) + s.payload
+        for s in sections
+    ])
+    return section_bytes + TRAILER_STRUCT.pack(len(section_bytes), FOOTER_MAGIC)
+
+
+def footer_num_bytes_from_trailer(trailer_bytes: bytes) -> int:
+    """
+    Reads the trailer at the very end of a file
+    :param trailer_bytes: the last TRAILER_STRUCT.size bytes of the file
+    :return: int, number of bytes in the footer including the trailer, 0 if the file has no footer
+    """
+    if len(trailer_bytes) < TRAILER_STRUCT.size:
+        return 0
+    sections_length, magic = TRAILER_STRUCT.unpack(trailer_bytes[-TRAILER_STRUCT.size:])
+    if magic != FOOTER_MAGIC:
+        return 0
+    return sections_length + TRAILER_STRUCT.size
+
+
+def sections_from_bytes(from_bytes: bytes) -> list:
+    """
+    Parses the footer sections
+    :param from_bytes: the footer bytes, with or without the trailer
+    :return: list of FooterSection. sections with unknown types are skipped
+    """
+    if len(from_bytes) >= TRAILER_STRUCT.size and from_bytes[-len(FOOTER_MAGIC):] == FOOTER_MAGIC:
+        from_bytes = from_bytes[:-TRAILER_STRUCT.size]
+    known_types = dict([(t.value, t) for t in TimeBoxFooterSectionTypes])
+    sections = []
+    position = 0
+    while position < len(from_bytes):
+        if position + SECTION_HEADER_STRUCT.size > len(from_bytes):
+            raise FooterFormatError('Footer section header at byte {} is truncated'.format(position))
+        section_type, tag_index, length = SECTION_HEADER_STRUCT.unpack_from(from_bytes, position)
+        position += SECTION_HEADER_STRUCT.size
+        if position + length > len(from_bytes):
+            raise FooterFormatError('Footer section at byte {} is truncated'.format(position))
+        if section_type in known_types:
+            sections.append(FooterSection(known_types[section_type], tag_index, from_bytes[position:position+length]))
+        position += length
+    return sections
+
+
+def end_date_section(num_date_units: int) -> FooterSection:
+    """
+    Builds the footer section holding the distance from the start date to the end date
+    :param num_date_units: number of date differential units between the first and the last date
+    :return: FooterSection
+    """
+    return FooterSection(
+        TimeBoxFooterSectionTypes.END_DATE,
+        FILE_FOOTER_SECTION_TAG_INDEX,
+        END_DATE_STRUCT.pack(num_date_units)
+    )
+
+
+def start_date_remainder_section(num_date_units: int) -> FooterSection:
+    """
+    Builds the footer section holding the part of the first date finer than the whole second
+    stored in the file info
+    :param num_date_units: number of date differential units between the whole second and the first date
+    :return: FooterSection
+    """
+    return FooterSection(
+        TimeBoxFooterSectionTypes.START_DATE_REMAINDER,
+        FILE_FOOTER_SECTION_TAG_INDEX,
+        START_DATE_REMAINDER_STRUCT.pack(num_date_units)
+    )
+
+
+def last_value_section(tag_index: int, value: np.ndarray) -> FooterSection:
+    """
+    Builds the footer section holding the value of the last point of a tag stored in 'e' mode,
+    from which the tag can be decoded backwards
+    :param tag_index: position of the tag in the sorted tag identifiers
+    :param value: 1-element numpy array of the tag's dtype, the value 'e' mode accumulates to
+    :return: FooterSection
+    """
+    return FooterSection(
+        TimeBoxFooterSectionTypes.LAST_VALUE,
+        tag_index,
+        value.astype(value.dtype.newbyteorder('<'), copy=False).tobytes()
+    )
+
+
+def virtual_tag_section(name: str, expression: str) -> FooterSection:
+    """
+    Builds the footer section holding a virtual tag, a named expression of the tags computed on read
+    :param name: name of the virtual tag
+    :param expression: arithmetic expression of tags, see timebox.expression
+    :return: FooterSection
+    """
+    name_bytes = name.encode('utf-8')
+    return FooterSection(
+        TimeBoxFooterSectionTypes.VIRTUAL_TAG,
+        FILE_FOOTER_SECTION_TAG_INDEX,
+        VIRTUAL_TAG_NAME_STRUCT.pack(len(name_bytes)) + name_bytes + expression.encode('utf-8')
+    )
+
+
+def virtual_tag_from_section(section: FooterSection) -> tuple:
+    """
+    Parses a virtual tag footer section
+    :param section: FooterSection
+    :return: tuple like (name, expression)
+    """
+    if len(section.payload) < VIRTUAL_TAG_NAME_STRUCT.size:
+        raise FooterFormatError('Virtual tag section is truncated')
+    name_length = VIRTUAL_TAG_NAME_STRUCT.unpack_from(section.payload)[0]
+    name_end = VIRTUAL_TAG_NAME_STRUCT.size + name_length
+    if name_end > len(section.payload):
+        raise FooterFormatError('Virtual tag section is truncated')
+    return section.payload[VIRTUAL_TAG_NAME_STRUCT.size:name_end].decode('utf-8'), \
+        section.payload[name_end:].decode('utf-8')
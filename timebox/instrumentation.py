@@ -0,0 +1,137 @@
+import time
+import logging
+from collections import namedtuple
+
+
+# stages of reading a file
+LOCK_WAIT = 'lock_wait'  # waiting for the fcntl lock, reads and writes
+READ_FILE_INFO = 'read_file_info'  # reading and parsing the header
+READ_DATES = 'read_dates'  # reading the date differentials
+DECODE_DATES = 'decode_dates'  # cumulative sum of the date differentials into the dates array
+READ_TAG = 'read_tag'  # reading one tag's encoded data
+DECODE_TAG = 'decode_tag'  # decompressing and un-rounding one tag's data
+
+# stages of writing a file
+ENCODE_DATES = 'encode_dates'  # calculating and compressing the date differentials
+ENCODE_TAG = 'encode_tag'  # rounding and compressing one tag's data, runs within write_file_info
+WRITE_FILE_INFO = 'write_file_info'  # writing the header
+WRITE_DATES = 'write_dates'  # writing the date differentials
+WRITE_TAG = 'write_tag'  # writing one tag's encoded data
+WRITE_FOOTER = 'write_footer'  # writing the footer
+SORT_ROWS = 'sort_rows'  # sorting rows that were not in date order, TimeBox.from_csv
+
+# tag is the tag identifier for per-tag stages else None, num_bytes the bytes read, written or produced
+StageEvent = namedtuple('StageEvent', ['stage', 'file_path', 'tag', 'seconds', 'num_bytes'])
+StageTotals = namedtuple('StageTotals', ['count', 'seconds', 'num_bytes'])
+
+_listeners = []
+
+
+def add_listener(listener):
+    """
+    Turns on instrumentation, the listener is called with a StageEvent at the end of each
+    stage of reading and writing files, in the thread that ran the stage
+    :param listener: function taking a StageEvent
+    :return: void
+    """
+    global _listeners
+    _listeners = _listeners + [listener]
+    return
+
+
+def remove_listener(listener):
+    """
+    Stops calling a listener. Instrumentation is off once no listeners are left
+    :param listener: function passed to add_listener
+    :return: void
+    """
+    global _listeners
+    _listeners = [existing for existing in _listeners if existing != listener]
+    return
+
+
+def is_enabled() -> bool:
+    """
+    :return: True if any listener was added
+    """
+    return len(_listeners) > 0
+
+
+def start_stage():
+    """
+    Marks the start of a stage. Costs one check when instrumentation is off
+    :return: start time to pass to end_stage, or None if instrumentation is off
+    """
+    return time.perf_counter() if _listeners else None
+
+
+def end_stage(started, stage: str, file_path: str = None, tag=None, num_bytes: int = 0):
+    """
+    Reports a stage to the listeners, does nothing if started is None
+    :param started: value returned by start_stage
+    :param stage: stage name, one of the module constants
+    :param file_path: path of the file the stage ran on
+    :param tag: tag identifier for per-tag stages
+    :param num_bytes: number of bytes read, written or produced by the stage
+    :return: void
+    """
+    if started is None:
+        return
+    event = StageEvent(stage, file_path, tag, time.perf_counter() - started, int(num_bytes))
+    for listener in _listeners:
+        listener(event)
+    return
+
+
+class StageCollector:
+    def __init__(self):
+        """
+        Collects the stage events reported while it is active, use it as a context manager:
+        with StageCollector() as collector:
+            tb.read()
+        collector.totals()
+        """
+        self.events = []
+        return
+
+    def __call__(self, event: StageEvent):
+        self.events.append(event)
+        return
+
+    def __enter__(self):
+        add_listener(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        remove_listener(self)
+        return False
+
+    def totals(self, by_tag: bool = False) -> dict:
+        """
+        Sums the collected events
+        :param by_tag: if True, per-tag stages are summed per tag
+        :return: dictionary like {stage: StageTotals}, or {(stage, tag): StageTotals} if by_tag
+        """
+        totals = dict()
+        for e in self.events:
+            key = (e.stage, e.tag) if by_tag else e.stage
+            count, seconds, num_bytes = totals.get(key, (0, 0., 0))
+            totals[key] = StageTotals(count + 1, seconds + e.seconds, num_bytes + e.num_bytes)
+        return totals
+
+
+class LoggingListener:
+    def __init__(self, logger: logging.Logger = None, level: int = logging.DEBUG):
+        """
+        Logs each stage event, pass it to add_listener
+        :param logger: optional logger, the 'timebox' logger if None
+        :param level: logging level of the messages
+        """
+        self.logger = logging.getLogger('timebox') if logger is None else logger
+        self.level = level
+        return
+
+    def __call__(self, event: StageEvent):
+        self.logger.log(self.level, '%s %s%s: %.6f seconds, %d bytes', event.stage, event.file_path,
+                        '' if event.tag is None else ' tag {}'.format(event.tag), event.seconds, event.num_bytes)
+        return
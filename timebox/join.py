@@ -0,0 +1,179 @@
+import numpy as np
+from timebox.timebox import TimeBoxArrays
+from timebox.range_reader import RangeReader, RangeChunk, DEFAULT_CHUNK_NUM_POINTS
+from timebox.utils.datetime_utils import get_unit_data, get_conversion_multiplier, frequency_to_units
+from timebox.exceptions import JoinError
+
+
+def asof_join(left: str, right: str, tags: list, tolerance=None, left_tags: list = None, start=None, end=None,
+              fill_value=None, chunk_num_points: int = DEFAULT_CHUNK_NUM_POINTS) -> TimeBoxArrays:
+    """
+    Joins the points of one file with the last point of another file dated at or before them, like
+    pandas.merge_asof with direction='backward', see iter_asof_join
+    :return: TimeBoxArrays named tuple like (int64 dates of the left points since epoch, unit,
+    {tag_identifier: numpy array}) holding the left tags and the joined right tags
+    """
+    timestamps = []
+    data = dict()
+    unit = None
+    for chunk in iter_asof_join(left, right, tags, tolerance, left_tags, start, end, fill_value, chunk_num_points):
+        unit = chunk.unit
+        timestamps.append(chunk.timestamps)
+        for t in chunk.data:
+            data.setdefault(t, []).append(chunk.data[t])
+    return TimeBoxArrays(
+        timestamps=np.concatenate(timestamps),
+        unit=unit,
+        data=dict([(t, np.concatenate(data[t])) for t in data])
+    )
+
+
+def iter_asof_join(left: str, right: str, tags: list, tolerance=None, left_tags: list = None, start=None, end=None,
+                   fill_value=None, chunk_num_points: int = DEFAULT_CHUNK_NUM_POINTS):
+    """
+    Joins the points of one file with the last point of another file dated at or before them, like
+    pandas.merge_asof with direction='backward'. Both files are decoded chunk by chunk in date order
+    and each left chunk is matched with np.searchsorted on the int64 dates of the right chunks it
+    spans, so memory depends on chunk_num_points and not on the size of the files. The right file
+    is decoded from the last point before the first left point
+    :param left: path of the TimeBox file whose points are kept
+    :param right: path of the TimeBox file whose tags are joined
+    :param tags: list of the right file's tag identifiers to join
+    :param tolerance: optional largest distance from a left point back to its right point, numpy
+    timedelta64 or string like '1s' or '5min'. left points farther from the previous right point are
+    not matched
+    :param left_tags: optional list of the left file's tag identifiers to keep, all of them if None
+    :param start: optional first date of the left points, like numpy.datetime64('2018-01-01') or '2018-01-01T00:00'
+    :param end: optional last date of the left points
+    :param fill_value: optional value of the joined tags at unmatched left points. if None, float tags
+    are NaN and integer tags are converted to float64 to be NaN
+    :param chunk_num_points: number of points decoded at a time from each file
+    :return: generator of TimeBoxArrays, one per chunk of left points. dates are in the finer of the
+    files' date units
+    """
+    with RangeReader(left) as left_reader, RangeReader(right) as right_reader:
+        left_tags = left_reader.tags if left_tags is None else left_tags
+        overlapping = set(left_tags) & set(tags)
+        if len(overlapping) > 0:
+            raise JoinError('Tags {} are in both the left and the right tags'.format(sorted(overlapping, key=str)))
+        for t in tags:
+            right_reader.tag(t)
+
+        unit = min([left_reader.dates_units, right_reader.dates_units], key=lambda u: get_unit_data(u).order)
+        left_multiplier = int(get_conversion_multiplier(left_reader.dates_units, unit))
+        right_multiplier = int(get_conversion_multiplier(right_reader.dates_units, unit))
+        width = None if tolerance is None else frequency_to_units(tolerance, unit)
+        out_dtypes = dict([(t, _joined_dtype(right_reader.tag(t).dtype, fill_value)) for t in tags])
+
+        first, stop = left_reader.index_range(start, end)
+        if first == stop:
+            yield TimeBoxArrays(
+                timestamps=np.empty(0, dtype=np.int64),
+                unit=unit,
+                data=dict([(t, np.empty(0, dtype=left_reader.tag(t).dtype)) for t in left_tags] +
+                          [(t, np.empty(0, dtype=out_dtypes[t])) for t in tags])
+            )
+            return
+
+        # the right points from the last one before the first left point to the last one before the last left point
+        first_date = int(left_reader.read_dates(first, first + 1)[0]) * left_multiplier
+        last_date = int(left_reader.read_dates(stop - 1, stop)[0]) * left_multiplier
+        right_first = max(right_reader.int_index_range(None, first_date // right_multiplier)[1] - 1, 0)
+        right_stop = right_reader.int_index_range(None, last_date // right_multiplier)[1]
+        right_chunks = right_reader.iter_chunks(tags, right_first, right_stop, chunk_num_points)
+        right_chunk = _scaled_chunk(next(right_chunks, None), right_multiplier, tags, right_reader)
+        final = right_stop - right_first <= chunk_num_points
+
+        for chunk in left_reader.iter_chunks(left_tags, first, stop, chunk_num_points):
+            dates = chunk.dates * left_multiplier if left_multiplier != 1 else chunk.dates
+            data = dict([(t, chunk.data[t]) for t in left_tags])
+            for t in tags:
+                data[t] = np.empty(dates.size, dtype=out_dtypes[t])
+            position = 0
+            while position < dates.size:
+                if final:
+                    covered = dates.size
+                else:
+                    # left points at or after the last date of the right chunk may match the next chunk,
+                    # which may start with more points at that date
+                    covered = int(np.searchsorted(dates, right_chunk.dates[-1], 'left'))
+                _match(dates[position:covered], right_chunk, tags, width, fill_value,
+                       dict([(t, data[t][position:covered]) for t in tags]))
+                position = covered
+                if position < dates.size:
+                    # the last point of this right chunk is matched by the left points before the next one
+                    following = next(right_chunks, None)
+                    final = following is None
+                    carry = RangeChunk(
+                        start_index=right_chunk.start_index + right_chunk.dates.size - 1,
+                        dates=right_chunk.dates[-1:],
+                        data=dict([(t, right_chunk.data[t][-1:]) for t in tags])
+                    )
+                    right_chunk = carry if final else _prepended_chunk(
+                        carry, _scaled_chunk(following, right_multiplier, tags, right_reader), tags
+                    )
+            yield TimeBoxArrays(timestamps=dates, unit=unit, data=data)
+    return
+
+
+def _match(dates: np.ndarray, right_chunk: RangeChunk, tags: list, width: int, fill_value, out: dict):
+    """
+    Matches left dates with the last right point dated at or before each of them
+    :param dates: sorted int64 array of left dates
+    :param right_chunk: RangeChunk of right points, holding the last right point before dates[0] if any
+    :param tags: list of the right tag identifiers
+    :param width: optional tolerance in the units of dates
+    :param fill_value: value of unmatched points, NaN if None
+    :param out: dictionary like {tag_identifier: numpy array of dates.size values} to fill
+    :return: void
+    """
+    if dates.size == 0:
+        return
+    indexes = np.searchsorted(right_chunk.dates, dates, 'right')
+    indexes -= 1
+    unmatched = indexes < 0
+    np.maximum(indexes, 0, out=indexes)
+    if width is not None and right_chunk.dates.size > 0:
+        unmatched |= dates - right_chunk.dates[indexes] > width
+    for t in tags:
+        if right_chunk.dates.size == 0:
+            pass
+        elif out[t].dtype == right_chunk.data[t].dtype:
+            np.take(right_chunk.data[t], indexes, out=out[t])
+        else:
+            np.copyto(out[t], right_chunk.data[t][indexes], casting='unsafe')
+        out[t][unmatched] = np.nan if fill_value is None else fill_value
+    return
+
+
+def _joined_dtype(dtype: np.dtype, fill_value) -> np.dtype:
+    """
+    :return: dtype of a joined tag, float64 for integer tags that are NaN where unmatched
+    """
+    dtype = np.dtype(dtype)
+    if fill_value is None and dtype.kind != 'f':
+        return np.dtype(np.float64)
+    return dtype
+
+
+def _scaled_chunk(chunk: RangeChunk, multiplier: int, tags: list, reader: RangeReader) -> RangeChunk:
+    """
+    Converts the dates of a right chunk to the join's units, an empty chunk if chunk is None
+    """
+    if chunk is None:
+        return RangeChunk(start_index=0, dates=np.empty(0, dtype=np.int64),
+                          data=dict([(t, np.empty(0, dtype=reader.tag(t).dtype)) for t in tags]))
+    if multiplier == 1:
+        return chunk
+    return chunk._replace(dates=chunk.dates * multiplier)
+
+
+def _prepended_chunk(carry: RangeChunk, chunk: RangeChunk, tags: list) -> RangeChunk:
+    """
+    Prepends the last point of the previous right chunk to a right chunk
+    """
+    return RangeChunk(
+        start_index=carry.start_index,
+        dates=np.concatenate([carry.dates, chunk.dates]),
+        data=dict([(t, np.concatenate([carry.data[t], chunk.data[t]])) for t in tags])
+    )
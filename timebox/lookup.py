@@ -0,0 +1,45 @@
+import numpy as np
+from timebox.timebox import TimeBoxArrays
+from timebox.range_reader import RangeReader
+
+
+def value_at(file_path: str, date, tags: list = None) -> TimeBoxArrays:
+    """
+    Gets the point dated at or just before a date. The point is found in one block of dates
+    and only that point of each tag is decoded, tags stored in 'e' mode are decoded from the
+    checkpoint at the start of its block, see RangeReader.read_tag
+    :param file_path: path of the TimeBox file
+    :param date: numpy datetime64, or anything numpy.datetime64 parses, like '2018-01-01T00:00'
+    :param tags: optional list of tag identifiers, all tags if None
+    :return: TimeBoxArrays named tuple like (int64 date of the point since epoch, unit, {tag_identifier: numpy
+    array}), with one point, or none if date is before the first point
+    """
+    with RangeReader(file_path) as reader:
+        stop = reader.index_range(end=date)[1]
+        return _read_points(reader, max(stop - 1, 0), stop, tags)
+
+
+def tail(file_path: str, num_points: int, tags: list = None) -> TimeBoxArrays:
+    """
+    Gets the last points of a file. Tags stored in 'e' mode are decoded backwards from the value of
+    their last point stored in the footer, so the time does not depend on the length of the file
+    :param file_path: path of the TimeBox file
+    :param num_points: number of points
+    :param tags: optional list of tag identifiers, all tags if None
+    :return: TimeBoxArrays named tuple like (int64 dates since epoch, unit, {tag_identifier: numpy array}),
+    with fewer points if the file holds fewer
+    """
+    with RangeReader(file_path) as reader:
+        return _read_points(reader, max(reader.num_points - max(num_points, 0), 0), reader.num_points, tags)
+
+
+def _read_points(reader: RangeReader, first: int, stop: int, tags: list) -> TimeBoxArrays:
+    """
+    :return: TimeBoxArrays of the points from first to stop, excluded
+    """
+    tags = reader.tags if tags is None else tags
+    return TimeBoxArrays(
+        timestamps=reader.read_dates(first, stop),
+        unit=reader.dates_units,
+        data=dict([(t, reader.read_tag(t, first, stop)) for t in tags])
+    )
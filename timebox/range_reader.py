@@ -0,0 +1,447 @@
+import os
+import numpy as np
+from fcntl import flock, LOCK_UN
+from timebox.timebox import TimeBox
+from timebox.file_snapshot import FileSnapshot
+from timebox.block_statistics import block_section_array, block_statistics_dtype
+from timebox.rollup import rollup_level_from_section
+from timebox.constants import TimeBoxFooterSectionTypes
+from timebox.footer import virtual_tag_from_section
+from timebox.instrumentation import start_stage, end_stage, READ_FILE_INFO, READ_DATES, DECODE_DATES, READ_TAG, \
+    DECODE_TAG
+from timebox.utils.datetime_utils import get_unit_data, get_conversion_multiplier, get_units_from_dtype, \
+    units_by_order, SECONDS
+from timebox.utils.numpy_utils import get_numpy_type, decompress_array
+from timebox.exceptions import DataDoesNotMatchTagDefinitionError, DataShapeError
+from collections import namedtuple
+
+
+DEFAULT_CHUNK_NUM_POINTS = 1 << 20  # points decoded at a time by RangeReader.iter_chunks
+
+# dates is an int64 array of dates_units since epoch, data is like {tag_identifier: numpy array}
+RangeChunk = namedtuple('RangeChunk', ['start_index', 'dates', 'data'])
+
+
+def tag_identifier(name: str, tags: list):
+    """
+    Finds the tag a name of a predicate or expression refers to. Names are strings, integer tag
+    identifiers are written as quoted numbers like "7"
+    :param name: tag name
+    :param tags: list of the tag identifiers of the file
+    :return: the tag identifier, None if no tag has that name
+    """
+    if name in tags:
+        return name
+    if name.isdigit() and int(name) in tags:
+        return int(name)
+    return None
+
+
+def missing_tag_message(name: str, tags: list) -> str:
+    """
+    :return: error message for a name tag_identifier did not find
+    """
+    if any([not isinstance(t, str) for t in tags]):
+        return 'Tag {} was not found in file, integer tag identifiers are written as quoted numbers ' \
+               'like "7"'.format(name)
+    return 'Tag {} was not found in file'.format(name)
+
+
+class RangeReader:
+    def __init__(self, file_path: str):
+        """
+        Reads ranges of points from a TimeBox file without decoding the whole file. The file info
+        and footer are read under the shared lock, then the dates and tag data are read from a
+        snapshot of the file, see FileSnapshot. Files written with block dates find a date in one
+        block, older files decode all the dates once. Slices of tags stored in 'e' mode are decoded
+        from the checkpoint at the start of their first block, or from the first point of files
+        written without checkpoints
+        :param file_path: path of the TimeBox file
+        """
+        self.file_path = file_path
+        self._tb = TimeBox(file_path)
+        with self._tb._get_fcntl_lock('r') as handle:
+            try:
+                started = start_stage()
+                dates_offset = self._tb._read_file_info(handle)
+                self._snapshot = FileSnapshot(handle)
+                sections = TimeBox._read_footer_sections(handle.fileno(), os.fstat(handle.fileno()).st_size)
+                end_stage(started, READ_FILE_INFO, file_path, num_bytes=dates_offset)
+            finally:
+                flock(handle, LOCK_UN)
+
+        tb = self._tb
+        tb._apply_start_date_remainder(sections)
+        self.num_points = tb._num_points
+        self.tags = sorted(tb._tags)
+        self._dates_offset = dates_offset
+        offset = dates_offset + (max(self.num_points - 1, 0) * tb._bytes_per_date_differential
+                                 if tb._date_differentials_stored else 0)
+        self._tag_offsets = dict()
+        for t in self.tags:
+            self._tag_offsets[t] = offset
+            offset += tb._tags[t].encoded_num_bytes(self.num_points)
+
+        if tb._date_differentials_stored:
+            stored_units = get_unit_data(tb._date_differential_units).units
+            self.dates_units = units_by_order[min(get_unit_data(stored_units).order, SECONDS)]
+            self._step = None
+        else:
+            stored_units = 's'
+            self.dates_units = 's'
+            self._step = int(tb._seconds_between_points)
+        self._multiplier = int(get_conversion_multiplier(stored_units, self.dates_units))
+        self._start = int(tb._start_date.astype('datetime64[{}]'.format(self.dates_units)).astype(np.int64))
+
+        self.block_num_points = None
+        self._block_dates = None  # int64 array of the first date of each block, in dates_units
+        self._block_statistics = dict()
+        self._rollups = dict([(t, []) for t in self.tags])  # like {tag_identifier: [RollupLevel]}
+        self._last_values = dict()  # value 'e' mode tags accumulate to at the last point, before rounding division
+        self._checkpoints = dict()  # like {tag_identifier: (points per block, values at the first point of each block)}
+        self.virtual_tags = dict()  # like {name: expression}, see timebox.expression
+        self._all_dates = None
+        for s in sections:
+            if s.section_type == TimeBoxFooterSectionTypes.BLOCK_DATES:
+                self.block_num_points, offsets = block_section_array(s, '<i8', self.num_points)
+                self._block_dates = self._start + offsets * self._multiplier
+            elif s.section_type == TimeBoxFooterSectionTypes.BLOCK_STATISTICS and s.tag_index < len(self.tags):
+                tag = tb._tags[self.tags[s.tag_index]]
+                self._block_statistics[tag.identifier] = block_section_array(
+                    s, block_statistics_dtype(tag.dtype, tag.floating_point_rounded), self.num_points
+                )
+            elif s.section_type == TimeBoxFooterSectionTypes.LAST_VALUE and s.tag_index < len(self.tags):
+                tag = tb._tags[self.tags[s.tag_index]]
+                self._last_values[tag.identifier] = np.frombuffer(s.payload, dtype=np.dtype(tag.dtype).newbyteorder('<'))[0]
+            elif s.section_type == TimeBoxFooterSectionTypes.CHECKPOINTS and s.tag_index < len(self.tags):
+                tag = tb._tags[self.tags[s.tag_index]]
+                self._checkpoints[tag.identifier] = block_section_array(
+                    s, np.dtype(tag.dtype).newbyteorder('<'), self.num_points
+                )
+            elif s.section_type == TimeBoxFooterSectionTypes.ROLLUP and s.tag_index < len(self.tags):
+                tag = tb._tags[self.tags[s.tag_index]]
+                self._rollups[tag.identifier].append(rollup_level_from_section(
+                    s, block_statistics_dtype(tag.dtype, tag.floating_point_rounded)
+                ))
+            elif s.section_type == TimeBoxFooterSectionTypes.VIRTUAL_TAG:
+                name, expression = virtual_tag_from_section(s)
+                self.virtual_tags[name] = expression
+        return
+
+    def close(self):
+        """
+        Closes the snapshot of the file
+        :return: void
+        """
+        self._snapshot.close()
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def tag(self, identifier):
+        """
+        :param identifier: tag identifier
+        :return: TimeBoxTag definition of the tag, without data
+        """
+        if identifier not in self._tb._tags:
+            raise DataDoesNotMatchTagDefinitionError('Tag {} was not found in file'.format(identifier))
+        return self._tb._tags[identifier]
+
+    def block_statistics(self, identifier) -> tuple:
+        """
+        Gets the block statistics a tag was written with
+        :param identifier: tag identifier
+        :return: tuple like (points per block, array of block_statistics_dtype), or None if the file has none
+        """
+        self.tag(identifier)
+        return self._block_statistics.get(identifier)
+
+    def rollups(self, identifier) -> list:
+        """
+        Gets the rollup levels a tag was written with
+        :param identifier: tag identifier
+        :return: list of rollup.RollupLevel, empty if the file has none
+        """
+        self.tag(identifier)
+        return self._rollups[identifier]
+
+    def date_to_int(self, date, round_up: bool = False) -> int:
+        """
+        Converts a date to an integer number of dates_units since epoch
+        :param date: numpy datetime64, or anything numpy.datetime64 parses, like '2018-01-01T00:00'
+        :param round_up: if True, dates finer than dates_units are rounded up instead of down
+        :return: int
+        """
+        date = np.datetime64(date)
+        date_units = get_units_from_dtype(date.dtype)
+        multiplier = get_conversion_multiplier(self.dates_units, date_units)
+        if multiplier <= 1:
+            return int(date.astype('datetime64[{}]'.format(self.dates_units)).astype(np.int64))
+        value = int(date.astype(np.int64))
+        multiplier = int(multiplier)
+        return -(-value // multiplier) if round_up else value // multiplier
+
+    def index_range(self, start=None, end=None) -> tuple:
+        """
+        Finds the points dated from start to end, both included
+        :param start: optional first date, see date_to_int. the first point if None
+        :param end: optional last date, see date_to_int. the last point if None
+        :return: tuple like (index of the first point, index after the last point)
+        """
+        return self.int_index_range(None if start is None else self.date_to_int(start, round_up=True),
+                                    None if end is None else self.date_to_int(end))
+
+    def int_index_range(self, first_date: int = None, last_date: int = None) -> tuple:
+        """
+        Finds the points dated from first_date to last_date, both included
+        :param first_date: optional first date in dates_units since epoch. the first point if None
+        :param last_date: optional last date in dates_units since epoch. the last point if None
+        :return: tuple like (index of the first point, index after the last point)
+        """
+        first = 0 if first_date is None else self._search(first_date, 'left')
+        stop = self.num_points if last_date is None else self._search(last_date, 'right')
+        return first, max(first, stop)
+
+    def _search(self, value: int, side: str) -> int:
+        """
+        Like numpy.searchsorted on all the dates, decoding at most one block of dates
+        :param value: date as an integer number of dates_units
+        :param side: 'left' or 'right', as for numpy.searchsorted
+        :return: int, index of the point
+        """
+        if self._step is not None:
+            # uniform dates, searchsorted on start + i * step
+            step = self._step * self._multiplier
+            index = (value - self._start) // step + 1 if side == 'right' else -((self._start - value) // step)
+            return min(max(index, 0), self.num_points)
+        if self._block_dates is None:
+            if self._all_dates is None:
+                self._all_dates = self.read_dates(0, self.num_points)
+            return int(np.searchsorted(self._all_dates, value, side))
+        block = int(np.searchsorted(self._block_dates, value, side)) - 1
+        if block < 0:
+            return 0
+        first = block * self.block_num_points
+        dates = self.read_dates(first, min(first + self.block_num_points, self.num_points))
+        return first + int(np.searchsorted(dates, value, side))
+
+    def read_dates(self, start_index: int, stop_index: int) -> np.ndarray:
+        """
+        Decodes the dates of a range of points, starting from the first date of their block
+        :param start_index: index of the first point
+        :param stop_index: index after the last point
+        :return: int64 array of dates_units since epoch
+        """
+        self._validate_index_range(start_index, stop_index)
+        if start_index == stop_index:
+            return np.empty(0, dtype=np.int64)
+        first = 0
+        first_date = self._start
+        if self._block_dates is not None:
+            block = start_index // self.block_num_points
+            first = block * self.block_num_points
+            first_date = int(self._block_dates[block])
+        if self._step is not None:
+            first = start_index
+        return self._read_dates_from(first, first_date, stop_index)[start_index - first:]
+
+    def read_tag(self, identifier, start_index: int, stop_index: int, out: np.ndarray = None) -> np.ndarray:
+        """
+        Decodes the data of a tag for a range of points. Tags stored in 'e' mode are decoded
+        from the checkpoint at the start of the block of start_index, or from the first point
+        of files written without checkpoints. They are decoded backwards from the last point
+        instead if the file stores its value and that decodes fewer points
+        :param identifier: tag identifier
+        :param start_index: index of the first point
+        :param stop_index: index after the last point
+        :param out: optional array of the tag's dtype and stop_index - start_index elements to decode into.
+        ranges that start at a checkpoint, or any range of tags not stored in 'e' mode, are decoded
+        straight into it
+        :return: numpy array of the tag's dtype, out if given
+        """
+        tag = self.tag(identifier)
+        self._validate_index_range(start_index, stop_index)
+        if out is not None and out.size != stop_index - start_index:
+            raise DataShapeError('Output array of {} elements does not fit points {} to '
+                                 '{}'.format(out.size, start_index, stop_index))
+        if not (tag.use_compression and tag._compression_mode == 'e') or stop_index == start_index:
+            return self._read_tag_from(tag, start_index, stop_index, out=out)[0]
+        first, first_value = self._checkpoint(tag, start_index)
+        if identifier in self._last_values and self.num_points - start_index < stop_index - first:
+            data = self._read_tag_to(tag, start_index, self.num_points, self._last_values[identifier])
+            data, trimmed = data[:stop_index - start_index], stop_index < self.num_points
+        elif first == start_index:
+            return self._read_tag_from(tag, first, stop_index, first_value, out)[0]
+        else:
+            data, trimmed = self._read_tag_from(tag, first, stop_index, first_value)[0][start_index - first:], True
+        if out is not None:
+            np.copyto(out, data)
+            return out
+        # a slice would keep the points decoded outside the range alive
+        return data.copy() if trimmed else data
+
+    def iter_chunks(self, tags: list, start_index: int = 0, stop_index: int = None,
+                    chunk_num_points: int = DEFAULT_CHUNK_NUM_POINTS):
+        """
+        Decodes a range of points chunk by chunk. Each chunk continues from the last date and
+        the last value of 'e' mode tags of the previous chunk, so the range is decoded once
+        :param tags: list of tag identifiers
+        :param start_index: index of the first point
+        :param stop_index: optional index after the last point, the number of points if None
+        :param chunk_num_points: number of points per chunk
+        :return: generator of RangeChunk
+        """
+        stop_index = self.num_points if stop_index is None else stop_index
+        self._validate_index_range(start_index, stop_index)
+        definitions = [self.tag(t) for t in tags]
+        last_date = None
+        last_values = dict()  # value of the previous point of 'e' mode tags, before rounded tags are divided
+        for first in range(start_index, stop_index, chunk_num_points):
+            stop = min(first + chunk_num_points, stop_index)
+            if last_date is None:
+                dates = self.read_dates(first, stop)
+            else:
+                dates = self._read_dates_from(first - 1, last_date, stop)[1:]
+            last_date = int(dates[-1])
+
+            data = dict()
+            for tag in definitions:
+                t = tag.identifier
+                if not (tag.use_compression and tag._compression_mode == 'e'):
+                    data[t] = self._read_tag_from(tag, first, stop)[0]
+                elif t in last_values:
+                    values, last_values[t] = self._read_tag_from(tag, first - 1, stop, last_values[t])
+                    data[t] = values[1:]
+                else:
+                    checkpoint, checkpoint_value = self._checkpoint(tag, first)
+                    values, last_values[t] = self._read_tag_from(tag, checkpoint, stop, checkpoint_value)
+                    data[t] = values[first - checkpoint:]
+            yield RangeChunk(start_index=first, dates=dates, data=data)
+        return
+
+    def _read_dates_from(self, first: int, first_date: int, stop_index: int) -> np.ndarray:
+        """
+        Decodes the dates of a range of points from the known date of its first point
+        :param first: index of the first point
+        :param first_date: date of the first point in dates_units, ignored for uniform dates
+        :param stop_index: index after the last point
+        :return: int64 array of dates_units since epoch, of stop_index - first points
+        """
+        if self._step is not None:
+            started = start_stage()
+            dates = self._start + np.arange(first, stop_index, dtype=np.int64) * (self._step * self._multiplier)
+            end_stage(started, DECODE_DATES, self.file_path, num_bytes=dates.nbytes)
+            return dates
+        if stop_index == first:
+            return np.empty(0, dtype=np.int64)
+
+        tb = self._tb
+        started = start_stage()
+        differentials = self._snapshot.read_array(
+            self._dates_offset + first * tb._bytes_per_date_differential,
+            get_numpy_type('u', 8 * tb._bytes_per_date_differential),
+            stop_index - 1 - first
+        )
+        end_stage(started, READ_DATES, self.file_path, num_bytes=differentials.nbytes)
+
+        started = start_stage()
+        dates = np.empty(stop_index - first, dtype=np.int64)
+        dates[0] = first_date
+        np.cumsum(differentials, dtype=np.int64, out=dates[1:])
+        if self._multiplier != 1:
+            np.multiply(dates[1:], self._multiplier, out=dates[1:])
+        np.add(dates[1:], first_date, out=dates[1:])
+        end_stage(started, DECODE_DATES, self.file_path, num_bytes=dates.nbytes)
+        return dates
+
+    def _read_tag_from(self, tag, first: int, stop_index: int, first_value=None,
+                       out: np.ndarray = None) -> tuple:
+        """
+        Decodes the data of a tag for a range of points
+        :param tag: TimeBoxTag definition
+        :param first: index of the first point
+        :param stop_index: index after the last point
+        :param first_value: value of the first point for tags stored in 'e' mode, before rounded
+        tags are divided, ignored for other tags
+        :param out: optional array of the tag's dtype and stop_index - first elements to decode into
+        :return: tuple like (numpy array of stop_index - first points, out if given, value of the last point before rounded
+        tags are divided or None if the tag is not stored in 'e' mode)
+        """
+        element_wise = tag.use_compression and tag._compression_mode == 'e'
+        if stop_index == first:
+            return (np.empty(0, dtype=tag.dtype) if out is None else out), first_value
+        read_dtype = tag._encoded_dtype_and_count(self.num_points)[0]
+        started = start_stage()
+        encoded = self._snapshot.read_array(
+            self._tag_offsets[tag.identifier] + first * np.dtype(read_dtype).itemsize,
+            read_dtype,
+            stop_index - first - (1 if element_wise else 0)
+        )
+        end_stage(started, READ_TAG, self.file_path, tag.identifier, encoded.nbytes)
+
+        started = start_stage()
+        if not element_wise:
+            data = tag._decode_encoded_array(encoded, out)
+            end_stage(started, DECODE_TAG, self.file_path, tag.identifier, data.nbytes)
+            return data, None
+        # the differences are accumulated from the first value, the same way TimeBoxTag decodes them
+        data = decompress_array(encoded, 'e', first_value,
+                                out=np.empty(stop_index - first, dtype=tag.dtype) if out is None else out)
+        last_value = data[-1]
+        if tag.floating_point_rounded:
+            np.divide(data, pow(10, tag.num_decimals_to_store), out=data)
+        end_stage(started, DECODE_TAG, self.file_path, tag.identifier, data.nbytes)
+        return data, last_value
+
+    def _checkpoint(self, tag, start_index: int) -> tuple:
+        """
+        Finds the closest point at or before start_index from which a tag stored in 'e' mode can be decoded
+        :param tag: TimeBoxTag definition
+        :param start_index: index of a point
+        :return: tuple like (index of the point, its value before rounded tags are divided)
+        """
+        if tag.identifier not in self._checkpoints or start_index >= self.num_points:
+            return 0, tag._compression_reference_value
+        block_num_points, values = self._checkpoints[tag.identifier]
+        block = start_index // block_num_points
+        return block * block_num_points, values[block]
+
+    def _read_tag_to(self, tag, first: int, stop_index: int, last_value) -> np.ndarray:
+        """
+        Decodes a tag stored in 'e' mode backwards from the known value of the last point of a range
+        :param tag: TimeBoxTag definition
+        :param first: index of the first point
+        :param stop_index: index after the last point
+        :param last_value: value of the point before stop_index, before rounded tags are divided
+        :return: numpy array of stop_index - first points
+        """
+        read_dtype = tag._encoded_dtype_and_count(self.num_points)[0]
+        started = start_stage()
+        differences = self._snapshot.read_array(
+            self._tag_offsets[tag.identifier] + first * np.dtype(read_dtype).itemsize,
+            read_dtype,
+            stop_index - first - 1
+        )
+        end_stage(started, READ_TAG, self.file_path, tag.identifier, differences.nbytes)
+
+        started = start_stage()
+        data = np.empty(stop_index - first, dtype=tag.dtype)
+        data[-1] = last_value
+        # data[i] is the last value less the differences from i to the last point
+        np.cumsum(differences[::-1], dtype=data.dtype, out=data[-2::-1])
+        np.subtract(data[-1], data[:-1], out=data[:-1], dtype=data.dtype, casting='unsafe')
+        if tag.floating_point_rounded:
+            np.divide(data, pow(10, tag.num_decimals_to_store), out=data)
+        end_stage(started, DECODE_TAG, self.file_path, tag.identifier, data.nbytes)
+        return data
+
+    def _validate_index_range(self, start_index: int, stop_index: int):
+        if start_index < 0 or stop_index > self.num_points or start_index > stop_index:
+            raise DataShapeError('Point range {} to {} is not within the {} points of '
+                                 '{}'.format(start_index, stop_index, self.num_points, self.file_path))
+        return
@@ -0,0 +1,114 @@
+import numpy as np
+from timebox.timebox import TimeBoxArrays
+from timebox.range_reader import RangeReader, DEFAULT_CHUNK_NUM_POINTS
+from timebox.block_statistics import combine_segments
+from timebox.rollup import BucketStatistics, RollupLevel, coarsest_level
+from timebox.utils.datetime_utils import frequency_to_units, get_unit_data
+from timebox.exceptions import ResampleFunctionError
+
+
+RESAMPLE_FUNCTIONS = ['open', 'high', 'low', 'close', 'sum', 'count']
+
+# fields of block_statistics.block_statistics_dtype each resample function reads
+RESAMPLE_STATISTICS = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'sum': 'sum',
+    'count': 'count'
+}
+
+
+def resample_file(file_path: str, tag, rule, how: list = None, start=None, end=None,
+                  chunk_num_points: int = DEFAULT_CHUNK_NUM_POINTS) -> TimeBoxArrays:
+    """
+    Resamples a tag into buckets of a fixed duration, aligned on the epoch like pandas' default.
+    The points dated from start to end, both included, are decoded chunk by chunk: the bucket
+    boundaries of each chunk are found on its int64 dates and every function is reduced with
+    one reduceat per chunk, so the whole series is never held in memory. If the file has rollup
+    levels whose duration divides the rule, the buckets are combined from the coarsest of them
+    and only the buckets cut by start or end are decoded, see timebox.rollup. Only the buckets
+    holding at least one point are returned. NaN values are left out like in pandas: open and
+    close are the first and last values that are not NaN, and buckets of NaN values only have
+    a count of 0 and NaN open, high, low and close
+    :param file_path: path of the TimeBox file
+    :param tag: tag identifier
+    :param rule: bucket duration, numpy timedelta64 or string like '1s', '5min' or '1h', a whole number
+    of the file's date units, see timebox.utils.datetime_utils.frequency_to_units
+    :param how: optional list of RESAMPLE_FUNCTIONS, all of them if None
+    :param start: optional first date, like numpy.datetime64('2018-01-01') or '2018-01-01T00:00'
+    :param end: optional last date
+    :param chunk_num_points: number of points decoded at a time
+    :return: TimeBoxArrays named tuple like (int64 start of each bucket since epoch, unit, {function: numpy array})
+    """
+    how = RESAMPLE_FUNCTIONS if how is None else how
+    for f in how:
+        if f not in RESAMPLE_FUNCTIONS:
+            raise ResampleFunctionError('Resample function {} is not one of {}'.format(
+                f, ', '.join(RESAMPLE_FUNCTIONS)))
+
+    with RangeReader(file_path) as reader:
+        width = frequency_to_units(rule, reader.dates_units)
+        unit = reader.dates_units
+        first_date = None if start is None else reader.date_to_int(start, round_up=True)
+        last_date = None if end is None else reader.date_to_int(end)
+        level = coarsest_level(reader.rollups(tag), frequency_to_units(rule, 'ns'))
+        if level is None:
+            labels, statistics = _decoded_buckets(reader, tag, width, first_date, last_date, chunk_num_points)
+        else:
+            labels, statistics = _rollup_buckets(reader, tag, level, width, first_date, last_date, chunk_num_points)
+
+    return TimeBoxArrays(
+        timestamps=labels * width,
+        unit=unit,
+        data=dict([(f, statistics[RESAMPLE_STATISTICS[f]]) for f in how])
+    )
+
+
+def _decoded_buckets(reader: RangeReader, tag, width: int, first_date: int, last_date: int,
+                     chunk_num_points: int) -> tuple:
+    """
+    Decodes the points dated from first_date to last_date chunk by chunk and summarizes them in buckets
+    :param reader: RangeReader of the file
+    :param tag: tag identifier
+    :param width: bucket duration in the reader's dates_units
+    :param first_date: optional first date in dates_units since epoch
+    :param last_date: optional last date in dates_units since epoch
+    :param chunk_num_points: number of points decoded at a time
+    :return: tuple like (int64 array of the buckets since epoch, array of block_statistics_dtype)
+    """
+    first, stop = reader.int_index_range(first_date, last_date)
+    buckets = BucketStatistics(width, reader.tag(tag).dtype)
+    for chunk in reader.iter_chunks([tag], first, stop, chunk_num_points):
+        buckets.append(chunk.dates, chunk.data[tag])
+    return buckets.finish()
+
+
+def _rollup_buckets(reader: RangeReader, tag, level: RollupLevel, width: int, first_date: int, last_date: int,
+                    chunk_num_points: int) -> tuple:
+    """
+    Combines the buckets of a rollup level into the requested buckets. Buckets cut by first_date
+    or last_date are decoded instead, see _decoded_buckets
+    :param level: RollupLevel whose bucket duration divides width
+    :return: tuple like (int64 array of the buckets since epoch, array of block_statistics_dtype)
+    """
+    first_bucket = None if first_date is None else -(-first_date // width)
+    stop_bucket = None if last_date is None else (last_date + 1) // width
+    if first_bucket is not None and stop_bucket is not None and first_bucket >= stop_bucket:
+        return _decoded_buckets(reader, tag, width, first_date, last_date, chunk_num_points)
+
+    # the rollup buckets nest in the requested buckets, as both are aligned on the epoch
+    level_buckets = level.labels // (width * get_unit_data(reader.dates_units).multiplier // level.width)
+    lo = 0 if first_bucket is None else np.searchsorted(level_buckets, first_bucket, 'left')
+    hi = level_buckets.size if stop_bucket is None else np.searchsorted(level_buckets, stop_bucket, 'left')
+    level_buckets = level_buckets[lo:hi]
+    starts = np.concatenate([[0], np.flatnonzero(level_buckets[1:] != level_buckets[:-1]) + 1]) \
+        if level_buckets.size > 0 else np.empty(0, dtype=np.int64)
+    pieces = [(level_buckets[starts], combine_segments(level.statistics[lo:hi], starts))]
+    if first_bucket is not None and first_date < first_bucket * width:
+        pieces.insert(0, _decoded_buckets(reader, tag, width, first_date, first_bucket * width - 1, chunk_num_points))
+    if stop_bucket is not None and stop_bucket * width <= last_date:
+        pieces.append(_decoded_buckets(reader, tag, width, stop_bucket * width, last_date, chunk_num_points))
+    return np.concatenate([p[0] for p in pieces]), \
+        np.concatenate([p[1].astype(level.statistics.dtype, copy=False) for p in pieces])
@@ -0,0 +1,132 @@
+import struct
+import numpy as np
+from collections import namedtuple
+from timebox.constants import TimeBoxFooterSectionTypes
+from timebox.footer import FooterSection
+from timebox.block_statistics import block_statistics_dtype, summarize_segments, combine_statistics, \
+    BLOCK_NUM_POINTS, STATISTICS_CHUNK_NUM_BLOCKS
+from timebox.utils.datetime_utils import frequency_to_units
+from timebox.exceptions import FooterFormatError
+
+
+ROLLUP_HEADER_STRUCT = struct.Struct('<Q')  # bucket duration in nanoseconds, leads the rollup sections
+# points summarized at a time. TimeBox.write and TimeBoxWriter split the points the same way,
+# so float sums are added in the same order and their files are the same
+ROLLUP_CHUNK_NUM_POINTS = BLOCK_NUM_POINTS * STATISTICS_CHUNK_NUM_BLOCKS
+
+# width is the bucket duration in nanoseconds, labels is an int64 array of the buckets since epoch,
+# statistics is an array of block_statistics.block_statistics_dtype, one element per label
+RollupLevel = namedtuple('RollupLevel', ['width', 'labels', 'statistics'])
+
+
+class BucketStatistics:
+    def __init__(self, width: int, dtype, num_decimals: int = None):
+        """
+        Summarizes values in buckets of a fixed duration, aligned on the epoch, from chunks of
+        points appended in date order. The boundaries of the buckets are found on the int64
+        dates of each chunk and each statistic is reduced with one reduceat per chunk, the
+        bucket still open at the end of a chunk is merged with the start of the next one. Only
+        buckets holding at least one point are kept
+        :param width: bucket duration in the units of the appended dates
+        :param dtype: numpy dtype of the values
+        :param num_decimals: if not None, values are the integers of a tag rounded to num_decimals
+        decimals, and the statistics are of the decoded floats
+        """
+        self.width = width
+        self.num_decimals = num_decimals
+        self._dtype = block_statistics_dtype(dtype, num_decimals is not None)
+        self._labels = []
+        self._statistics = []
+        return
+
+    def append(self, dates: np.ndarray, values: np.ndarray):
+        """
+        Summarizes a chunk of points
+        :param dates: sorted int64 array of dates, not before the dates already appended
+        :param values: numpy array of the values at those dates
+        :return: void
+        """
+        if dates.size == 0:
+            return
+        buckets = np.floor_divide(dates, self.width)
+        starts = np.flatnonzero(buckets[1:] != buckets[:-1])
+        starts += 1
+        starts = np.concatenate([[0], starts])
+        labels = buckets[starts]
+        statistics = summarize_segments(values, starts)
+        if self._labels and self._labels[-1][-1] == labels[0]:
+            # the last bucket of the previous chunk goes on in this chunk
+            statistics[0] = combine_statistics(np.concatenate([self._statistics[-1][-1:], statistics[:1]]))
+            self._labels[-1] = self._labels[-1][:-1]
+            self._statistics[-1] = self._statistics[-1][:-1]
+        self._labels.append(labels)
+        self._statistics.append(statistics)
+        return
+
+    def finish(self) -> tuple:
+        """
+        :return: tuple like (int64 array of the buckets since epoch, array of block_statistics_dtype)
+        """
+        if not self._labels:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=self._dtype)
+        labels = np.concatenate(self._labels)
+        statistics = np.concatenate(self._statistics)
+        if self.num_decimals is not None:
+            statistics = statistics.astype(self._dtype)
+            for name in ['min', 'max', 'first', 'last', 'sum']:
+                np.divide(statistics[name], pow(10, self.num_decimals), out=statistics[name])
+        return labels, statistics
+
+
+def rollup_widths(rules: list) -> list:
+    """
+    Converts rollup rules to bucket durations
+    :param rules: list of numpy timedelta64 or strings like '1s', '1min' or '1h'
+    :return: sorted list of distinct bucket durations in nanoseconds
+    """
+    return sorted(set([frequency_to_units(r, 'ns') for r in rules]))
+
+
+def rollup_section(tag_index: int, width: int, labels: np.ndarray, statistics: np.ndarray) -> FooterSection:
+    """
+    Builds the footer section holding one rollup level of a tag
+    :param tag_index: position of the tag in the sorted tag identifiers
+    :param width: bucket duration in nanoseconds
+    :param labels: int64 array of the buckets since epoch
+    :param statistics: array of block_statistics_dtype, one element per label
+    :return: FooterSection
+    """
+    return FooterSection(
+        TimeBoxFooterSectionTypes.ROLLUP,
+        tag_index,
+        ROLLUP_HEADER_STRUCT.pack(width) + labels.astype('<i8', copy=False).tobytes() + statistics.tobytes()
+    )
+
+
+def rollup_level_from_section(section: FooterSection, dtype: np.dtype) -> RollupLevel:
+    """
+    Parses a rollup footer section
+    :param section: FooterSection
+    :param dtype: block_statistics_dtype of the tag
+    :return: RollupLevel
+    """
+    width = ROLLUP_HEADER_STRUCT.unpack_from(section.payload)[0]
+    num_bytes = len(section.payload) - ROLLUP_HEADER_STRUCT.size
+    num_buckets = num_bytes // (8 + dtype.itemsize)
+    if width == 0 or num_buckets * (8 + dtype.itemsize) != num_bytes:
+        raise FooterFormatError('Rollup section of tag index {} does not hold whole buckets'.format(section.tag_index))
+    labels = np.frombuffer(section.payload, dtype='<i8', count=num_buckets, offset=ROLLUP_HEADER_STRUCT.size)
+    statistics = np.frombuffer(section.payload, dtype=dtype, count=num_buckets,
+                               offset=ROLLUP_HEADER_STRUCT.size + labels.nbytes)
+    return RollupLevel(width=width, labels=labels, statistics=statistics)
+
+
+def coarsest_level(levels: list, width: int):
+    """
+    Picks the rollup level to resample from
+    :param levels: list of RollupLevel
+    :param width: requested bucket duration in nanoseconds
+    :return: the RollupLevel with the longest buckets that divide width, None if no level does
+    """
+    candidates = [level for level in levels if width % level.width == 0]
+    return max(candidates, key=lambda level: level.width) if candidates else None
@@ -0,0 +1,259 @@
+import os
+import json
+import numpy as np
+from collections import namedtuple
+from fcntl import flock, LOCK_EX, LOCK_UN
+from timebox.timebox import TimeBox
+from timebox.batch import read_many
+from timebox.exceptions import StoreError, DataDoesNotMatchTagDefinitionError
+
+
+MANIFEST_FILE_NAME = 'manifest.json'
+WRITE_LOCK_FILE_NAME = 'write.lock'
+PARTITION_UNITS = ['Y', 'M', 'W', 'D', 'h', 'm']
+
+# start and end are int64 nanoseconds since epoch
+ManifestEntry = namedtuple('ManifestEntry', ['key', 'partition', 'start', 'end', 'num_points', 'tags'])
+
+
+class TimeBoxStore:
+    def __init__(self, root: str, partition_unit: str = 'D'):
+        """
+        A data set of TimeBox files, one file per key per time bucket, with a
+        manifest of what each file holds so range queries only open the files
+        that overlap them. Files are laid out like root/key/partition.npb
+        :param root: directory of the store, created if it does not exist
+        :param partition_unit: numpy datetime64 unit of the time buckets, one of 'Y', 'M', 'W', 'D', 'h', 'm'.
+        ignored if the store already exists, the unit in its manifest is used
+        """
+        if partition_unit not in PARTITION_UNITS:
+            raise StoreError('Partition unit must be one of {}, {} found'.format(PARTITION_UNITS, partition_unit))
+        self.root = root
+        self.partition_unit = partition_unit
+        os.makedirs(root, exist_ok=True)
+        manifest = self._read_manifest()
+        if manifest is not None:
+            self.partition_unit = manifest['partition_unit']
+        return
+
+    def write(self, key: str, tb: TimeBox):
+        """
+        Splits the TimeBox into time buckets and writes each bucket into its partition file.
+        Points are merged into existing partitions, points at an existing date replace the existing point.
+        Tag definitions and encoding options of tb are used for the partition files. Writers of the same
+        key wait for each other, so concurrent writes are merged rather than lost. A TimeBox without
+        points writes nothing
+        :param key: name of the series, like a symbol. used as a directory name
+        :param tb: TimeBox holding dates and tag data
+        :return: void
+        """
+        self._validate_key(key)
+        if tb._dates is None or tb._dates.size == 0:
+            return
+        os.makedirs(os.path.join(self.root, key), exist_ok=True)
+        # the partitions are read, merged and written, and the manifest updated, under one lock
+        with open(os.path.join(self.root, key, WRITE_LOCK_FILE_NAME), 'a') as lock_handle:
+            flock(lock_handle, LOCK_EX)
+            try:
+                self._write_locked(key, tb)
+            finally:
+                flock(lock_handle, LOCK_UN)
+        return
+
+    def _write_locked(self, key: str, tb: TimeBox):
+        """
+        Writes the partitions of tb and updates the manifest, the write lock of key must be held
+        :param key: name of the series
+        :param tb: TimeBox holding at least one point
+        :return: void
+        """
+        dates = tb._dates
+        order = None
+        if dates.size > 1 and np.any(dates[1:] < dates[:-1]):
+            order = np.argsort(dates, kind='mergesort')
+            dates = dates[order]
+        buckets = dates.astype('datetime64[{}]'.format(self.partition_unit))
+        boundaries = np.concatenate(([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1, [dates.size]))
+
+        entries = []
+        for i in range(0, boundaries.size - 1):
+            start_index, end_index = boundaries[i], boundaries[i + 1]
+            partition = self._partition_name(buckets[start_index])
+            tag_data = {}
+            for t in tb._tags:
+                data = tb._tags[t].data if order is None else tb._tags[t].data[order]
+                tag_data[t] = data[start_index:end_index]
+            partition_tb = self._write_partition(
+                key, partition, tb, dates[start_index:end_index], tag_data
+            )
+            entries.append(ManifestEntry(
+                key=key,
+                partition=partition,
+                start=self._to_epoch_ns(partition_tb._dates[0]),
+                end=self._to_epoch_ns(partition_tb._dates[-1]),
+                num_points=int(partition_tb._num_points),
+                tags=sorted([str(t) for t in partition_tb._tags])
+            ))
+        self._update_manifest(entries)
+        return
+
+    def read(self, key: str, start=None, end=None, tags: list = None, workers: int = None) -> TimeBox:
+        """
+        Reads the points of key between start and end, inclusive, opening only the
+        partition files that overlap the range
+        :param key: name of the series
+        :param start: optional start date, anything np.datetime64 accepts
+        :param end: optional end date, anything np.datetime64 accepts
+        :param tags: optional list of tag identifiers to read, all tags if None
+        :param workers: maximum number of threads reading partitions, see read_many
+        :return: TimeBox with the dates and tag data, not associated with a file
+        """
+        entries = self.partitions(key, start, end)
+        return read_many(
+            [self.partition_path(key, e.partition) for e in entries],
+            tags,
+            None if start is None else np.datetime64(self._to_epoch_ns(start), 'ns'),
+            None if end is None else np.datetime64(self._to_epoch_ns(end), 'ns'),
+            workers
+        )
+
+    def partitions(self, key: str, start=None, end=None) -> list:
+        """
+        Looks up the partitions of key that overlap the range in the manifest
+        :param key: name of the series
+        :param start: optional start date, anything np.datetime64 accepts
+        :param end: optional end date, anything np.datetime64 accepts
+        :return: list of ManifestEntry, sorted by start
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            return []
+        start_ns = None if start is None else self._to_epoch_ns(start)
+        end_ns = None if end is None else self._to_epoch_ns(end)
+        entries = [ManifestEntry(key, *e) for e in manifest['keys'].get(key, [])]
+        return sorted(
+            [e for e in entries
+             if (start_ns is None or e.end >= start_ns) and (end_ns is None or e.start <= end_ns)],
+            key=lambda e: e.start
+        )
+
+    def keys(self) -> list:
+        """
+        Gets the keys held by the store
+        :return: sorted list of keys
+        """
+        manifest = self._read_manifest()
+        return [] if manifest is None else sorted(manifest['keys'])
+
+    def partition_path(self, key: str, partition: str) -> str:
+        """
+        Gets the path of a partition file
+        :param key: name of the series
+        :param partition: partition name from the manifest
+        :return: file path
+        """
+        return os.path.join(self.root, key, '{}.npb'.format(partition))
+
+    def _write_partition(self, key: str, partition: str, tb: TimeBox, dates: np.ndarray,
+                         tag_data: dict) -> TimeBox:
+        """
+        Writes the points of one time bucket, merging them with the existing partition file. The rollup
+        durations and virtual tags of the existing file are kept along with those of tb
+        :param key: name of the series
+        :param partition: partition name
+        :param tb: source TimeBox, used for tag definitions
+        :param dates: sorted dates of the points
+        :param tag_data: dictionary like {tag_identifier: numpy array} of the points
+        :return: the TimeBox that was written
+        """
+        path = self.partition_path(key, partition)
+        widths = tb._rollup_widths
+        virtual_tags = tb._virtual_tags
+        if os.path.exists(path):
+            existing = TimeBox(path)
+            existing.read()
+            if sorted(existing._tags) != sorted(tag_data):
+                raise DataDoesNotMatchTagDefinitionError('Tags of partition {} of {} do not match the '
+                                                         'tags written'.format(partition, key))
+            # new points go last so they win when dates are duplicated
+            dates = np.concatenate((existing._dates, dates))
+            order = np.argsort(dates, kind='mergesort')
+            dates = dates[order]
+            keep = np.ones(dates.size, dtype=bool)
+            keep[:-1] = dates[1:] != dates[:-1]
+            dates = dates[keep]
+            tag_data = dict([
+                (t, np.concatenate((existing._tags[t].data, tag_data[t]))[order][keep])
+                for t in tag_data
+            ])
+            widths = sorted(set(existing._rollup_widths) | set(widths))
+            virtual_tags = dict(existing._virtual_tags)
+            virtual_tags.update(tb._virtual_tags)
+
+        partition_tb = TimeBox(path)
+        partition_tb._tag_names_are_strings = tb._tag_names_are_strings
+        partition_tb._date_differentials_stored = True
+        partition_tb._dates = dates
+        partition_tb._start_date = np.amin(dates).astype('datetime64[s]')
+        partition_tb._num_points = dates.size
+        partition_tb._rollup_widths = widths
+        partition_tb._virtual_tags = virtual_tags
+        for t in tb._tags:
+            partition_tb._tags[t] = tb._tags[t].definition_copy()
+            partition_tb._tags[t].data = tag_data[t]
+        partition_tb.write()
+        return partition_tb
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.root, MANIFEST_FILE_NAME)
+
+    def _read_manifest(self) -> dict:
+        """
+        Reads the manifest. manifest layout is like
+        {'partition_unit': 'D', 'keys': {key: [[partition, start, end, num_points, tags], ...]}}
+        :return: dictionary, or None if the store has no manifest yet
+        """
+        try:
+            with open(self._manifest_path(), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _update_manifest(self, entries: list):
+        """
+        Adds or replaces manifest entries. The manifest is locked while it is updated
+        and replaced atomically, so readers never see a partial manifest
+        :param entries: list of ManifestEntry
+        :return: void
+        """
+        with open('{}.lock'.format(self._manifest_path()), 'a') as lock_handle:
+            flock(lock_handle, LOCK_EX)
+            try:
+                manifest = self._read_manifest()
+                if manifest is None:
+                    manifest = {'partition_unit': self.partition_unit, 'keys': {}}
+                for e in entries:
+                    key_entries = [k for k in manifest['keys'].get(e.key, []) if k[0] != e.partition]
+                    key_entries.append([e.partition, e.start, e.end, e.num_points, e.tags])
+                    manifest['keys'][e.key] = sorted(key_entries, key=lambda k: k[1])
+                temporary_path = '{}.tmp'.format(self._manifest_path())
+                with open(temporary_path, 'w') as f:
+                    json.dump(manifest, f, separators=(',', ':'))
+                os.replace(temporary_path, self._manifest_path())
+            finally:
+                flock(lock_handle, LOCK_UN)
+        return
+
+    @classmethod
+    def _validate_key(cls, key: str):
+        if not isinstance(key, str) or key in ['', '.', '..'] or os.sep in key:
+            raise StoreError('Key {} cannot be used as a directory name'.format(key))
+        return
+
+    @classmethod
+    def _partition_name(cls, bucket: np.datetime64) -> str:
+        return str(bucket).replace(':', '-')
+
+    @classmethod
+    def _to_epoch_ns(cls, date) -> int:
+        return int(np.datetime64(date).astype('datetime64[ns]').astype(np.int64))
@@ -0,0 +1,101 @@
+from timebox.timebox import TimeBox
+from timebox.convert import convert_csv_file, convert_directory, CodecOptions
+from timebox.cli import main
+import unittest
+import numpy as np
+import shutil
+import os
+import io
+import contextlib
+
+
+def write_csv(file_name: str, start: str, num_points: int, shuffle: bool = False):
+    dates = np.datetime64(start, 's') + np.arange(0, num_points) * np.timedelta64(1, 'm')
+    order = np.arange(0, num_points)
+    if shuffle:
+        order = order[::-1]
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    with open(file_name, 'w') as f:
+        f.write('time,price,volume\n')
+        for i in order:
+            f.write('{},{},{}\n'.format(dates[i], round(100 + i * 0.25, 2), i))
+    return
+
+
+class TestConvert(unittest.TestCase):
+    def setUp(self):
+        self.source_dir = 'test_convert_csv'
+        self.destination_dir = 'test_convert_npb'
+        write_csv(os.path.join(self.source_dir, 'a.csv'), '2018-01-01', 50)
+        write_csv(os.path.join(self.source_dir, 'nested', 'b.csv'), '2018-02-01', 30, shuffle=True)
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.source_dir, ignore_errors=True)
+        shutil.rmtree(self.destination_dir, ignore_errors=True)
+        return
+
+    def test_convert_csv_file_in_chunks(self):
+        destination = os.path.join(self.destination_dir, 'b.npb')
+        result = convert_csv_file(
+            os.path.join(self.source_dir, 'nested', 'b.csv'),
+            destination,
+            chunk_size=7,
+            codec_options=CodecOptions(use_compression=True, compression_mode='e', num_decimals_to_store=2)
+        )
+        self.assertEqual('converted', result.status)
+        self.assertEqual(30, result.num_rows)
+        tb = TimeBox(destination)
+        tb.read()
+        expected_dates = np.datetime64('2018-02-01', 's') + np.arange(0, 30) * np.timedelta64(1, 'm')
+        np.testing.assert_array_equal(expected_dates, tb._dates)
+        np.testing.assert_array_equal(np.arange(0, 30), tb._tags['volume'].data)
+        np.testing.assert_array_almost_equal(100 + np.arange(0, 30) * 0.25, tb._tags['price'].data)
+        self.assertTrue(tb._tags['price'].use_compression)
+        self.assertTrue(tb._tags['price'].floating_point_rounded)
+        return
+
+    def test_convert_directory_resumes(self):
+        report = convert_directory(self.source_dir, self.destination_dir, workers=2)
+        self.assertEqual(2, report.num_converted)
+        self.assertEqual(0, report.num_failed)
+        self.assertEqual(80, report.num_rows)
+        self.assertTrue(os.path.exists(os.path.join(self.destination_dir, 'a.npb')))
+        self.assertTrue(os.path.exists(os.path.join(self.destination_dir, 'nested', 'b.npb')))
+
+        report = convert_directory(self.source_dir, self.destination_dir, workers=2)
+        self.assertEqual(0, report.num_converted)
+        self.assertEqual(2, report.num_skipped)
+
+        report = convert_directory(self.source_dir, self.destination_dir, workers=2, overwrite=True)
+        self.assertEqual(2, report.num_converted)
+        return
+
+    def test_convert_directory_reports_failures(self):
+        with open(os.path.join(self.source_dir, 'bad.csv'), 'w') as f:
+            f.write('time,name\n2018-01-01,abc\n')
+        report = convert_directory(self.source_dir, self.destination_dir, workers=1)
+        self.assertEqual(2, report.num_converted)
+        self.assertEqual(1, report.num_failed)
+        failed = [r for r in report.results if r.status == 'failed'][0]
+        self.assertTrue(failed.source.endswith('bad.csv'))
+        self.assertIsNotNone(failed.error)
+        return
+
+    def test_cli_convert(self):
+        report_file = os.path.join(self.destination_dir, 'report.json')
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            exit_code = main(['convert', self.source_dir, self.destination_dir, '--workers', '1',
+                              '--compress', '--decimals', '2', '--report', report_file])
+        self.assertEqual(0, exit_code)
+        self.assertIn('Rows/s', output.getvalue())
+        self.assertTrue(os.path.exists(report_file))
+        tb = TimeBox(os.path.join(self.destination_dir, 'a.npb'))
+        tb.read()
+        self.assertTrue(tb._tags['volume'].use_compression)
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
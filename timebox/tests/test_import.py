@@ -0,0 +1,33 @@
+import unittest
+import subprocess
+import sys
+
+
+NUMPY_ONLY_MODULES = ['timebox.timebox', 'timebox.store', 'timebox.batch', 'timebox.writer', 'timebox.convert',
+                      'timebox.describe', 'timebox.instrumentation', 'timebox.cli', 'timebox.aggregate',
+                      'timebox.range_reader', 'timebox.block_statistics', 'timebox.resample',
+                      'timebox.rollup', 'timebox.join', 'timebox.lookup', 'timebox.where',
+                      'timebox.expression']
+
+
+class TestImport(unittest.TestCase):
+    def test_pandas_is_not_imported(self):
+        # pandas roughly triples the import time, it must only be imported by the pandas entry points
+        code = 'import sys\n{}\nprint(sorted([m for m in sys.modules if m.split(".")[0] == "pandas"])[:1])'.format(
+            '\n'.join(['import {}'.format(m) for m in NUMPY_ONLY_MODULES])
+        )
+        output = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+        self.assertEqual('[]', output.strip())
+        return
+
+    def test_pandas_entry_points(self):
+        code = 'import sys\nimport numpy as np\nfrom timebox.timebox import TimeBox\n' \
+               'tb = TimeBox.from_arrays(np.arange(0, 3), {"a": np.arange(0, 3)}, unit="s")\n' \
+               'df = tb.to_pandas()\nprint(TimeBox.from_pandas(df)._num_points, "pandas" in sys.modules)'
+        output = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+        self.assertEqual('3 True', output.strip())
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
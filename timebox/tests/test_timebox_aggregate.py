@@ -0,0 +1,178 @@
+from timebox.timebox import TimeBox
+from timebox.timebox_tag import TimeBoxTag
+from timebox.range_reader import RangeReader
+from timebox.block_statistics import compute_block_statistics, combine_statistics, combine_segments, \
+    block_date_offsets
+from timebox.footer import footer_num_bytes_from_trailer, TRAILER_STRUCT
+from timebox.instrumentation import StageCollector, DECODE_TAG
+from timebox.exceptions import AggregationFunctionError
+from timebox.tests.test_timebox_memory import example_large_time_box
+import unittest
+import numpy as np
+import os
+
+
+RANGES = [
+    (None, None),
+    ('2018-01-03', '2018-01-06T12:00:00.5'),  # starts and ends within blocks
+    ('2018-01-02T10:00:01', '2018-01-02T10:30'),  # within a single block
+    ('2017-06-01', '2017-12-31'),  # before the first point
+    ('2018-01-01T00:00:00.001', None)  # rounded up to the second point
+]
+
+
+class TestTimeBoxAggregate(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_aggregate.npb'
+        example_large_time_box(self.file_name).write()
+        self.expected = TimeBox(self.file_name)
+        self.expected.read()
+        return
+
+    def tearDown(self):
+        os.remove(self.file_name)
+        return
+
+    def assert_aggregates(self, result: dict, start, end):
+        dates = self.expected._dates
+        mask = np.ones(dates.size, dtype=bool)
+        if start is not None:
+            mask &= dates >= np.datetime64(start)
+        if end is not None:
+            mask &= dates <= np.datetime64(end)
+        for t in result:
+            values = self.expected._tags[t].data[mask]
+            self.assertEqual(values.size, result[t]['count'])
+            if values.size == 0:
+                self.assertIsNone(result[t]['min'])
+                self.assertIsNone(result[t]['first'])
+                self.assertEqual(0, result[t]['sum'])
+                continue
+            self.assertEqual(np.amin(values), result[t]['min'])
+            self.assertEqual(np.amax(values), result[t]['max'])
+            self.assertEqual(values[0], result[t]['first'])
+            self.assertEqual(values[-1], result[t]['last'])
+            self.assertAlmostEqual(float(np.sum(values, dtype=np.float64)), float(result[t]['sum']), places=6)
+            self.assertAlmostEqual(float(np.mean(values, dtype=np.float64)), float(result[t]['mean']), places=6)
+        return
+
+    def test_aggregate(self):
+        tb = TimeBox(self.file_name)
+        for start, end in RANGES:
+            self.assert_aggregates(tb.aggregate(sorted(self.expected._tags), start, end), start, end)
+
+        result = tb.aggregate(['m'], '2018-01-03', funcs=['count', 'last'])
+        self.assertEqual(['count', 'last'], sorted(result['m']))
+        with self.assertRaises(AggregationFunctionError):
+            tb.aggregate(['m'], funcs=['median'])
+        return
+
+    def test_aggregate_decodes_only_edges(self):
+        with RangeReader(self.file_name) as reader:
+            self.assertEqual(4096, reader.block_num_points)
+            first, stop = reader.index_range('2018-01-02', '2018-01-09')
+        with StageCollector() as collector:
+            TimeBox(self.file_name).aggregate(['m', 'rounded_m'], '2018-01-02', '2018-01-09')
+        totals = collector.totals(by_tag=True)
+        # the 'm' tags decode the points of the two partial blocks, not the whole range
+        for t in ['m', 'rounded_m']:
+            self.assertLess(totals[(DECODE_TAG, t)].num_bytes, (stop - first) * 8)
+        self.assertGreater(stop - first, 4096)
+
+        with StageCollector() as collector:
+            TimeBox(self.file_name).aggregate(['m'])
+        self.assertNotIn((DECODE_TAG, 'm'), collector.totals(by_tag=True))
+        return
+
+    def test_aggregate_without_block_statistics(self):
+        with open(self.file_name, 'rb') as f:
+            f.seek(-TRAILER_STRUCT.size, os.SEEK_END)
+            footer_num_bytes = footer_num_bytes_from_trailer(f.read())
+        with open(self.file_name, 'r+b') as f:
+            f.truncate(os.path.getsize(self.file_name) - footer_num_bytes)
+        tb = TimeBox(self.file_name)
+        for start, end in RANGES:
+            self.assert_aggregates(tb.aggregate(sorted(self.expected._tags), start, end), start, end)
+        return
+
+    def test_range_reader(self):
+        int_dates = self.expected._dates.astype(np.int64)
+        with RangeReader(self.file_name) as reader:
+            self.assertEqual('s', reader.dates_units)
+            for start, end in [(0, 10000), (4095, 4097), (5000, 9000), (9999, 10000), (3, 3)]:
+                np.testing.assert_array_equal(int_dates[start:end], reader.read_dates(start, end))
+                for t in self.expected._tags:
+                    np.testing.assert_array_equal(self.expected._tags[t].data[start:end],
+                                                  reader.read_tag(t, start, end))
+            for i in [0, 4095, 4096, 4097, 8191, 9999]:
+                self.assertEqual((i, i + 1), reader.index_range(self.expected._dates[i], self.expected._dates[i]))
+            self.assertEqual((0, 0), reader.index_range(end='2017-01-01'))
+            self.assertEqual((10000, 10000), reader.index_range(start='2019-01-01'))
+        return
+
+    def test_uniform_dates(self):
+        tb = TimeBox(self.file_name)
+        tb.read()
+        tb._date_differentials_stored = False
+        tb._start_date = np.datetime64('2018-01-01', 's')
+        tb._seconds_between_points = 60
+        tb.write()
+        self.expected = TimeBox(self.file_name)
+        self.expected.read()
+        for start, end in [('2018-01-01T00:00:30', '2018-01-02'), ('2018-01-03T10:00', None)]:
+            self.assert_aggregates(tb.aggregate(['e', 'raw'], start, end), start, end)
+        return
+
+
+class TestBlockStatistics(unittest.TestCase):
+    def test_compute_block_statistics(self):
+        values = np.array([np.nan, 2., -1., np.nan, np.nan, np.nan, 5., np.nan])
+        statistics = compute_block_statistics(values, 3)
+        np.testing.assert_array_equal([2, 0, 1], statistics['count'])
+        np.testing.assert_array_equal([-1., np.nan, 5.], statistics['min'])
+        np.testing.assert_array_equal([2., np.nan, 5.], statistics['first'])
+        np.testing.assert_array_equal([-1., np.nan, 5.], statistics['last'])
+        np.testing.assert_array_equal([1., 0., 5.], statistics['sum'])
+
+        combined = combine_statistics(statistics)
+        self.assertEqual(3, combined['count'])
+        self.assertEqual(2., combined['first'])
+        self.assertEqual(5., combined['max'])
+
+        integers = compute_block_statistics(np.array([3, 1, 2, 7], dtype=np.uint16), 3)
+        self.assertEqual(np.dtype('<u8'), integers.dtype['sum'])
+        np.testing.assert_array_equal([6, 7], integers['sum'])
+        np.testing.assert_array_equal([1, 7], integers['min'])
+
+        rounded = compute_block_statistics(np.array([125, -50], dtype=np.int64), 4, num_decimals=2)
+        self.assertEqual(-0.5, rounded['min'][0])
+        self.assertEqual(0.75, rounded['sum'][0])
+        return
+
+    def test_combine_segments(self):
+        values = np.array([np.nan, 2., -1., np.nan, np.nan, np.nan, 5., np.nan, 3.])
+        statistics = compute_block_statistics(values, 2)
+        combined = combine_segments(statistics, np.array([0, 2, 3]))
+        for i, (start, stop) in enumerate([(0, 2), (2, 3), (3, 5)]):
+            expected = combine_statistics(statistics[start:stop])
+            for name in ['count', 'min', 'max', 'first', 'last', 'sum']:
+                np.testing.assert_array_equal(expected[name], combined[name][i])
+        return
+
+    def test_block_date_offsets(self):
+        differentials = np.array([1, 2, 3, 4, 5, 6], dtype=np.uint8)
+        np.testing.assert_array_equal([0, 6, 21], block_date_offsets(differentials, 3))
+        np.testing.assert_array_equal([0, 3, 10], block_date_offsets(differentials[:5], 2))
+        np.testing.assert_array_equal([0], block_date_offsets(differentials[:0], 2))
+        return
+
+    def test_statistics_of_small_dtypes(self):
+        tag = TimeBoxTag('a', 1, 'i')
+        tag.data = np.array([-5, 100, 7], dtype=np.int8)
+        statistics = tag.block_statistics(2)
+        np.testing.assert_array_equal([95, 7], statistics['sum'])
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+from timebox.timebox import TimeBox
+from timebox.exceptions import DataShapeError, DataDoesNotMatchTagDefinitionError, \
+    TagIdentifierByteRepresentationError
+import unittest
+import numpy as np
+import os
+
+
+class TestTimeBoxArrays(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_arrays.npb'
+        return
+
+    def tearDown(self):
+        if os.path.exists(self.file_name):
+            os.remove(self.file_name)
+        return
+
+    def test_from_arrays_sorted_input_is_not_copied(self):
+        timestamps = np.arange(0, 5, dtype=np.int64) * 60 + 1514764800
+        values = np.arange(0, 5, dtype=np.float32)
+        tb = TimeBox.from_arrays(timestamps, {'a': values}, unit='s')
+        self.assertTrue(np.shares_memory(timestamps, tb._dates))
+        self.assertIs(values, tb._tags['a'].data)
+        self.assertTrue(tb._tag_names_are_strings)
+        self.assertEqual(np.datetime64('2018-01-01T00:00:00'), tb._start_date)
+        self.assertEqual(np.dtype('datetime64[s]'), tb._dates.dtype)
+        self.assertEqual(5, tb._num_points)
+        return
+
+    def test_from_arrays_sorts_unsorted_input(self):
+        timestamps = np.array(['2018-01-01T00:02', '2018-01-01T00:00', '2018-01-01T00:01'], dtype='datetime64[ms]')
+        tb = TimeBox.from_arrays(timestamps, {0: np.array([2, 0, 1], dtype=np.uint8)})
+        self.assertFalse(tb._tag_names_are_strings)
+        np.testing.assert_array_equal(np.sort(timestamps), tb._dates)
+        np.testing.assert_array_equal(np.array([0, 1, 2], dtype=np.uint8), tb._tags[0].data)
+        return
+
+    def test_from_arrays_errors(self):
+        timestamps = np.arange(0, 3, dtype=np.int64)
+        with self.assertRaises(DataShapeError):
+            TimeBox.from_arrays(timestamps, {'a': np.arange(0, 4)})
+        with self.assertRaises(DataDoesNotMatchTagDefinitionError):
+            TimeBox.from_arrays(timestamps, {'a': np.array(['x', 'y', 'z'])})
+        with self.assertRaises(TagIdentifierByteRepresentationError):
+            TimeBox.from_arrays(timestamps, {'a': np.arange(0, 3), 1: np.arange(0, 3)})
+        return
+
+    def test_write_and_to_arrays(self):
+        timestamps = 1514764800000 + np.arange(0, 10, dtype=np.int64) * 1500
+        data = {'a': np.arange(0, 10, dtype=np.int32), 'b': np.linspace(0, 1, 10)}
+        tb = TimeBox.from_arrays(timestamps, data, unit='ms')
+        tb.file_path = self.file_name
+        tb.write()
+
+        arrays = TimeBox(self.file_name).to_arrays()
+        self.assertEqual('ms', arrays.unit)
+        np.testing.assert_array_equal(timestamps, arrays.timestamps)
+        self.assertEqual(np.int64, arrays.timestamps.dtype)
+        np.testing.assert_array_equal(data['a'], arrays.data['a'])
+        np.testing.assert_array_equal(data['b'], arrays.data['b'])
+
+        arrays = TimeBox(self.file_name).to_arrays('us')
+        self.assertEqual('us', arrays.unit)
+        np.testing.assert_array_equal(timestamps * 1000, arrays.timestamps)
+        return
+
+    def test_write_sub_second_start(self):
+        # the file info holds whole seconds, the rest of the first date is kept in the footer
+        dates = np.array(['2018-01-01T00:00:00.5', '2018-01-01T00:00:01.0', '2018-01-01T00:00:01.7'],
+                         dtype='datetime64[ms]')
+        tb = TimeBox.from_arrays(dates, {'a': np.arange(0, 3, dtype=np.int32)})
+        tb.file_path = self.file_name
+        tb.write()
+
+        tb = TimeBox(self.file_name)
+        tb.read()
+        np.testing.assert_array_equal(dates, tb._dates)
+        info = TimeBox.info(self.file_name)
+        self.assertEqual(dates[0], info.start_date)
+        self.assertEqual(dates[-1], info.end_date)
+        np.testing.assert_array_equal(dates.astype(np.int64), TimeBox(self.file_name).to_arrays().timestamps)
+        result = TimeBox(self.file_name).where('a >= 0', start=dates[1])
+        np.testing.assert_array_equal(dates[1:].astype(np.int64), result.timestamps)
+
+        # the units of the differentials also divide the rest of the first date
+        dates = np.datetime64('1969-12-31T23:59:58.25', 'ms') + np.arange(0, 3) * np.timedelta64(1, 's')
+        tb = TimeBox.from_arrays(dates, {'a': np.arange(0, 3, dtype=np.int32)})
+        tb.file_path = self.file_name
+        tb.write()
+        tb = TimeBox(self.file_name)
+        tb.read()
+        np.testing.assert_array_equal(dates, tb._dates)
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+from timebox.timebox import TimeBox
+from timebox.timebox_tag import TimeBoxTag
+from timebox.cache import DecodedArrayCache, enable_cache, disable_cache, get_cache
+import unittest
+import numpy as np
+import os
+
+
+def example_time_box(file_name: str):
+    tb = TimeBox(file_name)
+    tb._tag_names_are_strings = True
+    tb._date_differentials_stored = True
+    tb._num_points = 4
+    tb._tags = {
+        'a': TimeBoxTag('a', 2, 'u'),
+        'b': TimeBoxTag('b', 8, 'f')
+    }
+    tb._tags['b'].use_compression = True
+    tb._tags['b']._compression_mode = 'e'
+    tb._dates = np.array(['2018-01-01T00:00', '2018-01-01T00:01', '2018-01-01T00:05', '2018-01-01T01:00'],
+                         dtype='datetime64[s]')
+    tb._tags['a'].data = np.array([1, 2, 3, 400], dtype=np.uint16)
+    tb._tags['b'].data = np.array([5.25, 0.75, 3.14, -8], dtype=np.float64)
+    return tb
+
+
+class TestDecodedArrayCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = DecodedArrayCache(max_bytes=64)
+        a = np.zeros(4, dtype=np.float64)
+        cache.put('a', a)
+        self.assertFalse(a.flags.writeable)
+        cache.put('b', np.zeros(4, dtype=np.float64))
+        self.assertIs(a, cache.get('a'))  # 'a' is now most recently used
+        cache.put('c', np.zeros(4, dtype=np.float64))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+
+        stats = cache.stats()
+        self.assertEqual(3, stats.hits)
+        self.assertEqual(1, stats.misses)
+        self.assertEqual(1, stats.evictions)
+        self.assertEqual(2, stats.num_entries)
+        self.assertEqual(64, stats.num_bytes)
+
+        # too large to ever fit
+        d = np.zeros(16, dtype=np.float64)
+        cache.put('d', d)
+        self.assertIsNone(cache.get('d'))
+        self.assertTrue(d.flags.writeable)
+        self.assertEqual(2, cache.stats().num_entries)
+
+        cache.clear()
+        self.assertEqual(0, cache.stats().num_entries)
+        self.assertEqual(0, cache.stats().hits)
+        return
+
+
+class TestTimeBoxCache(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_cache.npb'
+        example_time_box(self.file_name).write()
+        enable_cache(1024 * 1024)
+        return
+
+    def tearDown(self):
+        disable_cache()
+        os.remove(self.file_name)
+        return
+
+    def test_read_through_cache(self):
+        tb = TimeBox(self.file_name)
+        tb.read()
+        stats = get_cache().stats()
+        self.assertEqual(0, stats.hits)
+        self.assertEqual(3, stats.misses)
+        self.assertEqual(3, stats.num_entries)
+        self.assertFalse(tb._tags['b'].data.flags.writeable)
+
+        tb2 = TimeBox(self.file_name)
+        tb2.read()
+        self.assertEqual(3, get_cache().stats().hits)
+        self.assertIs(tb._tags['a'].data, tb2._tags['a'].data)
+        self.assertIs(tb._dates, tb2._dates)
+        np.testing.assert_array_equal(np.array([5.25, 0.75, 3.14, -8]), tb2._tags['b'].data)
+        with self.assertRaises(ValueError):
+            tb2._tags['a'].data[0] = 10
+
+        # re-writing the file invalidates the entries
+        tb2._tags['a'].data = np.array([9, 8, 7, 6], dtype=np.uint16)
+        tb2._tags['a']._encoded_data = None
+        tb2._date_differentials_stored = True
+        tb2.write()
+        tb3 = TimeBox(self.file_name)
+        tb3.read()
+        self.assertListEqual([9, 8, 7, 6], list(tb3._tags['a'].data))
+        np.testing.assert_array_equal(tb._dates, tb3._dates)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+from timebox.timebox import TimeBox
+from timebox.writer import CodecOptions
+from timebox.exceptions import DataDoesNotMatchTagDefinitionError
+import unittest
+import numpy as np
+import os
+
+
+class TestTimeBoxFromCsv(unittest.TestCase):
+    def setUp(self):
+        self.csv_file_name = 'test_from_csv.csv'
+        self.file_name = 'test_from_csv.npb'
+        return
+
+    def tearDown(self):
+        for file_name in [self.csv_file_name, self.file_name]:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+        return
+
+    def write_csv(self, lines: list):
+        with open(self.csv_file_name, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        return
+
+    def test_from_csv_in_chunks(self):
+        lines = ['price,time,volume']
+        for i in range(0, 25):
+            lines.append('{},2018-01-01T00:{:02d}:00,{}'.format(round(100 + i * 0.25, 2), i, i * 10))
+        self.write_csv(lines)
+        tb = TimeBox.from_csv(self.csv_file_name, self.file_name, index_col='time', chunk_size=4,
+                              codec_options=CodecOptions(True, 'e', 2))
+        self.assertEqual(self.file_name, tb.file_path)
+        tb.read()
+        expected_dates = np.datetime64('2018-01-01', 's') + np.arange(0, 25) * np.timedelta64(1, 'm')
+        np.testing.assert_array_equal(expected_dates, tb._dates)
+        self.assertEqual(np.int64, tb._tags['volume'].dtype)
+        np.testing.assert_array_equal(np.arange(0, 25) * 10, tb._tags['volume'].data)
+        np.testing.assert_array_almost_equal(100 + np.arange(0, 25) * 0.25, tb._tags['price'].data)
+        self.assertTrue(tb._tags['price'].floating_point_rounded)
+        self.assertTrue(tb._tags['volume'].use_compression)
+        return
+
+    def test_unsorted_rows_and_missing_values(self):
+        self.write_csv([
+            'time,value,count',
+            '2018-01-01 00:02:00,2.5,2',
+            '2018-01-01 00:00:00,,0',
+            '2018-01-01 00:01:00,1.5,1'
+        ])
+        TimeBox.from_csv(self.csv_file_name, self.file_name, chunk_size=2, dtypes={'count': np.uint8})
+        tb = TimeBox(self.file_name)
+        tb.read()
+        np.testing.assert_array_equal(
+            np.array(['2018-01-01T00:00', '2018-01-01T00:01', '2018-01-01T00:02'], dtype='datetime64[s]'),
+            tb._dates
+        )
+        np.testing.assert_array_equal(np.array([np.nan, 1.5, 2.5]), tb._tags['value'].data)
+        np.testing.assert_array_equal(np.array([0, 1, 2], dtype=np.uint8), tb._tags['count'].data)
+        return
+
+    def test_epoch_timestamps(self):
+        self.write_csv(['epoch,value', '1514764800,1', '1514764860,2', '1514764920,3'])
+        TimeBox.from_csv(self.csv_file_name, self.file_name, epoch_units='s')
+        tb = TimeBox(self.file_name)
+        tb.read()
+        self.assertEqual(np.datetime64('2018-01-01T00:00:00'), tb._dates[0])
+        self.assertEqual(np.datetime64('2018-01-01T00:02:00'), tb._dates[-1])
+        return
+
+    def test_sub_second_first_row(self):
+        self.write_csv(['time,value', '2018-01-01T00:00:00.822,1', '2018-01-01T00:00:01.5,2',
+                        '2018-01-01T00:00:03,3'])
+        TimeBox.from_csv(self.csv_file_name, self.file_name, chunk_size=2)
+        tb = TimeBox(self.file_name)
+        tb.read()
+        np.testing.assert_array_equal(
+            np.array(['2018-01-01T00:00:00.822', '2018-01-01T00:00:01.5', '2018-01-01T00:00:03'],
+                     dtype='datetime64[ms]'),
+            tb._dates
+        )
+        self.assertEqual(np.datetime64('2018-01-01T00:00:03'), TimeBox.info(self.file_name).end_date)
+        return
+
+    def test_non_numeric_column(self):
+        self.write_csv(['time,name', '2018-01-01,abc'])
+        with self.assertRaises(DataDoesNotMatchTagDefinitionError):
+            TimeBox.from_csv(self.csv_file_name, self.file_name)
+        self.assertFalse(os.path.exists(self.file_name))
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
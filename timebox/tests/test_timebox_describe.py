@@ -0,0 +1,85 @@
+from timebox.timebox import TimeBox
+from timebox.describe import codec_name, lossless_num_decimals, print_description
+from timebox.timebox_tag import TimeBoxTag
+from timebox.cli import main
+from timebox.tests.test_timebox_lazy import example_time_box
+from contextlib import redirect_stdout
+import unittest
+import numpy as np
+import io
+import os
+
+
+class TestTimeBoxDescribe(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_describe.npb'
+        example_time_box(self.file_name).write()
+        return
+
+    def tearDown(self):
+        os.remove(self.file_name)
+        return
+
+    def test_describe(self):
+        description = TimeBox(self.file_name).describe()
+        self.assertEqual(4, description.info.num_points)
+        self.assertEqual(3, description.dates_num_bytes)
+        self.assertEqual(['a', 'b', 'c'], [t.identifier for t in description.tags])
+        a, b, c = description.tags
+
+        self.assertEqual('raw', a.codec)
+        self.assertEqual(8, a.num_bytes)
+        self.assertEqual(2., a.bytes_per_point)
+        self.assertIsNone(a.num_decimals_to_store)
+        self.assertEqual(0., a.decode_seconds)
+        self.assertGreater(a.read_seconds, 0.)
+        self.assertEqual({'raw': 8, 'm': 8, 'e': 6}, a.alternatives)
+
+        self.assertEqual('round2+m', b.codec)
+        self.assertEqual(2, b.num_decimals_to_store)
+        self.assertEqual(-800, b.compression_reference_value)
+        self.assertEqual(np.dtype(np.uint16), b.compressed_dtype)
+        self.assertEqual(b.num_bytes, b.alternatives['round2+m'])
+        self.assertGreater(b.decode_seconds, 0.)
+        self.assertEqual(32, b.alternatives['raw'])
+
+        self.assertEqual('e', c.codec)
+        self.assertEqual(c.num_bytes, c.alternatives['e'])
+        self.assertEqual(-100, c.compression_reference_value)
+
+        self.assertEqual(dict(), TimeBox(self.file_name).describe(estimate_alternatives=False).tags[0].alternatives)
+        return
+
+    def test_codecs(self):
+        self.assertEqual('raw', codec_name(False))
+        self.assertEqual('m', codec_name(True))
+        self.assertEqual('round3+e', codec_name(True, 'e', 3))
+        self.assertEqual('round0', codec_name(False, None, 0))
+
+        tag = TimeBoxTag('a', 8, 'f')
+        self.assertEqual(0, lossless_num_decimals(tag, np.array([1., -2., 3e6])))
+        self.assertEqual(3, lossless_num_decimals(tag, np.array([1.125, 0.5, 7.])))
+        self.assertIsNone(lossless_num_decimals(tag, np.array([np.pi])))
+        self.assertIsNone(lossless_num_decimals(tag, np.array([1., np.nan])))
+        self.assertIsNone(lossless_num_decimals(tag, np.array([1e300])))
+        self.assertIsNone(lossless_num_decimals(TimeBoxTag('i', 8, 'i'), np.array([1, 2], dtype=np.int64)))
+        return
+
+    def test_print_and_cli(self):
+        stream = io.StringIO()
+        print_description(TimeBox(self.file_name).describe(), stream)
+        output = stream.getvalue()
+        self.assertIn('4 points, 3 tags', output)
+        self.assertIn('round2+m', output)
+        self.assertIn('vs stored', output)
+
+        stream = io.StringIO()
+        with redirect_stdout(stream):
+            self.assertEqual(0, main(['inspect', self.file_name, '--no-alternatives']))
+        self.assertIn('round2+m', stream.getvalue())
+        self.assertNotIn('vs stored', stream.getvalue())
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+from timebox.timebox import TimeBox
+from timebox.expression import parse_expression, eval_file, TagReference, Constant, Arithmetic, Negation, \
+    _num_scratch_buffers
+from timebox.writer import TimeBoxWriter
+from timebox.exceptions import ExpressionError
+from timebox.tests.test_timebox_memory import example_large_time_box
+import unittest
+import numpy as np
+import os
+
+
+class TestTimeBoxExpression(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_expression.npb'
+        self.tb = example_large_time_box(self.file_name)
+        self.tb.write()
+        self.data = dict([(t, self.tb._tags[t].data) for t in self.tb._tags])
+        return
+
+    def tearDown(self):
+        if os.path.exists(self.file_name):
+            os.remove(self.file_name)
+        return
+
+    def test_parse_expression(self):
+        self.assertEqual(Arithmetic('/', Arithmetic('+', TagReference('bid'), TagReference('ask')), Constant(2.)),
+                         parse_expression('(bid + ask) / 2'))
+        self.assertEqual(Arithmetic('-', Arithmetic('-', TagReference('a'), Arithmetic('*', TagReference('b'),
+                                                                                       Constant(3.))),
+                                    Negation(TagReference('c'))),
+                         parse_expression('a - b*3 - -c'))
+        self.assertEqual(Constant(1500.), parse_expression(' 1.5e3 '))
+        self.assertEqual(Arithmetic('*', TagReference('7'), Negation(TagReference('bid ask'))),
+                         parse_expression('"7" * -\'bid ask\''))
+        for expression in ['', 'a +', '(a + b', 'a + b)', 'a b', 'a ** 2', 'a > 1', '2 (a)', '* a']:
+            with self.assertRaises(ExpressionError):
+                parse_expression(expression)
+        self.assertEqual(0, _num_scratch_buffers(parse_expression('-(a + b) * 2 - c')))
+        self.assertEqual(1, _num_scratch_buffers(parse_expression('-(a + b) * 2 - c / 4')))
+        self.assertEqual(2, _num_scratch_buffers(parse_expression('a + (b * (c - d))')))
+        return
+
+    def test_eval(self):
+        data = self.data
+        expected = (data['rounded_m'] + data['m'].astype(np.float64)) / 2 - \
+            -data['e'].astype(np.float64) * (data['raw'].astype(np.float64) - 3)
+        for chunk_num_points in [777, 4096, 20000]:
+            result = eval_file(self.file_name, '(rounded_m + m) / 2 - -e * (raw - 3)',
+                               chunk_num_points=chunk_num_points)
+            self.assertEqual('s', result.unit)
+            np.testing.assert_array_equal(self.tb._dates.astype(np.int64), result.timestamps)
+            self.assertEqual(np.float64, result.data['(rounded_m + m) / 2 - -e * (raw - 3)'].dtype)
+            np.testing.assert_allclose(expected, result.data['(rounded_m + m) / 2 - -e * (raw - 3)'])
+
+        tb = TimeBox(self.file_name)
+        dates = self.tb._dates
+        result = tb.eval('rounded_e - e / 0', dates[5000], dates[8999])
+        np.testing.assert_array_equal(dates[5000:9000].astype(np.int64), result.timestamps)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.testing.assert_array_equal(data['rounded_e'][5000:9000] - data['e'][5000:9000] / 0.,
+                                          result.data['rounded_e - e / 0'])
+        result = tb.eval('2 * raw', start='2019-01-01')
+        self.assertEqual(0, result.timestamps.size)
+        self.assertEqual(0, result.data['2 * raw'].size)
+        with self.assertRaises(ExpressionError):
+            tb.eval('bid + ask')
+        return
+
+    def test_integer_tag_identifiers(self):
+        file_name = 'test_expression_integer_tags.npb'
+        timestamps = np.arange(1514764800, 1514764800 + 10000, dtype=np.int64)
+        data = {0: np.arange(10000, dtype=np.int32), 7: np.arange(10000, dtype=np.float64) * 0.5}
+        tb = TimeBox.from_arrays(timestamps, data, unit='s')
+        tb.file_path = file_name
+        tb.write(virtual_tags={'mid': '("0" + \'7\') / 2'})
+        try:
+            tb = TimeBox(file_name)
+            np.testing.assert_allclose((data[0] + data[7]) / 2, tb.eval('mid').data['mid'])
+            np.testing.assert_allclose(data[7] - data[0] * 3, tb.eval('"7" - "0" * 3').data['"7" - "0" * 3'])
+            for expression in ['price + 1', '"8" + 1']:
+                with self.assertRaisesRegex(ExpressionError, 'quoted numbers'):
+                    tb.eval(expression)
+        finally:
+            os.remove(file_name)
+        return
+
+    def test_virtual_tags(self):
+        self.tb.write(virtual_tags={'mid': '(rounded_m + rounded_e) / 2', 'spread': 'rounded_e - rounded_m',
+                                    'ask': 'mid + spread / 2'})
+        data = self.data
+        tb = TimeBox(self.file_name)
+        mid = (data['rounded_m'] + data['rounded_e']) / 2
+        np.testing.assert_allclose(mid, tb.eval('mid').data['mid'])
+        np.testing.assert_allclose(mid + (data['rounded_e'] - data['rounded_m']) / 2, tb.eval('ask').data['ask'])
+        np.testing.assert_allclose(mid * data['raw'], tb.eval('mid * raw').data['mid * raw'])
+
+        # the virtual tags are kept for the next writes
+        self.tb.write()
+        np.testing.assert_allclose(mid, tb.eval('mid').data['mid'])
+
+        # and when the file is read and written back
+        read_back = TimeBox(self.file_name)
+        read_back.read()
+        self.assertEqual(['ask', 'mid', 'spread'], sorted(read_back._virtual_tags))
+        read_back.write()
+        np.testing.assert_allclose(mid, tb.eval('mid').data['mid'])
+        self.tb.write(virtual_tags={})
+        with self.assertRaises(ExpressionError):
+            tb.eval('mid')
+
+        for virtual_tags in [{'mid': 'bid + ask'}, {'raw': 'e * 2'}, {'2x': 'e * 2'}, {'a': 'b', 'b': 'a + 1'},
+                             {'a': 'a'}, {'a': 'e +'}]:
+            with self.assertRaises(ExpressionError):
+                self.tb.write(virtual_tags=virtual_tags)
+            with self.assertRaises(ExpressionError):
+                TimeBoxWriter(self.file_name, [self.tb._tags[t].definition_copy() for t in self.tb._tags],
+                              virtual_tags=virtual_tags)
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
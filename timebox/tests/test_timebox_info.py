@@ -0,0 +1,119 @@
+from timebox.timebox import TimeBox
+from timebox.timebox_tag import TimeBoxTag
+from timebox.footer import footer_num_bytes_from_trailer, sections_from_bytes, footer_to_bytes, FooterSection, \
+    TRAILER_STRUCT
+from timebox.constants import TimeBoxFooterSectionTypes
+from timebox.exceptions import FooterFormatError
+import unittest
+import numpy as np
+import os
+
+
+def example_time_box(file_name: str):
+    tb = TimeBox(file_name)
+    tb._tag_names_are_strings = True
+    tb._date_differentials_stored = True
+    tb._num_points = 4
+    tb._tags = {
+        'a': TimeBoxTag('a', 2, 'u'),
+        'b': TimeBoxTag('b', 8, 'f')
+    }
+    tb._tags['b'].use_compression = True
+    tb._tags['b']._compression_mode = 'e'
+    tb._dates = np.array(['2018-01-01T00:00', '2018-01-01T00:01', '2018-01-01T00:05', '2018-01-01T01:00'],
+                         dtype='datetime64[s]')
+    tb._tags['a'].data = np.array([1, 2, 3, 400], dtype=np.uint16)
+    tb._tags['b'].data = np.array([5.25, 0.75, 3.14, -8], dtype=np.float64)
+    return tb
+
+
+class TestTimeBoxInfo(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_info.npb'
+        return
+
+    def tearDown(self):
+        os.remove(self.file_name)
+        return
+
+    def test_info(self):
+        example_time_box(self.file_name).write()
+        info = TimeBox.info(self.file_name)
+        self.assertEqual(self.file_name, info.file_path)
+        self.assertEqual(os.path.getsize(self.file_name), info.file_size)
+        self.assertEqual(4, info.num_points)
+        self.assertTrue(info.tag_names_are_strings)
+        self.assertTrue(info.date_differentials_stored)
+        self.assertEqual('m', info.date_units)
+        self.assertEqual(np.datetime64('2018-01-01T00:00', 's'), info.start_date)
+        self.assertEqual(np.datetime64('2018-01-01T01:00', 's'), info.end_date)
+        self.assertListEqual(['a', 'b'], list(info.tags))
+
+        self.assertEqual(np.uint16, info.tags['a'].dtype)
+        self.assertFalse(info.tags['a'].use_compression)
+        self.assertEqual(8, info.tags['a'].num_bytes)
+        self.assertEqual(np.float64, info.tags['b'].dtype)
+        self.assertTrue(info.tags['b'].use_compression)
+        self.assertEqual('e', info.tags['b'].compression_mode)
+        self.assertEqual(5.25, info.tags['b'].compression_reference_value)
+        self.assertEqual(3 * info.tags['b'].compressed_dtype.itemsize, info.tags['b'].num_bytes)
+
+        # reading the full file still works with the footer present
+        tb = TimeBox(self.file_name)
+        tb.read()
+        self.assertEqual(info.end_date, tb._dates[-1])
+        return
+
+    def test_info_without_footer(self):
+        example_time_box(self.file_name).write()
+        with open(self.file_name, 'rb') as f:
+            f.seek(-TRAILER_STRUCT.size, os.SEEK_END)
+            footer_num_bytes = footer_num_bytes_from_trailer(f.read())
+        self.assertGreater(footer_num_bytes, 0)
+        with open(self.file_name, 'r+b') as f:
+            f.truncate(os.path.getsize(self.file_name) - footer_num_bytes)
+        info = TimeBox.info(self.file_name)
+        self.assertEqual(np.datetime64('2018-01-01T01:00', 's'), info.end_date)
+        return
+
+    def test_info_uniform_dates(self):
+        tb = example_time_box(self.file_name)
+        tb._date_differentials_stored = False
+        tb._start_date = np.datetime64('2018-01-01', 's')
+        tb._seconds_between_points = 3600
+        tb.write()
+        info = TimeBox.info(self.file_name)
+        self.assertFalse(info.date_differentials_stored)
+        self.assertEqual(3600, info.seconds_between_points)
+        self.assertEqual(np.datetime64('2018-01-01T03:00', 's'), info.end_date)
+        return
+
+    def test_info_large_header(self):
+        tb = example_time_box(self.file_name)
+        for i in range(0, 200):
+            name = 'long_tag_name_{}'.format(i)
+            tb._tags[name] = TimeBoxTag(name, 1, 'u')
+            tb._tags[name].data = np.array([i, i, i, i], dtype=np.uint8)
+        tb.write()
+        info = TimeBox.info(self.file_name)
+        self.assertEqual(202, len(info.tags))
+        self.assertEqual(np.datetime64('2018-01-01T01:00', 's'), info.end_date)
+        return
+
+
+class TestFooter(unittest.TestCase):
+    def test_footer_round_trip(self):
+        sections = [
+            FooterSection(TimeBoxFooterSectionTypes.END_DATE, 0xFFFF, b'12345678'),
+            FooterSection(TimeBoxFooterSectionTypes.END_DATE, 3, b'')
+        ]
+        footer_bytes = footer_to_bytes(sections)
+        self.assertEqual(len(footer_bytes), footer_num_bytes_from_trailer(footer_bytes))
+        self.assertListEqual(sections, sections_from_bytes(footer_bytes))
+        self.assertEqual(0, footer_num_bytes_from_trailer(b'not a footer at all'))
+        with self.assertRaises(FooterFormatError):
+            sections_from_bytes(footer_bytes[1:])
+        return
+
+if __name__ == '__main__':
+    unittest.main()
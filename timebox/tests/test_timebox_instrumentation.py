@@ -0,0 +1,97 @@
+from timebox.timebox import TimeBox
+from timebox.writer import TimeBoxWriter
+from timebox.timebox_tag import TimeBoxTag
+from timebox.instrumentation import StageCollector, LoggingListener, add_listener, remove_listener, is_enabled, \
+    start_stage, LOCK_WAIT, READ_FILE_INFO, READ_DATES, DECODE_DATES, READ_TAG, DECODE_TAG, ENCODE_DATES, \
+    ENCODE_TAG, WRITE_FILE_INFO, WRITE_DATES, WRITE_TAG, WRITE_FOOTER
+from timebox.tests.test_timebox_lazy import example_time_box
+import unittest
+import logging
+import os
+
+
+class TestTimeBoxInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_instrumentation.npb'
+        return
+
+    def tearDown(self):
+        if os.path.exists(self.file_name):
+            os.remove(self.file_name)
+        return
+
+    def test_disabled(self):
+        self.assertFalse(is_enabled())
+        self.assertIsNone(start_stage())
+        example_time_box(self.file_name).write()
+        TimeBox(self.file_name).read()
+        return
+
+    def test_write_and_read_stages(self):
+        tb = example_time_box(self.file_name)
+        with StageCollector() as collector:
+            tb.write()
+        totals = collector.totals()
+        for stage in [LOCK_WAIT, ENCODE_DATES, WRITE_FILE_INFO, WRITE_DATES, WRITE_FOOTER]:
+            self.assertEqual(1, totals[stage].count)
+        self.assertEqual(3, totals[ENCODE_TAG].count)
+        self.assertEqual(3, totals[WRITE_TAG].count)
+        self.assertEqual(os.path.getsize(self.file_name), sum([totals[s].num_bytes for s in
+                                                               [WRITE_FILE_INFO, WRITE_DATES, WRITE_TAG,
+                                                                WRITE_FOOTER]]))
+        self.assertTrue(all([e.file_path == self.file_name for e in collector.events]))
+
+        with StageCollector() as collector:
+            TimeBox(self.file_name).read()
+        totals = collector.totals(by_tag=True)
+        self.assertEqual(1, totals[(LOCK_WAIT, None)].count)
+        self.assertEqual(1, totals[(READ_FILE_INFO, None)].count)
+        self.assertEqual(3 * 1, totals[(READ_DATES, None)].num_bytes)  # 3 one-byte differentials
+        self.assertEqual(4 * 8, totals[(DECODE_DATES, None)].num_bytes)
+        self.assertEqual(4 * 2, totals[(READ_TAG, 'a')].num_bytes)
+        self.assertEqual(4 * 8, totals[(DECODE_TAG, 'b')].num_bytes)
+        self.assertEqual(0, len([e for e in collector.events if e.seconds < 0]))
+        self.assertFalse(is_enabled())
+
+        # lazy tags report their stages when first accessed
+        tb = TimeBox(self.file_name)
+        tb.read(lazy=True)
+        with StageCollector() as collector:
+            self.assertEqual(-8, tb._tags['b'].data[3])
+        self.assertEqual([(READ_TAG, 'b'), (DECODE_TAG, 'b')], [(e.stage, e.tag) for e in collector.events])
+        self.assertEqual(self.file_name, collector.events[0].file_path)
+        return
+
+    def test_writer_stages(self):
+        tb = example_time_box(self.file_name)
+        tags = [tb._tags[t].definition_copy() for t in tb._tags]
+        with StageCollector() as collector:
+            with TimeBoxWriter(self.file_name, tags, date_units='s') as writer:
+                writer.append(tb._dates, dict([(t, tb._tags[t].data) for t in tb._tags]))
+        totals = collector.totals()
+        self.assertEqual(3, totals[WRITE_TAG].count)
+        self.assertEqual(os.path.getsize(self.file_name), sum([totals[s].num_bytes for s in
+                                                               [WRITE_FILE_INFO, WRITE_DATES, WRITE_TAG,
+                                                                WRITE_FOOTER]]))
+        return
+
+    def test_listeners(self):
+        events = []
+        add_listener(events.append)
+        try:
+            with self.assertLogs('timebox', level='DEBUG') as logs:
+                listener = LoggingListener()
+                add_listener(listener)
+                example_time_box(self.file_name).write()
+                remove_listener(listener)
+        finally:
+            remove_listener(events.append)
+        self.assertFalse(is_enabled())
+        self.assertEqual(len(events), len(logs.records))
+        self.assertTrue(any(['write_tag {} tag a'.format(self.file_name) in m for m in logs.output]))
+        self.assertEqual(logging.DEBUG, logs.records[0].levelno)
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+from timebox.timebox import TimeBox
+from timebox.join import asof_join, iter_asof_join
+from timebox.exceptions import JoinError
+from timebox.tests.test_timebox_memory import example_large_time_box
+import unittest
+import numpy as np
+import pandas as pd
+import os
+
+
+class TestTimeBoxJoin(unittest.TestCase):
+    def setUp(self):
+        self.left_file_name = 'test_join_left.npb'
+        self.right_file_name = 'test_join_right.npb'
+        example_large_time_box(self.left_file_name).write()
+        self.left = TimeBox(self.left_file_name)
+        self.left.read()
+
+        random_state = np.random.RandomState(11)
+        num_points = 15000
+        # millisecond dates with repeated dates, starting after the first left points on a whole
+        # second as the start date is stored in seconds
+        differences = random_state.randint(0, 60000, num_points)
+        differences[0] = 0
+        differences[100:110] = 0
+        dates = np.datetime64('2018-01-01T01:00:00', 'ms') + np.cumsum(differences).astype('timedelta64[ms]')
+        bid = np.round(100. + np.cumsum(random_state.normal(0., 0.1, num_points)), 2)
+        bid[random_state.uniform(0., 1., num_points) < 0.1] = np.nan
+        self.right = TimeBox.from_arrays(dates, {
+            'bid': bid,
+            'size': random_state.randint(1, 500, num_points).astype(np.int32)
+        })
+        self.right.file_path = self.right_file_name
+        self.right.write()
+        return
+
+    def tearDown(self):
+        for file_name in [self.left_file_name, self.right_file_name]:
+            os.remove(file_name)
+        return
+
+    def expected_join(self, tolerance=None, start=None, end=None) -> pd.DataFrame:
+        left = pd.DataFrame({'e': self.left._tags['e'].data}, index=self.left._dates.astype('datetime64[ns]'))
+        if start is not None:
+            left = left[left.index >= pd.Timestamp(start)]
+        if end is not None:
+            left = left[left.index <= pd.Timestamp(end)]
+        right = pd.DataFrame({'bid': self.right._tags['bid'].data, 'size': self.right._tags['size'].data},
+                             index=self.right._dates.astype('datetime64[ns]'))
+        return pd.merge_asof(left, right, left_index=True, right_index=True,
+                             tolerance=None if tolerance is None else pd.Timedelta(tolerance))
+
+    def assert_join(self, result, expected: pd.DataFrame):
+        self.assertEqual('ms', result.unit)
+        np.testing.assert_array_equal(expected.index.values.astype('datetime64[ms]').astype(np.int64),
+                                      result.timestamps)
+        for t in ['e', 'bid', 'size']:
+            np.testing.assert_array_equal(expected[t].values, result.data[t])
+        return
+
+    def test_asof_join(self):
+        for chunk_num_points in [1000000, 777, 1]:
+            for tolerance in [None, '2min']:
+                result = asof_join(self.left_file_name, self.right_file_name, ['bid', 'size'], tolerance,
+                                   left_tags=['e'], chunk_num_points=chunk_num_points)
+                self.assertEqual(np.float64, result.data['size'].dtype)
+                self.assert_join(result, self.expected_join(tolerance))
+
+        start, end = '2018-01-03T10:00', '2018-01-04T12:00'
+        self.assert_join(self.left.asof_join(self.right_file_name, ['bid', 'size'], np.timedelta64(90, 's'),
+                                             left_tags=['e'], start=start, end=end),
+                         self.expected_join('90s', start, end))
+        return
+
+    def test_fill_value(self):
+        result = TimeBox(self.left_file_name).asof_join(self.right_file_name, ['size'], fill_value=-1)
+        self.assertEqual(np.int32, result.data['size'].dtype)
+        expected = self.expected_join()['size'].fillna(-1).values
+        np.testing.assert_array_equal(expected, result.data['size'])
+        self.assertEqual(sorted(self.left._tags) + ['size'], sorted(result.data))
+        return
+
+    def test_streams_chunks(self):
+        chunks = list(iter_asof_join(self.left_file_name, self.right_file_name, ['bid'], left_tags=['e'],
+                                     chunk_num_points=4000))
+        self.assertEqual([4000, 4000, 2000], [c.timestamps.size for c in chunks])
+        empty = asof_join(self.left_file_name, self.right_file_name, ['bid'], start='2019-01-01')
+        self.assertEqual(0, empty.timestamps.size)
+        self.assertEqual(0, empty.data['bid'].size)
+        with self.assertRaises(JoinError):
+            asof_join(self.left_file_name, self.left_file_name, ['e'])
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+from timebox.timebox import TimeBox
+from timebox.timebox_tag import TimeBoxTag
+from timebox.cache import enable_cache, disable_cache, get_cache
+import unittest
+import numpy as np
+import os
+
+
+def example_time_box(file_name: str):
+    tb = TimeBox(file_name)
+    tb._tag_names_are_strings = True
+    tb._date_differentials_stored = True
+    tb._num_points = 4
+    tb._tags = {
+        'a': TimeBoxTag('a', 2, 'u'),
+        'b': TimeBoxTag('b', 8, 'f'),
+        'c': TimeBoxTag('c', 4, 'i')
+    }
+    tb._tags['b'].use_compression = True
+    tb._tags['b'].floating_point_rounded = True
+    tb._tags['b'].num_decimals_to_store = 2
+    tb._tags['c'].use_compression = True
+    tb._tags['c']._compression_mode = 'e'
+    tb._dates = np.array(['2018-01-01T00:00', '2018-01-01T00:01', '2018-01-01T00:05', '2018-01-01T01:00'],
+                         dtype='datetime64[s]')
+    tb._tags['a'].data = np.array([1, 2, 3, 400], dtype=np.uint16)
+    tb._tags['b'].data = np.array([5.25, 0.75, 3.14, -8], dtype=np.float64)
+    tb._tags['c'].data = np.array([-100, 0, 100000, 7], dtype=np.int32)
+    return tb
+
+
+class TestTimeBoxLazyRead(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_lazy.npb'
+        self.tb = example_time_box(self.file_name)
+        self.tb.write()
+        return
+
+    def tearDown(self):
+        disable_cache()
+        os.remove(self.file_name)
+        return
+
+    def test_lazy_read(self):
+        tb = TimeBox(self.file_name)
+        tb.read(lazy=True)
+        self.assertEqual(4, tb._dates.size)
+        for t in tb._tags:
+            self.assertIsNone(tb._tags[t]._data)
+            self.assertIsNone(tb._tags[t]._encoded_data)
+
+        np.testing.assert_array_equal(self.tb._tags['c'].data, tb._tags['c'].data)
+        self.assertIsNone(tb._tags['a']._data)
+        np.testing.assert_array_equal(self.tb._tags['a'].data, tb._tags['a'].data)
+        np.testing.assert_array_equal(self.tb._tags['b'].data, tb._tags['b'].data)
+        self.assertIsNone(tb._tags['b']._lazy_source)
+        return
+
+    def test_lazy_read_keeps_snapshot(self):
+        tb = TimeBox(self.file_name)
+        tb.read(lazy=True)
+
+        # replace the file contents after the lazy read
+        tb_new = example_time_box(self.file_name)
+        tb_new._tags['a'].data = np.array([9, 9, 9, 9], dtype=np.uint16)
+        tb_new._tags['c'].data = np.array([1, 2, 3, 4], dtype=np.int32)
+        tb_new.write()
+
+        self.assertListEqual([1, 2, 3, 400], list(tb._tags['a'].data))
+        self.assertListEqual([-100, 0, 100000, 7], list(tb._tags['c'].data))
+
+        tb_reread = TimeBox(self.file_name)
+        tb_reread.read(lazy=True)
+        self.assertListEqual([9, 9, 9, 9], list(tb_reread._tags['a'].data))
+        return
+
+    def test_lazy_read_through_cache(self):
+        enable_cache()
+        tb = TimeBox(self.file_name)
+        tb.read(lazy=True)
+        self.assertEqual(1, get_cache().stats().num_entries)  # only the dates
+        tb._tags['a'].data
+        self.assertEqual(2, get_cache().stats().num_entries)
+
+        tb2 = TimeBox(self.file_name)
+        tb2.read(lazy=True)
+        self.assertIs(tb._tags['a'].data, tb2._tags['a']._data)
+        self.assertIsNone(tb2._tags['b']._data)
+        return
+
+    def test_write_after_lazy_read(self):
+        tb = TimeBox(self.file_name)
+        tb.read(lazy=True)
+        tb.write()
+        tb2 = TimeBox(self.file_name)
+        tb2.read()
+        for t in self.tb._tags:
+            np.testing.assert_array_equal(self.tb._tags[t].data, tb2._tags[t].data)
+        self.assertFalse(os.path.exists(tb._temporary_file_name()))
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+from timebox.timebox import TimeBox
+from timebox.footer import footer_num_bytes_from_trailer, TRAILER_STRUCT
+from timebox.instrumentation import StageCollector, DECODE_TAG
+from timebox.tests.test_timebox_memory import example_large_time_box
+import unittest
+import numpy as np
+import os
+
+
+class TestTimeBoxLookup(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_lookup.npb'
+        example_large_time_box(self.file_name).write()
+        self.expected = TimeBox(self.file_name)
+        self.expected.read()
+        return
+
+    def tearDown(self):
+        os.remove(self.file_name)
+        return
+
+    def assert_points(self, result, first: int, stop: int):
+        self.assertEqual('s', result.unit)
+        np.testing.assert_array_equal(self.expected._dates[first:stop].astype(np.int64), result.timestamps)
+        for t in result.data:
+            np.testing.assert_array_equal(self.expected._tags[t].data[first:stop], result.data[t])
+        return
+
+    def test_value_at(self):
+        tb = TimeBox(self.file_name)
+        dates = self.expected._dates
+        for i in [0, 1, 4095, 4096, 5000, 9998, 9999]:
+            self.assert_points(tb.value_at(dates[i]), i, i + 1)
+            self.assert_points(tb.value_at(dates[i] + np.timedelta64(500, 'ms'), ['e', 'rounded_e']), i, i + 1)
+        self.assert_points(tb.value_at('2019-01-01'), 9999, 10000)
+        with StageCollector() as collector:
+            self.assert_points(tb.value_at(dates[6000], ['e', 'rounded_e']), 6000, 6001)
+        totals = collector.totals(by_tag=True)
+        # decoded from the checkpoint at point 4096
+        self.assertEqual((6001 - 4096) * 4, totals[(DECODE_TAG, 'e')].num_bytes)
+        self.assertEqual((6001 - 4096) * 8, totals[(DECODE_TAG, 'rounded_e')].num_bytes)
+        result = tb.value_at('2017-12-31', ['e'])
+        self.assertEqual(0, result.timestamps.size)
+        self.assertEqual(0, result.data['e'].size)
+        return
+
+    def test_tail(self):
+        tb = TimeBox(self.file_name)
+        for n in [1, 10, 4097, 10000]:
+            self.assert_points(tb.tail(n), 10000 - n, 10000)
+        self.assert_points(tb.tail(20000, ['m']), 0, 10000)
+        self.assertEqual(0, tb.tail(0).timestamps.size)
+
+        with StageCollector() as collector:
+            self.assert_points(tb.tail(10, ['e', 'rounded_e']), 9990, 10000)
+        totals = collector.totals(by_tag=True)
+        for t in ['e', 'rounded_e']:
+            self.assertEqual(10 * 8 if t == 'rounded_e' else 10 * 4, totals[(DECODE_TAG, t)].num_bytes)
+        return
+
+    def test_without_last_values(self):
+        with open(self.file_name, 'rb') as f:
+            f.seek(-TRAILER_STRUCT.size, os.SEEK_END)
+            footer_num_bytes = footer_num_bytes_from_trailer(f.read())
+        with open(self.file_name, 'r+b') as f:
+            f.truncate(os.path.getsize(self.file_name) - footer_num_bytes)
+        tb = TimeBox(self.file_name)
+        self.assert_points(tb.tail(5), 9995, 10000)
+        self.assert_points(tb.value_at(self.expected._dates[7000]), 7000, 7001)
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
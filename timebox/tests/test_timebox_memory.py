@@ -0,0 +1,138 @@
+from timebox.timebox import TimeBox
+from timebox.timebox_tag import TimeBoxTag
+from timebox.instrumentation import StageCollector, READ_DATES, READ_TAG
+from timebox.exceptions import MemoryBudgetExceededError
+import unittest
+import numpy as np
+import os
+
+
+NUM_POINTS = 10000
+
+
+def example_large_time_box(file_name: str):
+    random_state = np.random.RandomState(7)
+    tb = TimeBox(file_name)
+    tb._tag_names_are_strings = True
+    tb._date_differentials_stored = True
+    tb._num_points = NUM_POINTS
+    tb._tags = {
+        'raw': TimeBoxTag('raw', 2, 'u'),
+        'rounded_m': TimeBoxTag('rounded_m', 8, 'f'),
+        'e': TimeBoxTag('e', 4, 'i'),
+        'rounded_e': TimeBoxTag('rounded_e', 8, 'f'),
+        'm': TimeBoxTag('m', 8, 'i')
+    }
+    for t in ['rounded_m', 'e', 'rounded_e', 'm']:
+        tb._tags[t].use_compression = True
+    for t in ['e', 'rounded_e']:
+        tb._tags[t]._compression_mode = 'e'
+    for t in ['rounded_m', 'rounded_e']:
+        tb._tags[t].floating_point_rounded = True
+        tb._tags[t].num_decimals_to_store = 2
+
+    tb._dates = np.datetime64('2018-01-01T00:00:00', 's') + \
+        np.cumsum(random_state.randint(1, 120, NUM_POINTS)).astype('timedelta64[s]')
+    tb._tags['raw'].data = random_state.randint(0, 60000, NUM_POINTS).astype(np.uint16)
+    tb._tags['rounded_m'].data = np.round(random_state.uniform(-50., 50., NUM_POINTS), 2)
+    tb._tags['e'].data = np.cumsum(random_state.randint(-1000, 1000, NUM_POINTS)).astype(np.int32)
+    tb._tags['rounded_e'].data = np.round(100. + np.cumsum(random_state.normal(0., 0.5, NUM_POINTS)), 2)
+    tb._tags['m'].data = random_state.randint(10 ** 12, 10 ** 12 + 10 ** 6, NUM_POINTS).astype(np.int64)
+    return tb
+
+
+class TestTimeBoxMemory(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_memory.npb'
+        self.tb = example_large_time_box(self.file_name)
+        return
+
+    def tearDown(self):
+        for file_name in [self.file_name, 'test_memory_chunked.npb']:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+        return
+
+    def test_chunked_read(self):
+        self.tb.write()
+        expected = TimeBox(self.file_name)
+        expected.read()
+
+        # decoded arrays take 38 bytes per point, leave room for about 2000 points of encoded data
+        max_memory = NUM_POINTS * 38 + 2000 * 8
+        tb = TimeBox(self.file_name)
+        with StageCollector() as collector:
+            tb.read(max_memory=max_memory)
+        totals = collector.totals(by_tag=True)
+        self.assertGreater(totals[(READ_DATES, None)].count, 1)
+        self.assertEqual(1, totals[(READ_TAG, 'raw')].count)
+        for t in ['rounded_m', 'e', 'rounded_e', 'm']:
+            self.assertGreater(totals[(READ_TAG, t)].count, 1)
+        self.assertIsNone(tb._date_differentials)
+
+        np.testing.assert_array_equal(expected._dates, tb._dates)
+        for t in expected._tags:
+            np.testing.assert_array_equal(expected._tags[t].data, tb._tags[t].data)
+            np.testing.assert_array_equal(self.tb._tags[t].data, tb._tags[t].data)
+
+        dates = TimeBox(self.file_name)
+        dates.read(lazy=True, dates_units='ms', max_memory=NUM_POINTS * 8 + 1024 * 2)
+        np.testing.assert_array_equal(expected._dates.astype('datetime64[ms]'), dates._dates)
+        np.testing.assert_array_equal(expected._tags['e'].data, dates._tags['e'].data)
+
+        # a budget that fits the whole file reads it in one go
+        tb = TimeBox(self.file_name)
+        tb.read(max_memory=1 << 30)
+        self.assertEqual(NUM_POINTS - 1, tb._date_differentials.size)
+        return
+
+    def test_read_over_budget(self):
+        self.tb.write()
+        with self.assertRaises(MemoryBudgetExceededError):
+            TimeBox(self.file_name).read(max_memory=NUM_POINTS * 38 - 1)
+        with self.assertRaises(MemoryBudgetExceededError):
+            TimeBox(self.file_name).read(max_memory=NUM_POINTS * 38 + 100)
+        with self.assertRaises(MemoryError):
+            TimeBox(self.file_name).read(lazy=True, max_memory=NUM_POINTS)
+        return
+
+    def test_chunked_write(self):
+        self.tb.write()
+        self.tb.file_path = 'test_memory_chunked.npb'
+        self.assertEqual(NUM_POINTS, self.tb._write_chunk_num_points(NUM_POINTS * 76))
+        self.assertEqual(2500, self.tb._write_chunk_num_points(200000))
+        self.tb.write(max_memory=200000)
+        with open(self.file_name, 'rb') as f:
+            expected_bytes = f.read()
+        with open(self.tb.file_path, 'rb') as f:
+            self.assertEqual(expected_bytes, f.read())
+
+        with self.assertRaises(MemoryBudgetExceededError):
+            self.tb.write(max_memory=1000)
+
+        # a budget that fits the whole write encodes it at once
+        self.tb.write(max_memory=1 << 30)
+        with open(self.tb.file_path, 'rb') as f:
+            self.assertEqual(expected_bytes, f.read())
+
+        # uniform dates are stored as uniform dates in chunks too
+        self.tb._date_differentials_stored = False
+        self.tb._start_date = np.datetime64('2018-01-01', 's')
+        self.tb._seconds_between_points = 60
+        self.tb.file_path = self.file_name
+        self.tb.write(rollups=['1h'])
+        with open(self.file_name, 'rb') as f:
+            expected_bytes = f.read()
+        self.tb.file_path = 'test_memory_chunked.npb'
+        self.tb.write(max_memory=200000)
+        with open(self.tb.file_path, 'rb') as f:
+            self.assertEqual(expected_bytes, f.read())
+        tb = TimeBox(self.tb.file_path)
+        tb.read()
+        self.assertFalse(tb._date_differentials_stored)
+        self.assertEqual(60, tb._seconds_between_points)
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -62,5 +62,50 @@ class TestTimeBoxPandas(unittest.TestCase):
         os.remove(file_name)
         return
 
+    def test_from_pandas_index_types(self):
+        df = pd.DataFrame(
+            {'value': np.array([2, 0, 1], dtype=np.int16)},
+            index=['2018-01-01 00:02', '2018-01-01 00:00', '2018-01-01 00:01']
+        )
+        tb = TimeBox.from_pandas(df)
+        np.testing.assert_array_equal(np.array([0, 1, 2], dtype=np.int16), tb._tags['value'].data)
+        self.assertEqual(np.datetime64('2018-01-01T00:00'), tb._dates[0])
+
+        df.index = pd.to_datetime(df.index).tz_localize('US/Eastern')
+        tb = TimeBox.from_pandas(df)
+        self.assertEqual(np.datetime64('2018-01-01T05:00'), tb._dates[0])
+
+        df2 = tb.to_pandas()
+        self.assertEqual('DateTimes', df2.index.name)
+        np.testing.assert_array_equal(np.array([0, 1, 2], dtype=np.int16), df2['value'].values)
+        return
+
+    def test_to_pandas_blocks(self):
+        file_name = 'to_pandas_blocks.npb'
+        timestamps = 1514764800000000000 + np.arange(0, 6, dtype=np.int64) * 1001
+        tb = TimeBox.from_arrays(timestamps, {
+            'a': np.arange(0, 6, dtype=np.float64),
+            'b': np.arange(0, 6, dtype=np.int32),
+            'c': np.linspace(0, 1, 6),
+            'd': np.arange(10, 16, dtype=np.int32)
+        })
+        tb._tags['c'].use_compression = True
+        tb._tags['d'].use_compression = True
+        tb._tags['d']._compression_mode = 'e'
+        tb.file_path = file_name
+        tb.write()
+
+        df = TimeBox(file_name).to_pandas()
+        os.remove(file_name)
+        self.assertListEqual(['a', 'b', 'c', 'd'], list(df.columns))
+        np.testing.assert_array_equal(timestamps, df.index.values.view(np.int64))
+        for t in tb._tags:
+            np.testing.assert_array_equal(tb._tags[t].data, df[t].values)
+            self.assertEqual(tb._tags[t].dtype, df[t].dtype)
+        # one (columns, points) block per dtype
+        self.assertListEqual([(2, 6), (2, 6)], [b.values.shape for b in df._data.blocks])
+        return
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,105 @@
+from timebox.timebox import TimeBox
+from timebox.timebox_tag import TimeBoxTag
+from timebox.exceptions import *
+from timebox.utils.exceptions import DateUnitsError
+import unittest
+import numpy as np
+import os
+
+
+def example_time_box(file_name: str):
+    tb = TimeBox(file_name)
+    tb._tag_names_are_strings = False
+    tb._date_differentials_stored = True
+    tb._num_points = 4
+    tb._tags = {
+        0: TimeBoxTag(0, 2, 'u'),
+        1: TimeBoxTag(1, 4, 'i'),
+        2: TimeBoxTag(2, 8, 'f')
+    }
+    tb._tags[1].use_compression = True
+    tb._tags[1]._compression_mode = 'e'
+    tb._tags[2].use_compression = True
+    tb._tags[2].floating_point_rounded = True
+    tb._tags[2].num_decimals_to_store = 2
+    tb._dates = np.array(['2018-01-01T00:00', '2018-01-01T00:01', '2018-01-01T00:05', '2018-01-01T01:00'],
+                         dtype='datetime64[s]')
+
+    tb._tags[0].data = np.array([1, 2, 3, 400], dtype=np.uint16)
+    tb._tags[1].data = np.array([-4, -2, 0, 2000], dtype=np.int32)
+    tb._tags[2].data = np.array([5.25, 0.75, 3.14, -8], dtype=np.float64)
+    return tb
+
+
+class TestTimeBoxReadInto(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_read_into.npb'
+        self.tb = example_time_box(self.file_name)
+        self.expected = dict([(t, self.tb._tags[t].data.copy()) for t in self.tb._tags])
+        self.tb.write()
+        return
+
+    def tearDown(self):
+        os.remove(self.file_name)
+        return
+
+    def test_read_into_buffers(self):
+        buffers = {
+            0: np.zeros(4, dtype=np.uint16),
+            1: np.zeros(4, dtype=np.int32),
+            2: np.zeros(4, dtype=np.float64)
+        }
+        dates = np.zeros(4, dtype='datetime64[ms]')
+        tb = TimeBox(self.file_name)
+        tb.read_into(buffers, dates_out=dates)
+        for t in buffers:
+            self.assertIs(buffers[t], tb._tags[t].data)
+            np.testing.assert_array_equal(self.expected[t], buffers[t])
+        self.assertIs(dates, tb._dates)
+        np.testing.assert_array_equal(self.tb._dates.astype('datetime64[ms]'), dates)
+
+        # re-use the buffers on a second read
+        buffers[2].fill(0)
+        tb = TimeBox(self.file_name)
+        tb.read_into(buffers, dates_out=dates)
+        np.testing.assert_array_equal(self.expected[2], buffers[2])
+        return
+
+    def test_read_into_partial_buffers(self):
+        buffer = np.zeros(4, dtype=np.int32)
+        tb = TimeBox(self.file_name)
+        tb.read_into({1: buffer})
+        self.assertIs(buffer, tb._tags[1].data)
+        np.testing.assert_array_equal(self.expected[0], tb._tags[0].data)
+        np.testing.assert_array_equal(self.expected[2], tb._tags[2].data)
+        self.assertEqual(np.dtype('datetime64[s]'), tb._dates.dtype)
+        return
+
+    def test_read_into_errors(self):
+        tb = TimeBox(self.file_name)
+        with self.assertRaises(DataDoesNotMatchTagDefinitionError):
+            tb.read_into({0: np.zeros(4, dtype=np.float64)})
+        with self.assertRaises(DataShapeError):
+            tb.read_into({0: np.zeros(5, dtype=np.uint16)})
+        with self.assertRaises(DataDoesNotMatchTagDefinitionError):
+            tb.read_into({'missing': np.zeros(4, dtype=np.uint16)})
+        with self.assertRaises(DateUnitsError):
+            tb.read_into({}, dates_out=np.zeros(4, dtype='datetime64[h]'))
+        return
+
+    def test_read_into_uniform_dates(self):
+        tb = example_time_box(self.file_name)
+        tb._date_differentials_stored = False
+        tb._start_date = np.datetime64('2018-01-01', 's')
+        tb._seconds_between_points = 60
+        tb.write()
+
+        dates = np.zeros(4, dtype='datetime64[s]')
+        tb_read = TimeBox(self.file_name)
+        tb_read.read_into({}, dates_out=dates)
+        self.assertEqual(np.datetime64('2018-01-01T00:00', 's'), dates[0])
+        self.assertEqual(np.datetime64('2018-01-01T00:03', 's'), dates[3])
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+from timebox.timebox import TimeBox
+from timebox.timebox_tag import TimeBoxTag
+from timebox.batch import read_many
+from timebox.range_reader import RangeReader
+from timebox.instrumentation import StageCollector, DECODE_TAG
+from timebox.exceptions import DataDoesNotMatchTagDefinitionError
+from timebox.tests.test_timebox_memory import example_large_time_box
+from unittest import mock
+import unittest
+import numpy as np
+import os
+
+
+def example_time_box(file_name: str, start: str, num_points: int):
+    tb = TimeBox(file_name)
+    tb._tag_names_are_strings = True
+    tb._date_differentials_stored = True
+    tb._num_points = num_points
+    tb._tags = {
+        'price': TimeBoxTag('price', 8, 'f'),
+        'volume': TimeBoxTag('volume', 4, 'u'),
+        'trades': TimeBoxTag('trades', 4, 'i')
+    }
+    tb._tags['price'].use_compression = True
+    tb._tags['price'].floating_point_rounded = True
+    tb._tags['price'].num_decimals_to_store = 2
+    tb._tags['trades'].use_compression = True
+    tb._tags['trades']._compression_mode = 'e'
+    tb._dates = np.datetime64(start, 's') + np.arange(0, num_points) * np.timedelta64(1, 'h')
+    offset = int((np.datetime64(start, 'h') - np.datetime64('2018-01-01', 'h')).astype(np.int64))
+    tb._tags['price'].data = np.round(100 + (offset + np.arange(0, num_points)) * 0.25, 2)
+    tb._tags['volume'].data = (offset + np.arange(0, num_points)).astype(np.uint32)
+    tb._tags['trades'].data = ((offset + np.arange(0, num_points)) * 3).astype(np.int32)
+    return tb
+
+
+class TestReadMany(unittest.TestCase):
+    def setUp(self):
+        self.file_names = ['test_read_many_{}.npb'.format(i) for i in range(0, 3)]
+        # written out of order, 24 hourly points per file
+        for file_name, start in zip(self.file_names, ['2018-01-03', '2018-01-01', '2018-01-02']):
+            example_time_box(file_name, start, 24).write()
+        return
+
+    def tearDown(self):
+        for file_name in self.file_names:
+            os.remove(file_name)
+        return
+
+    def test_read_all(self):
+        tb = read_many(self.file_names, workers=2)
+        self.assertEqual(72, tb._num_points)
+        expected_dates = np.datetime64('2018-01-01', 's') + np.arange(0, 72) * np.timedelta64(1, 'h')
+        np.testing.assert_array_equal(expected_dates, tb._dates)
+        np.testing.assert_array_equal(np.arange(0, 72, dtype=np.uint32), tb._tags['volume'].data)
+        np.testing.assert_array_equal(np.arange(0, 72, dtype=np.int32) * 3, tb._tags['trades'].data)
+        np.testing.assert_array_almost_equal(100 + np.arange(0, 72) * 0.25, tb._tags['price'].data)
+        self.assertEqual(np.datetime64('2018-01-01', 's'), tb._start_date)
+        self.assertIsNone(tb.file_path)
+        return
+
+    def test_read_range_and_tags(self):
+        tb = read_many(self.file_names, ['volume'], '2018-01-01T20:00', '2018-01-02T03:00')
+        self.assertListEqual(['volume'], list(tb._tags))
+        np.testing.assert_array_equal(np.arange(20, 28, dtype=np.uint32), tb._tags['volume'].data)
+        self.assertEqual(np.datetime64('2018-01-01T20:00'), tb._dates[0])
+        self.assertEqual(np.datetime64('2018-01-02T03:00'), tb._dates[-1])
+
+        tb = read_many(self.file_names, start='2018-01-02T23:30', end='2018-01-03T00:30')
+        np.testing.assert_array_equal(np.array([48], dtype=np.uint32), tb._tags['volume'].data)
+
+        tb = read_many(self.file_names, start='2019-01-01')
+        self.assertEqual(0, len(tb._tags))
+        self.assertIsNone(tb._dates)
+        return
+
+    def test_read_range_decodes_only_the_range(self):
+        file_name = 'test_read_many_large.npb'
+        expected = example_large_time_box(file_name)
+        expected.write()
+        try:
+            dates = expected._dates
+            with StageCollector() as collector:
+                tb = read_many([file_name], ['m', 'e', 'rounded_e'], dates[6000], dates[7000])
+            np.testing.assert_array_equal(dates[6000:7001], tb._dates)
+            for t in tb._tags:
+                np.testing.assert_array_equal(expected._tags[t].data[6000:7001], tb._tags[t].data)
+            totals = collector.totals(by_tag=True)
+            self.assertEqual(1001 * 8, totals[(DECODE_TAG, 'm')].num_bytes)
+            # 'e' mode tags are decoded from the checkpoint at point 4096
+            self.assertEqual((7001 - 4096) * 4, totals[(DECODE_TAG, 'e')].num_bytes)
+
+            # a range starting at a checkpoint is decoded straight into the result
+            tb = read_many([file_name], ['e'], dates[4096], dates[4999])
+            np.testing.assert_array_equal(expected._tags['e'].data[4096:5000], tb._tags['e'].data)
+        finally:
+            os.remove(file_name)
+        return
+
+    def test_read_missing_tag(self):
+        with self.assertRaises(DataDoesNotMatchTagDefinitionError):
+            read_many(self.file_names, ['missing'])
+        return
+
+    def test_failed_open_closes_other_files(self):
+        opened = []
+
+        class FailingRangeReader(RangeReader):
+            def __init__(self, file_path: str):
+                super().__init__(file_path)
+                self.closed = False
+                opened.append(self)
+                return
+
+            def index_range(self, start=None, end=None) -> tuple:
+                if self.file_path == self.failing_path:
+                    raise IOError('could not read {}'.format(self.file_path))
+                return super().index_range(start, end)
+
+            def close(self):
+                self.closed = True
+                super().close()
+                return
+
+        FailingRangeReader.failing_path = self.file_names[2]
+        with mock.patch('timebox.batch.RangeReader', FailingRangeReader):
+            with self.assertRaises(IOError):
+                read_many(self.file_names, workers=3)
+        self.assertEqual(3, len(opened))
+        self.assertTrue(all([r.closed for r in opened]))
+        return
+
+    def test_decode_into(self):
+        tb = TimeBox(self.file_names[1])
+        tb.read(lazy=True)
+        for t in tb._tags:
+            out = np.zeros(26, dtype=tb._tags[t].dtype)
+            tb._tags[t].decode_into(out[1:25])
+            self.assertIsNone(tb._tags[t]._data)
+            self.assertEqual(0, out[0])
+            self.assertEqual(0, out[-1])
+            np.testing.assert_array_equal(tb._tags[t].data, out[1:25])
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+from timebox.timebox import TimeBox
+from timebox.range_reader import RangeReader
+from timebox.resample import resample_file, RESAMPLE_FUNCTIONS
+from timebox.instrumentation import StageCollector, DECODE_TAG
+from timebox.exceptions import ResampleFunctionError
+from timebox.utils.exceptions import FrequencyError
+from timebox.tests.test_timebox_memory import example_large_time_box
+import unittest
+import numpy as np
+import os
+
+
+class TestTimeBoxResample(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_resample.npb'
+        example_large_time_box(self.file_name).write()
+        self.expected = TimeBox(self.file_name)
+        self.expected.read()
+        return
+
+    def tearDown(self):
+        os.remove(self.file_name)
+        return
+
+    def assert_resampled(self, result, tag: str, width: int, start=None, end=None):
+        dates = self.expected._dates.astype(np.int64)
+        mask = np.ones(dates.size, dtype=bool)
+        if start is not None:
+            mask &= self.expected._dates >= np.datetime64(start)
+        if end is not None:
+            mask &= self.expected._dates <= np.datetime64(end)
+        buckets = dates[mask] // width
+        values = self.expected._tags[tag].data[mask]
+        labels = np.unique(buckets)
+        self.assertEqual('s', result.unit)
+        np.testing.assert_array_equal(labels * width, result.timestamps)
+        for i, label in enumerate(labels):
+            in_bucket = values[buckets == label]
+            self.assertEqual(in_bucket[0], result.data['open'][i])
+            self.assertEqual(np.amax(in_bucket), result.data['high'][i])
+            self.assertEqual(np.amin(in_bucket), result.data['low'][i])
+            self.assertEqual(in_bucket[-1], result.data['close'][i])
+            self.assertEqual(in_bucket.size, result.data['count'][i])
+            self.assertAlmostEqual(float(np.sum(in_bucket, dtype=np.float64)), float(result.data['sum'][i]), places=6)
+        return
+
+    def test_resample(self):
+        tb = TimeBox(self.file_name)
+        for t in sorted(self.expected._tags):
+            self.assert_resampled(tb.resample(t, '1h'), t, 3600)
+        self.assert_resampled(tb.resample('rounded_e', np.timedelta64(15, 'm'), start='2018-01-02T10:07',
+                                          end='2018-01-04'), 'rounded_e', 900, '2018-01-02T10:07', '2018-01-04')
+
+        result = tb.resample('m', '1D', how=['close', 'count'])
+        self.assertEqual(['close', 'count'], sorted(result.data))
+        self.assertEqual(10000, np.sum(result.data['count']))
+
+        empty = tb.resample('e', '1min', start='2019-01-01')
+        self.assertEqual(0, empty.timestamps.size)
+        self.assertEqual(0, empty.data['open'].size)
+        return
+
+    def test_resample_in_chunks(self):
+        # buckets spanning chunks are merged, 'e' tags carry their last value from chunk to chunk
+        for t in ['e', 'rounded_e', 'raw']:
+            result = resample_file(self.file_name, t, '10min', chunk_num_points=7)
+            self.assert_resampled(result, t, 600)
+            whole = resample_file(self.file_name, t, '10min')
+            for f in RESAMPLE_FUNCTIONS:
+                if f == 'sum':
+                    np.testing.assert_allclose(whole.data[f], result.data[f], rtol=1e-12)
+                else:
+                    np.testing.assert_array_equal(whole.data[f], result.data[f])
+        return
+
+    def test_resample_from_rollups(self):
+        tb = example_large_time_box(self.file_name)
+        tb.write(rollups=['1h', '1min'])
+        with RangeReader(self.file_name) as reader:
+            self.assertEqual([60 * 10 ** 9, 3600 * 10 ** 9], [level.width for level in reader.rollups('rounded_e')])
+            np.testing.assert_array_equal(np.unique(self.expected._dates.astype(np.int64) // 3600),
+                                          reader.rollups('m')[1].labels)
+
+        tb = TimeBox(self.file_name)
+        for t in sorted(self.expected._tags):
+            with StageCollector() as collector:
+                result = tb.resample(t, '1D')
+            self.assertNotIn((DECODE_TAG, t), collector.totals(by_tag=True))
+            self.assert_resampled(result, t, 86400)
+            self.assert_resampled(tb.resample(t, '30min'), t, 1800)
+        for start, end in [('2018-01-02T10:07:01', '2018-01-04T00:00:30'), ('2018-01-03', '2018-01-03T23:59:59'),
+                           ('2018-01-03T10:01', '2018-01-03T10:02')]:
+            self.assert_resampled(tb.resample('rounded_e', '2h', start=start, end=end), 'rounded_e', 7200,
+                                  start, end)
+            self.assert_resampled(tb.resample('m', '1h', start=start, end=end), 'm', 3600, start, end)
+        # finer than every rollup level, decoded
+        self.assert_resampled(tb.resample('e', '30s'), 'e', 30)
+
+        # reading and writing the file back keeps its rollups
+        tb = TimeBox(self.file_name)
+        tb.read()
+        self.assertEqual([60 * 10 ** 9, 3600 * 10 ** 9], tb._rollup_widths)
+        tb.write()
+        with RangeReader(self.file_name) as reader:
+            self.assertEqual([60 * 10 ** 9, 3600 * 10 ** 9], [level.width for level in reader.rollups('m')])
+        return
+
+    def test_rollups_with_unaligned_start(self):
+        # buckets summarized at write are those of the dates decoded at read
+        raw_file_name = 'test_resample_raw.npb'
+        tb = example_large_time_box(raw_file_name)
+        tb._dates = tb._dates + np.timedelta64(59822, 'ms')
+        tb.write()
+        tb.file_path = self.file_name
+        try:
+            for max_memory in [None, 200000]:
+                tb.write(max_memory=max_memory, rollups=['1min'])
+                for t in sorted(tb._tags):
+                    with StageCollector() as collector:
+                        from_rollups = resample_file(self.file_name, t, '1h')
+                    self.assertNotIn((DECODE_TAG, t), collector.totals(by_tag=True))
+                    raw = resample_file(raw_file_name, t, '1h')
+                    self.assertEqual('ms', from_rollups.unit)
+                    np.testing.assert_array_equal(raw.timestamps, from_rollups.timestamps)
+                    for f in RESAMPLE_FUNCTIONS:
+                        np.testing.assert_allclose(raw.data[f], from_rollups.data[f], rtol=1e-12)
+        finally:
+            os.remove(raw_file_name)
+        return
+
+    def test_rollups_of_uniform_dates(self):
+        tb = TimeBox(self.file_name)
+        tb.read()
+        tb._date_differentials_stored = False
+        tb._start_date = np.datetime64('2018-01-01', 's')
+        tb._seconds_between_points = 60
+        tb.write(rollups=['1h'])
+        self.expected = TimeBox(self.file_name)
+        self.expected.read()
+        self.assert_resampled(tb.resample('raw', '1D'), 'raw', 86400)
+        return
+
+    def test_iter_chunks(self):
+        with RangeReader(self.file_name) as reader:
+            chunks = list(reader.iter_chunks(['e', 'rounded_e', 'm'], 4000, 9000, chunk_num_points=999))
+        self.assertEqual(4000, chunks[0].start_index)
+        self.assertEqual(4999, chunks[1].start_index)
+        np.testing.assert_array_equal(self.expected._dates[4000:9000].astype(np.int64),
+                                      np.concatenate([c.dates for c in chunks]))
+        for t in ['e', 'rounded_e', 'm']:
+            np.testing.assert_array_equal(self.expected._tags[t].data[4000:9000],
+                                          np.concatenate([c.data[t] for c in chunks]))
+        return
+
+    def test_resample_errors(self):
+        tb = TimeBox(self.file_name)
+        with self.assertRaises(ResampleFunctionError):
+            tb.resample('m', '1h', how=['median'])
+        with self.assertRaises(FrequencyError):
+            tb.resample('m', '500ms')
+        with self.assertRaises(FrequencyError):
+            tb.resample('m', '1 fortnight')
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
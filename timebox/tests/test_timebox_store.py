@@ -0,0 +1,142 @@
+from timebox.timebox import TimeBox
+from timebox.timebox_tag import TimeBoxTag
+from timebox.store import TimeBoxStore
+from timebox.range_reader import RangeReader
+from timebox.exceptions import StoreError, DataDoesNotMatchTagDefinitionError
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+import numpy as np
+import shutil
+
+
+def example_time_box(start: str, num_points: int, step_hours: int = 6):
+    tb = TimeBox()
+    tb._tag_names_are_strings = True
+    tb._dates = np.datetime64(start, 's') + np.arange(0, num_points) * np.timedelta64(step_hours, 'h')
+    tb._num_points = num_points
+    tb._tags = {
+        'price': TimeBoxTag('price', 8, 'f'),
+        'volume': TimeBoxTag('volume', 4, 'u')
+    }
+    tb._tags['price'].use_compression = True
+    tb._tags['price'].floating_point_rounded = True
+    tb._tags['price'].num_decimals_to_store = 2
+    tb._tags['price'].data = np.round(100 + np.arange(0, num_points) * 0.25, 2)
+    tb._tags['volume'].data = np.arange(0, num_points, dtype=np.uint32)
+    return tb
+
+
+class TestTimeBoxStore(unittest.TestCase):
+    def setUp(self):
+        self.root = 'test_store'
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        return
+
+    def test_write_and_read(self):
+        store = TimeBoxStore(self.root, 'D')
+        store.write('ETH', example_time_box('2018-01-01', 12))  # 3 days, 4 points per day
+        store.write('BTC', example_time_box('2018-01-02', 4))
+        self.assertListEqual(['BTC', 'ETH'], store.keys())
+
+        partitions = store.partitions('ETH')
+        self.assertListEqual(['2018-01-01', '2018-01-02', '2018-01-03'], [p.partition for p in partitions])
+        self.assertListEqual([4, 4, 4], [p.num_points for p in partitions])
+        self.assertListEqual(['price', 'volume'], partitions[0].tags)
+
+        # range query only touches overlapping partitions
+        self.assertEqual(1, len(store.partitions('ETH', '2018-01-02T01', '2018-01-02T20')))
+        self.assertEqual(2, len(store.partitions('ETH', '2018-01-02T01', '2018-01-03T00')))
+
+        tb = store.read('ETH', '2018-01-01T12', '2018-01-03T00', tags=['volume'])
+        self.assertListEqual(['volume'], list(tb._tags))
+        self.assertListEqual([2, 3, 4, 5, 6, 7, 8], list(tb._tags['volume'].data))
+        self.assertEqual(np.datetime64('2018-01-01T12', 's'), tb._dates[0])
+        self.assertEqual(np.datetime64('2018-01-03T00', 's'), tb._dates[-1])
+
+        tb = store.read('ETH')
+        self.assertEqual(12, tb._num_points)
+        np.testing.assert_array_equal(example_time_box('2018-01-01', 12)._tags['price'].data,
+                                      tb._tags['price'].data)
+
+        self.assertEqual(0, store.read('ETH', '2019-01-01')._num_points)
+        self.assertEqual(0, store.read('missing')._num_points)
+
+        # re-opening keeps the manifest's partition unit
+        self.assertEqual('D', TimeBoxStore(self.root, 'h').partition_unit)
+        return
+
+    def test_merge_into_partition(self):
+        store = TimeBoxStore(self.root, 'D')
+        store.write('ETH', example_time_box('2018-01-01', 2, step_hours=12))
+        update = example_time_box('2018-01-01T12', 2, step_hours=6)
+        update._tags['volume'].data = np.array([100, 200], dtype=np.uint32)
+        store.write('ETH', update)
+
+        partitions = store.partitions('ETH')
+        self.assertEqual(1, len(partitions))
+        self.assertEqual(3, partitions[0].num_points)
+        tb = store.read('ETH')
+        self.assertListEqual([0, 100, 200], list(tb._tags['volume'].data))
+
+        bad = example_time_box('2018-01-01', 2)
+        del bad._tags['price']
+        with self.assertRaises(DataDoesNotMatchTagDefinitionError):
+            store.write('ETH', bad)
+        return
+
+    def test_merge_keeps_rollups_and_virtual_tags(self):
+        store = TimeBoxStore(self.root, 'D')
+        tb = example_time_box('2018-01-01', 2, step_hours=12)
+        tb._rollup_widths = [3600 * 10 ** 9]
+        tb._virtual_tags = {'notional': 'price * volume'}
+        store.write('ETH', tb)
+        store.write('ETH', example_time_box('2018-01-01T06', 2, step_hours=12))
+        with RangeReader(store.partition_path('ETH', '2018-01-01')) as reader:
+            self.assertEqual([3600 * 10 ** 9], [level.width for level in reader.rollups('price')])
+            hours = np.datetime64('2018-01-01T00', 'h').astype(np.int64) + np.array([0, 6, 12, 18])
+            np.testing.assert_array_equal(hours, reader.rollups('price')[0].labels)
+            self.assertEqual({'notional': 'price * volume'}, reader.virtual_tags)
+        return
+
+    def test_concurrent_writes(self):
+        store = TimeBoxStore(self.root, 'D')
+        updates = []
+        for i in range(0, 8):
+            # every update lands in the same partition, at dates of its own
+            update = example_time_box('2018-01-01T{:02d}'.format(i), 3, step_hours=8)
+            update._tags['volume'].data = np.full(3, i, dtype=np.uint32)
+            updates.append(update)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda u: TimeBoxStore(self.root).write('ETH', u), updates))
+
+        partitions = store.partitions('ETH')
+        self.assertEqual(1, len(partitions))
+        self.assertEqual(24, partitions[0].num_points)
+        tb = store.read('ETH')
+        self.assertEqual(24, tb._num_points)
+        self.assertListEqual([i % 8 for i in range(0, 24)], list(tb._tags['volume'].data))
+        return
+
+    def test_write_without_points(self):
+        store = TimeBoxStore(self.root, 'D')
+        empty = example_time_box('2018-01-01', 0)
+        store.write('ETH', empty)
+        self.assertListEqual([], store.keys())
+        store.write('ETH', example_time_box('2018-01-01', 4))
+        store.write('ETH', empty)
+        self.assertEqual(4, store.read('ETH')._num_points)
+        return
+
+    def test_bad_arguments(self):
+        with self.assertRaises(StoreError):
+            TimeBoxStore(self.root, 's')
+        store = TimeBoxStore(self.root)
+        with self.assertRaises(StoreError):
+            store.write('../escape', example_time_box('2018-01-01', 2))
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,6 +20,21 @@ class TestTimeBoxTagCompression(unittest.TestCase):
         self.assertEqual(5, t._encoded_data[3])
         return
 
+    def test_timebox_tag_compression_of_tiny_dtypes(self):
+        # 1-byte integers are already as small as compress_array makes them, they are written uncompressed
+        t = TimeBoxTag(0, 1, 'u')
+        t.use_compression = True
+        t._compression_mode = 'e'
+        t.data = np.array([3, 0, 2], np.uint8)
+        result = t.info_to_bytes(1, False)
+        self.assertFalse(t.use_compression)
+        self.assertIsNone(t._compression_mode)
+        self.assertTrue(np.array_equal(t.data, t._encoded_data))
+
+        info = np.frombuffer(result.byte_code, TimeBoxTag.tag_info_dtype(1, False), count=1)[0]
+        self.assertFalse(TimeBoxTag(0, 1, 'u', options=info['options']).use_compression)
+        return
+
     def test_timebox_tag_decompression(self):
         t = TimeBoxTag(0, 8, 'u')
         t.use_compression = True
@@ -64,5 +79,18 @@ class TestTimeBoxTagCompression(unittest.TestCase):
 
         return
 
+    def test_encoding_does_not_modify_data(self):
+        t = TimeBoxTag(0, 8, 'f')
+        t.use_compression = True
+        t.floating_point_rounded = True
+        t.num_decimals_to_store = 2
+        source = np.array([0.5, -0.5, 10.2345, 0], np.float64)
+        t.data = source
+        t.encode_data()
+        self.assertIs(source, t.data)
+        self.assertListEqual([0.5, -0.5, 10.2345, 0], list(source))
+        self.assertFalse(np.shares_memory(source, t._encoded_data))
+        return
+
 if __name__ == '__main__':
     unittest.main()
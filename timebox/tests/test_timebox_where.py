@@ -0,0 +1,162 @@
+from timebox.timebox import TimeBox
+from timebox.where import parse_predicate, Comparison, BooleanOperation
+from timebox.instrumentation import StageCollector, DECODE_TAG
+from timebox.exceptions import PredicateError
+from timebox.tests.test_timebox_memory import example_large_time_box
+import unittest
+import numpy as np
+import os
+
+
+class TestTimeBoxWhere(unittest.TestCase):
+    def setUp(self):
+        self.file_name = 'test_where.npb'
+        example_large_time_box(self.file_name).write()
+        self.expected = TimeBox(self.file_name)
+        self.expected.read()
+        return
+
+    def tearDown(self):
+        os.remove(self.file_name)
+        return
+
+    def assert_matches(self, result, mask: np.ndarray, tags: list):
+        self.assertEqual('s', result.unit)
+        np.testing.assert_array_equal(self.expected._dates[mask].astype(np.int64), result.timestamps)
+        self.assertEqual(sorted(tags), sorted(result.data.keys()))
+        for t in tags:
+            np.testing.assert_array_equal(self.expected._tags[t].data[mask], result.data[t])
+        return
+
+    def test_parse_predicate(self):
+        self.assertEqual(Comparison('price', '>', 100), parse_predicate('price > 100'))
+        self.assertEqual(Comparison('price', '<=', -1.5), parse_predicate('-1.5>=price'))
+        self.assertEqual(
+            BooleanOperation('or', [
+                BooleanOperation('and', [Comparison('a', '>', 1), Comparison('b', '!=', 2.)]),
+                Comparison('c', '==', 0)
+            ]),
+            parse_predicate('a>1 and b != 2. or c == 0')
+        )
+        self.assertEqual(
+            BooleanOperation('and', [
+                Comparison('a', '>', 1),
+                BooleanOperation('or', [Comparison('b', '<', 2), Comparison('c', '>=', 1e3)])
+            ]),
+            parse_predicate(' a > 1 and (b < 2 or c >= 1e3) ')
+        )
+        self.assertEqual(BooleanOperation('and', [Comparison('7', '>', 1), Comparison('and', '<', 2)]),
+                         parse_predicate('"7" > 1 and 2 > \'and\''))
+        for predicate in ['', 'price', 'price > ', 'price > volume', '1 > 2', '(a > 1', 'a > 1)', 'a > 1 and',
+                          'a > 1 b < 2', 'a = 1', 'a > 1 & b > 2']:
+            with self.assertRaises(PredicateError):
+                parse_predicate(predicate)
+        return
+
+    def test_where(self):
+        tb = TimeBox(self.file_name)
+        data = dict([(t, self.expected._tags[t].data) for t in self.expected._tags])
+        self.assert_matches(tb.where('e > 0'), data['e'] > 0, list(data.keys()))
+        self.assert_matches(tb.where('rounded_m <= -49.5', ['raw', 'e']), data['rounded_m'] <= -49.5, ['raw', 'e'])
+        self.assert_matches(
+            tb.where('raw < 1000 and (rounded_e > 100 or e == {})'.format(data['e'][5000]), ['rounded_e']),
+            (data['raw'] < 1000) & ((data['rounded_e'] > 100) | (data['e'] == data['e'][5000])),
+            ['rounded_e']
+        )
+        self.assert_matches(tb.where('m != {}'.format(data['m'][3]), ['m']), data['m'] != data['m'][3], ['m'])
+        self.assert_matches(tb.where('e > 1e12', ['e']), np.zeros(10000, dtype=bool), ['e'])
+
+        dates = self.expected._dates
+        in_range = (dates >= dates[3000]) & (dates <= dates[8999])
+        self.assert_matches(tb.where('100 > raw', ['raw', 'e'], dates[3000], dates[8999]),
+                            in_range & (data['raw'] < 100), ['raw', 'e'])
+        result = tb.where('e > 0', start='2019-01-01')
+        self.assertEqual(0, result.timestamps.size)
+        self.assertEqual(0, result.data['e'].size)
+        with self.assertRaises(PredicateError):
+            tb.where('e >> 0')
+        return
+
+    def test_explain_skips_blocks(self):
+        tb = TimeBox(self.file_name)
+        values = self.expected._tags['e'].data
+        block_maxes = np.maximum.reduceat(values, np.arange(0, values.size, 4096))
+        threshold = int(np.amax(block_maxes)) - 1
+        expected_scanned = int(np.count_nonzero(block_maxes > threshold))
+        predicate = 'e > {}'.format(threshold)
+
+        explanation = tb.explain(predicate)
+        self.assertEqual(predicate, explanation.predicate)
+        self.assertEqual(3, explanation.num_blocks)
+        self.assertEqual(expected_scanned, explanation.scanned_blocks)
+        self.assertEqual(3 - expected_scanned, explanation.skipped_blocks)
+        self.assertLess(expected_scanned, 3)
+
+        with StageCollector() as collector:
+            self.assert_matches(tb.where(predicate, ['e']), values > threshold, ['e'])
+        self.assertEqual(explanation.scanned_points * 4, collector.totals(by_tag=True)[(DECODE_TAG, 'e')].num_bytes)
+
+        explanation = tb.explain('e > {} or raw >= 0'.format(threshold))
+        self.assertEqual((3, 3, 0, 10000), explanation[1:])
+        explanation = tb.explain('e > {} and raw >= 0'.format(threshold))
+        self.assertEqual(expected_scanned, explanation.scanned_blocks)
+        dates = self.expected._dates
+        explanation = tb.explain('raw >= 0', dates[4096], dates[4096])
+        self.assertEqual((1, 1, 0, 1), explanation[1:])
+        explanation = tb.explain('e > 1e12')
+        self.assertEqual((3, 0, 3, 0), explanation[1:])
+        return
+
+    def test_integer_tag_identifiers(self):
+        file_name = 'test_where_integer_tags.npb'
+        timestamps = np.arange(1514764800, 1514764800 + 10000, dtype=np.int64)
+        data = {0: np.arange(10000, dtype=np.int32), 7: np.arange(10000, dtype=np.float64) * 0.5}
+        tb = TimeBox.from_arrays(timestamps, data, unit='s')
+        tb.file_path = file_name
+        tb.write()
+        try:
+            tb = TimeBox(file_name)
+            result = tb.where('"7" > 4000 and \'0\' < 9000', [0, 7])
+            mask = (data[7] > 4000) & (data[0] < 9000)
+            np.testing.assert_array_equal(timestamps[mask], result.timestamps)
+            np.testing.assert_array_equal(data[0][mask], result.data[0])
+            np.testing.assert_array_equal(data[7][mask], result.data[7])
+            self.assertEqual((3, 2, 1), tb.explain('"7" >= 3000')[1:4])
+            for predicate in ['price > 1', '"8" > 1']:
+                with self.assertRaisesRegex(PredicateError, 'quoted numbers'):
+                    tb.where(predicate)
+        finally:
+            os.remove(file_name)
+        with self.assertRaisesRegex(PredicateError, 'was not found'):
+            TimeBox(self.file_name).where('"7" > 1')
+        return
+
+    def test_uniform_dates_skip_blocks(self):
+        # files with uniform dates have no block dates, the block size comes from the statistics
+        self.expected._date_differentials_stored = False
+        self.expected._start_date = np.datetime64('2018-01-01', 's')
+        self.expected._seconds_between_points = 60
+        self.expected.write()
+        values = self.expected._tags['e'].data
+        threshold = int(np.amax(values)) - 1
+        expected_scanned = int(np.count_nonzero(np.maximum.reduceat(values, np.arange(0, values.size, 4096)) >
+                                                threshold))
+
+        tb = TimeBox(self.file_name)
+        explanation = tb.explain('e > {}'.format(threshold))
+        self.assertEqual(3, explanation.num_blocks)
+        self.assertEqual(expected_scanned, explanation.scanned_blocks)
+        self.assertGreater(explanation.skipped_blocks, 0)
+
+        with StageCollector() as collector:
+            result = tb.where('e > {}'.format(threshold), ['e'])
+        mask = values > threshold
+        dates = np.datetime64('2018-01-01', 's') + np.arange(10000) * np.timedelta64(60, 's')
+        np.testing.assert_array_equal(dates[mask].astype(np.int64), result.timestamps)
+        np.testing.assert_array_equal(values[mask], result.data['e'])
+        self.assertEqual(explanation.scanned_points * 4, collector.totals(by_tag=True)[(DECODE_TAG, 'e')].num_bytes)
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
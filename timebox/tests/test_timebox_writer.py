@@ -0,0 +1,180 @@
+from timebox.timebox import TimeBox
+from timebox.timebox_tag import TimeBoxTag
+from timebox.writer import TimeBoxWriter
+from timebox.exceptions import DatesNotInOrderError, DataShapeError, DataDoesNotMatchTagDefinitionError, \
+    DateDataError
+import unittest
+import numpy as np
+import os
+
+
+def example_time_box(file_name: str, num_points: int = 500):
+    random = np.random.RandomState(7)
+    tb = TimeBox(file_name)
+    tb._tag_names_are_strings = True
+    tb._date_differentials_stored = True
+    tb._num_points = num_points
+    tb._dates = np.datetime64('2018-01-01', 'ns') + \
+        np.cumsum(random.randint(1, 5, num_points)) * np.timedelta64(1, 'm')
+    tb._start_date = tb._dates[0]
+    tb._tags = {
+        'price': TimeBoxTag('price', 8, 'f'),
+        'spread': TimeBoxTag('spread', 8, 'f'),
+        'volume': TimeBoxTag('volume', 4, 'i'),
+        'level': TimeBoxTag('level', 2, 'u'),
+        'raw': TimeBoxTag('raw', 4, 'f')
+    }
+    tb._tags['price'].use_compression = True
+    tb._tags['price']._compression_mode = 'e'
+    tb._tags['price'].floating_point_rounded = True
+    tb._tags['price'].num_decimals_to_store = 2
+    tb._tags['spread'].use_compression = True
+    tb._tags['volume'].use_compression = True
+    tb._tags['volume']._compression_mode = 'e'
+    tb._tags['level'].use_compression = True
+    tb._tags['price'].data = np.round(100 + np.cumsum(random.normal(size=num_points)), 2)
+    tb._tags['spread'].data = np.round(random.normal(size=num_points), 1) * 0.5
+    tb._tags['volume'].data = random.randint(-1000, 1000, num_points).astype(np.int32)
+    tb._tags['level'].data = random.randint(300, 60000, num_points).astype(np.uint16)
+    tb._tags['raw'].data = random.normal(size=num_points).astype(np.float32)
+    return tb
+
+
+class TestTimeBoxWriter(unittest.TestCase):
+    def setUp(self):
+        self.expected_file_name = 'test_writer_expected.npb'
+        self.file_name = 'test_writer.npb'
+        self.tb = example_time_box(self.expected_file_name)
+        self.tb.write()
+        return
+
+    def tearDown(self):
+        for file_name in [self.expected_file_name, self.file_name]:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+        return
+
+    def write_in_chunks(self, chunk_num_points: int, rollups: list = None, virtual_tags: dict = None):
+        tags = [self.tb._tags[t].definition_copy() for t in self.tb._tags]
+        with TimeBoxWriter(self.file_name, tags, chunk_num_points=chunk_num_points, rollups=rollups,
+                           virtual_tags=virtual_tags) as writer:
+            for i in range(0, self.tb._num_points, chunk_num_points):
+                writer.append(
+                    self.tb._dates[i:i+chunk_num_points],
+                    dict([(t, self.tb._tags[t].data[i:i+chunk_num_points]) for t in self.tb._tags])
+                )
+        return
+
+    def test_matches_timebox_write(self):
+        with open(self.expected_file_name, 'rb') as f:
+            expected = f.read()
+        for chunk_num_points in [1, 7, 128, 1000]:
+            self.write_in_chunks(chunk_num_points)
+            with open(self.file_name, 'rb') as f:
+                self.assertEqual(expected, f.read())
+
+        tb = TimeBox(self.file_name)
+        tb.read()
+        np.testing.assert_array_equal(self.tb._dates, tb._dates)
+        for t in self.tb._tags:
+            np.testing.assert_array_almost_equal(self.tb._tags[t].data, tb._tags[t].data)
+        self.assertListEqual([], [f for f in os.listdir('.') if f.startswith('.timebox-spool-')])
+        return
+
+    def test_matches_timebox_write_with_rollups(self):
+        self.tb.write(rollups=['1h', '10min'])
+        with open(self.expected_file_name, 'rb') as f:
+            expected = f.read()
+        for chunk_num_points in [7, 1000]:
+            self.write_in_chunks(chunk_num_points, rollups=['10min', np.timedelta64(1, 'h')])
+            with open(self.file_name, 'rb') as f:
+                self.assertEqual(expected, f.read())
+        return
+
+    def test_matches_timebox_write_with_virtual_tags(self):
+        virtual_tags = {'ask': 'price + spread / 2', 'bid': 'price - spread / 2', 'notional': 'price * volume'}
+        self.tb.write(virtual_tags=virtual_tags)
+        with open(self.expected_file_name, 'rb') as f:
+            expected = f.read()
+        self.write_in_chunks(7, virtual_tags=virtual_tags)
+        with open(self.file_name, 'rb') as f:
+            self.assertEqual(expected, f.read())
+        return
+
+    def test_matches_timebox_write_with_sub_second_start(self):
+        self.tb._dates = self.tb._dates + np.timedelta64(822, 'ms')
+        self.tb.write()
+        with open(self.expected_file_name, 'rb') as f:
+            expected = f.read()
+        self.write_in_chunks(7)
+        with open(self.file_name, 'rb') as f:
+            self.assertEqual(expected, f.read())
+        tb = TimeBox(self.file_name)
+        tb.read()
+        np.testing.assert_array_equal(self.tb._dates, tb._dates)
+        return
+
+    def test_matches_timebox_write_across_blocks(self):
+        # block statistics and the checkpoints of 'e' mode tags start within chunks
+        self.tb = example_time_box(self.expected_file_name, 10000)
+        self.tb.write()
+        with open(self.expected_file_name, 'rb') as f:
+            expected = f.read()
+        self.write_in_chunks(777)
+        with open(self.file_name, 'rb') as f:
+            self.assertEqual(expected, f.read())
+        return
+
+    def test_uniform_dates(self):
+        tags = [self.tb._tags[t].definition_copy() for t in self.tb._tags]
+        data = dict([(t, self.tb._tags[t].data) for t in self.tb._tags])
+        dates = np.datetime64('2018-01-01', 's') + np.arange(0, self.tb._num_points) * np.timedelta64(90, 's')
+        with TimeBoxWriter(self.file_name, tags, date_units='s', seconds_between_points=90) as writer:
+            writer.append(dates[:100], dict([(t, data[t][:100]) for t in data]))
+            writer.append(dates[100:], dict([(t, data[t][100:]) for t in data]))
+        tb = TimeBox(self.file_name)
+        tb.read()
+        self.assertFalse(tb._date_differentials_stored)
+        self.assertEqual(90, tb._seconds_between_points)
+        np.testing.assert_array_equal(dates, tb._dates)
+
+        for bad_dates in [dates + np.timedelta64(1, 's') * (np.arange(0, dates.size) == 300),
+                          dates + np.timedelta64(500, 'ms')]:
+            with self.assertRaises(DateDataError):
+                with TimeBoxWriter(self.file_name, tags, date_units='ms', seconds_between_points=90) as writer:
+                    writer.append(bad_dates[:100], dict([(t, data[t][:100]) for t in data]))
+                    writer.append(bad_dates[100:], dict([(t, data[t][100:]) for t in data]))
+        with self.assertRaises(DateDataError):
+            TimeBoxWriter(self.file_name, tags, seconds_between_points=0)
+        self.assertListEqual([], [f for f in os.listdir('.') if f.startswith('.timebox-spool-')])
+        return
+
+    def test_dates_out_of_order(self):
+        tags = [self.tb._tags[t].definition_copy() for t in self.tb._tags]
+        writer = TimeBoxWriter(self.file_name, tags)
+        data = dict([(t, self.tb._tags[t].data[10:20]) for t in self.tb._tags])
+        writer.append(self.tb._dates[10:20], data)
+        with self.assertRaises(DatesNotInOrderError):
+            writer.append(self.tb._dates[0:10], data)
+        writer.abort()
+        self.assertFalse(os.path.exists(self.file_name))
+        self.assertListEqual([], [f for f in os.listdir('.') if f.startswith('.timebox-spool-')])
+        return
+
+    def test_invalid_appends(self):
+        tags = [self.tb._tags[t].definition_copy() for t in self.tb._tags]
+        with self.assertRaises(DataDoesNotMatchTagDefinitionError):
+            with TimeBoxWriter(self.file_name, tags) as writer:
+                writer.append(self.tb._dates[0:10], {'price': self.tb._tags['price'].data[0:10]})
+        with self.assertRaises(DataShapeError):
+            with TimeBoxWriter(self.file_name, tags) as writer:
+                writer.append(self.tb._dates[0:10], dict([(t, self.tb._tags[t].data[0:9]) for t in self.tb._tags]))
+        with self.assertRaises(DataShapeError):
+            with TimeBoxWriter(self.file_name, tags):
+                pass
+        self.assertFalse(os.path.exists(self.file_name))
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
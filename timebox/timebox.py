@@ -1,20 +1,66 @@
 import numpy as np
-import pandas as pd
 import os
 import time
-import logging
+import struct
+from collections import namedtuple
 from fcntl import flock, LOCK_EX, LOCK_SH, LOCK_UN, LOCK_NB
-from timebox.utils.datetime_utils import compress_time_delta_array, get_unit_data
-from timebox.utils.numpy_utils import *
-from timebox.utils.binary import determine_required_bytes_unsigned_integer, read_unsigned_int
-from timebox.utils.pandas_utils import parse_pandas_dtype
-from timebox.constants import *
+from timebox.utils.datetime_utils import compress_time_delta_array, get_unit_data, get_units_from_dtype, \
+    get_conversion_multiplier, frequency_to_units, units_by_order, SECONDS
+from timebox.utils.numpy_utils import get_numpy_type
+from timebox.utils.binary import determine_required_bytes_unsigned_integer
+from timebox.utils.exceptions import DateUnitsError, InvalidPandasIndexError
+from timebox.utils.buffer_pool import BufferPool
+from timebox.cache import DecodedArrayCache, get_cache, file_identity, DATES_CACHE_TAG
+from timebox.file_snapshot import FileSnapshot
+from timebox.instrumentation import start_stage, end_stage, LOCK_WAIT, READ_FILE_INFO, READ_DATES, \
+    DECODE_DATES, ENCODE_DATES, WRITE_FILE_INFO, WRITE_DATES, WRITE_TAG, WRITE_FOOTER, SORT_ROWS
+from timebox.csv_reader import CsvChunkReader, DEFAULT_CSV_CHUNK_SIZE
+from timebox.constants import TimeBoxOptionPositions, TimeBoxFooterSectionTypes, \
+    get_date_utils_constant_from_stored_units_int, get_int_for_date_units_from_date_utils_constant
 from timebox.timebox_tag import TimeBoxTag, NUM_BYTES_PER_DEFINITION_WITHOUT_IDENTIFIER
-from timebox.exceptions import *
+from timebox.footer import footer_to_bytes, footer_num_bytes_from_trailer, sections_from_bytes, \
+    end_date_section, start_date_remainder_section, last_value_section, virtual_tag_section, \
+    virtual_tag_from_section, TRAILER_STRUCT, END_DATE_STRUCT, START_DATE_REMAINDER_STRUCT
+from timebox.block_statistics import block_date_offsets, block_dates_section, block_statistics_section, \
+    checkpoints_section
+from timebox.rollup import rollup_widths, rollup_section, ROLLUP_HEADER_STRUCT
+from timebox.exceptions import CouldNotAcquireFileLockError, DataDoesNotMatchTagDefinitionError, DataShapeError, \
+    DateDataError, DatesNotInOrderError, TagIdentifierByteRepresentationError, MemoryBudgetExceededError
 
 
 MAX_WRITE_BLOCK_WAIT_SECONDS = 60
 MAX_READ_BLOCK_WAIT_SECONDS = 30
+FILE_INFO_READ_NUM_BYTES = 4096  # size of the first read made by TimeBox.info()
+MIN_CHUNK_NUM_POINTS = 1024  # smallest chunk a max_memory budget may force reads and writes into
+DATE_WRITE_NUM_BYTES_PER_POINT = 24  # differentials, their int64 copy and the compressed differentials
+
+FILE_INFO_STRUCT = struct.Struct('<BHBIB')  # version, options, num tags, num points, bytes for tag identifier
+START_DATE_STRUCT = struct.Struct('<q')  # datetime64[s]
+DATE_DIFFERENTIAL_INFO_STRUCT = struct.Struct('<BH')  # bytes per date differential, date differential units
+UNIFORM_DATE_INFO_STRUCT = struct.Struct('<I')  # seconds between points
+
+# timestamps is an int64 numpy array of unit since epoch, data is like {tag_identifier: numpy array}
+TimeBoxArrays = namedtuple('TimeBoxArrays', ['timestamps', 'unit', 'data'])
+TimeBoxInfo = namedtuple('TimeBoxInfo', ['file_path', 'file_size', 'timebox_version', 'num_points',
+                                         'tag_names_are_strings', 'date_differentials_stored', 'date_units',
+                                         'seconds_between_points', 'start_date', 'end_date', 'tags'])
+
+
+def _tag_write_num_bytes_per_point(tag: TimeBoxTag) -> tuple:
+    """
+    Estimates the bytes per point TimeBoxTag.encode_data allocates, see round_array_returning_integers
+    and compress_array. the compressed dtype is not known before encoding, so the widest is assumed
+    :param tag: TimeBoxTag
+    :return: tuple like (bytes of encoded data, bytes of scratch space)
+    """
+    values_num_bytes = 8 if tag.floating_point_rounded else np.dtype(tag.dtype).itemsize
+    encoded_num_bytes = values_num_bytes if tag.use_compression or tag.floating_point_rounded else 0
+    scratch_num_bytes = 0
+    if tag.floating_point_rounded:
+        scratch_num_bytes += 8 * (2 if tag.use_compression else 1)
+    if tag.use_compression:
+        scratch_num_bytes += values_num_bytes
+    return encoded_num_bytes, scratch_num_bytes
 
 
 class TimeBox:
@@ -26,6 +72,7 @@ class TimeBox:
         self._num_points = 0
         self._tags = {}  # like { int|string tag_identifier : TimeBoxTag }
         self._start_date = None
+        self._start_date_remainder = 0  # date differential units from the whole second of _start_date to the first date
         self._seconds_between_points = 0
         self._bytes_per_date_differential = 0
         self._date_differential_units = 0
@@ -33,10 +80,13 @@ class TimeBox:
         self._dates = None  # numpy array of datetime64[s]
         self._MAX_WRITE_BLOCK_WAIT_SECONDS = MAX_WRITE_BLOCK_WAIT_SECONDS
         self._MAX_READ_BLOCK_WAIT_SECONDS = MAX_READ_BLOCK_WAIT_SECONDS
+        self._buffer_pool = BufferPool()  # scratch space re-used by each write()
+        self._rollup_widths = []  # bucket durations of the rollup levels written to the footer, in nanoseconds
+        self._virtual_tags = dict()  # like {name: expression} written to the footer, see timebox.expression
         return
 
     @classmethod
-    def save_pandas(cls, df: pd.DataFrame, file_path: str):
+    def save_pandas(cls, df: 'pandas.DataFrame', file_path: str):
         """
         Expects that the passing df has an index that is type Timestamp
         or string which can be converted to Timestamp. All dtypes in pandas
@@ -54,7 +104,7 @@ class TimeBox:
         return tb
 
     @classmethod
-    def from_pandas(cls, df: pd.DataFrame):
+    def from_pandas(cls, df: 'pandas.DataFrame'):
         """
         Expects that the passing df has an index that is type Timestamp
         or string which can be converted to Timestamp. All dtypes in pandas
@@ -62,92 +112,401 @@ class TimeBox:
         :param df: pandas DataFrame
         :return: TimeBox object
         """
-        # make sure the pandas data frame is sorted on date
-        logging.debug('Before sorting: {}'.format(df.head()))
-        df = df.sort_index()
-        logging.debug('After sorting: {}'.format(df.head()))
+        import pandas as pd  # imported on use, the rest of timebox does not need pandas
+
+        index = df.index
+        if not isinstance(index, pd.DatetimeIndex):
+            if index.dtype.kind in ['i', 'u', 'f']:
+                raise InvalidPandasIndexError('Index of dtype {} is not a date-time index'.format(index.dtype))
+            try:
+                index = pd.to_datetime(index)
+            except (ValueError, TypeError):
+                raise InvalidPandasIndexError('There was an error reading the date-time index on data frame')
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        index = index.as_unit('ns') if hasattr(index, 'as_unit') else index
+        return TimeBox.from_arrays(index.asi8, dict([(c, df[c].values) for c in df.columns]), unit='ns')
+
+    @classmethod
+    def from_arrays(cls, timestamps: np.ndarray, data: dict, unit: str = 'ns'):
+        """
+        Builds a TimeBox from numpy arrays, without pandas. The arrays are used as they are,
+        unless the timestamps are not sorted, in which case the timestamps and data are sorted
+        :param timestamps: int64 numpy array of timestamps in unit since epoch, or datetime64 array
+        :param data: dictionary like {tag_identifier: numpy array} with one float/int/u-int array per tag.
+        tag identifiers must be all strings or all integers
+        :param unit: numpy datetime64 units of int64 timestamps, like 'ns' or 's'. ignored for datetime64 timestamps
+        :return: TimeBox object, not associated with a file
+        """
+        timestamps = np.asarray(timestamps)
+        if timestamps.dtype.kind == 'M':
+            dates = timestamps
+        elif timestamps.dtype.kind in ['i', 'u']:
+            get_unit_data(unit)
+            dates = timestamps.astype(np.int64, copy=False).view('datetime64[{}]'.format(unit))
+        else:
+            raise DateDataError('Timestamps must be int64 or datetime64, {} found'.format(timestamps.dtype))
+        if dates.ndim != 1:
+            raise DataShapeError('Timestamps must be 1-d')
+
+        order = None
+        if dates.size > 1 and np.any(dates[1:] < dates[:-1]):
+            order = np.argsort(dates, kind='mergesort')
+            dates = dates[order]
 
         tb = TimeBox()
-        tb._tag_names_are_strings = True
-
-        # ensure index is there and can be converted to numpy array of datetime64s
-        logging.debug('Datetime index dtype before and after:\n{}'.format(df.index.dtype))
-        tb._dates = df.index.values.astype(np.datetime64)
-        logging.debug('after: {}'.format(tb._dates.dtype))
-        tb._start_date = np.amin(tb._dates.astype(np.dtype('datetime64[s]')))
-        logging.debug('Min date: {}'.format(tb._start_date))
+        tb._tag_names_are_strings = all([isinstance(t, str) for t in data])
+        if not tb._tag_names_are_strings and not all([isinstance(t, (int, np.integer)) for t in data]):
+            raise TagIdentifierByteRepresentationError('Tag identifiers must be all strings or all integers')
+        tb._dates = dates
         tb._date_differentials_stored = True
-        tb._num_points = tb._dates.size
-
-        # get column names and info
-        for c in df.columns:
-            type_info = parse_pandas_dtype(df[c].dtype)
-            tb._tags[c] = TimeBoxTag(c, type_info[0], type_info[1])
-            tb._tags[c].data = df[c].values
+        tb._num_points = dates.size
+        if dates.size > 0:
+            tb._start_date = dates[0].astype('datetime64[s]')
 
+        for t in data:
+            values = np.asarray(data[t])
+            if values.shape != dates.shape:
+                raise DataShapeError('Data for tag {} does not have the correct shape'.format(t))
+            if values.dtype.kind not in ['f', 'i', 'u']:
+                raise DataDoesNotMatchTagDefinitionError('Data for tag {} has dtype {}, float/int/u-int '
+                                                         'is required'.format(t, values.dtype))
+            tb._tags[t] = TimeBoxTag(t, values.dtype.itemsize, values.dtype.kind)
+            tb._tags[t].data = values if order is None else values[order]
         return tb
 
-    def to_pandas(self) -> pd.DataFrame:
+    def to_arrays(self, unit: str = None) -> TimeBoxArrays:
+        """
+        Gets the timestamps and tag data as numpy arrays, without pandas. The file is read if it was
+        not read yet. Arrays are not copied unless the timestamps are converted to other units
+        :param unit: optional numpy datetime64 units of the timestamps, the units of the dates if None
+        :return: TimeBoxArrays named tuple like (int64 timestamps since epoch, unit, {tag_identifier: numpy array})
+        """
+        self._read_if_not_read()
+        if self._dates is None:
+            return TimeBoxArrays(timestamps=np.empty(0, dtype=np.int64), unit=unit or 'ns', data={})
+        dates = self._dates
+        if unit is not None and unit != get_units_from_dtype(dates.dtype):
+            dates = dates.astype('datetime64[{}]'.format(unit))
+        return TimeBoxArrays(
+            timestamps=dates.view(np.int64),
+            unit=get_units_from_dtype(dates.dtype),
+            data=dict([(t, self._tags[t].data) for t in self._tags])
+        )
+
+    @classmethod
+    def from_csv(cls, csv_path: str, file_path: str, index_col=0, dtypes: dict = None, delimiter: str = ',',
+                 chunk_size: int = DEFAULT_CSV_CHUNK_SIZE, epoch_units: str = None, codec_options=None):
+        """
+        Converts a CSV file with a header row and a timestamp column into a TimeBox file without
+        building a DataFrame. The CSV is parsed in chunks of chunk_size rows into typed numpy columns,
+        timestamps straight into int64 nanoseconds since epoch, and each chunk is fed to a
+        TimeBoxWriter, so memory stays bounded by the chunk size. If the rows are not in date order,
+        the whole file is read into memory and sorted instead
+        :param csv_path: path of the CSV file
+        :param file_path: path of the TimeBox file to write
+        :param index_col: name or position of the timestamp column
+        :param dtypes: optional dictionary like {column name: numpy dtype}, int64 or float64 is inferred otherwise
+        :param delimiter: field delimiter
+        :param chunk_size: number of rows parsed at a time
+        :param epoch_units: optional numpy datetime64 units of an integer epoch timestamp column,
+        timestamps are ISO 8601 strings if None
+        :param codec_options: optional CodecOptions applied to every tag
+        :return: TimeBox associated with file_path, without data read
+        """
+        from timebox.writer import TimeBoxWriter, apply_codec_options  # the writer module imports TimeBox
+
+        def open_reader():
+            return CsvChunkReader(csv_path, index_col, dtypes, delimiter, chunk_size, 'ns', epoch_units)
+
+        with open_reader() as reader:
+            tags = [TimeBoxTag(c, reader.dtypes[c].itemsize, reader.dtypes[c].kind) for c in reader.columns]
+            if codec_options is not None:
+                apply_codec_options(tags, codec_options)
+            try:
+                with TimeBoxWriter(file_path, tags, tag_names_are_strings=True, date_units='ns') as writer:
+                    for dates, data in reader:
+                        writer.append(dates, data)
+                return TimeBox(file_path)
+            except DatesNotInOrderError:
+                pass  # the rows are sorted in memory below
+
+        with open_reader() as reader:
+            chunks = list(reader)
+        started = start_stage()
+        dates = np.concatenate([c[0] for c in chunks])
+        order = np.argsort(dates, kind='mergesort')
+        end_stage(started, SORT_ROWS, csv_path, num_bytes=dates.nbytes)
+        with TimeBoxWriter(file_path, tags, tag_names_are_strings=True, date_units='ns') as writer:
+            writer.append(
+                dates[order],
+                dict([(t.identifier, np.concatenate([c[1][t.identifier] for c in chunks])[order]) for t in tags])
+            )
+        return TimeBox(file_path)
+
+    def to_pandas(self) -> 'pandas.DataFrame':
         """
-        Populates a pandas data frame and returns it.
+        Populates a pandas data frame and returns it. Tags of the same dtype are decoded straight
+        into one 2-D block that the data frame uses without copying, and the DatetimeIndex is
+        built from the decoded nanosecond timeline. Columns are in the order of the tags, when tags
+        of different dtypes are interleaved the blocks are copied to put them in that order
         :return: Pandas DataFrame
         """
-        if len([t for t in self._tags if self._tags[t].data is None]) == 0:
+        import pandas as pd  # imported on use, the rest of timebox does not need pandas
+
+        if self._dates is None and self.file_path is not None:
+            self.read(lazy=True, dates_units='ns')
+        dates = self._dates
+        if dates is None:
+            return pd.DataFrame(index=pd.DatetimeIndex([], name='DateTimes'))
+        if dates.dtype != np.dtype('datetime64[ns]'):
+            dates = dates.astype('datetime64[ns]')
+        index = pd.DatetimeIndex(dates, name='DateTimes', copy=False)
+
+        tags_by_dtype = dict()
+        for t in self._tags:
+            tags_by_dtype.setdefault(self._tags[t].dtype, []).append(t)
+        frames = []
+        for dtype in tags_by_dtype:
+            tags = tags_by_dtype[dtype]
+            # pandas holds same-dtype columns as rows of a (columns, points) block
+            block = np.empty((len(tags), self._num_points), dtype=dtype)
+            for i, t in enumerate(tags):
+                self._tags[t].decode_into(block[i])
+            frames.append(pd.DataFrame(block.T, index=index, columns=tags, copy=False))
+        if len(frames) == 0:
+            return pd.DataFrame(index=index)
+        if len(frames) == 1:
+            return frames[0]
+        df = pd.concat(frames, axis=1, copy=False)
+        return df if list(df.columns) == list(self._tags) else df[list(self._tags)]
+
+    def _read_if_not_read(self):
+        """
+        Reads the file if the TimeBox is associated with a file and its dates were not read yet
+        :return: void
+        """
+        if self._dates is None and self.file_path is not None:
             self.read()
-        data = [(t, self._tags[t].data) for t in self._tags]
-        data.append(('DateTimes', self._dates))
-        df = pd.DataFrame.from_items(data)
-        return df.set_index('DateTimes')
+        return
 
-    def read(self):
+    def read(self, lazy: bool = False, dates_units: str = None, max_memory: int = None):
         """
         This function reads the entire file contents into memory.
-        Later it can be improved to only read certain tags/dates
-        :return: dictionary of results like {tag_identifier: numpy.array}
+        Later it can be improved to only read certain tags/dates.
+        If the process-wide cache is enabled (see timebox.cache.enable_cache), decoded
+        arrays are shared through it and are read-only.
+        :param lazy: if True, only the file info and dates are read. each tag's data is read
+        and decoded from a snapshot of the file the first time it is accessed
+        :param dates_units: optional numpy datetime64 units of the dates, like 'ns'. the finer of
+        seconds and the stored units if None. must be at least as granular as the stored units
+        :param max_memory: optional number of bytes the read may allocate. the cost is estimated
+        from the file info, then the date differentials and encoded tag data are read and decoded
+        in chunks that fit the budget. MemoryBudgetExceededError is raised before the dates or
+        tag data are read if the decoded arrays alone do not fit. with lazy, only the dates count
+        towards the budget. float tags compressed without rounding in 'e' mode may differ from
+        an unbounded read in the last bits, as each chunk is accumulated from the previous value.
+        the rollup durations and virtual tags of the file are kept for the next writes, see write()
+        :return: void, populates class internals
         """
+        cache = get_cache()
         with self._get_fcntl_lock('r') as handle:
             try:
                 # read in the data
+                started = start_stage()
                 nb = self._read_file_info(handle)
-                logging.debug('Read num bytes in file info: {}'.format(nb))
+                self._read_footer(handle)
+                end_stage(started, READ_FILE_INFO, self.file_path, num_bytes=nb)
+                chunk_num_points = None if max_memory is None else self._read_chunk_num_points(max_memory, lazy)
 
-                if self._date_differentials_stored:
-                    self._read_date_deltas(handle)
+                identity = None if cache is None else file_identity(self.file_path, handle)
+                self._read_dates(handle, cache, identity, dates_units, chunk_num_points)
 
-                self._read_tag_data(handle)
+                if lazy:
+                    self._attach_lazy_tag_data(handle, cache, identity)
+                elif cache is not None:
+                    self._read_tag_data_through_cache(handle, cache, identity, chunk_num_points)
+                else:
+                    self._read_tag_data(handle, chunk_num_points=chunk_num_points)
             finally:
                 # release shared lock
                 flock(handle, LOCK_UN)
         return
 
-    def write(self):
+    def read_into(self, buffers: dict, dates_out: np.ndarray = None):
+        """
+        Reads the entire file like read(), but decodes into caller-provided arrays
+        instead of allocating new ones, so buffers can be re-used across reads.
+        Tags not present in buffers are decoded into newly allocated arrays.
+        :param buffers: dictionary like {tag_identifier: numpy.array}. each array must be 1-d,
+        have the tag's dtype and hold the file's number of points
+        :param dates_out: optional numpy array of datetime64 to decode the dates into. must hold
+        the file's number of points and have units at least as granular as the stored dates
+        :return: void, tag data and dates reference the provided arrays
+        """
+        with self._get_fcntl_lock('r') as handle:
+            try:
+                self._read_file_info(handle)
+                self._read_footer(handle)
+                for t in buffers:
+                    if t not in self._tags:
+                        raise DataDoesNotMatchTagDefinitionError('Tag {} was not found in file'.format(t))
+                    self._tags[t]._validate_output_buffer(buffers[t], self._num_points)
+                if dates_out is not None and dates_out.size != self._num_points:
+                    raise DataShapeError('Dates output buffer must have {} elements'.format(self._num_points))
+
+                if self._date_differentials_stored:
+                    self._read_date_deltas(handle, dates_out)
+                else:
+                    self._populate_uniform_dates(dates_out)
+
+                self._read_tag_data(handle, buffers)
+            finally:
+                flock(handle, LOCK_UN)
+        return
+
+    def write(self, max_memory: int = None, rollups: list = None, virtual_tags: dict = None):
         """
         writes the file out to file_name.
         requires an exclusive LOCK_EX fcntl lock.
-        blocks until it can get a lock
+        blocks until it can get a lock.
+        the new contents are written to a temporary file that then replaces file_name,
+        so readers holding the previous version (e.g. lazily read tags) keep reading it
+        :param max_memory: optional number of bytes the write may allocate on top of the data. if
+        encoding the whole file at once does not fit, the points are spooled and encoded in chunks
+        that fit through TimeBoxWriter. the file is the same as the one written at once.
+        MemoryBudgetExceededError is raised before anything is written if not even a small chunk fits
+        :param rollups: optional list of bucket durations, numpy timedelta64 or strings like '1s', '1min'
+        or '1h'. every tag is summarized in buckets of each duration and the summaries are stored in
+        the footer, see timebox.rollup. resample() answers coarser durations they divide from them.
+        the durations are kept for the next writes of this TimeBox
+        :param virtual_tags: optional dictionary like {'mid': '(bid + ask) / 2'} of named expressions of the
+        tags stored in the footer and computed on read by eval(), see timebox.expression. they are kept for
+        the next writes of this TimeBox
+        :return: void
+        """
+        if rollups is not None:
+            self._rollup_widths = rollup_widths(rollups)
+        if virtual_tags is not None:
+            from timebox.expression import validate_virtual_tags  # the expression module imports TimeBox
+
+            validate_virtual_tags(virtual_tags, list(self._tags))
+            self._virtual_tags = dict(virtual_tags)
+        if max_memory is not None:
+            chunk_num_points = self._write_chunk_num_points(max_memory)
+            if chunk_num_points < self._num_points:
+                self._write_in_chunks(chunk_num_points)
+                return
+        self._replace_file_contents(self._write_contents)
+        return
+
+    def _write_chunk_num_points(self, max_memory: int) -> int:
+        """
+        Estimates the memory a write allocates on top of the data
+        :param max_memory: number of bytes the write may allocate
+        :return: int, the number of points if the whole file can be encoded at once,
+        else the number of points to encode at a time
+        """
+        date_bytes = DATE_WRITE_NUM_BYTES_PER_POINT if self._date_differentials_stored else 0
+        costs = [_tag_write_num_bytes_per_point(self._tags[t]) for t in self._tags]
+        # encoded tag data is held until the file is written, the scratch space is shared by the tags
+        in_memory = date_bytes + sum([c[0] for c in costs]) + max([c[1] for c in costs], default=0)
+        if in_memory * self._num_points <= max_memory:
+            return self._num_points
+
+        # TimeBoxWriter encodes one tag at a time but keeps the rounding buffers of each tag
+        chunked = DATE_WRITE_NUM_BYTES_PER_POINT + sum([8 * 2 for t in self._tags
+                                                        if self._tags[t].floating_point_rounded]) \
+            + max([c[1] for c in costs], default=0)
+        chunk_num_points = max_memory // chunked
+        if chunk_num_points < min(MIN_CHUNK_NUM_POINTS, self._num_points):
+            raise MemoryBudgetExceededError('Writing {} needs about {} bytes per point, {} bytes do not fit '
+                                            '{} points'.format(self.file_path, chunked, max_memory,
+                                                               MIN_CHUNK_NUM_POINTS))
+        return int(chunk_num_points)
+
+    def _write_in_chunks(self, chunk_num_points: int):
+        """
+        Writes the file through a TimeBoxWriter, appending chunk_num_points points at a time
+        :param chunk_num_points: number of points appended and encoded at a time
+        :return: void
+        """
+        from timebox.writer import TimeBoxWriter  # the writer module imports TimeBox
+
+        if len([t for t in self._tags if self._tags[t].data is None]) > 0:
+            raise DataDoesNotMatchTagDefinitionError('Missing data')
+        if self._date_differentials_stored:
+            if self._dates is None or self._dates.size != self._num_points:
+                raise DateDataError('Dates array does not have the correct shape')
+            date_units = get_units_from_dtype(self._dates.dtype)
+        else:
+            # the uniform dates are stored, like _write_contents does
+            if self._seconds_between_points <= 0:
+                raise DateDataError('Seconds between points must be positive')
+            date_units = 's'
+            start_date = int(np.datetime64(self._start_date, 's').astype(np.int64))
+        tags = [self._tags[t].definition_copy() for t in self._tags]
+        with TimeBoxWriter(self.file_path, tags, self._tag_names_are_strings, date_units, chunk_num_points,
+                           [np.timedelta64(w, 'ns') for w in self._rollup_widths], self._virtual_tags,
+                           None if self._date_differentials_stored else self._seconds_between_points) as writer:
+            for start in range(0, self._num_points, chunk_num_points):
+                stop = min(start + chunk_num_points, self._num_points)
+                if self._date_differentials_stored:
+                    dates = self._dates[start:stop]
+                else:
+                    dates = start_date + np.arange(start, stop, dtype=np.int64) * int(self._seconds_between_points)
+                writer.append(dates, dict([(t, self._tags[t].data[start:stop]) for t in self._tags]))
+        return
+
+    def _write_contents(self, file_handle) -> int:
+        """
+        writes out the file info, date differentials, tag data and footer
+        :param file_handle: file handle object in 'wb' mode, pre-seeked to the start of the file
+        :return: int, seek bytes advanced in this method
+        """
+        # prepare datetime data
+        if self._date_differentials_stored:
+            started = start_stage()
+            self._calculate_date_differentials()
+            self._compress_date_differentials()
+            end_stage(started, ENCODE_DATES, self.file_path, num_bytes=self._date_differentials.nbytes)
+
+        started = start_stage()
+        num_bytes = self._write_file_info(file_handle)
+        end_stage(started, WRITE_FILE_INFO, self.file_path, num_bytes=num_bytes)
+
+        if self._date_differentials_stored:
+            started = start_stage()
+            date_bytes = self._write_date_deltas(file_handle)
+            end_stage(started, WRITE_DATES, self.file_path, num_bytes=date_bytes)
+            num_bytes += date_bytes
+
+        num_bytes += self._write_tag_data(file_handle)
+        started = start_stage()
+        footer_bytes = self._write_footer(file_handle)
+        end_stage(started, WRITE_FOOTER, self.file_path, num_bytes=footer_bytes)
+        return num_bytes + footer_bytes
+
+    def _replace_file_contents(self, write_contents):
+        """
+        writes new file contents to a temporary file that then replaces file_name, holding the
+        exclusive write lock. the temporary file is removed if writing fails
+        :param write_contents: function taking a file handle in 'wb' mode that writes the whole file
         :return: void
         """
         # put a file in the same directory to block new shared requests
         # this prevents a popular file from blocking forever
         # note, this is a blocking function as it waits for other write events to finish
         file_is_new = not os.path.exists(self.file_path)
+        temporary_file_name = self._temporary_file_name()
         with self._get_fcntl_lock('w') as handle:
             try:
-                # prepare datetime data
-                if self._date_differentials_stored:
-                    self._calculate_date_differentials()
-                    self._compress_date_differentials()
-
-                logging.debug('Writing file info')
-                num_bytes_in_file_info = self._write_file_info(handle)
-                logging.debug('Num bytes in file info: {}'.format(num_bytes_in_file_info))
-
-                if self._date_differentials_stored:
-                    self._write_date_deltas(handle)
-
-                self._write_tag_data(handle)
-            except (InvalidPandasDataTypeError, InvalidPandasIndexError, DateDataError, DateUnitsError,
-                    DateUnitsGranularityError, CompressionError, CompressionModeInvalidError) as e:
+                with open(temporary_file_name, 'wb') as temporary_handle:
+                    write_contents(temporary_handle)
+                os.replace(temporary_file_name, self.file_path)
+            except Exception as e:
+                if os.path.exists(temporary_file_name):
+                    os.remove(temporary_file_name)
                 if file_is_new:
                     os.remove(self.file_path)
                 raise e
@@ -204,38 +563,65 @@ class TimeBox:
         :param file_handle: file handle object in 'rb' mode that is seeked to the correct position (0)
         :return: int, seek bytes increased since file_handle was received
         """
-        self._timebox_version = read_unsigned_int(file_handle.read(1))
-        self._unpack_options(int(read_unsigned_int(file_handle.read(2))))
-        num_tags = read_unsigned_int(file_handle.read(1))
-        self._num_points = read_unsigned_int(file_handle.read(4))
-        self._num_bytes_for_tag_identifier = read_unsigned_int(file_handle.read(1))
-        bytes_seek = 1 + 2 + 1 + 4 + 1
+        from_bytes = file_handle.read(FILE_INFO_STRUCT.size)
+        num_bytes_in_file_info = self._file_info_num_bytes(from_bytes)
+        from_bytes += file_handle.read(num_bytes_in_file_info - FILE_INFO_STRUCT.size)
+        return self._parse_file_info(from_bytes)
+
+    @classmethod
+    def _file_info_num_bytes(cls, from_bytes: bytes) -> int:
+        """
+        Gets the total size of the file info from its fixed-size leading fields
+        :param from_bytes: bytes starting at the beginning of the file, at least FILE_INFO_STRUCT.size long
+        :return: int, number of bytes in the file info
+        """
+        if len(from_bytes) < FILE_INFO_STRUCT.size:
+            raise DataShapeError('File info is truncated')
+        _, options, num_tags, _, num_bytes_for_tag_identifier = FILE_INFO_STRUCT.unpack_from(from_bytes)
+        date_differentials_stored = (options >> TimeBoxOptionPositions.DATE_DIFFERENTIALS_STORED_POSITION.value) & 1
+        return FILE_INFO_STRUCT.size \
+            + num_tags * (num_bytes_for_tag_identifier + NUM_BYTES_PER_DEFINITION_WITHOUT_IDENTIFIER) \
+            + START_DATE_STRUCT.size \
+            + (DATE_DIFFERENTIAL_INFO_STRUCT.size if date_differentials_stored else UNIFORM_DATE_INFO_STRUCT.size)
+
+    def _parse_file_info(self, from_bytes: bytes) -> int:
+        """
+        Parses the file info. Populates file internals
+        :param from_bytes: bytes starting at the beginning of the file, holding at least the whole file info
+        :return: int, number of bytes parsed
+        """
+        if len(from_bytes) < self._file_info_num_bytes(from_bytes):
+            raise DataShapeError('File info is truncated')
+        self._timebox_version, options, num_tags, self._num_points, self._num_bytes_for_tag_identifier = \
+            FILE_INFO_STRUCT.unpack_from(from_bytes)
+        self._unpack_options(options)
+        bytes_seek = FILE_INFO_STRUCT.size
 
         # first 2 bytes are info on the tag
         bytes_for_tag_def = num_tags * (self._num_bytes_for_tag_identifier+NUM_BYTES_PER_DEFINITION_WITHOUT_IDENTIFIER)
         self._tags = TimeBoxTag.tag_definitions_from_bytes(
-            file_handle.read(bytes_for_tag_def),
+            from_bytes[bytes_seek:bytes_seek+bytes_for_tag_def],
             self._num_bytes_for_tag_identifier,
             self._tag_names_are_strings
         )
         bytes_seek += bytes_for_tag_def
 
-        self._start_date = np.fromfile(file_handle, dtype='datetime64[s]', count=1)[0]
-        bytes_seek += 8
+        self._start_date = np.datetime64(START_DATE_STRUCT.unpack_from(from_bytes, bytes_seek)[0], 's')
+        bytes_seek += START_DATE_STRUCT.size
 
         if self._date_differentials_stored:
             self._seconds_between_points = 0
-            self._bytes_per_date_differential = read_unsigned_int(file_handle.read(1))
-            stored_value_for_date_diff_units = read_unsigned_int(file_handle.read(2))
+            self._bytes_per_date_differential, stored_value_for_date_diff_units = \
+                DATE_DIFFERENTIAL_INFO_STRUCT.unpack_from(from_bytes, bytes_seek)
             self._date_differential_units = get_date_utils_constant_from_stored_units_int(
                 stored_value_for_date_diff_units
             )
-            bytes_seek += 3
+            bytes_seek += DATE_DIFFERENTIAL_INFO_STRUCT.size
         else:
-            self._seconds_between_points = read_unsigned_int(file_handle.read(4))
+            self._seconds_between_points = UNIFORM_DATE_INFO_STRUCT.unpack_from(from_bytes, bytes_seek)[0]
             self._bytes_per_date_differential = 0
             self._date_differential_units = 0
-            bytes_seek += 4
+            bytes_seek += UNIFORM_DATE_INFO_STRUCT.size
         return bytes_seek
 
     def _write_file_info(self, file_handle) -> int:
@@ -257,12 +643,14 @@ class TimeBox:
         tags_to_bytes_result = TimeBoxTag.tag_list_to_bytes(
             [self._tags[t] for t in sorted_tags],
             self._num_bytes_for_tag_identifier,
-            self._tag_names_are_strings
+            self._tag_names_are_strings,
+            self._buffer_pool,
+            self.file_path
         )
         file_handle.write(tags_to_bytes_result.byte_code)
         bytes_seek += tags_to_bytes_result.num_bytes
 
-        np.array([np.datetime64(self._start_date, dtype='datetime64[s]')]).tofile(file_handle)
+        np.array([np.datetime64(self._start_date, 's')]).tofile(file_handle)
         bytes_seek += 8
 
         if self._date_differentials_stored:
@@ -312,25 +700,433 @@ class TimeBox:
         seek_bytes = 0
 
         # then write out file data
-        logging.debug('Writing tag data:')
         sorted_tags = sorted([t for t in self._tags])
         for t in sorted_tags:
-            logging.debug('\tTag: {}'.format(t))
-            seek_bytes += self._tags[t].data_to_file(file_handle)
+            started = start_stage()
+            tag_bytes = self._tags[t].data_to_file(file_handle)
+            end_stage(started, WRITE_TAG, self.file_path, t, tag_bytes)
+            seek_bytes += tag_bytes
         return seek_bytes
 
-    def _read_tag_data(self, file_handle) -> int:
+    def _read_tag_data(self, file_handle, buffers: dict = None, chunk_num_points: int = None) -> int:
         """
         reads in tag data from the file handle
         :param file_handle: file handle in 'rb' mode, pre-seeked to the correct starting position
+        :param buffers: optional dictionary like {tag_identifier: numpy.array} of arrays to decode into
+        :param chunk_num_points: optional number of encoded points read and decoded at a time
         :return: int, seek bytes advanced in this method
         """
         seek_bytes = 0
+        buffers = {} if buffers is None else buffers
         sorted_tags = sorted([t for t in self._tags])
         for t in sorted_tags:
-            seek_bytes += self._tags[t].fill_data_from_file(file_handle, self._num_points)
+            seek_bytes += self._tags[t].fill_data_from_file(file_handle, self._num_points, buffers.get(t),
+                                                            chunk_num_points)
         return seek_bytes
 
+    def _read_chunk_num_points(self, max_memory: int, lazy: bool) -> int:
+        """
+        Estimates the memory a read allocates from the file info
+        :param max_memory: number of bytes the read may allocate
+        :param lazy: True if the tag data is not read
+        :return: int, number of points read and decoded at a time
+        """
+        tags = [] if lazy else [self._tags[t] for t in self._tags]
+        result_num_bytes = self._num_points * (8 + sum([np.dtype(tag.dtype).itemsize for tag in tags]))
+        if result_num_bytes > max_memory:
+            raise MemoryBudgetExceededError('Reading {} needs {} bytes for the decoded arrays, over the budget of '
+                                            '{} bytes'.format(self.file_path, result_num_bytes, max_memory))
+
+        # the encoded data of tags stored as-is is read straight into the decoded arrays
+        scratch_num_bytes_per_point = max(
+            [self._bytes_per_date_differential if self._date_differentials_stored else 0] +
+            [np.dtype(tag._encoded_dtype_and_count(self._num_points)[0]).itemsize for tag in tags
+             if tag.use_compression or tag.floating_point_rounded]
+        )
+        if scratch_num_bytes_per_point == 0:
+            return max(self._num_points, 1)
+        chunk_num_points = (max_memory - result_num_bytes) // scratch_num_bytes_per_point
+        if chunk_num_points < min(MIN_CHUNK_NUM_POINTS, self._num_points):
+            raise MemoryBudgetExceededError('Reading {} needs {} bytes for the decoded arrays, {} bytes left of the '
+                                            'budget of {} bytes do not fit {} points of encoded data'.format(
+                                                self.file_path, result_num_bytes, max_memory - result_num_bytes,
+                                                max_memory, MIN_CHUNK_NUM_POINTS))
+        return max(int(chunk_num_points), 1)
+
+    def _read_dates(self, file_handle, cache: DecodedArrayCache = None, identity: tuple = None,
+                    dates_units: str = None, chunk_num_points: int = None):
+        """
+        Reads the date differentials, if stored, and populates the dates array,
+        taking the dates from the cache when possible. Date differentials are not
+        populated when the dates come from the cache.
+        :param file_handle: file handle in 'rb' mode, pre-seeked to the end of the file info
+        :param cache: optional DecodedArrayCache to read through
+        :param identity: file identity used in cache keys, required if cache is provided
+        :param dates_units: optional numpy datetime64 units to decode the dates in. the cache,
+        which holds dates in the default units, is not used if set
+        :param chunk_num_points: optional number of date differentials read and decoded at a time
+        :return: void
+        """
+        if dates_units is not None:
+            dates_out = np.empty(self._num_points, dtype='datetime64[{}]'.format(dates_units))
+            if self._date_differentials_stored:
+                self._read_date_deltas(file_handle, dates_out, chunk_num_points)
+            else:
+                self._populate_uniform_dates(dates_out)
+            return
+
+        dates = None if cache is None else cache.get(identity + (DATES_CACHE_TAG,))
+        if dates is not None:
+            self._dates = dates
+            self._date_differentials = None
+            if self._date_differentials_stored:
+                file_handle.seek((self._num_points - 1) * self._bytes_per_date_differential, os.SEEK_CUR)
+            return
+
+        if self._date_differentials_stored:
+            self._read_date_deltas(file_handle, chunk_num_points=chunk_num_points)
+        else:
+            self._populate_uniform_dates()
+        if cache is not None:
+            cache.put(identity + (DATES_CACHE_TAG,), self._dates)
+        return
+
+    def _read_tag_data_through_cache(self, file_handle, cache: DecodedArrayCache, identity: tuple,
+                                     chunk_num_points: int = None):
+        """
+        Reads the tag data, taking decoded arrays from the cache when possible
+        and putting newly decoded arrays into it. Cached arrays are read-only.
+        :param file_handle: file handle in 'rb' mode, pre-seeked to the start of the tag data
+        :param cache: DecodedArrayCache to read through
+        :param identity: file identity used in cache keys
+        :param chunk_num_points: optional number of encoded points read and decoded at a time
+        :return: void
+        """
+        sorted_tags = sorted([t for t in self._tags])
+        for t in sorted_tags:
+            tag = self._tags[t]
+            data = cache.get(identity + (t,))
+            if data is not None:
+                file_handle.seek(tag.encoded_num_bytes(self._num_points), os.SEEK_CUR)
+                tag.num_points = self._num_points
+                tag.data = data
+            else:
+                tag.fill_data_from_file(file_handle, self._num_points, chunk_num_points=chunk_num_points)
+                cache.put(identity + (t,), tag.data)
+        return
+
+    def _attach_lazy_tag_data(self, file_handle, cache: DecodedArrayCache = None, identity: tuple = None):
+        """
+        Points each tag at its data in a snapshot of the file instead of reading it.
+        Tags found in the cache are populated right away
+        :param file_handle: file handle in 'rb' mode, pre-seeked to the start of the tag data
+        :param cache: optional DecodedArrayCache to read through
+        :param identity: file identity used in cache keys, required if cache is provided
+        :return: void
+        """
+        snapshot = FileSnapshot(file_handle)
+        offset = file_handle.tell()
+        sorted_tags = sorted([t for t in self._tags])
+        for t in sorted_tags:
+            tag = self._tags[t]
+            cache_key = None if cache is None else identity + (t,)
+            data = None if cache is None else cache.get(cache_key)
+            if data is not None:
+                tag.num_points = self._num_points
+                tag.data = data
+            else:
+                tag.set_lazy_source(snapshot, offset, self._num_points, cache_key)
+            offset += tag.encoded_num_bytes(self._num_points)
+        return
+
+    def _footer_sections(self) -> list:
+        """
+        Gets the sections written to the file footer
+        :return: list of FooterSection
+        """
+        sections = []
+        if self._date_differentials_stored:
+            sections.append(end_date_section(int(np.sum(self._date_differentials, dtype=np.uint64))))
+            if self._start_date_remainder > 0:
+                sections.append(start_date_remainder_section(self._start_date_remainder))
+            sections.append(block_dates_section(block_date_offsets(self._date_differentials)))
+        for i, t in enumerate(sorted(self._tags)):
+            sections.append(block_statistics_section(i, self._tags[t].block_statistics(
+                buffer_pool=self._buffer_pool)))
+        for i, t in enumerate(sorted(self._tags)):
+            if self._tags[t].use_compression and self._tags[t]._compression_mode == 'e':
+                sections.append(last_value_section(i, self._tags[t].last_value(self._buffer_pool)))
+                sections.append(checkpoints_section(i, self._tags[t].checkpoints(buffer_pool=self._buffer_pool)))
+        if len(self._rollup_widths) > 0:
+            sections.extend(self._rollup_sections())
+        for name in sorted(self._virtual_tags):
+            sections.append(virtual_tag_section(name, self._virtual_tags[name]))
+        return sections
+
+    def _rollup_sections(self) -> list:
+        """
+        Summarizes every tag in buckets of each rollup duration
+        :return: list of FooterSection
+        """
+        if self._date_differentials_stored:
+            date_units = get_units_from_dtype(self._dates.dtype)
+            dates = self._dates.view(np.int64)
+        else:
+            date_units = 's'
+            dates = int(self._start_date.astype('datetime64[s]').astype(np.int64)) + \
+                np.arange(self._num_points, dtype=np.int64) * int(self._seconds_between_points)
+        sections = []
+        for i, t in enumerate(sorted(self._tags)):
+            for width in self._rollup_widths:
+                labels, statistics = self._tags[t].rollup(
+                    dates, frequency_to_units(np.timedelta64(width, 'ns'), date_units), self._buffer_pool
+                )
+                sections.append(rollup_section(i, width, labels, statistics))
+        return sections
+
+    def _write_footer(self, file_handle) -> int:
+        """
+        writes out the footer after the tag data
+        :param file_handle: file handle object in 'wb' mode, pre-seeked to the end of the tag data
+        :return: int, seek bytes advanced in this method
+        """
+        footer_bytes = footer_to_bytes(self._footer_sections())
+        file_handle.write(footer_bytes)
+        return len(footer_bytes)
+
+    def _read_footer(self, file_handle):
+        """
+        Reads the footer sections that change how the dates and tags are read, and the rollup
+        durations and virtual tags that write() keeps
+        :param file_handle: file handle in 'rb' mode, its position is not changed
+        :return: void
+        """
+        sections = self._read_footer_sections(file_handle.fileno(), os.fstat(file_handle.fileno()).st_size)
+        self._apply_start_date_remainder(sections)
+        self._rollup_widths = sorted(set([ROLLUP_HEADER_STRUCT.unpack_from(s.payload)[0] for s in sections
+                                          if s.section_type == TimeBoxFooterSectionTypes.ROLLUP]))
+        self._virtual_tags = dict([virtual_tag_from_section(s) for s in sections
+                                   if s.section_type == TimeBoxFooterSectionTypes.VIRTUAL_TAG])
+        return
+
+    def _apply_start_date_remainder(self, sections: list):
+        """
+        Adds the part of the first date finer than a second, which the file info cannot hold, to the
+        start date. Files written without a footer start at the whole second
+        :param sections: list of FooterSection of the file
+        :return: void
+        """
+        self._start_date_remainder = 0
+        if not self._date_differentials_stored:
+            return
+        for s in sections:
+            if s.section_type == TimeBoxFooterSectionTypes.START_DATE_REMAINDER:
+                self._start_date_remainder = START_DATE_REMAINDER_STRUCT.unpack(s.payload)[0]
+        if self._start_date_remainder > 0:
+            self._start_date = self._start_date + np.timedelta64(
+                self._start_date_remainder, get_unit_data(self._date_differential_units).units
+            )
+        return
+
+    @classmethod
+    def _read_footer_sections(cls, fd: int, file_size: int, leading_bytes: bytes = b'') -> list:
+        """
+        Reads the footer sections of a file
+        :param fd: file descriptor open for reading
+        :param file_size: size of the file in bytes
+        :param leading_bytes: bytes already read from the start of the file, used instead of reading
+        again if they cover the whole file
+        :return: list of FooterSection, empty if the file has no footer
+        """
+        if len(leading_bytes) >= file_size:
+            footer_num_bytes = footer_num_bytes_from_trailer(leading_bytes[:file_size])
+            return sections_from_bytes(leading_bytes[file_size-footer_num_bytes:file_size]) \
+                if footer_num_bytes > 0 else []
+        footer_num_bytes = footer_num_bytes_from_trailer(
+            os.pread(fd, TRAILER_STRUCT.size, max(file_size - TRAILER_STRUCT.size, 0))
+        )
+        if footer_num_bytes == 0:
+            return []
+        return sections_from_bytes(os.pread(fd, footer_num_bytes, file_size - footer_num_bytes))
+
+    @classmethod
+    def info(cls, file_path: str) -> TimeBoxInfo:
+        """
+        Reads only the file info and footer of a TimeBox file. The file info is
+        read with a single pread, and no data is decoded. Because write() replaces
+        files instead of re-writing them, no lock is taken.
+        :param file_path: path of the TimeBox file
+        :return: TimeBoxInfo named-tuple
+        """
+        tb = TimeBox(file_path)
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            file_size = os.fstat(fd).st_size
+            from_bytes = os.pread(fd, FILE_INFO_READ_NUM_BYTES, 0)
+            num_bytes_in_file_info = tb._file_info_num_bytes(from_bytes)
+            if len(from_bytes) < num_bytes_in_file_info:
+                from_bytes += os.pread(fd, num_bytes_in_file_info - len(from_bytes), len(from_bytes))
+            tb._parse_file_info(from_bytes)
+            footer_sections = tb._read_footer_sections(fd, file_size, from_bytes)
+            tb._apply_start_date_remainder(footer_sections)
+
+            if not tb._date_differentials_stored:
+                date_units = 's'
+                end_date = tb._start_date + np.timedelta64(
+                    max(tb._num_points - 1, 0) * int(tb._seconds_between_points), 's'
+                )
+            else:
+                date_units = get_unit_data(tb._date_differential_units).units
+                end_sections = [f for f in footer_sections if f.section_type == TimeBoxFooterSectionTypes.END_DATE]
+                if len(end_sections) > 0:
+                    num_date_units = END_DATE_STRUCT.unpack(end_sections[0].payload)[0]
+                else:
+                    # files written without a footer, sum the stored differentials
+                    date_differentials = np.frombuffer(
+                        os.pread(fd, max(tb._num_points - 1, 0) * tb._bytes_per_date_differential,
+                                 num_bytes_in_file_info),
+                        dtype=get_numpy_type('u', 8 * tb._bytes_per_date_differential)
+                    )
+                    num_date_units = int(np.sum(date_differentials, dtype=np.uint64))
+                end_date = tb._start_date + np.timedelta64(num_date_units, date_units)
+        finally:
+            os.close(fd)
+
+        return TimeBoxInfo(
+            file_path=file_path,
+            file_size=file_size,
+            timebox_version=tb._timebox_version,
+            num_points=tb._num_points,
+            tag_names_are_strings=tb._tag_names_are_strings,
+            date_differentials_stored=tb._date_differentials_stored,
+            date_units=date_units,
+            seconds_between_points=tb._seconds_between_points,
+            start_date=tb._start_date,
+            end_date=end_date,
+            tags=dict([(t, tb._tags[t].info(tb._num_points)) for t in sorted(tb._tags)])
+        )
+
+    def describe(self, estimate_alternatives: bool = True):
+        """
+        Describes how each tag of the file is stored, with the time to read and decode it and
+        the size it would take under the other lossless codecs, see timebox.describe.describe_file
+        :param estimate_alternatives: if True, each tag is re-encoded under each alternative codec
+        :return: TimeBoxDescription named-tuple
+        """
+        from timebox.describe import describe_file  # the describe module imports TimeBox
+
+        return describe_file(self.file_path, estimate_alternatives)
+
+    def aggregate(self, tags: list, start=None, end=None, funcs: list = None) -> dict:
+        """
+        Aggregates tags of the file over the points dated from start to end, both included, from the
+        block statistics in the footer where possible, see timebox.aggregate.aggregate_file
+        :param tags: list of tag identifiers
+        :param start: optional first date, like numpy.datetime64('2018-01-01') or '2018-01-01T00:00'
+        :param end: optional last date
+        :param funcs: optional list of 'min', 'max', 'sum', 'count', 'mean', 'first' and 'last', all if None
+        :return: dictionary like {tag_identifier: {func: value}}
+        """
+        from timebox.aggregate import aggregate_file  # the aggregate module imports TimeBox
+
+        return aggregate_file(self.file_path, tags, start, end, funcs)
+
+    def resample(self, tag, rule, how: list = None, start=None, end=None) -> TimeBoxArrays:
+        """
+        Resamples a tag of the file into buckets of a fixed duration, decoding the points dated from
+        start to end chunk by chunk, see timebox.resample.resample_file
+        :param tag: tag identifier
+        :param rule: bucket duration, numpy timedelta64 or string like '1s', '5min' or '1h'
+        :param how: optional list of 'open', 'high', 'low', 'close', 'sum' and 'count', all if None
+        :param start: optional first date, like numpy.datetime64('2018-01-01') or '2018-01-01T00:00'
+        :param end: optional last date
+        :return: TimeBoxArrays named tuple like (int64 start of each bucket since epoch, unit, {function: numpy array})
+        """
+        from timebox.resample import resample_file  # the resample module imports TimeBox
+
+        return resample_file(self.file_path, tag, rule, how, start, end)
+
+    def value_at(self, date, tags: list = None) -> TimeBoxArrays:
+        """
+        Gets the point of the file dated at or just before a date, see timebox.lookup.value_at
+        :param date: numpy datetime64, or anything numpy.datetime64 parses, like '2018-01-01T00:00'
+        :param tags: optional list of tag identifiers, all tags if None
+        :return: TimeBoxArrays named tuple like (int64 date since epoch, unit, {tag_identifier: numpy array}) with one
+        point, or none if date is before the first point
+        """
+        from timebox.lookup import value_at  # the lookup module imports TimeBox
+
+        return value_at(self.file_path, date, tags)
+
+    def tail(self, num_points: int, tags: list = None) -> TimeBoxArrays:
+        """
+        Gets the last points of the file without decoding the rest of it, see timebox.lookup.tail
+        :param num_points: number of points
+        :param tags: optional list of tag identifiers, all tags if None
+        :return: TimeBoxArrays named tuple like (int64 dates since epoch, unit, {tag_identifier: numpy array})
+        """
+        from timebox.lookup import tail  # the lookup module imports TimeBox
+
+        return tail(self.file_path, num_points, tags)
+
+    def asof_join(self, right: str, tags: list, tolerance=None, left_tags: list = None, start=None, end=None,
+                  fill_value=None) -> TimeBoxArrays:
+        """
+        Joins the points of the file with the last point of another file dated at or before them,
+        decoding both files chunk by chunk, see timebox.join.asof_join
+        :param right: path of the TimeBox file whose tags are joined
+        :param tags: list of the right file's tag identifiers to join
+        :param tolerance: optional largest distance back to the right point, like '1s' or numpy.timedelta64(5, 'm')
+        :param left_tags: optional list of this file's tag identifiers to keep, all of them if None
+        :param start: optional first date, like numpy.datetime64('2018-01-01') or '2018-01-01T00:00'
+        :param end: optional last date
+        :param fill_value: optional value of the joined tags at unmatched points, NaN if None
+        :return: TimeBoxArrays named tuple like (int64 dates since epoch, unit, {tag_identifier: numpy array})
+        """
+        from timebox.join import asof_join  # the join module imports TimeBox
+
+        return asof_join(self.file_path, right, tags, tolerance, left_tags, start, end, fill_value)
+
+    def where(self, predicate: str, tags: list = None, start=None, end=None) -> TimeBoxArrays:
+        """
+        Finds the points of the file matching a predicate like "price > 100 and volume >= 10",
+        skipping the blocks whose statistics cannot match, see timebox.where.where_file
+        :param predicate: comparisons of tags with numbers, combined with and, or and parentheses
+        :param tags: optional list of tag identifiers to return, all tags if None
+        :param start: optional first date, like numpy.datetime64('2018-01-01') or '2018-01-01T00:00'
+        :param end: optional last date
+        :return: TimeBoxArrays named tuple like (int64 dates since epoch, unit, {tag_identifier: numpy array})
+        """
+        from timebox.where import where_file  # the where module imports TimeBox
+
+        return where_file(self.file_path, predicate, tags, start, end)
+
+    def explain(self, predicate: str, start=None, end=None):
+        """
+        Tells how many blocks where decodes and skips for a predicate, see timebox.where.explain_where
+        :param predicate: comparisons of tags with numbers, combined with and, or and parentheses
+        :param start: optional first date
+        :param end: optional last date
+        :return: WhereExplanation named tuple like (predicate, num_blocks, scanned_blocks, skipped_blocks,
+        scanned_points)
+        """
+        from timebox.where import explain_where  # the where module imports TimeBox
+
+        return explain_where(self.file_path, predicate, start, end)
+
+    def eval(self, expression: str, start=None, end=None) -> TimeBoxArrays:
+        """
+        Evaluates an expression like "(bid + ask) / 2" of the file's tags, decoding them chunk by chunk,
+        see timebox.expression.eval_file
+        :param expression: tags and virtual tags of the file and numbers with +, -, *, / and parentheses
+        :param start: optional first date, like numpy.datetime64('2018-01-01') or '2018-01-01T00:00'
+        :param end: optional last date
+        :return: TimeBoxArrays named tuple like (int64 dates since epoch, unit, {expression: float64 numpy array})
+        """
+        from timebox.expression import eval_file  # the expression module imports TimeBox
+
+        return eval_file(self.file_path, expression, start, end)
+
     def _write_date_deltas(self, file_handle) -> int:
         """
         writes out the date differentials
@@ -340,38 +1136,90 @@ class TimeBox:
         self._date_differentials.tofile(file_handle)
         return self._date_differentials.nbytes
 
-    def _read_date_deltas(self, file_handle) -> int:
+    def _read_date_deltas(self, file_handle, dates_out: np.ndarray = None, chunk_num_points: int = None) -> int:
         """
         reads the date differentials
         :param file_handle: file handle object in 'rb' mode, pre-seeked to the correct position
+        :param dates_out: optional datetime64 array to decode the dates into
+        :param chunk_num_points: optional number of differentials read and decoded at a time. the
+        differentials are not kept if they are read in more than one chunk
         :return: int, seek bytes advanced in this method
         """
-        self._date_differentials = np.fromfile(
-            file_handle,
-            dtype=get_numpy_type('u', 8 * self._bytes_per_date_differential),
-            count=self._num_points-1
-        )
-
         # populate dates array
         unit_data = get_unit_data(self._date_differential_units)
-        data_type = np.dtype('timedelta64[{}]'.format(unit_data.units))
-        cumulative_time_deltas = np.cumsum(self._date_differentials.astype(data_type))
-        dates = cumulative_time_deltas + self._start_date
-        self._dates = np.insert(dates, 0, self._start_date)
-        return self._date_differentials.nbytes
+        if dates_out is None:
+            dates_units = units_by_order[min(unit_data.order, SECONDS)]
+            dates_out = np.empty(self._num_points, dtype='datetime64[{}]'.format(dates_units))
+        dates_units = get_units_from_dtype(dates_out.dtype)
+        multiplier = get_conversion_multiplier(unit_data.units, dates_units)
+        if multiplier < 1:
+            raise DateUnitsError('Dates output units {} are less granular than the '
+                                 'stored units {}'.format(dates_units, unit_data.units))
+
+        # accumulate the deltas as integers in the output units, each chunk from the last date decoded
+        int_dates = dates_out.view(np.int64)
+        int_dates[0] = self._start_date.astype(dates_out.dtype).astype(np.int64)
+        num_differentials = self._num_points - 1
+        chunk_num_points = num_differentials if chunk_num_points is None else chunk_num_points
+        num_bytes = 0
+        differentials = None
+        for start in range(0, max(num_differentials, 1), max(chunk_num_points, 1)):
+            stop = min(start + chunk_num_points, num_differentials)
+            started = start_stage()
+            differentials = np.fromfile(
+                file_handle,
+                dtype=get_numpy_type('u', 8 * self._bytes_per_date_differential),
+                count=stop - start
+            )
+            end_stage(started, READ_DATES, self.file_path, num_bytes=differentials.nbytes)
+            num_bytes += differentials.nbytes
+
+            started = start_stage()
+            chunk_dates = int_dates[start + 1:stop + 1]
+            np.cumsum(differentials, dtype=np.int64, out=chunk_dates)
+            if multiplier != 1:
+                np.multiply(chunk_dates, int(multiplier), out=chunk_dates)
+            np.add(chunk_dates, int_dates[start], out=chunk_dates)
+            end_stage(started, DECODE_DATES, self.file_path,
+                      num_bytes=(chunk_dates.size + (1 if start == 0 else 0)) * dates_out.itemsize)
+        self._date_differentials = differentials if chunk_num_points >= num_differentials else None
+        self._dates = dates_out
+        return num_bytes
+
+    def _populate_uniform_dates(self, dates_out: np.ndarray = None):
+        """
+        Populates the dates array from the start date and seconds between points,
+        used when date differentials are not stored
+        :param dates_out: optional datetime64 array to fill with the dates
+        :return: void
+        """
+        if dates_out is None:
+            dates_out = np.empty(self._num_points, dtype='datetime64[s]')
+        dates_units = get_units_from_dtype(dates_out.dtype)
+        multiplier = get_conversion_multiplier('s', dates_units)
+        if multiplier < 1:
+            raise DateUnitsError('Dates output units {} are less granular than seconds'.format(dates_units))
+
+        started = start_stage()
+        int_dates = dates_out.view(np.int64)
+        int_dates.fill(int(self._seconds_between_points * multiplier))
+        if int_dates.size > 0:
+            int_dates[0] = self._start_date.astype(dates_out.dtype).astype(np.int64)
+        np.cumsum(int_dates, out=int_dates)
+        self._dates = dates_out
+        end_stage(started, DECODE_DATES, self.file_path, num_bytes=dates_out.nbytes)
+        return
 
     def _calculate_date_differentials(self):
         """
         Calculates the date differentials array from the _dates array
         :return: void
         """
-        logging.debug('Calculating date differentials')
         self._start_date = np.amin(self._dates)
         differences = np.ediff1d(self._dates)
-        logging.debug('Date differences: {}'.format(differences))
         # ensure that the dates are sorted
         if np.amin(differences).astype(np.int64) < 0:
-            raise DateDataError('Dates were not in order')
+            raise DatesNotInOrderError('Dates were not in order')
         self._date_differentials = differences
         return
 
@@ -381,18 +1229,19 @@ class TimeBox:
         then the actual array is compressed
         :return: void
         """
-        logging.debug('Compressing date differentials')
-        result = compress_time_delta_array(self._date_differentials)
-        logging.debug('Compressed time delta array: {}'.format(result))
+        # the file info holds the start date in whole seconds, the units must also divide the rest of it
+        remainder = int((self._start_date - np.datetime64(self._start_date, 's'))
+                        .astype(self._date_differentials.dtype).astype(np.int64))
+        result = compress_time_delta_array(self._date_differentials, remainder)
+        self._start_date_remainder = remainder // int(get_conversion_multiplier(
+            result[1], get_units_from_dtype(self._date_differentials.dtype)
+        ))
         unit_data = get_unit_data(result[1])
         self._date_differential_units = unit_data.order
         max_diff = np.amax(result[0])
         bytes_needed = determine_required_bytes_unsigned_integer(max_diff)
         self._date_differentials = result[0].astype(get_numpy_type('u', 8 * bytes_needed))
         self._bytes_per_date_differential = bytes_needed
-        logging.debug('Date differentials:\n{}'.format(self._date_differentials))
-        logging.debug('Date units:\n{}'.format(self._date_differential_units))
-        logging.debug('Bytes per date diff:\n{}'.format(self._bytes_per_date_differential))
         return
 
     def _blocking_file_name(self) -> str:
@@ -402,6 +1251,13 @@ class TimeBox:
         """
         return '{}.lock'.format(self.file_path)
 
+    def _temporary_file_name(self) -> str:
+        """
+        returns the name of the file that new contents are written to before replacing the file
+        :return: file name of temporary file
+        """
+        return '{}.tmp'.format(self.file_path)
+
     def _get_fcntl_lock(self, mode: str = 'r'):
         """
         gets a lock of type 'w' (writing) or 'r' (reading). throws error if can't get lock in time
@@ -412,11 +1268,12 @@ class TimeBox:
         """
         if mode not in ['r', 'w']:
             raise ValueError('Could not get fcntl lock because mode specified was invalid: {}'.format(mode))
+        started = start_stage()
         block_file_name = self._blocking_file_name()
         count = 0
         sleep_seconds = 0.1
         file_locked = False
-        handle = open(self.file_path, 'rb' if mode is 'r' else 'wb')
+        handle = open(self.file_path, 'rb' if mode == 'r' else 'ab')  # writers replace the file, never truncate it
         if mode == 'r':
             # check and see if a blocking file exists, meaning we're waiting for a write job to clear
             # then try to get the lock
@@ -452,4 +1309,5 @@ class TimeBox:
         if not file_locked:
             handle.close()
             raise CouldNotAcquireFileLockError
+        end_stage(started, LOCK_WAIT, self.file_path)
         return handle
@@ -1,10 +1,16 @@
 import numpy as np
-import logging
 from collections import namedtuple
 from typing import Union
 from timebox.utils.numpy_utils import get_numpy_type, get_type_char_char,\
-    get_type_char_int, compress_array, decompress_array
-from timebox.exceptions import TagIdentifierByteRepresentationError
+    get_type_char_int, compress_array, decompress_array, round_array_returning_integers
+from timebox.utils.buffer_pool import BufferPool
+from timebox.file_snapshot import FileSnapshot
+from timebox.cache import get_cache
+from timebox.instrumentation import start_stage, end_stage, READ_TAG, DECODE_TAG, ENCODE_TAG
+from timebox.block_statistics import compute_block_statistics, BLOCK_NUM_POINTS
+from timebox.rollup import BucketStatistics, ROLLUP_CHUNK_NUM_POINTS
+from timebox.exceptions import TagIdentifierByteRepresentationError, DataDoesNotMatchTagDefinitionError, \
+    DataShapeError
 from timebox.utils.exceptions import NotIntegerException
 from timebox.utils.validation import ensure_int
 from timebox.constants import TimeBoxTagOptionPositions
@@ -12,6 +18,10 @@ from math import pow
 
 
 NumBytesByteCodeTuple = namedtuple('TagToBytesResult', ['num_bytes', 'byte_code'])
+LazyDataSource = namedtuple('LazyDataSource', ['snapshot', 'offset', 'cache_key'])
+TagInfo = namedtuple('TagInfo', ['identifier', 'dtype', 'use_compression', 'compression_mode', 'compressed_dtype',
+                                 'compression_reference_value', 'floating_point_rounded', 'num_decimals_to_store',
+                                 'num_bytes'])
 NUM_BYTES_PER_DEFINITION_WITHOUT_IDENTIFIER = 40
 
 
@@ -34,7 +44,8 @@ class TimeBoxTag:
             self.bytes_per_value * 8
         )
         self.num_bytes_extra_information = 0
-        self.data = None
+        self._data = None
+        self._lazy_source = None  # LazyDataSource, set when data is decoded on first access
         self._encoded_data = None
         self.num_points = None
 
@@ -60,13 +71,115 @@ class TimeBoxTag:
             self._decode_def_bytes(untyped_bytes)
         return
 
-    def info_to_bytes(self, num_bytes_for_tag_identifier: int, tag_identifier_is_string: bool) -> NumBytesByteCodeTuple:
+    def definition_copy(self):
+        """
+        Copies the tag definition and encoding options, without data or encoded data
+        :return: TimeBoxTag
+        """
+        tag = TimeBoxTag(self.identifier, self.bytes_per_value, self.type_char, options=self._encode_options())
+        tag._compression_mode = self._compression_mode
+        tag.num_decimals_to_store = self.num_decimals_to_store
+        return tag
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        The decoded data of the tag. If the tag was read lazily, the data is read
+        from the file snapshot and decoded on first access
+        :return: numpy array
+        """
+        if self._data is None and self._lazy_source is not None:
+            self._read_lazy_data()
+        return self._data
+
+    @data.setter
+    def data(self, value: np.ndarray):
+        self._data = value
+        self._lazy_source = None
+        return
+
+    def set_lazy_source(self, snapshot: FileSnapshot, offset: int, num_points: int, cache_key=None):
+        """
+        Defers reading and decoding the tag data until the data is first accessed
+        :param snapshot: FileSnapshot of the file holding the tag data
+        :param offset: byte offset of the tag data from the start of the file
+        :param num_points: number of points in the file
+        :param cache_key: optional key used to put the decoded data into the process-wide cache
+        :return: void
+        """
+        self._data = None
+        self._encoded_data = None
+        self.num_points = num_points
+        self._lazy_source = LazyDataSource(snapshot=snapshot, offset=offset, cache_key=cache_key)
+        return
+
+    def decode_into(self, out: np.ndarray):
+        """
+        Decodes the tag data into a caller-provided array. If the tag was read lazily and
+        its data has not been accessed yet, the data is decoded straight into out without
+        populating data
+        :param out: array with the tag's dtype and num_points elements
+        :return: out
+        """
+        self._validate_output_buffer(out, self.num_points if self._data is None else self._data.size)
+        if self._data is None and self._lazy_source is not None:
+            self._read_lazy_data(out)
+        else:
+            np.copyto(out, self.data)
+        return out
+
+    def _read_lazy_data(self, out: np.ndarray = None):
+        """
+        Reads and decodes the tag data from the lazy source
+        :param out: optional array to decode into instead of populating data. data decoded
+        into out is not cached and the tag stays lazy
+        :return: void, populates data if out is None
+        """
+        source = self._lazy_source
+        file_path = source.snapshot.file_path
+        read_dtype, read_num_points = self._encoded_dtype_and_count(self.num_points)
+        started = start_stage()
+        if out is not None:
+            if not self.use_compression and not self.floating_point_rounded and out.flags.c_contiguous:
+                source.snapshot.read_into(source.offset, out)
+                end_stage(started, READ_TAG, file_path, self.identifier, out.nbytes)
+            else:
+                encoded = source.snapshot.read_array(source.offset, read_dtype, read_num_points)
+                end_stage(started, READ_TAG, file_path, self.identifier, encoded.nbytes)
+                started = start_stage()
+                self._decode_encoded_array(encoded, out)
+                end_stage(started, DECODE_TAG, file_path, self.identifier, out.nbytes)
+            return
+
+        self._encoded_data = source.snapshot.read_array(source.offset, read_dtype, read_num_points)
+        end_stage(started, READ_TAG, file_path, self.identifier, self._encoded_data.nbytes)
+        started = start_stage()
+        self._decode_data()
+        end_stage(started, DECODE_TAG, file_path, self.identifier, self._data.nbytes)
+        self._lazy_source = None
+        cache = get_cache()
+        if source.cache_key is not None and cache is not None:
+            cache.put(source.cache_key, self._data)
+        return
+
+    def info_to_bytes(self, num_bytes_for_tag_identifier: int, tag_identifier_is_string: bool,
+                      buffer_pool: BufferPool = None, file_path: str = None) -> NumBytesByteCodeTuple:
         """
         Sends the tag definition to binary form.
         :param num_bytes_for_tag_identifier: number of bytes used in the unsigned int or unicode tag identifier
         :param tag_identifier_is_string: if True, tag identifier will be treated as 4-byte unicode. if False, int
+        :param buffer_pool: optional BufferPool used to hold the encoded data
+        :param file_path: optional path of the file being written, reported to the instrumentation
         :return: namedtuple TagToBytesResult like ('num_bytes', 'byte_code')
         """
+        if self.data is not None:
+            # a tag without data, like one written by TimeBoxWriter, keeps its encoding options as set.
+            # encoding may turn compression off, so it runs before the options are encoded
+            started = start_stage()
+            self._encoded_data = None
+            self.encode_data(buffer_pool)
+            end_stage(started, ENCODE_TAG, file_path, self.identifier, self._encoded_data.nbytes)
+
         options = np.uint16(self._encode_options())
         info = np.array(
             [(
@@ -82,13 +195,6 @@ class TimeBoxTag:
                 exclude_trailing_bytes=True
             )
         )
-        logging.debug('Sending tag "{}" info to bytes.'.format(self.identifier))
-        logging.debug('Bytes per value: {}'.format(self.bytes_per_value))
-        logging.debug('Type char: {}'.format(self.type_char))
-        logging.debug('Num bytes extra info: {}'.format(self.num_bytes_extra_information))
-
-        self._encoded_data = None
-        self.encode_data()
 
         def_bytes = self._encode_def_bytes()
         ret_bytes = info.tobytes() + def_bytes
@@ -105,28 +211,144 @@ class TimeBoxTag:
         self._encoded_data.tofile(file_handle)
         return self._encoded_data.nbytes
 
-    def fill_data_from_file(self, file_handle, num_points: int) -> int:
+    def fill_data_from_file(self, file_handle, num_points: int, out: np.ndarray = None,
+                            chunk_num_points: int = None) -> int:
         """
         reads in tag data from file handle
         :param file_handle: file handle in 'rb' mode at correct seek position
         :param num_points: number of points to extract from the file
+        :param out: optional pre-allocated array with the tag's dtype and num_points elements to decode into
+        :param chunk_num_points: optional number of encoded points read and decoded at a time, so that
+        only one chunk of encoded data is held in memory. data stored as-is is always read in one go
         :return: int, num bytes read from file
         """
         self.num_points = num_points
-        read_num_points = num_points
-        read_dtype = self.dtype
-        if self.use_compression:
-            read_dtype = get_numpy_type(self._compressed_type_char, self._compressed_bytes_per_value * 8)
-            if self._compression_mode == 'e':
-                read_num_points -= 1
+        if out is not None:
+            self._validate_output_buffer(out, num_points)
+        read_dtype, read_num_points = self._encoded_dtype_and_count(num_points)
+        if chunk_num_points is not None and read_num_points > chunk_num_points \
+                and (self.use_compression or self.floating_point_rounded):
+            return self._fill_data_from_file_in_chunks(file_handle, num_points, out, chunk_num_points)
+
+        started = start_stage()
+        if out is not None and not self.use_compression and not self.floating_point_rounded \
+                and out.flags.c_contiguous:
+            # stored as-is, read the bytes straight into the caller's buffer
+            num_bytes_read = file_handle.readinto(out.view(np.uint8))
+            if num_bytes_read != out.nbytes:
+                raise DataShapeError('Could not read {} bytes for tag {}, only {} bytes '
+                                     'found'.format(out.nbytes, self.identifier, num_bytes_read))
+            self._encoded_data = out
+            self.data = out
+            end_stage(started, READ_TAG, file_handle.name, self.identifier, num_bytes_read)
+            return num_bytes_read
+
         self._encoded_data = np.fromfile(
             file_handle,
             read_dtype,
             count=read_num_points
         )
-        self._decode_data()
+        end_stage(started, READ_TAG, file_handle.name, self.identifier, self._encoded_data.nbytes)
+        started = start_stage()
+        self._decode_data(out)
+        end_stage(started, DECODE_TAG, file_handle.name, self.identifier, self._data.nbytes)
         return self._encoded_data.nbytes
 
+    def _fill_data_from_file_in_chunks(self, file_handle, num_points: int, out: np.ndarray,
+                                       chunk_num_points: int) -> int:
+        """
+        reads in compressed or rounded tag data chunk by chunk, decoding each chunk into its
+        slice of the output array. 'e' mode chunks start from the last value decoded
+        :param file_handle: file handle in 'rb' mode at correct seek position
+        :param num_points: number of points to extract from the file
+        :param out: optional pre-allocated array with the tag's dtype and num_points elements to decode into
+        :param chunk_num_points: number of encoded points read and decoded at a time
+        :return: int, num bytes read from file
+        """
+        out = np.empty(num_points, dtype=self.dtype) if out is None else out
+        read_dtype, read_num_points = self._encoded_dtype_and_count(num_points)
+        element_wise = self.use_compression and self._compression_mode == 'e'
+        if element_wise:
+            out[0] = self._compression_reference_value
+        num_bytes_read = 0
+        for start in range(0, read_num_points, chunk_num_points):
+            stop = min(start + chunk_num_points, read_num_points)
+            started = start_stage()
+            encoded = np.fromfile(file_handle, read_dtype, count=stop - start)
+            end_stage(started, READ_TAG, file_handle.name, self.identifier, encoded.nbytes)
+            num_bytes_read += encoded.nbytes
+
+            started = start_stage()
+            if element_wise:
+                decompress_array(encoded, 'e', out[start], out=out[start:stop + 1])
+            elif self.use_compression:
+                decompress_array(encoded, 'm', self._compression_reference_value, out=out[start:stop])
+            else:
+                np.copyto(out[start:stop], encoded, casting='unsafe')
+            end_stage(started, DECODE_TAG, file_handle.name, self.identifier, (stop - start) * out.itemsize)
+        if self.floating_point_rounded:
+            np.divide(out, pow(10, self.num_decimals_to_store), out=out)
+        self._encoded_data = None
+        self.data = out
+        return num_bytes_read
+
+    def info(self, num_points: int) -> TagInfo:
+        """
+        Summarizes the tag definition and how its data is stored
+        :param num_points: number of points in the file
+        :return: TagInfo named-tuple
+        """
+        return TagInfo(
+            identifier=self.identifier,
+            dtype=np.dtype(self.dtype),
+            use_compression=self.use_compression,
+            compression_mode=self._compression_mode,
+            compressed_dtype=np.dtype(self._encoded_dtype_and_count(num_points)[0]),
+            compression_reference_value=self._compression_reference_value,
+            floating_point_rounded=self.floating_point_rounded,
+            num_decimals_to_store=self.num_decimals_to_store,
+            num_bytes=self.encoded_num_bytes(num_points)
+        )
+
+    def encoded_num_bytes(self, num_points: int) -> int:
+        """
+        Gets the number of bytes the tag's data occupies in the file
+        :param num_points: number of points in the file
+        :return: int, number of bytes
+        """
+        read_dtype, read_num_points = self._encoded_dtype_and_count(num_points)
+        return read_num_points * np.dtype(read_dtype).itemsize
+
+    def _encoded_dtype_and_count(self, num_points: int) -> tuple:
+        """
+        Gets the dtype and number of items of the tag's data as stored in the file
+        :param num_points: number of points in the file
+        :return: tuple like (numpy dtype, int)
+        """
+        if not self.use_compression:
+            return self.dtype, num_points
+        read_dtype = get_numpy_type(self._compressed_type_char, self._compressed_bytes_per_value * 8)
+        if self._compression_mode == 'e':
+            return read_dtype, num_points - 1
+        return read_dtype, num_points
+
+    def _validate_output_buffer(self, out: np.ndarray, num_points: int):
+        """
+        Ensures that a caller-provided array can hold the decoded tag data
+        :param out: numpy array to validate
+        :param num_points: number of points the array must hold
+        :return: void, raises exception if invalid
+        """
+        if out.dtype != self.dtype:
+            raise DataDoesNotMatchTagDefinitionError('Output buffer for tag {} does not have correct '
+                                                     'dtype {}'.format(self.identifier, self.dtype))
+        if out.ndim != 1 or out.size != num_points:
+            raise DataShapeError('Output buffer for tag {} must be 1-d with {} '
+                                 'elements'.format(self.identifier, num_points))
+        if not out.flags.writeable:
+            raise DataShapeError('Output buffer for tag {} is not writeable'.format(self.identifier))
+        return
+
     def _encode_options(self) -> int:
         """
         Encodes 16 bit options onto an integer
@@ -183,12 +405,6 @@ class TimeBoxTag:
         if self.floating_point_rounded:
             ret_bytes[counter] = self.num_decimals_to_store.to_bytes(1, 'little')
             counter += 1
-        logging.debug('Encoded definition:')
-        logging.debug('\tCompression mode: {}'.format(self._compression_mode))
-        logging.debug('\tCompression bytes: {}'.format(self._compressed_bytes_per_value))
-        logging.debug('\tCompression type char: {}'.format(self._compressed_type_char))
-        logging.debug('\tCompression ref val: {}'.format(self._compression_reference_value))
-        logging.debug('\tCompression ref val dtype: {}'.format(self._compression_reference_value_dtype))
         return b''.join(ret_bytes)
 
     def _decode_def_bytes(self, from_bytes: bytes):
@@ -218,30 +434,37 @@ class TimeBoxTag:
         if self.floating_point_rounded:
             self.num_decimals_to_store = from_bytes[counter]
             counter += 1
-        logging.debug('Decoded definition for tag: {}'.format(self.identifier))
-        logging.debug('\tCompression mode: {}'.format(self._compression_mode))
-        logging.debug('\tCompression bytes: {}'.format(self._compressed_bytes_per_value))
-        logging.debug('\tCompression type char: {}'.format(self._compressed_type_char))
-        logging.debug('\tCompression ref val: {}'.format(self._compression_reference_value))
-        logging.debug('\tCompression ref val dtype: {}'.format(self._compression_reference_value_dtype))
         return
 
-    def encode_data(self):
+    def encode_data(self, buffer_pool: BufferPool = None):
         """
-        Performs compression and alteration on data to produce data set that will be written in binary to file
+        Performs compression and alteration on data to produce data set that will be written in binary to file.
+        The source data array is never modified, intermediate and encoded arrays are held in buffer_pool
+        :param buffer_pool: optional BufferPool to hold the encoded data. a new pool is used if None
         :return: None
         """
         if self._encoded_data is not None:
             return
 
+        buffer_pool = BufferPool() if buffer_pool is None else buffer_pool
+        encoded_buffer_key = ('encoded', self.identifier)
         self._encoded_data = self.data
         if self.floating_point_rounded:
-            self._encoded_data *= pow(10, self.num_decimals_to_store)
-            self._encoded_data = np.around(self._encoded_data).astype(np.int64)
+            self._encoded_data = round_array_returning_integers(
+                self._encoded_data,
+                self.num_decimals_to_store,
+                buffer_pool,
+                'rounded' if self.use_compression else encoded_buffer_key
+            )
         if self.use_compression:
-            self._compression_reference_value_dtype = self._encoded_data.dtype
             mode = 'm' if self._compression_mode is None else self._compression_mode
-            compression_result = compress_array(self._encoded_data, mode)
+            compression_result = compress_array(self._encoded_data, mode, buffer_pool, encoded_buffer_key)
+            if isinstance(compression_result, np.ndarray):
+                # compress_array leaves tiny dtypes and single points in 'e' mode uncompressed
+                self.use_compression = False
+                self._compression_mode = None
+                return
+            self._compression_reference_value_dtype = self._encoded_data.dtype
             self._compression_mode = mode
             self._compressed_type_char = compression_result.numpy_array.dtype.kind
             self._compressed_bytes_per_value = compression_result.numpy_array.itemsize
@@ -249,21 +472,100 @@ class TimeBoxTag:
             self._compression_reference_value = compression_result.reference_value
         return
 
-    def _decode_data(self):
+    def block_statistics(self, block_num_points: int = BLOCK_NUM_POINTS, buffer_pool: BufferPool = None) -> np.ndarray:
+        """
+        Summarizes the data in blocks as it decodes, rounded tags are summarized after rounding
+        :param block_num_points: number of points per block
+        :param buffer_pool: optional BufferPool holding the rounded values
+        :return: numpy array of block_statistics.block_statistics_dtype, one element per block
+        """
+        if not self.floating_point_rounded:
+            return compute_block_statistics(self.data, block_num_points)
+        rounded = round_array_returning_integers(self.data, self.num_decimals_to_store, buffer_pool)
+        return compute_block_statistics(rounded, block_num_points, self.num_decimals_to_store)
+
+    def last_value(self, buffer_pool: BufferPool = None) -> np.ndarray:
+        """
+        Gets the value 'e' mode accumulates to at the last point, the rounded integer of rounded tags
+        :param buffer_pool: optional BufferPool holding the rounded value
+        :return: 1-element numpy array of the tag's dtype
+        """
+        value = self.data[-1:]
+        if self.floating_point_rounded:
+            value = round_array_returning_integers(value, self.num_decimals_to_store, buffer_pool)
+        return value.astype(self.dtype)
+
+    def checkpoints(self, block_num_points: int = BLOCK_NUM_POINTS, buffer_pool: BufferPool = None) -> np.ndarray:
+        """
+        Gets the values 'e' mode accumulates to at the first point of each block, the rounded integers
+        of rounded tags
+        :param block_num_points: number of points per block
+        :param buffer_pool: optional BufferPool holding the rounded values
+        :return: numpy array of the tag's dtype, one element per block
+        """
+        values = self.data[::block_num_points]
+        if self.floating_point_rounded:
+            values = round_array_returning_integers(values, self.num_decimals_to_store, buffer_pool)
+        return values.astype(self.dtype)
+
+    def rollup(self, dates: np.ndarray, width: int, buffer_pool: BufferPool = None) -> tuple:
+        """
+        Summarizes the data in buckets of a fixed duration as it decodes, rounded tags are summarized
+        after rounding, see rollup.BucketStatistics
+        :param dates: sorted int64 array of the dates of the points
+        :param width: bucket duration in the units of dates
+        :param buffer_pool: optional BufferPool holding the rounded values
+        :return: tuple like (int64 array of the buckets since epoch, array of block_statistics.block_statistics_dtype)
+        """
+        buckets = BucketStatistics(width, self.dtype, self.num_decimals_to_store if self.floating_point_rounded
+                                   else None)
+        for start in range(0, self.data.size, ROLLUP_CHUNK_NUM_POINTS):
+            values = self.data[start:start + ROLLUP_CHUNK_NUM_POINTS]
+            if self.floating_point_rounded:
+                values = round_array_returning_integers(values, self.num_decimals_to_store, buffer_pool)
+            buckets.append(dates[start:start + ROLLUP_CHUNK_NUM_POINTS], values)
+        return buckets.finish()
+
+    def _decode_data(self, out: np.ndarray = None):
         """
         Decodes the data from a file buffer
+        :param out: optional pre-allocated array with the tag's dtype to decode into
         :return:
         """
-        self.data = self._encoded_data
+        self.data = self._decode_encoded_array(self._encoded_data, out)
+        return
+
+    def _decode_encoded_array(self, encoded_data: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Decodes an array as stored in the file with the tag's encoding options, without
+        changing the state of the tag
+        :param encoded_data: numpy array as stored in the file
+        :param out: optional pre-allocated array with the tag's dtype to decode into
+        :return: numpy array of decoded data, out if given
+        """
+        if not self.use_compression and not self.floating_point_rounded:
+            if out is None:
+                return encoded_data
+            np.copyto(out, encoded_data)
+            return out
+
+        if out is None:
+            num_decoded = encoded_data.size
+            if self.use_compression and self._compression_mode == 'e':
+                num_decoded += 1
+            out = np.empty(num_decoded, dtype=self.dtype)
         if self.use_compression:
-            self.data = decompress_array(
-                self.data,
+            decompress_array(
+                encoded_data,
                 self._compression_mode,
-                self._compression_reference_value
-            ).astype(self.dtype)
+                self._compression_reference_value,
+                out=out
+            )
+        else:
+            np.copyto(out, encoded_data, casting='unsafe')
         if self.floating_point_rounded:
-            self.data /= pow(10, self.num_decimals_to_store)
-        return
+            np.divide(out, pow(10, self.num_decimals_to_store), out=out)
+        return out
 
     @classmethod
     def tag_info_dtype(cls, num_bytes_for_tag_identifier: int, tag_identifier_is_string: bool,
@@ -315,51 +617,41 @@ class TimeBoxTag:
         :param tag_names_are_strings: whether or not the tag identifiers are strings
         :return: dictionary like {identifier : TimeBoxTag}
         """
-        bytes_per_tag_def = num_bytes_for_identifier + NUM_BYTES_PER_DEFINITION_WITHOUT_IDENTIFIER
-        num_typed_bytes = bytes_per_tag_def - 32
-        split_bytes = [from_bytes[i:i+bytes_per_tag_def] for i in range(0, len(from_bytes), bytes_per_tag_def)]
-        typed_bytes = [s[0:num_typed_bytes] for s in split_bytes]
-        untyped_bytes = [s[num_typed_bytes:] for s in split_bytes]
-        raw_tags = np.frombuffer(
-            b''.join(typed_bytes),
-            dtype=TimeBoxTag.tag_info_dtype(
-                num_bytes_for_identifier,
-                tag_names_are_strings,
-                exclude_trailing_bytes=True
-            )
+        typed_dtype = TimeBoxTag.tag_info_dtype(
+            num_bytes_for_identifier,
+            tag_names_are_strings,
+            exclude_trailing_bytes=True
         )
+        raw_tags = np.frombuffer(from_bytes, dtype=np.dtype(typed_dtype.descr + [('def_bytes', 'V32')]))
         tags = []
-        for i in range(0, raw_tags.shape[0]):
+        for t in raw_tags:
             tag = TimeBoxTag(
-                raw_tags[i]['tag_identifier'],
-                raw_tags[i]['bytes_per_point'],
-                raw_tags[i]['type_char'],
-                options=raw_tags[i]['options']
+                t['tag_identifier'],
+                t['bytes_per_point'],
+                t['type_char'],
+                options=t['options'],
+                untyped_bytes=t['def_bytes'].tobytes()
             )
-            tag._decode_def_bytes(untyped_bytes[i])
+            tag.num_bytes_extra_information = int(t['bytes_extra_information'])
             tags.append(tag)
-        tags = [
-            TimeBoxTag(t['tag_identifier'], t['bytes_per_point'], t['type_char'], options=t['options'])
-            for t in raw_tags
-        ]
-        for i in range(0, len(tags)):
-            tags[i]._decode_def_bytes(untyped_bytes[i])
 
         return dict([(t.identifier, t) for t in tags])
 
     @classmethod
     def tag_list_to_bytes(cls, tag_list: list, num_bytes_for_tag_identifier: int,
-                          tag_identifier_is_string: bool) -> NumBytesByteCodeTuple:
+                          tag_identifier_is_string: bool, buffer_pool: BufferPool = None,
+                          file_path: str = None) -> NumBytesByteCodeTuple:
         """
         Executes to_bytes() on each element in tag_list, then combines the result into a NumBytesByteCodeTuple
         :param tag_list: list of TimeBoxTag items
         :param num_bytes_for_tag_identifier: number of bytes used in the unsigned int or unicode tag identifier
         :param tag_identifier_is_string: if True, tag identifier will be treated as 4-byte unicode. if False, int
+        :param buffer_pool: optional BufferPool shared by the tags to hold their encoded data
+        :param file_path: optional path of the file being written, reported to the instrumentation
         :return: NumBytesByteCodeTuple object, summed/joined across the tags
         """
-        logging.debug('converting tags to bytes: {}'.format([t.identifier for t in tag_list]))
         tags_to_bytes_result = [
-            t.info_to_bytes(num_bytes_for_tag_identifier, tag_identifier_is_string)
+            t.info_to_bytes(num_bytes_for_tag_identifier, tag_identifier_is_string, buffer_pool, file_path)
             for t in tag_list
             ]
         num_bytes = sum([r[0] for r in tags_to_bytes_result])
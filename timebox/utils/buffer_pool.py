@@ -0,0 +1,45 @@
+import numpy as np
+
+
+class BufferPool:
+    def __init__(self):
+        """
+        Holds re-usable scratch buffers keyed by name. Buffers only grow, so a
+        pool that is re-used across operations stops allocating once it has
+        seen the largest array size.
+        """
+        self._buffers = {}  # like { key : numpy array of uint8 }
+        return
+
+    def get(self, key, num_items: int, dtype) -> np.ndarray:
+        """
+        Gets an uninitialized array backed by the buffer stored under key,
+        growing the buffer if it is too small
+        :param key: hashable name of the buffer
+        :param num_items: number of elements in the returned array
+        :param dtype: numpy dtype of the returned array
+        :return: 1-d numpy array with num_items elements
+        """
+        dtype = np.dtype(dtype)
+        num_bytes = num_items * dtype.itemsize
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.nbytes < num_bytes:
+            buffer = np.empty(num_bytes, dtype=np.uint8)
+            self._buffers[key] = buffer
+        return buffer[:num_bytes].view(dtype)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Total number of bytes held by the pool
+        :return: int
+        """
+        return sum([b.nbytes for b in self._buffers.values()])
+
+    def clear(self):
+        """
+        Drops all of the buffers held by the pool
+        :return: void
+        """
+        self._buffers = {}
+        return
@@ -1,6 +1,7 @@
 import numpy as np
 from collections import namedtuple
-from .exceptions import *
+import re
+from .exceptions import DateUnitsError, DateUnitsGranularityError, FrequencyError
 
 
 NANO_SECONDS = 0
@@ -37,6 +38,19 @@ units_by_order = {
 }
 
 
+# frequency strings like '5min' or '1h', and the pandas aliases of the same units
+frequency_units = {
+    'ns': 'ns', 'N': 'ns',
+    'us': 'us', 'U': 'us',
+    'ms': 'ms', 'L': 'ms',
+    's': 's', 'S': 's',
+    'min': 'm', 'm': 'm', 'T': 'm',
+    'h': 'h', 'H': 'h',
+    'D': 'D', 'd': 'D'
+}
+FREQUENCY_PATTERN = re.compile(r'^\s*(\d*)\s*([a-zA-Z]+)\s*$')
+
+
 def get_unit_data(units_to_get) -> UnitInfo:
     """
     Gets units from either a string of units, or a integer representing which unit
@@ -115,28 +129,64 @@ def get_units_from_dtype(dtype) -> str:
     return date_units
 
 
-def compress_time_delta_array(arr: np.array) -> (np.array, str):
+def compress_time_delta_array(arr: np.array, also_divided: int = 0) -> (np.array, str):
     """
-    Tries to compress the timedelta64 array by units
+    Tries to compress the timedelta64 array by units. The coarsest units dividing every
+    element are found from the greatest common divisor of the elements, so the int64 result
+    is the only array allocated, and it is divided in place
     :param arr: numpy array
+    :param also_divided: optional number in the units of arr that the units found must also divide
     :return: tuple, (numpy array of int64s, units string)
     """
-    mod_value = np.full(arr.shape, 0, dtype=np.uint64)
-    mod_result = np.full(arr.shape, 0, dtype=np.float64)
     result_array = arr.astype(np.int64)
-    curr_units = get_units_from_dtype(arr.dtype)
+    common_divisor = int(np.gcd.reduce(result_array)) if result_array.size > 0 else 0
+    common_divisor = int(np.gcd(common_divisor, also_divided))
+    base_units = get_units_from_dtype(arr.dtype)
+    curr_units = base_units
+    divisor = 1
     while True:
         try:
             try_units = get_less_granular_units(curr_units)
         except DateUnitsGranularityError:  # we couldn't get less granular
             break
-        divisor = get_conversion_multiplier(try_units, curr_units)
-        mod_value.fill(divisor)
-        np.mod(result_array, mod_value, mod_result)
+        try_divisor = int(get_conversion_multiplier(try_units, base_units))
         # check if we are not successful
-        if np.count_nonzero(mod_result) > 0:
+        if common_divisor % try_divisor != 0:
             break
-        # else, we are successful, update the result_array and curr_units
+        # else, we are successful, update the divisor and curr_units
         curr_units = try_units
-        result_array = (result_array / divisor).astype(np.int64)
+        divisor = try_divisor
+    if divisor != 1:
+        np.floor_divide(result_array, divisor, out=result_array)
     return result_array, curr_units
+
+
+def frequency_to_units(frequency, to_units: str) -> int:
+    """
+    Converts a frequency to a whole number of units. For example
+    frequency_to_units('5min', 's') = 300
+    :param frequency: numpy timedelta64, or string like '1s', '5min', '1h', '1D', with
+    an optional count and units in frequency_units
+    :param to_units: string in ['ns', 'us', 'ms', 's', 'm', 'h', 'D']
+    :return: positive int
+    """
+    if isinstance(frequency, np.timedelta64):
+        if np.isnat(frequency):
+            raise FrequencyError('Could not use NaT as a frequency')
+        count = int(frequency.astype(np.int64))
+        from_units = get_units_from_dtype(frequency.dtype)
+    else:
+        match = FREQUENCY_PATTERN.match(frequency) if isinstance(frequency, str) else None
+        if match is None or match.group(2) not in frequency_units:
+            raise FrequencyError('Could not parse frequency {}, expected a count and units '
+                                 'in {}'.format(frequency, ', '.join(sorted(frequency_units))))
+        count = int(match.group(1)) if match.group(1) else 1
+        from_units = frequency_units[match.group(2)]
+    if count <= 0:
+        raise FrequencyError('Frequency {} is not positive'.format(frequency))
+
+    from_multiplier = get_unit_data(from_units).multiplier * count
+    to_multiplier = get_unit_data(to_units).multiplier
+    if from_multiplier % to_multiplier != 0:
+        raise FrequencyError('Frequency {} is not a whole number of {}'.format(frequency, to_units))
+    return from_multiplier // to_multiplier
@@ -40,3 +40,7 @@ class InvalidPandasIndexError(ValueError):
 
 class InvalidPandasDataTypeError(TypeError):
     pass
+
+
+class FrequencyError(ValueError):
+    pass
@@ -1,7 +1,9 @@
 import numpy as np
 from .binary import determine_required_bytes_unsigned_integer, determine_required_bytes_signed_integer
 from .validation import ensure_int
-from .exceptions import *
+from .buffer_pool import BufferPool
+from .exceptions import ArrayNotFloatException, CharConversionException, CompressionError, \
+    CompressionModeInvalidError
 from collections import namedtuple
 
 
@@ -184,13 +186,17 @@ def compress_float_array(arr: np.array) -> np.array:
     return arr
 
 
-def compress_array(arr: np.array, mode: str) -> CompressionResult:
+def compress_array(arr: np.array, mode: str, buffer_pool: BufferPool = None,
+                   buffer_key='compressed') -> CompressionResult:
     """
     compresses the array by finding the minimum value.
     if mode is 'e', the differences between elements are stored
     if mode is 'm', the returned array holds the difference from minimum
+    arr is never modified.
     :param arr: numpy source array
     :param mode: string, must be 'e' or 'm'. 'e' is differences between elements, 'm' is difference from minimum
+    :param buffer_pool: optional BufferPool holding the scratch and result buffers. a new pool is used if None
+    :param buffer_key: key of the buffer_pool buffer that holds the compressed result
     :return: CompressionResult named-tuple like numpy array, value. if mode='e', array has 1 fewer elements than arr
     and value is the starting value. If mode='m', value is minimum
     """
@@ -211,43 +217,64 @@ def compress_array(arr: np.array, mode: str) -> CompressionResult:
     if arr.size == 1 and mode == 'e':
         return arr
 
+    buffer_pool = BufferPool() if buffer_pool is None else buffer_pool
     reference_value = arr[0] if mode == 'e' else np.amin(arr)
     # else, continue on
     diff_array = None
     if mode == 'e':
-        diff_array = np.ediff1d(arr)
+        diff_array = buffer_pool.get('diff', arr.size - 1, arr.dtype)
+        np.subtract(arr[1:], arr[:-1], out=diff_array)
 
     if mode == 'm':
-        diff_array = arr - reference_value
+        diff_array = buffer_pool.get('diff', arr.size, arr.dtype)
+        np.subtract(arr, reference_value, out=diff_array)
 
     # calculate the size of data needed
     max_value = np.amax(diff_array)
     min_value = np.amin(diff_array)
     ret_array = None
     if diff_array.dtype.kind in ['u', 'i']:  # integer or unsigned integer
-        if min_value < 0 and (-1 * min_value) > max_value:
-            max_abs_value = -1 * min_value
-        else:
-            max_abs_value = max_value
-        type_char = 'i' if min_value < 0 else 'u'
-        if min_value < 0:
-            num_bytes = determine_required_bytes_signed_integer(max_abs_value)
-        else:
-            num_bytes = determine_required_bytes_unsigned_integer(max_abs_value)
-        ret_array = diff_array.astype(get_numpy_type(type_char, num_bytes * 8))
+        ret_array = buffer_pool.get(buffer_key, diff_array.size, integer_compression_dtype(min_value, max_value))
+        np.copyto(ret_array, diff_array, casting='unsafe')
     if diff_array.dtype.kind == 'f':  # float
         # try to convert the array
         ret_array = compress_float_array(diff_array)
+        if ret_array is diff_array:
+            # the diff buffer is shared scratch space, move the result into its own buffer
+            ret_array = buffer_pool.get(buffer_key, diff_array.size, diff_array.dtype)
+            np.copyto(ret_array, diff_array)
     return CompressionResult(ret_array, reference_value)
 
 
-def decompress_array(arr: np.array, mode: str, reference_value) -> np.array:
+def integer_compression_dtype(min_value, max_value) -> np.dtype:
+    """
+    Gets the smallest integer dtype that holds every value between min_value and max_value,
+    unsigned if min_value is not negative
+    :param min_value: minimum integer value
+    :param max_value: maximum integer value
+    :return: numpy dtype
+    """
+    if min_value < 0 and (-1 * min_value) > max_value:
+        max_abs_value = -1 * min_value
+    else:
+        max_abs_value = max_value
+    type_char = 'i' if min_value < 0 else 'u'
+    if min_value < 0:
+        num_bytes = determine_required_bytes_signed_integer(max_abs_value)
+    else:
+        num_bytes = determine_required_bytes_unsigned_integer(max_abs_value)
+    return get_numpy_type(type_char, num_bytes * 8)
+
+
+def decompress_array(arr: np.array, mode: str, reference_value, out: np.array = None) -> np.array:
     """
     Decodes a numpy array using a specified mode and reference value.
     :param arr: array to decompress
     :param mode: either 'e' for element-wise differences or 'm' for difference from minimum
     :param reference_value: first value of decompressed array if 'e', else the min value of the decompressed array
-    :return: numpy array with decompressed data
+    :param out: optional pre-allocated array to decode into. must hold arr.size + 1 elements if 'e',
+    else arr.size elements. values are cast into out's dtype
+    :return: numpy array with decompressed data (out, if it was provided)
     """
     if mode not in ['e', 'm']:
         raise CompressionModeInvalidError('Mode must be "e" or "m", {} found'.format(mode))
@@ -255,21 +282,36 @@ def decompress_array(arr: np.array, mode: str, reference_value) -> np.array:
     if arr.dtype.kind not in ['f', 'u', 'i']:
         raise CompressionError('Could not compress. dtype kind {} not '
                                'eligible for compression.'.format(arr.dtype.kind))
+    num_decoded = arr.size + 1 if mode == 'e' else arr.size
+    if out is None:
+        out = np.empty(num_decoded, dtype=np.result_type(arr.dtype, np.asarray(reference_value).dtype))
+    elif out.size != num_decoded:
+        raise CompressionError('Could not decompress into array of size {}, '
+                               '{} elements required'.format(out.size, num_decoded))
     if mode == 'e':
-        ret_array = np.cumsum(arr) + reference_value
-        ret_array = np.insert(ret_array, 0, reference_value)
+        out[0] = reference_value
+        np.cumsum(arr, dtype=out.dtype, out=out[1:])
+        np.add(out[1:], reference_value, out=out[1:], dtype=out.dtype, casting='unsafe')
     elif mode == 'm':
-        ret_array = np.add(arr, np.full(arr.shape, reference_value))
-    return ret_array
+        np.add(arr, reference_value, out=out, dtype=out.dtype, casting='unsafe')
+    return out
 
 
-def round_array_returning_integers(arr: np.array, num_decimals: int) -> np.array:
+def round_array_returning_integers(arr: np.array, num_decimals: int, buffer_pool: BufferPool = None,
+                                   buffer_key='rounded') -> np.array:
     """
-    Multiplies the array by 10^num_decimals, rounds the array, and returns an integer array
+    Multiplies the array by 10^num_decimals, rounds the array, and returns an integer array.
+    arr is never modified.
     :param arr: source array
     :param num_decimals: number of decimals to keep
+    :param buffer_pool: optional BufferPool holding the scratch and result buffers. a new pool is used if None
+    :param buffer_key: key of the buffer_pool buffer that holds the rounded result
     :return: 64-bit integer array with rounded data
     """
-    rounded_array = arr * pow(10, num_decimals)
-    rounded_array = np.around(rounded_array)
-    return rounded_array.astype(np.int64)
+    buffer_pool = BufferPool() if buffer_pool is None else buffer_pool
+    scaled_array = buffer_pool.get('scaled', arr.size, arr.dtype if arr.dtype.kind == 'f' else np.float64)
+    np.multiply(arr, pow(10, num_decimals), out=scaled_array)
+    np.around(scaled_array, out=scaled_array)
+    rounded_array = buffer_pool.get(buffer_key, arr.size, np.int64)
+    np.copyto(rounded_array, scaled_array, casting='unsafe')
+    return rounded_array
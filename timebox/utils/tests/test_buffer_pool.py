@@ -0,0 +1,58 @@
+from timebox.utils.buffer_pool import BufferPool
+from timebox.utils.numpy_utils import compress_array, round_array_returning_integers
+import unittest
+import numpy as np
+
+
+class TestBufferPool(unittest.TestCase):
+    def test_get_buffer(self):
+        pool = BufferPool()
+        a = pool.get('a', 4, np.float64)
+        self.assertEqual(4, a.size)
+        self.assertEqual(np.float64, a.dtype)
+        self.assertEqual(32, pool.nbytes)
+
+        # smaller request re-uses the same memory
+        b = pool.get('a', 2, np.uint16)
+        self.assertEqual(2, b.size)
+        self.assertTrue(np.shares_memory(a, b))
+        self.assertEqual(32, pool.nbytes)
+
+        # larger request grows the buffer
+        c = pool.get('a', 8, np.float64)
+        self.assertFalse(np.shares_memory(a, c))
+        self.assertEqual(64, pool.nbytes)
+
+        pool.get('b', 1, np.uint8)
+        self.assertEqual(65, pool.nbytes)
+        pool.clear()
+        self.assertEqual(0, pool.nbytes)
+        return
+
+    def test_compression_does_not_modify_source(self):
+        pool = BufferPool()
+        data = np.array([5, 3, 2000, 7], dtype=np.int64)
+        for mode in ['e', 'm']:
+            result = compress_array(data, mode, pool, 'result')
+            self.assertListEqual([5, 3, 2000, 7], list(data))
+            self.assertFalse(np.shares_memory(data, result.numpy_array))
+            self.assertTrue(np.shares_memory(pool.get('result', 1, np.uint8), result.numpy_array))
+
+        data = np.array([0.5, 1.25, -0.75], dtype=np.float64)
+        result = compress_array(data, 'm', pool, 'result')
+        self.assertListEqual([0.5, 1.25, -0.75], list(data))
+        self.assertListEqual([1.25, 2.0, 0], list(result.numpy_array))
+        return
+
+    def test_round_array_returning_integers(self):
+        pool = BufferPool()
+        data = np.array([0.5, -0.5, 10.2345, 0], dtype=np.float64)
+        rounded = round_array_returning_integers(data, 2, pool)
+        self.assertEqual(np.int64, rounded.dtype)
+        self.assertListEqual([50, -50, 1023, 0], list(rounded))
+        self.assertListEqual([0.5, -0.5, 10.2345, 0], list(data))
+        self.assertIs(rounded.base, round_array_returning_integers(data, 1, pool).base)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
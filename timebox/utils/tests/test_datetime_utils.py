@@ -1,7 +1,7 @@
 import numpy as np
 import unittest
 from timebox.utils.datetime_utils import *
-from timebox.utils.exceptions import DateUnitsError, DateUnitsGranularityError
+from timebox.utils.exceptions import DateUnitsError, DateUnitsGranularityError, FrequencyError
 
 
 class TestDateTimeUtils(unittest.TestCase):
@@ -102,6 +102,32 @@ class TestDateTimeUtils(unittest.TestCase):
         comp_array_result = compress_time_delta_array(diff_array)
         self.assertEqual('D', comp_array_result[1])
         self.assertEqual(1, comp_array_result[0][0])
+
+        # differentials beyond float64 precision are divided exactly
+        large_array = np.array([(2 ** 53 + 1) * 1000, 3000], dtype='timedelta64[ns]')
+        comp_array_result = compress_time_delta_array(large_array)
+        self.assertEqual('us', comp_array_result[1])
+        self.assertEqual(2 ** 53 + 1, comp_array_result[0][0])
+        self.assertEqual(3, comp_array_result[0][1])
+        self.assertEqual('D', compress_time_delta_array(np.array([], dtype='timedelta64[s]'))[1])
+
+        # the units found also divide also_divided
+        comp_array_result = compress_time_delta_array(diff_array, 30)
+        self.assertEqual('s', comp_array_result[1])
+        self.assertEqual(86400, comp_array_result[0][0])
+        self.assertEqual('m', compress_time_delta_array(np.array([], dtype='timedelta64[s]'), 120)[1])
+        return
+
+    def test_frequency_to_units(self):
+        self.assertEqual(300, frequency_to_units('5min', 's'))
+        self.assertEqual(300, frequency_to_units('5T', 's'))
+        self.assertEqual(1, frequency_to_units('h', 'h'))
+        self.assertEqual(86400000, frequency_to_units('1D', 'ms'))
+        self.assertEqual(250, frequency_to_units(np.timedelta64(250, 'ms'), 'ms'))
+        self.assertEqual(2, frequency_to_units(np.timedelta64(2000, 'ms'), 's'))
+        for frequency in ['1ms', '0s', '5 weeks', '', 5, np.timedelta64('NaT'), np.timedelta64(-1, 's')]:
+            with self.assertRaises(FrequencyError):
+                frequency_to_units(frequency, 's')
         return
 
 if __name__ == '__main__':
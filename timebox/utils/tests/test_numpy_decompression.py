@@ -116,5 +116,21 @@ class TestNumpyDecompression(unittest.TestCase):
         self.assertEqual(2, compress_array(np.array([1], dtype=np.uint16), 'e').itemsize)
         return
 
+    def test_decompress_into_output(self):
+        data = np.array([-4, -2, 0, 2000], dtype=np.int16)
+        for mode in ['e', 'm']:
+            compression_result = compress_array(data, mode)
+            out = np.zeros(4, dtype=np.int16)
+            dec_array = decompress_array(compression_result.numpy_array, mode,
+                                         compression_result.reference_value, out=out)
+            self.assertIs(out, dec_array)
+            self.assertListEqual([-4, -2, 0, 2000], list(out))
+
+        compression_result = compress_array(data, 'e')
+        with self.assertRaises(CompressionError):
+            decompress_array(compression_result.numpy_array, 'e', compression_result.reference_value,
+                             out=np.zeros(3, dtype=np.int16))
+        return
+
 if __name__ == '__main__':
     unittest.main()
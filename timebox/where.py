@@ -0,0 +1,273 @@
+import re
+import operator
+import numpy as np
+from collections import namedtuple
+from timebox.timebox import TimeBoxArrays
+from timebox.range_reader import RangeReader, DEFAULT_CHUNK_NUM_POINTS, tag_identifier, missing_tag_message
+from timebox.exceptions import PredicateError
+
+
+# tag op value, value is a python int or float
+Comparison = namedtuple('Comparison', ['tag', 'op', 'value'])
+# op is 'and' or 'or', operands is a list of Comparison or BooleanOperation
+BooleanOperation = namedtuple('BooleanOperation', ['op', 'operands'])
+WhereExplanation = namedtuple('WhereExplanation', ['predicate', 'num_blocks', 'scanned_blocks', 'skipped_blocks',
+                                                   'scanned_points'])
+
+COMPARISON_OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+FLIPPED_OPERATORS = {'>': '<', '>=': '<=', '<': '>', '<=': '>=', '==': '==', '!=': '!='}
+TOKEN_PATTERN = re.compile(r'\s*(?:(?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(?P<op>>=|<=|==|!=|>|<)'
+                           r'|(?P<paren>[()])|(?P<name>[A-Za-z_][A-Za-z0-9_]*)|(?P<quoted>"[^"]*"|\'[^\']*\'))')
+
+
+def parse_predicate(predicate: str):
+    """
+    Parses a predicate like "price > 100 and (volume >= 10 or flag == 1)". Each comparison is
+    between a tag and a number, with >, >=, <, <=, == or !=, and comparisons are combined with
+    and, which binds first, or, and parentheses. Tags may be quoted, like "7" for the integer tag
+    identifier 7
+    :param predicate: string
+    :return: Comparison or BooleanOperation
+    """
+    tokens = _tokenize(predicate)
+    node, position = _parse_or(tokens, 0, predicate)
+    if position != len(tokens):
+        raise PredicateError('Unexpected {} in predicate {}'.format(tokens[position][1], predicate))
+    return node
+
+
+def where_file(file_path: str, predicate: str, tags: list = None, start=None, end=None,
+               chunk_num_points: int = DEFAULT_CHUNK_NUM_POINTS) -> TimeBoxArrays:
+    """
+    Finds the points matching a predicate. The block statistics in the footer tell which blocks
+    of points cannot match, from the min and max of each tag, and those blocks are skipped. The
+    other blocks are decoded chunk by chunk and the predicate is evaluated on whole chunks. NaN
+    values only match !=, like numpy comparisons
+    :param file_path: path of the TimeBox file
+    :param predicate: string, see parse_predicate
+    :param tags: optional list of tag identifiers to return, all tags if None
+    :param start: optional first date, like numpy.datetime64('2018-01-01') or '2018-01-01T00:00'
+    :param end: optional last date
+    :param chunk_num_points: number of points decoded at a time
+    :return: TimeBoxArrays named tuple like (int64 dates of the matching points since epoch, unit,
+    {tag_identifier: numpy array})
+    """
+    with RangeReader(file_path) as reader:
+        node = _resolve_tags(parse_predicate(predicate), reader.tags)
+        tags = reader.tags if tags is None else tags
+        read_tags = sorted(set(tags) | set(_predicate_tags(node)), key=str)
+        timestamps = []
+        data = dict([(t, []) for t in tags])
+        for first, stop in _scanned_ranges(reader, node, start, end)[0]:
+            for chunk in reader.iter_chunks(read_tags, first, stop, chunk_num_points):
+                mask = _evaluate(node, chunk.data)
+                timestamps.append(chunk.dates[mask])
+                for t in tags:
+                    data[t].append(chunk.data[t][mask])
+        return TimeBoxArrays(
+            timestamps=np.concatenate(timestamps) if timestamps else np.empty(0, dtype=np.int64),
+            unit=reader.dates_units,
+            data=dict([(t, np.concatenate(data[t]) if data[t] else np.empty(0, dtype=reader.tag(t).dtype))
+                       for t in tags])
+        )
+
+
+def explain_where(file_path: str, predicate: str, start=None, end=None) -> WhereExplanation:
+    """
+    Tells how much of the file where_file decodes for a predicate, without decoding any tag
+    :param file_path: path of the TimeBox file
+    :param predicate: string, see parse_predicate
+    :param start: optional first date
+    :param end: optional last date
+    :return: WhereExplanation named tuple like (predicate, number of blocks in the date range, number
+    of blocks decoded, number of blocks skipped, number of points decoded)
+    """
+    with RangeReader(file_path) as reader:
+        node = _resolve_tags(parse_predicate(predicate), reader.tags)
+        ranges, num_blocks, scanned_blocks = _scanned_ranges(reader, node, start, end)
+    return WhereExplanation(
+        predicate=predicate,
+        num_blocks=num_blocks,
+        scanned_blocks=scanned_blocks,
+        skipped_blocks=num_blocks - scanned_blocks,
+        scanned_points=sum([stop - first for first, stop in ranges])
+    )
+
+
+def _scanned_ranges(reader: RangeReader, node, start, end) -> tuple:
+    """
+    Finds the blocks of points of the date range that may match the predicate
+    :return: tuple like (list of (index of the first point, index after the last point) of consecutive blocks to
+    decode, number of blocks in the date range, number of blocks to decode)
+    """
+    for t in _predicate_tags(node):
+        reader.tag(t)
+    first, stop = reader.index_range(start, end)
+    if first == stop:
+        return [], 0, 0
+    # the statistics sections hold their block size, files with uniform dates have no block dates
+    statistics = dict([(t, reader.block_statistics(t)) for t in _predicate_tags(node)])
+    if any([s is None for s in statistics.values()]) or len(set([s[0] for s in statistics.values()])) != 1:
+        # written without block statistics, every point is decoded
+        return [(first, stop)], 1, 1
+    block_num_points = next(iter(statistics.values()))[0]
+
+    first_block = first // block_num_points
+    stop_block = (stop - 1) // block_num_points + 1
+    block_sizes = np.full(stop_block - first_block, block_num_points, dtype=np.uint64)
+    if stop_block * block_num_points > reader.num_points:
+        block_sizes[-1] = reader.num_points - (stop_block - 1) * block_num_points
+    candidates = _may_match(node, dict([(t, statistics[t][1][first_block:stop_block]) for t in statistics]),
+                            block_sizes)
+
+    # runs of consecutive candidate blocks are decoded together
+    edges = np.flatnonzero(np.diff(np.concatenate([[False], candidates, [False]]).astype(np.int8)))
+    ranges = [(max((first_block + a) * block_num_points, first), min((first_block + b) * block_num_points, stop))
+              for a, b in zip(edges[::2], edges[1::2])]
+    return ranges, int(candidates.size), int(np.count_nonzero(candidates))
+
+
+def _may_match(node, statistics: dict, block_sizes: np.ndarray) -> np.ndarray:
+    """
+    Tells which blocks may hold points matching the predicate
+    :param node: Comparison or BooleanOperation
+    :param statistics: dictionary like {tag_identifier: array of block_statistics_dtype}
+    :param block_sizes: uint64 array of the number of points in each block
+    :return: boolean numpy array, one element per block
+    """
+    if isinstance(node, BooleanOperation):
+        results = [_may_match(n, statistics, block_sizes) for n in node.operands]
+        combine = np.logical_and if node.op == 'and' else np.logical_or
+        return combine.reduce(results)
+
+    s = statistics[node.tag]
+    has_values = s['count'] > 0
+    with np.errstate(invalid='ignore'):
+        if node.op == '>':
+            return has_values & (s['max'] > node.value)
+        if node.op == '>=':
+            return has_values & (s['max'] >= node.value)
+        if node.op == '<':
+            return has_values & (s['min'] < node.value)
+        if node.op == '<=':
+            return has_values & (s['min'] <= node.value)
+        if node.op == '==':
+            return has_values & (s['min'] <= node.value) & (s['max'] >= node.value)
+        # NaN values are != anything
+        return (s['count'] < block_sizes) | (s['min'] != node.value) | (s['max'] != node.value)
+
+
+def _evaluate(node, data: dict) -> np.ndarray:
+    """
+    :param node: Comparison or BooleanOperation
+    :param data: dictionary like {tag_identifier: numpy array}
+    :return: boolean numpy array, True at the points matching the predicate
+    """
+    if isinstance(node, BooleanOperation):
+        mask = _evaluate(node.operands[0], data)
+        for n in node.operands[1:]:
+            if node.op == 'and':
+                np.logical_and(mask, _evaluate(n, data), out=mask)
+            else:
+                np.logical_or(mask, _evaluate(n, data), out=mask)
+        return mask
+    with np.errstate(invalid='ignore'):
+        return COMPARISON_OPERATORS[node.op](data[node.tag], node.value)
+
+
+def _resolve_tags(node, tags: list):
+    """
+    Replaces the tag names of a parsed predicate with the tag identifiers of the file, see tag_identifier
+    :param node: Comparison or BooleanOperation
+    :param tags: list of the tag identifiers of the file
+    :return: Comparison or BooleanOperation
+    """
+    if isinstance(node, BooleanOperation):
+        return BooleanOperation(node.op, [_resolve_tags(n, tags) for n in node.operands])
+    identifier = tag_identifier(node.tag, tags)
+    if identifier is None:
+        raise PredicateError(missing_tag_message(node.tag, tags))
+    return node._replace(tag=identifier)
+
+
+def _predicate_tags(node) -> list:
+    """
+    :return: list of the tag identifiers compared in the predicate
+    """
+    if isinstance(node, BooleanOperation):
+        return sorted(set([t for n in node.operands for t in _predicate_tags(n)]), key=str)
+    return [node.tag]
+
+
+def _tokenize(predicate: str) -> list:
+    """
+    :return: list of tuples like (kind, text), kind is 'number', 'op', 'paren', 'name' or 'quoted'. the
+    quotes of quoted names are removed
+    """
+    tokens = []
+    position = 0
+    while position < len(predicate.rstrip()):
+        match = TOKEN_PATTERN.match(predicate, position)
+        if match is None or match.end() == position:
+            raise PredicateError('Could not parse predicate {} at character {}'.format(predicate, position))
+        text = match.group(match.lastgroup)
+        tokens.append((match.lastgroup, text[1:-1] if match.lastgroup == 'quoted' else text))
+        position = match.end()
+    return tokens
+
+
+def _parse_or(tokens: list, position: int, predicate: str) -> tuple:
+    operands = []
+    while True:
+        node, position = _parse_and(tokens, position, predicate)
+        operands.append(node)
+        if position < len(tokens) and tokens[position] == ('name', 'or'):
+            position += 1
+            continue
+        return (operands[0] if len(operands) == 1 else BooleanOperation('or', operands)), position
+
+
+def _parse_and(tokens: list, position: int, predicate: str) -> tuple:
+    operands = []
+    while True:
+        node, position = _parse_atom(tokens, position, predicate)
+        operands.append(node)
+        if position < len(tokens) and tokens[position] == ('name', 'and'):
+            position += 1
+            continue
+        return (operands[0] if len(operands) == 1 else BooleanOperation('and', operands)), position
+
+
+def _parse_atom(tokens: list, position: int, predicate: str) -> tuple:
+    if position < len(tokens) and tokens[position] == ('paren', '('):
+        node, position = _parse_or(tokens, position + 1, predicate)
+        if position >= len(tokens) or tokens[position] != ('paren', ')'):
+            raise PredicateError('Missing ) in predicate {}'.format(predicate))
+        return node, position + 1
+
+    if position + 3 > len(tokens) or tokens[position + 1][0] != 'op':
+        raise PredicateError('Expected a comparison like "tag > 1" in predicate {}'.format(predicate))
+    left, op, right = tokens[position], tokens[position + 1][1], tokens[position + 2]
+    if left[0] in ['name', 'quoted'] and right[0] == 'number':
+        return Comparison(left[1], op, _number(right[1])), position + 3
+    if left[0] == 'number' and right[0] in ['name', 'quoted']:
+        return Comparison(right[1], FLIPPED_OPERATORS[op], _number(left[1])), position + 3
+    raise PredicateError('Comparisons must be between a tag and a number, {} {} {} found in predicate '
+                         '{}'.format(left[1], op, right[1], predicate))
+
+
+def _number(text: str):
+    """
+    :return: int if text is an integer literal, else float
+    """
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
@@ -0,0 +1,561 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from collections import namedtuple
+from timebox.timebox import TimeBox
+from timebox.timebox_tag import TimeBoxTag
+from timebox.footer import footer_to_bytes, end_date_section, start_date_remainder_section, last_value_section, \
+    virtual_tag_section
+from timebox.block_statistics import compute_block_statistics, block_dates_section, block_statistics_section, \
+    checkpoints_section, BLOCK_NUM_POINTS
+from timebox.rollup import BucketStatistics, rollup_widths, rollup_section, ROLLUP_CHUNK_NUM_POINTS
+from timebox.expression import validate_virtual_tags
+from timebox.instrumentation import start_stage, end_stage, WRITE_FILE_INFO, WRITE_DATES, WRITE_TAG, WRITE_FOOTER
+from timebox.utils.numpy_utils import compress_float_array, integer_compression_dtype, \
+    round_array_returning_integers
+from timebox.utils.binary import determine_required_bytes_unsigned_integer
+from timebox.utils.datetime_utils import get_unit_data, get_conversion_multiplier, frequency_to_units, \
+    units_by_order, DAYS
+from timebox.utils.buffer_pool import BufferPool
+from timebox.exceptions import DataDoesNotMatchTagDefinitionError, DataShapeError, DatesNotInOrderError, \
+    DateDataError
+
+
+DEFAULT_WRITE_CHUNK_NUM_POINTS = 1 << 20  # points encoded at a time when the file is assembled
+
+# compression_mode is 'm' or 'e', num_decimals_to_store rounds float tags if not None
+CodecOptions = namedtuple('CodecOptions', ['use_compression', 'compression_mode', 'num_decimals_to_store'])
+DEFAULT_CODEC_OPTIONS = CodecOptions(use_compression=False, compression_mode='m', num_decimals_to_store=None)
+
+
+def apply_codec_options(tags: list, codec_options: CodecOptions):
+    """
+    Sets the encoding options of tags
+    :param tags: list of TimeBoxTag
+    :param codec_options: CodecOptions
+    :return: void
+    """
+    for tag in tags:
+        tag.use_compression = codec_options.use_compression
+        tag._compression_mode = codec_options.compression_mode if codec_options.use_compression else None
+        if codec_options.num_decimals_to_store is not None and tag.type_char == 'f':
+            tag.floating_point_rounded = True
+            tag.num_decimals_to_store = codec_options.num_decimals_to_store
+    return
+
+
+class TimeBoxWriter:
+    def __init__(self, file_path: str, tags: list, tag_names_are_strings: bool = True, date_units: str = 'ns',
+                 chunk_num_points: int = DEFAULT_WRITE_CHUNK_NUM_POINTS, rollups: list = None,
+                 virtual_tags: dict = None, seconds_between_points: int = None):
+        """
+        Writes a TimeBox file from chunks of points appended in date order, holding at most one chunk
+        in memory. Appended points are spooled raw to temporary files next to file_path while the
+        statistics that pick each tag's encoding are accumulated, then close() encodes the spooled
+        data chunk by chunk into the file. The file is identical to the one TimeBox.write() produces
+        for the same points
+        :param file_path: path of the TimeBox file
+        :param tags: list of TimeBoxTag with the definitions and encoding options of the tags, data is ignored
+        :param tag_names_are_strings: True if tag identifiers are strings, False if integers
+        :param date_units: numpy datetime64 units the dates are handled in, like 'ns' or 's'
+        :param chunk_num_points: number of points encoded at a time by close()
+        :param rollups: optional list of rollup bucket durations, see TimeBox.write
+        :param virtual_tags: optional dictionary like {name: expression} of virtual tags, see TimeBox.write
+        :param seconds_between_points: optional number of seconds between points. if given the file stores
+        uniform dates, a start date and this step, instead of date differentials. the appended dates must start
+        at a whole second and be this many seconds apart
+        """
+        self.file_path = file_path
+        self.tag_names_are_strings = tag_names_are_strings
+        self.chunk_num_points = chunk_num_points
+        self.rollup_widths = rollup_widths(rollups) if rollups is not None else []
+        self.virtual_tags = dict(virtual_tags) if virtual_tags is not None else dict()
+        validate_virtual_tags(self.virtual_tags, [t.identifier for t in tags])
+        if seconds_between_points is not None and seconds_between_points <= 0:
+            raise DateDataError('Seconds between points must be positive')
+        if seconds_between_points is not None and get_unit_data(date_units).order > get_unit_data('s').order:
+            raise DateDataError('Uniform dates must be appended in seconds or finer units, {} found'.format(date_units))
+        self.seconds_between_points = seconds_between_points
+        self._spool_dir = tempfile.mkdtemp(prefix='.timebox-spool-', dir=os.path.dirname(os.path.abspath(file_path)))
+        self._dates = _StreamingDateEncoder(os.path.join(self._spool_dir, 'dates'), date_units,
+                                            seconds_between_points)
+        self._tags = dict([
+            (t.identifier, _StreamingTagEncoder(t.definition_copy(), os.path.join(self._spool_dir, str(i))))
+            for i, t in enumerate(tags)
+        ])
+        self._closed = False
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    @property
+    def num_points(self) -> int:
+        return self._dates.num_points
+
+    def append(self, dates: np.ndarray, data: dict):
+        """
+        Appends a chunk of points. Dates must be sorted and not before the dates already appended
+        :param dates: numpy datetime64 array, or int64 array of dates in date_units since epoch
+        :param data: dictionary like {tag_identifier: numpy array} with one array per tag
+        :return: void
+        """
+        if self._closed:
+            raise DataShapeError('Cannot append to a closed writer')
+        if sorted(data, key=str) != sorted(self._tags, key=str):
+            raise DataDoesNotMatchTagDefinitionError('Appended tags {} do not match the writer tags '
+                                                     '{}'.format(sorted(data, key=str), sorted(self._tags, key=str)))
+        dates = np.asarray(dates)
+        for t in data:
+            if data[t].size != dates.size:
+                raise DataShapeError('Data for tag {} does not have the correct shape'.format(t))
+        self._dates.append(dates)
+        for t in data:
+            self._tags[t].append(data[t])
+        return
+
+    def close(self) -> TimeBox:
+        """
+        Writes the file from the spooled points and removes the spool files
+        :return: TimeBox associated with the file, without data read
+        """
+        if self._closed:
+            raise DataShapeError('Writer was already closed')
+        try:
+            if self.num_points == 0:
+                raise DataShapeError('No points were appended to {}'.format(self.file_path))
+            tb = TimeBox(self.file_path)
+            tb._tag_names_are_strings = self.tag_names_are_strings
+            tb._num_points = self.num_points
+            tb._start_date = self._dates.start_date
+            if self.seconds_between_points is None:
+                tb._date_differentials_stored = True
+                tb._bytes_per_date_differential, tb._date_differential_units = self._dates.finalize()
+            else:
+                tb._date_differentials_stored = False
+                tb._seconds_between_points = self.seconds_between_points
+            for t in self._tags:
+                tb._tags[t] = self._tags[t].finalize(self.num_points)
+            tb._replace_file_contents(lambda handle: self._write_contents(tb, handle))
+        finally:
+            self.abort()
+        return TimeBox(self.file_path)
+
+    def abort(self):
+        """
+        Discards the appended points and removes the spool files, the file is not written
+        :return: void
+        """
+        if not self._closed:
+            self._closed = True
+            self._dates.close()
+            for t in self._tags:
+                self._tags[t].close()
+            shutil.rmtree(self._spool_dir, ignore_errors=True)
+        return
+
+    def _write_contents(self, tb: TimeBox, file_handle) -> int:
+        """
+        Writes the whole file, encoding the spooled points chunk by chunk
+        :param tb: TimeBox holding the file info and finalized tag definitions
+        :param file_handle: file handle object in 'wb' mode, pre-seeked to the start of the file
+        :return: int, seek bytes advanced in this method
+        """
+        started = start_stage()
+        num_bytes = tb._write_file_info(file_handle)
+        end_stage(started, WRITE_FILE_INFO, self.file_path, num_bytes=num_bytes)
+
+        if tb._date_differentials_stored:
+            started = start_stage()
+            date_bytes = self._dates.write_encoded(file_handle, self.chunk_num_points)
+            end_stage(started, WRITE_DATES, self.file_path, num_bytes=date_bytes)
+            num_bytes += date_bytes
+
+        for t in sorted(self._tags):
+            started = start_stage()
+            tag_bytes = self._tags[t].write_encoded(file_handle, self.chunk_num_points)
+            end_stage(started, WRITE_TAG, self.file_path, t, tag_bytes)
+            num_bytes += tag_bytes
+
+        started = start_stage()
+        # block statistics are summarized from chunks holding whole blocks
+        chunk_num_points = max(self.chunk_num_points // BLOCK_NUM_POINTS, 1) * BLOCK_NUM_POINTS
+        sections = []
+        if tb._date_differentials_stored:
+            sections.append(end_date_section(self._dates.end_date_units_since_start))
+            if self._dates.start_date_remainder > 0:
+                sections.append(start_date_remainder_section(self._dates.start_date_remainder))
+            sections.append(block_dates_section(self._dates.block_date_offsets(chunk_num_points)))
+        for i, t in enumerate(sorted(self._tags)):
+            sections.append(block_statistics_section(i, self._tags[t].block_statistics(chunk_num_points)))
+        for i, t in enumerate(sorted(self._tags)):
+            if tb._tags[t].use_compression and tb._tags[t]._compression_mode == 'e':
+                sections.append(last_value_section(i, self._tags[t].last_value()))
+                sections.append(checkpoints_section(i, self._tags[t].checkpoints()))
+        for i, t in enumerate(sorted(self._tags)):
+            for width, (labels, statistics) in zip(self.rollup_widths, self._tags[t].rollups(self._dates,
+                                                                                            self.rollup_widths)):
+                sections.append(rollup_section(i, width, labels, statistics))
+        for name in sorted(self.virtual_tags):
+            sections.append(virtual_tag_section(name, self.virtual_tags[name]))
+        footer_bytes = footer_to_bytes(sections)
+        file_handle.write(footer_bytes)
+        end_stage(started, WRITE_FOOTER, self.file_path, num_bytes=len(footer_bytes))
+        return num_bytes + len(footer_bytes)
+
+
+class _StreamingDateEncoder:
+    def __init__(self, spool_path: str, date_units: str, seconds_between_points: int = None):
+        """
+        Spools int64 dates and tracks the coarsest units and largest differential, like
+        TimeBox._compress_date_differentials does for a whole array
+        :param spool_path: path of the spool file
+        :param date_units: numpy datetime64 units the dates are handled in
+        :param seconds_between_points: optional number of seconds every date must be after the previous one
+        """
+        self.date_units = date_units
+        self._second = int(get_conversion_multiplier('s', date_units))
+        self._step = None if seconds_between_points is None else seconds_between_points * self._second
+        self.num_points = 0
+        self._spool = open(spool_path, 'w+b')
+        self._first = None
+        self._last = None
+        self._max_difference = 0
+        self._coarsest_order = DAYS  # lowered until every differential is a multiple of the units
+        self._base_order = get_unit_data(date_units).order
+        self._multiplier = 1
+        return
+
+    @property
+    def start_date(self) -> np.datetime64:
+        return np.datetime64(int(self._first), self.date_units)
+
+    @property
+    def end_date_units_since_start(self) -> int:
+        return int((self._last - self._first) // self._multiplier)
+
+    @property
+    def start_date_remainder(self) -> int:
+        """
+        Date differential units from the whole second before the first date to the first date,
+        like TimeBox._start_date_remainder
+        """
+        return self._remainder() // self._multiplier
+
+    def _remainder(self) -> int:
+        """
+        :return: int, date_units from the whole second before the first date to the first date
+        """
+        return int(self._first % self._second) if self._second > 1 else 0
+
+    def append(self, dates: np.ndarray):
+        if dates.size == 0:
+            return
+        if dates.dtype.kind == 'M':
+            dates = dates.astype('datetime64[{}]'.format(self.date_units)).view(np.int64)
+        dates = dates.astype(np.int64, copy=False)
+        if self._last is None:
+            differences = np.diff(dates)
+            self._first = dates[0]
+        else:
+            differences = np.diff(dates, prepend=self._last)
+        if self._step is not None:
+            self._check_uniform(dates)
+        if differences.size > 0:
+            if np.amin(differences) < 0:
+                raise DatesNotInOrderError('Dates were not in order')
+            self._max_difference = max(self._max_difference, int(np.amax(differences)))
+            while self._coarsest_order > self._base_order:
+                divisor = int(get_conversion_multiplier(units_by_order[self._coarsest_order], self.date_units))
+                if np.count_nonzero(differences % divisor) == 0:
+                    break
+                self._coarsest_order -= 1
+        self._last = dates[-1]
+        dates.tofile(self._spool)
+        self.num_points += dates.size
+        return
+
+    def _check_uniform(self, dates: np.ndarray):
+        """
+        Checks that dates follow the uniform dates appended so far
+        :param dates: int64 array of dates in date_units since epoch
+        :return: void
+        """
+        if self._first % self._second != 0:
+            raise DateDataError('Uniform dates must start at a whole second, {} found'.format(self.start_date))
+        expected = self._first + np.arange(self.num_points, self.num_points + dates.size, dtype=np.int64) * self._step
+        if not np.array_equal(dates, expected):
+            raise DateDataError('Dates are not {} seconds apart'.format(self._step // self._second))
+        return
+
+    def finalize(self) -> tuple:
+        """
+        Picks the units and number of bytes of the stored date differentials
+        :return: tuple like (bytes per date differential, date differential units order)
+        """
+        order = self._coarsest_order if self.num_points > 1 else self._base_order
+        # the file info holds the start date in whole seconds, the units must also divide the rest of it
+        while order > self._base_order and \
+                self._remainder() % int(get_conversion_multiplier(units_by_order[order], self.date_units)) != 0:
+            order -= 1
+        self._multiplier = int(get_conversion_multiplier(units_by_order[order], self.date_units))
+        self._dtype = np.dtype('u{}'.format(determine_required_bytes_unsigned_integer(
+            self._max_difference // self._multiplier
+        )))
+        return self._dtype.itemsize, order
+
+    def write_encoded(self, file_handle, chunk_num_points: int) -> int:
+        num_bytes = 0
+        previous = None
+        self._spool.seek(0)
+        while True:
+            dates = np.fromfile(self._spool, dtype=np.int64, count=chunk_num_points)
+            if dates.size == 0:
+                break
+            differences = np.diff(dates) if previous is None else np.diff(dates, prepend=previous)
+            differences //= self._multiplier
+            encoded = differences.astype(self._dtype)
+            encoded.tofile(file_handle)
+            num_bytes += encoded.nbytes
+            previous = dates[-1]
+        return num_bytes
+
+    def chunks(self, chunk_num_points: int):
+        """
+        Reads the spooled dates back
+        :param chunk_num_points: number of dates read at a time
+        :return: generator of int64 arrays of dates in date_units since epoch
+        """
+        self._spool.seek(0)
+        while True:
+            dates = np.fromfile(self._spool, dtype=np.int64, count=chunk_num_points)
+            if dates.size == 0:
+                break
+            yield dates
+        return
+
+    def block_date_offsets(self, chunk_num_points: int) -> np.ndarray:
+        """
+        Gets the date of the first point of each block from the spooled dates
+        :param chunk_num_points: number of dates read at a time, a multiple of BLOCK_NUM_POINTS
+        :return: int64 array, date units from the start date to the first date of each block
+        """
+        offsets = [(dates[::BLOCK_NUM_POINTS] - self._first) // self._multiplier
+                   for dates in self.chunks(chunk_num_points)]
+        return np.concatenate(offsets)
+
+    def close(self):
+        self._spool.close()
+        return
+
+
+class _StreamingTagEncoder:
+    def __init__(self, tag: TimeBoxTag, spool_path: str):
+        """
+        Spools a tag's data and tracks the statistics compress_array uses to pick the encoding
+        :param tag: TimeBoxTag definition, owned by the encoder
+        :param spool_path: path of the spool file
+        """
+        self.tag = tag
+        self._spool = open(spool_path, 'w+b')
+        self._buffer_pool = BufferPool()
+        self._first = None
+        self._last = None  # last value before compression, as a 1-element array
+        self._min = None
+        self._max = None
+        self._difference_min = None
+        self._difference_max = None
+        self._float_itemsize = 0
+        self._num_points = 0
+        self._checkpoints = []  # values to compress at the first point of each block, for 'e' mode
+        return
+
+    def append(self, data: np.ndarray):
+        if data.dtype != self.tag.dtype:
+            raise DataDoesNotMatchTagDefinitionError('Data for tag {} does not have correct '
+                                                     'dtype {}'.format(self.tag.identifier, self.tag.dtype))
+        if data.size == 0:
+            return
+        data.tofile(self._spool)
+        if not self.tag.use_compression:
+            return
+
+        values = self._values_to_compress(data)
+        if self._first is None:
+            self._first = values[0]
+        chunk_min, chunk_max = np.amin(values), np.amax(values)
+        self._min = chunk_min if self._min is None else np.minimum(self._min, chunk_min)
+        self._max = chunk_max if self._max is None else np.maximum(self._max, chunk_max)
+        if self.tag._compression_mode == 'e':
+            differences = self._differences(values, self._last)
+            if differences.size > 0:
+                self._update_difference_statistics(differences)
+            self._checkpoints.append(values[-self._num_points % BLOCK_NUM_POINTS::BLOCK_NUM_POINTS].copy())
+        self._last = values[-1:].copy()
+        self._num_points += values.size
+        return
+
+    def finalize(self, num_points: int) -> TimeBoxTag:
+        """
+        Sets the encoding of the tag from the accumulated statistics
+        :param num_points: number of points appended
+        :return: TimeBoxTag definition ready to be written to the file info
+        """
+        tag = self.tag
+        tag.num_points = num_points
+        if not tag.use_compression:
+            return tag
+        tag._compression_mode = 'm' if tag._compression_mode is None else tag._compression_mode
+        values_dtype = np.dtype(np.int64 if tag.floating_point_rounded else tag.dtype)
+        if values_dtype.itemsize == 1 and values_dtype.kind in ['u', 'i'] \
+                or values_dtype.kind == 'f' and values_dtype.itemsize == 2 \
+                or num_points == 1 and tag._compression_mode == 'e':
+            # compress_array leaves these uncompressed
+            tag.use_compression = False
+            return tag
+
+        if tag._compression_mode == 'm':
+            tag._compression_reference_value = self._min
+            if values_dtype.kind == 'f':
+                self._float_itemsize_from_spool()
+            else:
+                self._difference_min = values_dtype.type(0)
+                self._difference_max = np.subtract(self._max, self._min, dtype=values_dtype)
+        else:
+            tag._compression_reference_value = self._first
+        tag._compression_reference_value_dtype = values_dtype
+        compressed_dtype = np.dtype(values_dtype.kind + str(self._float_itemsize)) if values_dtype.kind == 'f' \
+            else np.dtype(integer_compression_dtype(self._difference_min, self._difference_max))
+        tag._compressed_type_char = compressed_dtype.kind
+        tag._compressed_bytes_per_value = compressed_dtype.itemsize
+        return tag
+
+    def write_encoded(self, file_handle, chunk_num_points: int) -> int:
+        tag = self.tag
+        num_bytes = 0
+        previous = None
+        self._spool.seek(0)
+        while True:
+            data = np.fromfile(self._spool, dtype=tag.dtype, count=chunk_num_points)
+            if data.size == 0:
+                break
+            if not tag.use_compression and not tag.floating_point_rounded:
+                encoded = data
+            else:
+                values = self._values_to_compress(data)
+                if not tag.use_compression:
+                    encoded = values
+                elif tag._compression_mode == 'm':
+                    encoded = np.subtract(values, tag._compression_reference_value, dtype=values.dtype)
+                else:
+                    encoded = self._differences(values, previous)
+                    previous = values[-1:].copy()
+                encoded = encoded.astype(tag._encoded_dtype_and_count(tag.num_points)[0], copy=False) \
+                    if tag.use_compression else encoded
+            encoded.tofile(file_handle)
+            num_bytes += encoded.nbytes
+        return num_bytes
+
+    def block_statistics(self, chunk_num_points: int) -> np.ndarray:
+        """
+        Summarizes the spooled data in blocks, like TimeBoxTag.block_statistics
+        :param chunk_num_points: number of points read at a time, a multiple of BLOCK_NUM_POINTS
+        :return: numpy array of block_statistics.block_statistics_dtype, one element per block
+        """
+        tag = self.tag
+        statistics = []
+        self._spool.seek(0)
+        while True:
+            data = np.fromfile(self._spool, dtype=tag.dtype, count=chunk_num_points)
+            if data.size == 0:
+                break
+            if tag.floating_point_rounded:
+                statistics.append(compute_block_statistics(self._values_to_compress(data), BLOCK_NUM_POINTS,
+                                                           tag.num_decimals_to_store))
+            else:
+                statistics.append(compute_block_statistics(data, BLOCK_NUM_POINTS))
+        return np.concatenate(statistics)
+
+    def last_value(self) -> np.ndarray:
+        """
+        Gets the value 'e' mode accumulates to at the last point, like TimeBoxTag.last_value
+        :return: 1-element numpy array of the tag's dtype
+        """
+        return self._last.astype(self.tag.dtype)
+
+    def checkpoints(self) -> np.ndarray:
+        """
+        Gets the values 'e' mode accumulates to at the first point of each block, like TimeBoxTag.checkpoints
+        :return: numpy array of the tag's dtype, one element per block
+        """
+        return np.concatenate(self._checkpoints).astype(self.tag.dtype)
+
+    def rollups(self, dates: _StreamingDateEncoder, widths: list) -> list:
+        """
+        Summarizes the spooled data in buckets of each duration, like TimeBoxTag.rollup
+        :param dates: _StreamingDateEncoder of the same points
+        :param widths: list of bucket durations in nanoseconds
+        :return: list of tuples like (int64 array of the buckets since epoch, array of
+        block_statistics.block_statistics_dtype), one per width
+        """
+        tag = self.tag
+        num_decimals = tag.num_decimals_to_store if tag.floating_point_rounded else None
+        buckets = [BucketStatistics(frequency_to_units(np.timedelta64(w, 'ns'), dates.date_units), tag.dtype,
+                                    num_decimals) for w in widths]
+        self._spool.seek(0)
+        for chunk_dates in dates.chunks(ROLLUP_CHUNK_NUM_POINTS):
+            data = self._values_to_compress(np.fromfile(self._spool, dtype=tag.dtype, count=chunk_dates.size))
+            for b in buckets:
+                b.append(chunk_dates, data)
+        return [b.finish() for b in buckets]
+
+    def close(self):
+        self._spool.close()
+        return
+
+    def _values_to_compress(self, data: np.ndarray) -> np.ndarray:
+        """
+        Gets the values compress_array is given, the rounded integers of rounded tags
+        """
+        if self.tag.floating_point_rounded:
+            return round_array_returning_integers(data, self.tag.num_decimals_to_store, self._buffer_pool)
+        return data
+
+    @classmethod
+    def _differences(cls, values: np.ndarray, previous: np.ndarray = None) -> np.ndarray:
+        """
+        Gets the element-wise differences in the dtype of values, starting from the previous chunk's last value
+        """
+        if previous is None:
+            return np.subtract(values[1:], values[:-1], dtype=values.dtype)
+        return np.subtract(values, np.concatenate((previous, values[:-1])), dtype=values.dtype)
+
+    def _update_difference_statistics(self, differences: np.ndarray):
+        if differences.dtype.kind == 'f':
+            self._float_itemsize = max(self._float_itemsize, compress_float_array(differences).itemsize)
+            return
+        chunk_min, chunk_max = np.amin(differences), np.amax(differences)
+        self._difference_min = chunk_min if self._difference_min is None else min(self._difference_min, chunk_min)
+        self._difference_max = chunk_max if self._difference_max is None else max(self._difference_max, chunk_max)
+        return
+
+    def _float_itemsize_from_spool(self):
+        """
+        Float differences from the minimum can only be checked once the minimum is known,
+        so the spooled data is read once more
+        """
+        self._spool.seek(0)
+        while True:
+            data = np.fromfile(self._spool, dtype=self.tag.dtype, count=DEFAULT_WRITE_CHUNK_NUM_POINTS)
+            if data.size == 0:
+                break
+            self._update_difference_statistics(np.subtract(data, self._min, dtype=data.dtype))
+        return